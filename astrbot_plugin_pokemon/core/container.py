@@ -1,5 +1,6 @@
 import os
 import shutil
+from typing import Any, Dict, Optional
 
 from .services.player.user_item_serviece import UserItemService
 from ..core.services import (
@@ -8,20 +9,22 @@ from ..core.services import (
     EvolutionService, NatureService, TrainerService, AbilityService
 )
 
-from ..infrastructure.repositories.sqlite_item_repo import SqliteItemRepository
-from ..infrastructure.repositories.sqlite_nature_repo import SqliteNatureRepository
-from ..infrastructure.repositories.sqlite_pokemon_repo import SqlitePokemonRepository
+from .services.world.encounter_store import EncounterStore, DEFAULT_TTL_SECONDS
+from ..infrastructure.database.connection_manager import SqliteConnectionManager
+from ..infrastructure.database.user_state_cache import UserStateCache, DEFAULT_MAX_USERS, DEFAULT_TTL_SECONDS as STATE_TTL_SECONDS
+from ..infrastructure.database.async_executor import DatabaseExecutor, DEFAULT_MAX_WORKERS
+from ..infrastructure.database.game_data_catalog import GameDataCatalog
 from ..infrastructure.repositories.sqlite_team_repo import SqliteTeamRepository
 from ..infrastructure.repositories.sqlite_user_item_repo import SqliteUserItemRepository
 from ..infrastructure.repositories.sqlite_user_repo import SqliteUserRepository
-from ..infrastructure.repositories.sqlite_adventure_repo import SqliteAdventureRepository
-from ..infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository
+from ..infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository, MAINTENANCE_BATCH_SIZE, DEFAULT_WIN_RATE_PERSIST_ROWS
 from ..infrastructure.repositories.sqlite_shop_repo import SqliteShopRepository
-from ..infrastructure.repositories.sqlite_move_repo import SqliteMoveRepository
 from ..infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
 from ..infrastructure.repositories.sqlite_trainer_repo import SqliteTrainerRepository
-from ..infrastructure.repositories.sqlite_ability_repo import SqliteAbilityRepository
-from ..infrastructure.repositories.sqlite_pokemon_ability_repo import SqlitePokemonAbilityRepository
+from ..infrastructure.repositories.catalog_repos import (
+    CatalogPokemonRepository, CatalogAdventureRepository, CatalogItemRepository, CatalogMoveRepository,
+    CatalogNatureRepository, CatalogAbilityRepository, CatalogPokemonAbilityRepository
+)
 
 
 class GameContainer:
@@ -32,24 +35,51 @@ class GameContainer:
         self.db_path = db_path
         self.config = config
 
-        # 1. 初始化 Repositories
-        self.user_repo = SqliteUserRepository(self.db_path)
-        self.pokemon_repo = SqlitePokemonRepository(self.db_path)
-        self.team_repo = SqliteTeamRepository(self.db_path)
-        self.adventure_repo = SqliteAdventureRepository(self.db_path)
-        self.shop_repo = SqliteShopRepository(self.db_path)
-        self.item_repo = SqliteItemRepository(self.db_path)
-        self.move_repo = SqliteMoveRepository(self.db_path)
-        self.battle_repo = SqliteBattleRepository(self.db_path)
-        self.user_pokemon_repo = SqliteUserPokemonRepository(self.db_path)
-        self.user_item_repo = SqliteUserItemRepository(self.db_path)
-        self.nature_repo = SqliteNatureRepository(self.db_path)
-        self.trainer_repo = SqliteTrainerRepository(self.db_path)  # 添加训练家仓库
-        self.ability_repo = SqliteAbilityRepository(self.db_path)  # 添加特性定义仓库
-        self.pokemon_ability_repo = SqlitePokemonAbilityRepository(self.db_path)  # 添加宝可梦特性关联仓库
+        # 1. 初始化 Repositories（共用同一个连接管理器：按线程复用连接并统一 PRAGMA 配置）
+        #    静态数据仓储在 load_catalog() 之后改为从内存目录读取
+        self.db_manager = SqliteConnectionManager.from_config(self.db_path, self.config)
+        # 指令处理器通过专用数据库线程异步调用服务，避免阻塞事件循环
+        self.db_executor = DatabaseExecutor(
+            max_workers=self.config.get("database", {}).get("executor_workers", DEFAULT_MAX_WORKERS)
+        )
+        # 静态数据目录（初始数据写入后由 load_catalog() 加载）
+        self.catalog: Optional[GameDataCatalog] = None
+        # 玩家热点状态缓存（用户行、队伍、队伍宝可梦、道馆状态、图鉴位图），由各仓储在写入后失效
+        state_cache_config = self.config.get("state_cache", {})
+        self.state_cache = UserStateCache(
+            max_users=state_cache_config.get("max_users", DEFAULT_MAX_USERS),
+            ttl_seconds=state_cache_config.get("ttl_seconds", STATE_TTL_SECONDS)
+        )
+        self.db_manager.add_rollback_listener(self.state_cache.clear)
+        self.user_repo = SqliteUserRepository(self.db_path, self.db_manager, state_cache=self.state_cache)
+        self.pokemon_repo = CatalogPokemonRepository(self.db_path, self.db_manager)
+        self.team_repo = SqliteTeamRepository(self.db_path, self.db_manager, state_cache=self.state_cache)
+        self.adventure_repo = CatalogAdventureRepository(self.db_path, self.db_manager, state_cache=self.state_cache)
+        self.shop_repo = SqliteShopRepository(self.db_path, self.db_manager)
+        self.item_repo = CatalogItemRepository(self.db_path, self.db_manager)
+        self.move_repo = CatalogMoveRepository(self.db_path, self.db_manager)
+        battle_log_config = self.config.get("battle_log", {})
+        self.battle_repo = SqliteBattleRepository(self.db_path, self.db_manager,
+                                                  compress=battle_log_config.get("compress", True))
+        self.user_pokemon_repo = SqliteUserPokemonRepository(self.db_path, self.db_manager, self.move_repo,
+                                                             state_cache=self.state_cache)
+        self.user_item_repo = SqliteUserItemRepository(self.db_path, self.db_manager)
+        self.nature_repo = CatalogNatureRepository(self.db_path, self.db_manager)
+        self.trainer_repo = SqliteTrainerRepository(self.db_path, self.db_manager)  # 添加训练家仓库
+        self.ability_repo = CatalogAbilityRepository(self.db_path, self.db_manager)  # 添加特性定义仓库
+        self.pokemon_ability_repo = CatalogPokemonAbilityRepository(self.db_path, self.db_manager)  # 添加宝可梦特性关联仓库
 
 
 
+        # 未处理的野生遭遇缓存（冒险服务与用户宝可梦服务共用）
+        adventure_config = self.config.get("adventure", {})
+        self.encounter_store = EncounterStore(
+            self.pokemon_repo, self.user_pokemon_repo,
+            ttl_seconds=adventure_config.get("encounter_ttl_seconds", DEFAULT_TTL_SECONDS),
+            write_through=adventure_config.get("encounter_write_through", True),
+            on_rollback=self.db_manager.on_rollback
+        )
+
         # 2. 初始化 Services (依赖注入逻辑)
         self.nature_service = NatureService(
             nature_repo=self.nature_repo
@@ -90,7 +120,8 @@ class GameContainer:
             pokemon_ability_repo=self.pokemon_ability_repo,
             user_item_repo=self.user_item_repo,
             move_repo=self.move_repo,
-            config=self.config
+            config=self.config,
+            encounter_store=self.encounter_store
         )
         self.user_item_service = UserItemService(
             user_item_repo=self.user_item_repo,
@@ -127,7 +158,9 @@ class GameContainer:
             pokemon_service=self.pokemon_service,
             pokemon_ability_repo=self.pokemon_ability_repo,
             exp_service=self.exp_service,
-            config=self.config
+            config=self.config,
+            unit_of_work=self.db_manager.unit_of_work,
+            encounter_store=self.encounter_store
         )
         # 设置冒险服务中的训练家服务引用
         self.adventure_service.set_trainer_service(self.trainer_service)
@@ -155,6 +188,51 @@ class GameContainer:
         os.makedirs(self.tmp_dir, exist_ok=True)
         self._clear_tmp_directory()
 
+    def load_catalog(self) -> GameDataCatalog:
+        """初始数据写入完成后加载（或重新加载）静态数据目录，此后静态数据查询不再访问数据库"""
+        self.catalog = GameDataCatalog.load(self.db_manager.get_connection())
+        for repo in (self.pokemon_repo, self.adventure_repo, self.item_repo, self.move_repo,
+                     self.nature_repo, self.ability_repo, self.pokemon_ability_repo):
+            repo.use_catalog(self.catalog)
+        return self.catalog
+
+    def maintain_battle_logs(self) -> Dict[str, int]:
+        """
+        执行一批战斗日志维护（由后台任务在数据库线程中反复调用，直到没有可处理的记录）：
+        把旧的 JSON 文本日志转换为压缩格式，按 config["battle_log"] 的保留策略归档过期日志，
+        并把持久化的胜率缓存裁剪到 config["adventure"]["win_rate_cache_persist_rows"] 行以内。
+        """
+        battle_log_config = self.config.get("battle_log", {})
+        compressed = 0
+        if battle_log_config.get("compress", True):
+            compressed = self.battle_repo.compress_legacy_battle_logs(MAINTENANCE_BATCH_SIZE)
+        pruned = self.battle_repo.prune_battle_logs(
+            keep_per_user=battle_log_config.get("keep_per_user", 0),
+            keep_days=battle_log_config.get("keep_days", 0),
+            archive=battle_log_config.get("archive", True),
+            batch_size=MAINTENANCE_BATCH_SIZE
+        )
+        adventure_config = self.config.get("adventure", {})
+        win_rates = 0
+        if adventure_config.get("win_rate_cache_persist", False):
+            win_rates = self.battle_repo.prune_win_rate_cache(
+                adventure_config.get("win_rate_cache_persist_rows", DEFAULT_WIN_RATE_PERSIST_ROWS),
+                batch_size=MAINTENANCE_BATCH_SIZE
+            )
+        return {"compressed": compressed, "pruned": pruned, "win_rates": win_rates}
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        """各内存缓存与数据库连接的命中/执行指标"""
+        return {
+            "user_state": self.state_cache.stats(),
+            "encounters": self.encounter_store.stats(),
+            "database": self.db_manager.metrics(),
+        }
+
+    def collect_wild_pokemon_garbage(self) -> Dict[str, int]:
+        """执行一批野生遭遇清理（由后台任务在数据库线程中反复调用）：过期遭遇与无引用的历史野生宝可梦"""
+        return {"wild_pokemon": self.encounter_store.collect_garbage()}
+
     def _clear_tmp_directory(self):
         """清空临时目录中的文件"""
         if os.path.exists(self.tmp_dir):
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import datetime
-from typing import Optional, TypedDict, Dict, List
+from typing import Optional, TypedDict, Dict, List, Tuple
 
 from dataclasses import dataclass
 
@@ -36,6 +36,7 @@ class BattleMoveInfo:
     max_hits: int = 1  # 最多攻击次数
     # 新增：接触类招式标记
     is_contact: bool = False  # 是否为接触类招式
+    type_id: Optional[int] = None  # 属性ID（由 type_chart 在创建战斗上下文时填充）
 
 
 
@@ -58,6 +59,8 @@ class BattleContext:
     charging_move_id: Optional[int] = None
     # 保护状态 (如 'underground', 'flying', 'diving')
     protection_status: Optional[str] = None
+    # 属性ID元组（由 type_chart 在创建时由 types 换算）
+    type_ids: Optional[Tuple[int, ...]] = None
 
 
 
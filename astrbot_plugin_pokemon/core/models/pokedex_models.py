@@ -0,0 +1,49 @@
+from collections.abc import Set as AbstractSet
+from typing import Iterable, Iterator, Optional
+
+
+class SpeciesBitset(AbstractSet):
+    """以整数位图表示的物种ID集合（第 n 位为 1 表示包含物种 n），支持 in / len / 迭代及集合运算"""
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, species_ids: Iterable[int]) -> 'SpeciesBitset':
+        bits = 0
+        for species_id in species_ids:
+            bits |= 1 << species_id
+        return cls(bits)
+
+    @classmethod
+    def from_blob(cls, blob: Optional[bytes]) -> 'SpeciesBitset':
+        """从 user_pokedex 中保存的小端字节串还原"""
+        return cls(int.from_bytes(blob, "little") if blob else 0)
+
+    def to_blob(self) -> bytes:
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def with_id(self, species_id: int) -> 'SpeciesBitset':
+        """返回加入 species_id 后的新集合"""
+        return SpeciesBitset(self.bits | (1 << species_id))
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[int]) -> 'SpeciesBitset':
+        return cls.from_ids(it)
+
+    def __contains__(self, species_id) -> bool:
+        return isinstance(species_id, int) and species_id >= 0 and (self.bits >> species_id) & 1 == 1
+
+    def __len__(self) -> int:
+        return bin(self.bits).count("1")
+
+    def __iter__(self) -> Iterator[int]:
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def __repr__(self) -> str:
+        return f"SpeciesBitset({sorted(self)})"
@@ -210,9 +210,8 @@ class StaticAbility(AbilityPlugin):
         self.owner.hooks.register("after_damage", hook)
 
     def on_hit(self, owner, attacker, move, damage, logger_obj):
-        import random
         # 接触类招式判定 且 30% 几率
-        if getattr(move, 'is_contact', False) and random.random() < 0.3:
+        if getattr(move, 'is_contact', False) and self.owner.rng.random() < 0.3:
             # 使用现有的状态系统施加麻痹 (Status ID: 1, 假设1是麻痹，根据 battle_engine/context)
             # 检查 attacker 状态
             if attacker.non_volatile_status is None:
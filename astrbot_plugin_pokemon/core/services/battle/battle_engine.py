@@ -8,11 +8,21 @@ from .stat_modifier_service import StatModifierService, StatID
 from .battle_config import battle_config
 from .hook_manager import HookManager, BattleHook
 from .hook_manager import HookManager, BattleHook
+from .type_chart import type_chart, TYPE_NAME_MAPPING
+from .battle_events import (
+    StructuredBattleLogger, render_event, NEUTRAL,
+    EV_MOVE, EV_DAMAGE, EV_MULTI_HIT, EV_MISS, EV_FAINT,
+    EV_AILMENT, EV_STAT_CHANGE, EV_HEAL, EV_HP_LOSS, EV_OHKO,
+)
 from .status_plugins import StatusRegistry
 from .ability_plugins import AbilityRegistry
 from .item_plugins import ItemRegistry
 
 
+# 战斗引擎版本：战斗规则或随机数消耗顺序变化时递增，旧版本的重放记录将不再重新生成
+BATTLE_ENGINE_VERSION = 1
+
+
 # --- 基础协议与数据类 ---
 
 class BattleLogger(Protocol):
@@ -20,14 +30,17 @@ class BattleLogger(Protocol):
 
     def log_rich(self, segments: list): ...
 
+    def log_event(self, event_type: int, actor=None, *values): ...
+
     def should_log_details(self) -> bool: ...
 
 
-class ListBattleLogger:
+class ListBattleLogger(StructuredBattleLogger):
+    """逐条立即渲染为文本/分段的日志器（结构化事件也即时渲染，兼容旧格式）"""
+
     def __init__(self, log_details: bool = False):
+        super().__init__(log_details)
         self.logs = []
-        self._log_details = log_details
-
 
     def log(self, message: str): self.logs.append(message)
     
@@ -38,7 +51,9 @@ class ListBattleLogger:
         """
         self.logs.append(segments)
 
-    def should_log_details(self) -> bool: return self._log_details
+    def log_event(self, event_type: int, actor=None, *values):
+        super().log_event(event_type, actor, *values)
+        self.logs.extend(render_event(self.events.pop(), self.actors, self.moves))
 
 
 class NoOpBattleLogger:
@@ -46,6 +61,8 @@ class NoOpBattleLogger:
 
     def log_rich(self, segments: list): pass
 
+    def log_event(self, event_type: int, actor=None, *values): pass
+
     def should_log_details(self) -> bool: return False
 
 
@@ -91,8 +108,15 @@ class BattleState:
     item_plugin: Optional[Any] = None
     # -----------------------
 
+    # 修正后能力值缓存：(钩子表, 钩子版本, 场域钩子表, 场域钩子版本, 天气, 能力等级快照, 能力值)
+    stat_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    # 随机数来源（状态/特性/持有物插件使用），实战时为所属 BattleLogic 的独立随机流
+    rng: Any = field(default=random, repr=False, compare=False)
+
     @classmethod
-    def from_context(cls, context: BattleContext) -> 'BattleState':
+    def from_context(cls, context: BattleContext, rng: Any = None) -> 'BattleState':
+        type_chart.normalize_context(context)  # 属性ID只换算一次
         state = cls(
             context=context,
             current_hp=context.current_hp,
@@ -106,11 +130,71 @@ class BattleState:
             ability_id=getattr(context.pokemon, 'ability_id', None),
             item_id=getattr(context.pokemon, 'held_item_id', None)  # 新增：获取持有物ID
         )
+        if rng is not None:
+            state.rng = rng
         state._setup_initial_hooks()
         state._init_ability() # 初始化特性
         state._init_item()    # 新增：初始化持有物
         return state
 
+    def clone(self) -> 'BattleState':
+        """
+        基于原型的快速结构复制：复制可变容器与插件实例并把插件的 owner 改绑到新状态，
+        避免每场模拟都重新执行 from_context（重新创建 HookManager 与全部插件）。
+        首次复制时在原型上缓存复制模板，因此原型本身不应参与战斗，只用于产生副本。
+        """
+        template = self.__dict__.get('_clone_template')
+        if template is None:
+            template = self._build_clone_template()
+        plugins, status_ids, hook_template = template
+
+        cls = self.__class__
+        state = cls.__new__(cls)
+        state.__dict__.update(self.__dict__)
+        # 复制模板只属于原型；能力值缓存每个副本独立，从空缓存开始
+        del state.__dict__['_clone_template']
+        state.stat_cache = None
+        state.current_pps = self.current_pps.copy()
+        state.stat_levels = self.stat_levels.copy()
+        state.volatile_statuses = self.volatile_statuses.copy()
+
+        if not plugins:
+            # 常见情况：无特性/持有物/状态插件
+            state.active_plugins = {}
+            state.hooks = HookManager() if hook_template is None else HookManager.from_template(hook_template, plugins)
+            return state
+
+        new_plugins = []
+        for plugin in plugins:
+            new_plugin = plugin.__class__.__new__(plugin.__class__)
+            new_plugin.__dict__.update(plugin.__dict__)
+            new_plugin.owner = state
+            new_plugins.append(new_plugin)
+
+        n_status = len(status_ids)
+        state.active_plugins = dict(zip(status_ids, new_plugins))
+        extra = iter(new_plugins[n_status:])
+        if self.ability_plugin is not None:
+            state.ability_plugin = next(extra)
+        if self.item_plugin is not None:
+            state.item_plugin = next(extra)
+        state.hooks = HookManager.from_template(hook_template, new_plugins)
+        return state
+
+    def _build_clone_template(self) -> tuple:
+        """缓存复制模板：(插件列表, 状态ID顺序, 钩子模板)；钩子表为空时钩子模板为 None"""
+        plugins = list(self.active_plugins.values())
+        if self.ability_plugin is not None:
+            plugins.append(self.ability_plugin)
+        if self.item_plugin is not None:
+            plugins.append(self.item_plugin)
+        hook_template = self.hooks.clone_template(plugins)
+        if not any(hook_template.values()):
+            hook_template = None
+        template = (plugins, tuple(self.active_plugins), hook_template)
+        self._clone_template = template
+        return template
+
     def _init_ability(self):
         """初始化特性插件"""
         if self.ability_id:
@@ -212,8 +296,14 @@ class MoveOutcome:
 # --- 核心逻辑类 ---
 
 class BattleLogic:
-    def __init__(self, move_repo=None):
-        self.stat_modifier_service = StatModifierService()
+    def __init__(self, move_repo=None, seed: Optional[int] = None):
+        """
+        seed: 随机种子。本实例总是使用独立的 random.Random 随机流，相同种子与输入的战斗可完全重放；
+        未指定时随机抽取一个种子（记录在 self.seed 中）
+        """
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        self.stat_modifier_service = StatModifierService(rng=self.rng)
         self.move_repo = move_repo
         if move_repo and hasattr(move_repo, 'move_repo'):
             self.move_service = move_repo
@@ -237,18 +327,9 @@ class BattleLogic:
         self.TARGETS_OPPONENT = {2, 8, 9, 10, 11, 14}
         self.TARGETS_USER = {3, 4, 5, 7, 13, 15}
 
-        # 属性映射
-        self.TYPE_NAME_MAPPING = {
-            '一般': 'normal', 'normal': 'normal', '火': 'fire', 'fire': 'fire',
-            '水': 'water', 'water': 'water', '电': 'electric', 'electric': 'electric',
-            '草': 'grass', 'grass': 'grass', '冰': 'ice', 'ice': 'ice',
-            '格斗': 'fighting', 'fighting': 'fighting', '毒': 'poison', 'poison': 'poison',
-            '地面': 'ground', 'ground': 'ground', '飞行': 'flying', 'flying': 'flying',
-            '超能力': 'psychic', 'psychic': 'psychic', '虫': 'bug', 'bug': 'bug',
-            '岩石': 'rock', 'rock': 'rock', '幽灵': 'ghost', 'ghost': 'ghost',
-            '龙': 'dragon', 'dragon': 'dragon', '恶': 'dark', 'dark': 'dark',
-            '钢': 'steel', 'steel': 'steel', '妖精': 'fairy', 'fairy': 'fairy'
-        }
+        # 属性映射与整数化克制矩阵
+        self.TYPE_NAME_MAPPING = TYPE_NAME_MAPPING
+        self.type_chart = type_chart
 
         # 从配置加载技能配置
         # 【修复】将键转换为 int，防止 lookup 失败
@@ -259,6 +340,10 @@ class BattleLogic:
         # 在所有配置加载完成后创建挣扎技能
         self._struggle_move = self._create_struggle_move()
         
+        # 修正后能力值缓存的命中统计
+        self.stat_cache_hits = 0
+        self.stat_cache_misses = 0
+
         # --- 新增：场域系统 ---
         self.field_hooks = HookManager() # 全局场域钩子管理器
         self.current_weather = None      # 当前天气 ID
@@ -275,7 +360,8 @@ class BattleLogic:
             power=40, accuracy=100.0, type_name='normal', damage_class_id=2,
             priority=0, type_effectiveness=1.0, stab_bonus=1.0,
             max_pp=10, current_pp=10, move_id=self.STRUGGLE_MOVE_ID, move_name="挣扎",
-            meta_category_id=0  # 视为普通伤害
+            meta_category_id=0,  # 视为普通伤害
+            type_id=type_chart.type_id('normal')
         )
 
     def get_struggle_move(self) -> BattleMoveInfo:
@@ -394,7 +480,7 @@ class BattleLogic:
                 score = self._calculate_unified_move_score(attacker_state, defender_state, move, logger_obj)
 
             # 增加随机抖动
-            score += random.uniform(0, 3)
+            score += self.rng.uniform(0, 3)
 
             if logger_obj and logger_obj.should_log_details():
                 logger.debug(f"[DEBUG] {move.move_name} (Cat:{move.meta_category_id}) 评分: {score:.2f}")
@@ -403,7 +489,7 @@ class BattleLogic:
                 best_score = score
                 best_move = move
 
-        return best_move if best_move else random.choice(available_moves)
+        return best_move if best_move else self.rng.choice(available_moves)
 
     # --- 3. 执行层 (控制器) ---
 
@@ -537,20 +623,8 @@ class BattleLogic:
         if move_config and "msg_release" in move_config:
              logger_obj.log(f"{attacker.context.pokemon.name} {move_config['msg_release']}\n\n")
         elif not move_config:
-             # 普通技能日志
-             pp_str = self._get_pp_str(attacker, move)
-             
-             # Rich Log
-             attacker_type = attacker.context.types[0] if attacker.context.types else 'normal'
-             move_type = move.type_name
-             
-             logger_obj.log_rich([
-                {'text': f"{attacker.context.pokemon.name}", 'color': f"type_{attacker_type}"},
-                {'text': " 使用了 ", 'color': 'default'},
-                {'text': f"{move.move_name}", 'color': f"type_{move_type}"},
-                {'text': f"{pp_str}！\n\n", 'color': 'default'}
-             ])
-             # logger_obj.log(f"{attacker.context.pokemon.name} 使用了 {move.move_name}{pp_str}！\n\n")
+             # 普通技能日志（结构化事件，查看时再渲染为 Rich Log）
+             logger_obj.log_event(EV_MOVE, attacker, move, self._get_current_pp(attacker, move), move.max_pp)
 
         # E. 计算结果 (Calculate) - 需要处理连续攻击逻辑
         # 此步骤只计算数据，不修改任何状态
@@ -574,7 +648,7 @@ class BattleLogic:
                 # 如果第一次攻击未命中，整个连续攻击失败
                 move_missed = True
                 if move.meta_category_id != 9:
-                    logger_obj.log("没有击中目标！\n\n")
+                    logger_obj.log_event(EV_MISS)
             else:
                 # 依次进行所有攻击
                 for hit_i in range(hits_to_perform):
@@ -626,38 +700,17 @@ class BattleLogic:
                     # 记录最后一次攻击的暴击和效果状态
                     if logger_obj.should_log_details():
                         logger.debug(f"[DEBUG] 连续攻击总共造成 {total_damage_dealt} 点伤害")
-                    # Rich Log for Multi-Hit
-                    dmg_color = 'red' if (outcome and (outcome.is_crit or outcome.effectiveness > 1.0)) else 'default'
-                    logger_obj.log_rich([
-                        {'text': f"击中了 {hits_landed} 次！造成总计 ", 'color': 'default'},
-                        {'text': f"{total_damage_dealt}", 'color': dmg_color},
-                        {'text': " 点伤害。\n\n", 'color': 'default'}
-                    ])
-
-                    # 显示暴击和效果拔群提示（基于最后一次攻击）
-                    if outcome and outcome.is_crit:
-                        logger_obj.log_rich([{'text': "击中要害！\n\n", 'color': 'red'}])
-                        if logger_obj.should_log_details():
-                            logger.debug("[DEBUG] 触发暴击")
-                    if outcome and outcome.effectiveness > 1.0:
-                        logger_obj.log_rich([{'text': "效果绝佳！\n\n", 'color': 'red'}])
-                        if logger_obj.should_log_details():
-                            logger.debug("[DEBUG] 效果绝佳")
-                    elif outcome and outcome.effectiveness == 0.0:
-                        logger_obj.log_rich([{'text': "似乎没有效果！\n\n", 'color': 'blue'}])
-                        if logger_obj.should_log_details():
-                            logger.debug("[DEBUG] 技能对目标无效")
-                    elif outcome and outcome.effectiveness < 1.0:
-                        logger_obj.log_rich([{'text': "效果不佳！\n\n", 'color': 'blue'}])
-                        if logger_obj.should_log_details():
-                            logger.debug("[DEBUG] 效果不佳")
+                    # 暴击和效果拔群提示基于最后一次攻击
+                    logger_obj.log_event(EV_MULTI_HIT, attacker, hits_landed, total_damage_dealt,
+                                         outcome.effectiveness if outcome else NEUTRAL,
+                                         bool(outcome and outcome.is_crit))
                 else:
                     if hits_landed > 0:
                         # 如果命中了但是没有造成伤害（例如对钢系宝可梦使用地面系技能）
                         logger_obj.log(f"击中了 {hits_landed} 次！\n\n")
                     else:
                         if move.meta_category_id != 9:
-                            logger_obj.log("没有击中目标！\n\n")
+                            logger_obj.log_event(EV_MISS)
         else:
             # 传统单次攻击逻辑
             outcome = self._calculate_move_outcome(attacker, defender, move, logger_obj=logger_obj)
@@ -671,7 +724,7 @@ class BattleLogic:
                 # 只有非OHKO的未命中才显示"没有击中"
                 # OHKO的未命中在meta_effects里处理了
                 if move.meta_category_id != 9:
-                    logger_obj.log("没有击中目标！\n\n")
+                    logger_obj.log_event(EV_MISS)
 
             # 2. 伤害判定 (如果有伤害)
             if outcome.damage > 0:
@@ -683,31 +736,8 @@ class BattleLogic:
                 defender.current_hp -= outcome.damage
                 if is_struggle:
                     logger_obj.log(f"{attacker.context.pokemon.name} 使用了挣扎！（PP耗尽）\n\n")
-                # Rich Log for Single Hit
-                dmg_color = 'red' if (outcome.is_crit or outcome.effectiveness > 1.0) else 'default'
-                logger_obj.log_rich([
-                    {'text': "造成 ", 'color': 'default'},
-                    {'text': f"{outcome.damage}", 'color': dmg_color},
-                    {'text': " 点伤害。\n\n", 'color': 'default'}
-                ])
-
-                # 效果拔群等提示
-                if outcome.is_crit:
-                    logger_obj.log_rich([{'text': "击中要害！\n\n", 'color': 'red'}])
-                    if logger_obj.should_log_details():
-                        logger.debug("[DEBUG] 触发暴击")
-                if outcome.effectiveness > 1.0:
-                    logger_obj.log_rich([{'text': "效果绝佳！\n\n", 'color': 'red'}])
-                    if logger_obj.should_log_details():
-                        logger.debug("[DEBUG] 效果绝佳")
-                elif outcome.effectiveness == 0.0:
-                    logger_obj.log_rich([{'text': "似乎没有效果！\n\n", 'color': 'blue'}])
-                    if logger_obj.should_log_details():
-                        logger.debug("[DEBUG] 技能对目标无效")
-                elif outcome.effectiveness < 1.0:
-                    logger_obj.log_rich([{'text': "效果不佳！\n\n", 'color': 'blue'}])
-                    if logger_obj.should_log_details():
-                        logger.debug("[DEBUG] 效果不佳")
+                # 伤害及效果拔群等提示
+                logger_obj.log_event(EV_DAMAGE, attacker, outcome.damage, outcome.effectiveness, outcome.is_crit)
 
                 # 触发after_damage钩子：攻击方、防御方、招式、造成的伤害量
                 attacker.hooks.trigger_event("after_damage", attacker, defender, move, damage_dealt, logger_obj)
@@ -800,7 +830,7 @@ class BattleLogic:
             if attacker.current_hp > 0:
                 attacker.hooks.trigger_event("on_opponent_faint", attacker, defender, logger_obj)
             
-            logger_obj.log(f"{defender.context.pokemon.name} 倒下了！\n\n")
+            logger_obj.log_event(EV_FAINT, defender)
             return True
 
         if logger_obj.should_log_details():
@@ -818,7 +848,7 @@ class BattleLogic:
 
         # 1. 命中判定 (OHKO 除外) - 如果 bypass_accuracy 为 True，则跳过命中判定
         if move.meta_category_id != 9 and not bypass_accuracy:
-            if random.random() * 100 > move.accuracy:
+            if self.rng.random() * 100 > move.accuracy:
                 outcome.missed = True
                 return outcome
 
@@ -979,11 +1009,11 @@ class BattleLogic:
         level = attacker.context.pokemon.level
 
         # 修正因子
-        eff = self.calculate_type_effectiveness([move.type_name], defender.context.types)
+        eff = self._move_effectiveness(move, defender)
         stab = 1.5 if move.type_name in attacker.context.types else 1.0
-        is_crit = (random.random() < self.CRIT_RATE)
+        is_crit = (self.rng.random() < self.CRIT_RATE)
         crit_mod = 1.5 if is_crit else 1.0
-        rand_mod = random.uniform(0.85, 1.0)
+        rand_mod = self.rng.uniform(0.85, 1.0)
 
         # 2. 构造计算上下文，以便钩子修改
         damage_params = {
@@ -1034,7 +1064,7 @@ class BattleLogic:
                 # 为2-5次的攻击实现更接近原版游戏的概率
                 # 在实际游戏中，这个分布可能更复杂，这里使用一个简化的分布：
                 # 2: 33.33%, 3: 33.33%, 4: 16.67%, 5: 16.67%
-                rand_val = random.random()
+                rand_val = self.rng.random()
                 if rand_val < 0.3333:
                     return 2
                 elif rand_val < 0.6666:
@@ -1045,12 +1075,12 @@ class BattleLogic:
                     return 5
             else:
                 # 对于其他范围，使用均匀分布
-                return random.randint(min_hits, max_hits)
+                return self.rng.randint(min_hits, max_hits)
 
     def _gen_ailment_effect(self, target: BattleState, move: BattleMoveInfo, force_status_id=None) -> List[Dict]:
         """生成异常状态效果"""
         chance = move.ailment_chance if move.ailment_chance > 0 else 100
-        if random.randint(1, 100) > chance: return []
+        if self.rng.randint(1, 100) > chance: return []
 
         ailment_id = force_status_id or move.meta_ailment_id
 
@@ -1075,7 +1105,7 @@ class BattleLogic:
         raw_chance = int(move.stat_chance * 100) if move.stat_chance is not None else 0
         chance = raw_chance if raw_chance > 0 else 100
 
-        if random.randint(1, 100) > chance: return []
+        if self.rng.randint(1, 100) > chance: return []
 
         effects = []
         if hasattr(move, 'stat_changes') and move.stat_changes:
@@ -1124,7 +1154,7 @@ class BattleLogic:
             return False, "属性免疫"
 
         acc = 30 + (attacker.context.pokemon.level - defender.context.pokemon.level)
-        if random.randint(1, 100) <= acc:
+        if self.rng.randint(1, 100) <= acc:
             return True, ""
         return False, "未命中"
 
@@ -1193,7 +1223,7 @@ class BattleLogic:
                         # 睡眠回合设定 (2-4回合)
                         turns = 0
                         if status_id == 2:
-                            turns = random.randint(2, 4)
+                            turns = self.rng.randint(2, 4)
                         
                         defender.status_turns = turns # Set locally for legacy sync
                         defender.apply_status(status_id, turns=turns)
@@ -1203,7 +1233,7 @@ class BattleLogic:
                     # 6: 混乱 (2-5回合)
                     if status_id == 6:
                         if 6 not in defender.volatile_statuses: # 已经混乱则不重置
-                            defender.apply_status(6, turns=random.randint(2, 5))
+                            defender.apply_status(6, turns=self.rng.randint(2, 5))
 
                     # 7: 着迷 (持续直到下场，这里给个极大值或特殊标记)
                     elif status_id == 7:
@@ -1214,7 +1244,7 @@ class BattleLogic:
                     # 8: 束缚 (4-5回合)
                     elif status_id == 8:
                         if 8 not in defender.volatile_statuses:
-                            defender.apply_status(8, turns=random.randint(4, 5))
+                            defender.apply_status(8, turns=self.rng.randint(4, 5))
 
                     # 18: 寄生种子 (持续无限，但草系免疫)
                     elif status_id == 18:
@@ -1225,37 +1255,29 @@ class BattleLogic:
             # -----------------------
 
     def _log_meta_effects(self, attacker, defender, effects, logger_obj):
-        """统一日志记录"""
+        """统一日志记录（结构化事件）"""
         for eff in effects:
             etype = eff.get("type")
             if etype == "ailment":
                 # 尝试使用中文状态名称
                 status_id = eff.get('status_id')
                 if status_id and str(status_id) in self.AILMENT_CHINESE_MAP:
-                    status_name_chinese = self.AILMENT_CHINESE_MAP[str(status_id)]
-                    logger_obj.log(f"{defender.context.pokemon.name}陷入{status_name_chinese}状态！\n\n")
+                    logger_obj.log_event(EV_AILMENT, defender, self.AILMENT_CHINESE_MAP[str(status_id)])
                 else:
-                    logger_obj.log(f"{defender.context.pokemon.name}陷入{eff['status']}状态！\n\n")
+                    logger_obj.log_event(EV_AILMENT, defender, eff['status'])
             elif etype == "stat_change":
-                t_name = eff['target_obj'].context.pokemon.name
-                action = "提升" if eff['change'] > 0 else "降低"
-                logger_obj.log(f"{t_name}的{eff['stat_name']}{action}了！\n\n")
+                logger_obj.log_event(EV_STAT_CHANGE, eff['target_obj'], eff['stat_name'], eff['change'])
 
                 # 添加调试日志
                 if logger_obj.should_log_details():
+                    t_name = eff['target_obj'].context.pokemon.name
                     logger.debug(f"[DEBUG] 属性变化: {t_name}的{eff['stat_name']}等级从 {eff['target_obj'].stat_levels.get(eff['stat_id'], 0)} 变为 {eff['new_stage']} (变化量: {eff['change']})")
             elif etype == "heal":
-                if eff.get("from_drain"):
-                    logger_obj.log(f"{attacker.context.pokemon.name}通过攻击吸收了{eff['amount']}点HP！\n\n")
-                else:
-                    logger_obj.log(f"{attacker.context.pokemon.name}回复了{eff['amount']}点HP！\n\n")
+                logger_obj.log_event(EV_HEAL, attacker, eff['amount'], bool(eff.get("from_drain")))
             elif etype == "damage":
-                logger_obj.log(f"{attacker.context.pokemon.name}损失了{eff['amount']}点HP！\n\n")
+                logger_obj.log_event(EV_HP_LOSS, attacker, eff['amount'])
             elif etype == "ohko":
-                if eff['success']:
-                    logger_obj.log("一击必杀！直接击败了对手！\n\n")
-                else:
-                    logger_obj.log(f"一击必杀失败！{eff.get('reason', '')}\n\n")
+                logger_obj.log_event(EV_OHKO, None, bool(eff['success']), eff.get('reason', ''))
 
     def _check_can_move(self, attacker: BattleState, move: BattleMoveInfo, logger_obj: BattleLogger) -> bool:
         """
@@ -1356,7 +1378,7 @@ class BattleLogic:
         u_spd = self._get_modified_stats(user_state).speed
         w_spd = self._get_modified_stats(wild_state).speed
         if u_spd != w_spd: return u_spd > w_spd
-        return random.random() < 0.5
+        return self.rng.random() < 0.5
 
     def _apply_turn_end_effects(self, state: BattleState, opponent: BattleState, logger_obj: BattleLogger):
         """处理回合结束时的残留伤害"""
@@ -1373,6 +1395,37 @@ class BattleLogic:
         state.current_hp = max(0, state.current_hp)
 
     def _get_modified_stats(self, state: BattleState):
+        """
+        修正后的能力值（能力等级 + 状态/特性/持有物钩子 + 场域钩子）。
+        结果缓存在 BattleState 上，仅当能力等级、自身钩子表（状态插件增减）、天气或场域钩子变化时重新计算
+        """
+        hooks = state.hooks
+        field_hooks = self.field_hooks
+        cache = state.stat_cache
+        if (cache is not None and cache[0] is hooks and cache[1] == hooks.version
+                and cache[2] is field_hooks and cache[3] == field_hooks.version
+                and cache[4] == self.current_weather and cache[5] == state.stat_levels):
+            self.stat_cache_hits += 1
+            return cache[6]
+        self.stat_cache_misses += 1
+
+        # 版本号取计算前的值：计算中一次性钩子被移除时，下次调用会重新计算
+        key = (hooks, hooks.version, field_hooks, field_hooks.version, self.current_weather,
+               dict(state.stat_levels) if state.stat_levels else {})
+        mod = self._compute_modified_stats(state)
+        state.stat_cache = key + (mod,)
+        return mod
+
+    def get_stat_cache_stats(self) -> Dict[str, Any]:
+        """能力值缓存命中统计"""
+        total = self.stat_cache_hits + self.stat_cache_misses
+        return {
+            "hits": self.stat_cache_hits,
+            "misses": self.stat_cache_misses,
+            "hit_rate": round(self.stat_cache_hits / total * 100, 1) if total else 0.0,
+        }
+
+    def _compute_modified_stats(self, state: BattleState):
         # 获取基础修正 stats
         if not state.stat_levels:
             mod, _ = self.stat_modifier_service.apply_stat_changes(
@@ -1392,21 +1445,27 @@ class BattleLogic:
         return mod
 
     def calculate_type_effectiveness(self, atk_types: List[str], def_types: List[str]) -> float:
-        eff = 1.0
-        for at in atk_types:
-            at_en = self.TYPE_NAME_MAPPING.get(at, at.lower())
-            if at_en not in self.TYPE_CHART: continue
-            for dt in def_types:
-                dt_en = self.TYPE_NAME_MAPPING.get(dt, dt.lower())
-                eff *= self.TYPE_CHART[at_en].get(dt_en, 1.0)
-        return eff
-
-    def _get_pp_str(self, attacker, move):
+        """字符串接口（兼容旧调用），战斗内部使用 _move_effectiveness"""
+        return self.type_chart.effectiveness_by_names(atk_types, def_types)
+
+    def _move_effectiveness(self, move: BattleMoveInfo, defender: 'BattleState') -> float:
+        """按属性ID查表计算招式对防御方的克制倍率"""
+        type_id = move.type_id
+        if type_id is None:
+            type_id = move.type_id = self.type_chart.type_id(move.type_name)
+        def_ids = defender.context.type_ids
+        if def_ids is None:
+            def_ids = self.type_chart.normalize_context(defender.context).type_ids
+        return self.type_chart.effectiveness(type_id, def_ids)
+
+    def _get_current_pp(self, attacker, move) -> int:
         try:
-            curr = attacker.current_pps[attacker.context.moves.index(move)]
+            return attacker.current_pps[attacker.context.moves.index(move)]
         except:
-            curr = move.current_pp
-        return f" (PP: {curr}/{move.max_pp})"
+            return move.current_pp
+
+    def _get_pp_str(self, attacker, move):
+        return f" (PP: {self._get_current_pp(attacker, move)}/{move.max_pp})"
 
     def _get_atk_def_ratio(self, attacker_state, defender_state, move):
         """AI评分用的辅助函数"""
@@ -1445,7 +1504,7 @@ class BattleLogic:
             # 1. 初始化虚拟伤害参数
             sim_params = {
                 'power': move.power,
-                'effectiveness': self.calculate_type_effectiveness([move.type_name], defender_state.context.types),
+                'effectiveness': self._move_effectiveness(move, defender_state),
                 'stab': 1.5 if move.type_name in attacker_state.context.types else 1.0,
                 'crit_mod': 1.0, # AI 评估通常不考虑暴击
                 'is_immune': False
@@ -1636,7 +1695,7 @@ class BattleLogic:
                     atk_def_ratio = self._get_atk_def_ratio(attacker_state, defender_state, other_move)
                     raw_dmg = ((
                                        2 * attacker_state.context.pokemon.level / 5 + 2) * other_move.power * atk_def_ratio) / 50 + 2
-                    eff = self.calculate_type_effectiveness([other_move.type_name], defender_state.context.types)
+                    eff = self._move_effectiveness(other_move, defender_state)
                     if raw_dmg * eff >= defender_hp:
                         max_other_damage = raw_dmg * eff
                         break
@@ -0,0 +1,186 @@
+"""
+结构化战斗事件日志
+
+实战过程中只记录紧凑的事件元组（事件类型、行动方、招式、伤害、克制倍率……），
+宝可梦与招式名称各自只在表中保存一次；文本与 log_rich 分段在查看日志或绘图时才渲染。
+
+存储格式（battle_logs.details）：
+    {"v": 1, "actors": [[名称, 等级, 第一属性], ...], "moves": [[招式名, 属性], ...],
+     "events": [事件, ...]}
+其中事件为以下三种之一：
+    - str：未结构化的普通文本日志
+    - list[dict]：未结构化的 log_rich 分段
+    - [事件类型, 行动方下标(-1 表示无), 参数...]
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+EVENT_LOG_VERSION = 1
+
+# --- 事件类型 ---
+EV_START = 1        # 战斗开始（双方名称与等级）
+EV_HP = 2           # 开场双方HP: hp0, hp1
+EV_TURN = 3         # 回合标题: turn
+EV_HP_LEFT = 4      # 回合结束剩余HP: hp0, hp1
+EV_MOVE = 5         # 使用招式: move, current_pp, max_pp
+EV_DAMAGE = 6       # 单次伤害: damage, effectiveness, is_crit
+EV_MULTI_HIT = 7    # 连续攻击: hits, total_damage, effectiveness, is_crit
+EV_MISS = 8         # 没有击中目标
+EV_FAINT = 9        # 倒下
+EV_AILMENT = 10     # 陷入状态: status_name
+EV_STAT_CHANGE = 11  # 能力变化: stat_name, change
+EV_HEAL = 12        # 回复HP: amount, from_drain
+EV_HP_LOSS = 13     # 损失HP: amount
+EV_OHKO = 14        # 一击必杀: success, reason
+EV_TIMEOUT = 15     # 战斗超时
+
+# 连续攻击未取得最后一次结果时使用的中性倍率
+NEUTRAL = 1.0
+
+
+class StructuredBattleLogger:
+    """记录紧凑事件元组的战斗日志器，文本在 render_battle_details 时才生成"""
+
+    def __init__(self, log_details: bool = True):
+        self.events: List[Any] = []
+        self.actors: List[list] = []
+        self.moves: List[list] = []
+        self._actor_index: Dict[int, int] = {}
+        self._move_index: Dict[Any, int] = {}
+        self._log_details = log_details
+        # 保持表中对象存活，避免 id() 被复用
+        self._refs: List[Any] = []
+
+    def begin(self, *contexts):
+        """按顺序登记参战双方（下标 0 为我方，1 为对手）"""
+        for ctx in contexts:
+            self._actor(ctx)
+
+    def _actor(self, ctx) -> int:
+        index = self._actor_index.get(id(ctx))
+        if index is None:
+            index = self._actor_index[id(ctx)] = len(self.actors)
+            self._refs.append(ctx)
+            self.actors.append([ctx.pokemon.name, ctx.pokemon.level, ctx.types[0] if ctx.types else 'normal'])
+        return index
+
+    def _move(self, move) -> int:
+        key = (move.move_id, move.move_name)
+        index = self._move_index.get(key)
+        if index is None:
+            index = self._move_index[key] = len(self.moves)
+            self.moves.append([move.move_name, move.type_name])
+        return index
+
+    def log(self, message: str): self.events.append(message)
+
+    def log_rich(self, segments: list): self.events.append(segments)
+
+    def log_event(self, event_type: int, actor=None, *values):
+        """记录结构化事件；actor 为 BattleState（或 None），EV_MOVE 的第一个参数为招式对象"""
+        if event_type == EV_MOVE:
+            values = (self._move(values[0]),) + values[1:]
+        self.events.append((event_type, -1 if actor is None else self._actor(actor.context)) + values)
+
+    def should_log_details(self) -> bool: return self._log_details
+
+    def to_details(self) -> Dict[str, Any]:
+        """可直接 JSON 序列化的紧凑日志"""
+        return {"v": EVENT_LOG_VERSION, "actors": self.actors, "moves": self.moves, "events": self.events}
+
+
+# --- 渲染 ---
+
+def _effect_lines(effectiveness: float, is_crit) -> List[list]:
+    lines = []
+    if is_crit:
+        lines.append([{'text': "击中要害！\n\n", 'color': 'red'}])
+    if effectiveness > 1.0:
+        lines.append([{'text': "效果绝佳！\n\n", 'color': 'red'}])
+    elif effectiveness == 0.0:
+        lines.append([{'text': "似乎没有效果！\n\n", 'color': 'blue'}])
+    elif effectiveness < 1.0:
+        lines.append([{'text': "效果不佳！\n\n", 'color': 'blue'}])
+    return lines
+
+
+def render_event(event: Sequence[Any], actors: List[list], moves: List[list]) -> List[Any]:
+    """将一条事件渲染为旧格式的日志行（字符串或 rich 分段列表）"""
+    if isinstance(event, str) or not event or isinstance(event[0], dict):
+        return [event]
+
+    etype, actor = event[0], event[1]
+    args = event[2:]
+    name = actors[actor][0] if actor >= 0 else ""
+
+    if etype == EV_TURN:
+        return [f"--- 第 {args[0]} 回合 ---\n\n"]
+    if etype == EV_MOVE:
+        move_name, move_type = moves[args[0]]
+        return [[
+            {'text': f"{name}", 'color': f"type_{actors[actor][2]}"},
+            {'text': " 使用了 ", 'color': 'default'},
+            {'text': f"{move_name}", 'color': f"type_{move_type}"},
+            {'text': f" (PP: {args[1]}/{args[2]})！\n\n", 'color': 'default'}
+        ]]
+    if etype == EV_DAMAGE:
+        damage, effectiveness, is_crit = args
+        dmg_color = 'red' if (is_crit or effectiveness > 1.0) else 'default'
+        return [[
+            {'text': "造成 ", 'color': 'default'},
+            {'text': f"{damage}", 'color': dmg_color},
+            {'text': " 点伤害。\n\n", 'color': 'default'}
+        ]] + _effect_lines(effectiveness, is_crit)
+    if etype == EV_MULTI_HIT:
+        hits, total, effectiveness, is_crit = args
+        dmg_color = 'red' if (is_crit or effectiveness > 1.0) else 'default'
+        return [[
+            {'text': f"击中了 {hits} 次！造成总计 ", 'color': 'default'},
+            {'text': f"{total}", 'color': dmg_color},
+            {'text': " 点伤害。\n\n", 'color': 'default'}
+        ]] + _effect_lines(effectiveness, is_crit)
+    if etype == EV_HP_LEFT:
+        return [f"剩余HP - {actors[0][0]}: {args[0]}, {actors[1][0]}: {args[1]}\n\n"]
+    if etype == EV_MISS:
+        return ["没有击中目标！\n\n"]
+    if etype == EV_FAINT:
+        return [f"{name} 倒下了！\n\n"]
+    if etype == EV_AILMENT:
+        return [f"{name}陷入{args[0]}状态！\n\n"]
+    if etype == EV_STAT_CHANGE:
+        action = "提升" if args[1] > 0 else "降低"
+        return [f"{name}的{args[0]}{action}了！\n\n"]
+    if etype == EV_HEAL:
+        if args[1]:
+            return [f"{name}通过攻击吸收了{args[0]}点HP！\n\n"]
+        return [f"{name}回复了{args[0]}点HP！\n\n"]
+    if etype == EV_HP_LOSS:
+        return [f"{name}损失了{args[0]}点HP！\n\n"]
+    if etype == EV_OHKO:
+        if args[0]:
+            return ["一击必杀！直接击败了对手！\n\n"]
+        return [f"一击必杀失败！{args[1]}\n\n"]
+    if etype == EV_START:
+        (n0, l0, _), (n1, l1, _) = actors[0], actors[1]
+        return [f"战斗开始！{n0} (Lv.{l0}) VS {n1} (Lv.{l1})\n\n"]
+    if etype == EV_HP:
+        return [f"{actors[0][0]} HP: {args[0]}, {actors[1][0]} HP: {args[1]}\n\n"]
+    if etype == EV_TIMEOUT:
+        return ["战斗超时，强制结束。\n\n"]
+    return []
+
+
+def render_battle_details(details: Optional[Any]) -> List[Any]:
+    """
+    将 battle_logs 中单场战斗的 details 渲染为日志行列表；
+    旧版日志（已是文本/分段列表）原样返回
+    """
+    if not details:
+        return []
+    if not isinstance(details, dict):
+        return details
+    actors = details.get("actors", [])
+    moves = details.get("moves", [])
+    lines = []
+    for event in details.get("events", []):
+        lines.extend(render_event(event, actors, moves))
+    return lines
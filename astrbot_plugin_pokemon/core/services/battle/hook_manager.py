@@ -1,5 +1,6 @@
-from typing import Dict, List, Callable, Any, Optional
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from dataclasses import dataclass, field
+from types import MethodType
 import bisect
 
 @dataclass
@@ -10,39 +11,119 @@ class BattleHook:
     callback: Callable = None  # 触发时的回调函数
     persistent: bool = True  # 是否持久化，False 则触发一次后移除
 
+
+def _hook_priority(hook: BattleHook) -> int:
+    return hook.priority
+
+
 class HookManager:
-    """钩子管理器：负责注册、注销和触发事件"""
+    """
+    钩子管理器：负责注册、注销和触发事件
+
+    每个事件的钩子保存为按优先级排序的不可变元组，只在注册/注销时重建，
+    触发时直接遍历元组（触发过程中的注销不会影响本次遍历），无需逐次复制列表；
+    另有按名称的索引，注销不存在的钩子时可直接返回。
+    注册与注销都会重建该事件的元组，复杂度为 O(该事件的钩子数)：
+    它们只在状态/特性/持有物生效或结束时发生，远少于触发次数，且单个事件的钩子通常只有几个。
+    """
+    # 默认事件
+    EVENTS = (
+        "on_priority_calc",   # 新增：优先度计算
+        "before_move",        # 招式发动前 (可取消行动)
+        "on_stat_calc",       # 能力值计算 (修正攻击/速度等)
+        "on_damage_calc",     # 伤害计算中 (属性修正、威力修正)
+        "after_damage",       # 造成伤害后 (反伤、吸血)
+        "turn_end",           # 回合结束时 (中毒扣血、道具回复)
+        "on_faint",           # 自身濒死时
+        "on_opponent_faint",  # 新增：击败对手时
+    )
+    _EMPTY = dict.fromkeys(EVENTS, ())
+
     def __init__(self):
-        # 存储格式：{ "event_name": [BattleHook, ...] }
-        self._hooks: Dict[str, List[BattleHook]] = {
-            "on_priority_calc": [], # 新增：优先度计算
-            "before_move": [],      # 招式发动前 (可取消行动)
-            "on_stat_calc": [],     # 能力值计算 (修正攻击/速度等)
-            "on_damage_calc": [],   # 伤害计算中 (属性修正、威力修正)
-            "after_damage": [],     # 造成伤害后 (反伤、吸血)
-            "turn_end": [],         # 回合结束时 (中毒扣血、道具回复)
-            "on_faint": [],          # 自身濒死时
-            "on_opponent_faint": []  # 新增：击败对手时
-        }
+        # 存储格式：{ "event_name": (BattleHook, ...) }
+        self._hooks: Dict[str, Tuple[BattleHook, ...]] = dict(self._EMPTY)
+        # 名称索引：{ "event_name": { hook_name: 数量 } }
+        self._names: Dict[str, Dict[str, int]] = {}
+        # 版本号：每次注册/注销递增，供能力值缓存等判断钩子表是否变化
+        self.version = 0
 
     def register(self, event: str, hook: BattleHook):
-        """注册一个钩子，按优先级排序"""
-        if event not in self._hooks:
-            self._hooks[event] = []
-        # 使用二分法保持列表按 priority 排序
-        bisect.insort(self._hooks[event], hook, key=lambda x: x.priority)
+        """注册一个钩子，按优先级排序（同优先级按注册顺序）"""
+        hooks = self._hooks.get(event, ())
+        i = bisect.bisect_right(hooks, hook.priority, key=_hook_priority)
+        self._hooks[event] = hooks[:i] + (hook,) + hooks[i:]
+        names = self._names.setdefault(event, {})
+        names[hook.name] = names.get(hook.name, 0) + 1
+        self.version += 1
 
     def unregister(self, event: str, hook_name: str):
-        """根据名称注销钩子"""
-        if event in self._hooks:
-            self._hooks[event] = [h for h in self._hooks[event] if h.name != hook_name]
+        """根据名称注销钩子：名称不存在时 O(1) 返回，否则重建该事件的元组，O(该事件的钩子数)"""
+        names = self._names.get(event)
+        if not names or hook_name not in names:
+            return
+        del names[hook_name]
+        self._hooks[event] = tuple(h for h in self._hooks[event] if h.name != hook_name)
+        self.version += 1
+
+    def has_hooks(self, event: Optional[str] = None) -> bool:
+        """指定事件（或任意事件）上是否注册了钩子"""
+        if event is not None:
+            return bool(self._hooks.get(event))
+        return any(self._hooks.values())
+
+    def clone_template(self, plugins: List[Any]) -> Dict[str, tuple]:
+        """
+        生成钩子表的复制模板：
+        { event: ((name, priority, func, plugin_index, callback, persistent, source_index), ...) }
+        回调是 plugins 中某个插件的绑定方法时记录其下标，复制时改绑到对应的新插件上；
+        钩子的 source_plugin（破格判定用）同样按下标改绑
+        """
+        index_of = {id(p): i for i, p in enumerate(plugins)}
+        template = {}
+        for event, event_hooks in self._hooks.items():
+            specs = []
+            for hook in event_hooks:
+                callback = hook.callback
+                i = index_of.get(id(getattr(callback, '__self__', None)), -1)
+                func = callback.__func__ if i >= 0 else None
+                source_index = index_of.get(id(getattr(hook, 'source_plugin', None)), -1)
+                specs.append((hook.name, hook.priority, func, i, callback, hook.persistent, source_index))
+            template[event] = tuple(specs)
+        return template
+
+    @classmethod
+    def from_template(cls, template: Dict[str, tuple], plugins: List[Any]) -> 'HookManager':
+        """按模板结构复制钩子表，不重新执行插件的 on_apply"""
+        new = cls.__new__(cls)
+        hooks = {}
+        names = {}
+        for event, specs in template.items():
+            if not specs:
+                hooks[event] = ()
+                continue
+            event_hooks = []
+            counts = names[event] = {}
+            for name, priority, func, i, callback, persistent, source_index in specs:
+                hook = BattleHook(name, priority, MethodType(func, plugins[i]) if i >= 0 else callback, persistent)
+                if source_index >= 0:
+                    hook.source_plugin = plugins[source_index]
+                event_hooks.append(hook)
+                counts[name] = counts.get(name, 0) + 1
+            hooks[event] = tuple(event_hooks)
+        new._hooks = hooks
+        new._names = names
+        new.version = 0
+        return new
 
     def trigger_action(self, event: str, *args, **kwargs) -> bool:
         """
         触发动作型钩子：任何一个钩子返回 False，则整个动作取消
         常用于 before_move (如麻痹、睡眠判定)
         """
-        for hook in list(self._hooks.get(event, [])): # Iterate over a copy to allow modification during iteration if needed
+        hooks = self._hooks.get(event)
+        if not hooks:
+            return True
+        for hook in hooks:
             can_continue = hook.callback(*args, **kwargs)
             if not hook.persistent:
                 self.unregister(event, hook.name)
@@ -55,8 +136,11 @@ class HookManager:
         触发数值型钩子：依次修正传入的 value 并返回最终值
         常用于 on_stat_calc 或 on_damage_calc
         """
+        hooks = self._hooks.get(event)
+        if not hooks:
+            return value
         current_value = value
-        for hook in list(self._hooks.get(event, [])):
+        for hook in hooks:
             current_value = hook.callback(current_value, *args, **kwargs)
             if not hook.persistent:
                 self.unregister(event, hook.name)
@@ -67,7 +151,10 @@ class HookManager:
         触发事件型钩子：仅执行副作用，不返回值
         常用于 turn_end (如中毒、烧伤扣血)
         """
-        for hook in list(self._hooks.get(event, [])):
+        hooks = self._hooks.get(event)
+        if not hooks:
+            return
+        for hook in hooks:
             hook.callback(*args, **kwargs)
             if not hook.persistent:
                 self.unregister(event, hook.name)
@@ -377,9 +377,8 @@ class FocusBandPlugin(ItemPlugin):
         self.owner.hooks.register("on_faint", hook)
 
     def check_save(self, state, opponent, logger_obj):
-        import random
         # 通常有10%的几率触发
-        if state.current_hp <= 0 and random.random() < 0.1:
+        if state.current_hp <= 0 and self.owner.rng.random() < 0.1:
             # 恢复1HP，避免濒死
             state.current_hp = 1
             logger_obj.log(f"{state.context.pokemon.name} 用气势头带奇迹般地站了起来！\n\n")
@@ -432,12 +431,11 @@ class KingsRockPlugin(ItemPlugin):
         self.owner.hooks.register("after_damage", hook)
 
     def on_hit(self, attacker, defender, move, damage, logger_obj):
-        import random
         # 约10%的几率让对手畏缩
         # 这里持有王者之证的宝可梦是攻击方（attacker）
         if (attacker == self.owner and
             damage > 0 and
-            random.random() < 0.1):
+            self.owner.rng.random() < 0.1):
             # 在实际战斗系统中，需要应用畏缩状态
             # 由于我们无法直接应用状态，这里记录日志
             logger_obj.log(f"{attacker.context.pokemon.name} 的攻击让对手畏缩了！\n\n")
@@ -554,8 +552,7 @@ class FocusBandPluginOld(ItemPlugin):
         self.owner.hooks.register("on_faint", hook)
 
     def check_save(self, state, opponent, logger_obj):
-        import random
-        if state.current_hp <= 0 and random.random() < 0.1:
+        if state.current_hp <= 0 and self.owner.rng.random() < 0.1:
             # 恢复1HP，避免濒死
             state.current_hp = 1
             logger_obj.log(f"{state.context.pokemon.name} 用达人带奇迹般地站了起来！\n\n")
@@ -658,8 +655,7 @@ class QuickClawPlugin(ItemPlugin):
         self.owner.hooks.register("on_priority_calc", hook)
 
     def prio_mod(self, current_priority, attacker, move):
-        import random
-        if random.random() < 0.2:
+        if self.owner.rng.random() < 0.2:
             # 提升优先度使其在同优先级阶层中先手
             return current_priority + 1
         return current_priority
@@ -0,0 +1,423 @@
+"""
+战斗模拟执行器
+
+将胜率蒙特卡洛模拟与实战结算从调用线程中抽离，支持两种后端：
+- InProcessSimulationExecutor：在当前进程内执行（默认，也是进程池不可用时的回退方案）
+- ProcessPoolSimulationExecutor：基于 ProcessPoolExecutor，工作进程在启动时预加载战斗配置与插件注册表，
+  只接收紧凑的可序列化对局描述（元组），胜率模拟会按工作进程数切分后并行执行
+
+同步接口会阻塞调用线程直到结果返回（服务层在数据库线程中调用）；
+在事件循环中请使用 *_async 接口，进程池的结果通过 asyncio.wrap_future 等待。
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, astuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+from ...models.adventure_models import BattleContext, BattleMoveInfo
+from ...models.pokemon_models import PokemonStats
+from .battle_engine import BattleLogic, BattleState, NoOpBattleLogger, BATTLE_ENGINE_VERSION
+from .battle_events import StructuredBattleLogger, EV_START, EV_HP, EV_TURN, EV_HP_LEFT, EV_TIMEOUT
+from .vectorized_engine import VectorizedBattleSimulator
+
+# 单个工作进程任务的最小模拟场数，避免切分过细导致通信开销大于计算量
+MIN_SIMULATIONS_PER_CHUNK = 10
+
+
+# --- 引擎入口（进程内与工作进程共用） ---
+
+def simulate_win_count(battle_logic: BattleLogic, simulator: VectorizedBattleSimulator,
+                       user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+    """模拟 simulations 场对战并返回用户方获胜场数"""
+    # 常见对局走 numpy 向量化引擎，含特殊钩子的对局回退到标量引擎
+    if simulator.supports(user_ctx, wild_ctx):
+        return simulator.simulate(user_ctx, wild_ctx, simulations)
+
+    user_wins = 0
+    logger_obj = NoOpBattleLogger()
+
+    # 每个对局只构建一次初始状态原型，之后每场模拟使用快速结构复制
+    user_proto = BattleState.from_context(user_ctx, rng=battle_logic.rng)
+    wild_proto = BattleState.from_context(wild_ctx, rng=battle_logic.rng)
+
+    for i in range(simulations):
+        # Create fresh state for each simulation
+        user_state = user_proto.clone()
+        wild_state = wild_proto.clone()
+
+        turn = 0
+        while user_state.current_hp > 0 and wild_state.current_hp > 0 and turn < 50:
+            turn += 1
+            battle_ended = battle_logic.process_turn(user_state, wild_state, logger_obj)
+            if battle_ended:
+                break
+
+        if user_state.current_hp > 0:
+            user_wins += 1
+
+    return user_wins
+
+
+def run_real_battle(battle_logic: BattleLogic, user_ctx: BattleContext,
+                    wild_ctx: BattleContext) -> Tuple[str, Dict[str, Any], int, int]:
+    """
+    执行实战，生成详细日志，并将最终状态提交回双方的 BattleContext
+    日志为结构化事件（见 battle_events），查看时由 render_battle_details 渲染为文本
+    """
+    logger_obj = StructuredBattleLogger(log_details=True)  # 真实战斗时启用详细日志
+    logger_obj.begin(user_ctx, wild_ctx)
+    logger_obj.log_event(EV_START)
+    logger_obj.log_event(EV_HP, None, user_ctx.current_hp, wild_ctx.current_hp)
+
+    # 插件与引擎共用 battle_logic 的随机流，指定种子时整场战斗可重放
+    user_state = BattleState.from_context(user_ctx, rng=battle_logic.rng)
+    wild_state = BattleState.from_context(wild_ctx, rng=battle_logic.rng)
+
+    # 触发登场特性 (按速度顺序)
+    battle_logic.handle_battle_start(user_state, wild_state, logger_obj)
+
+    turn = 0
+    max_turns = 50
+    winner = None
+    logger.debug(f"[DEBUG] =====================执行实战，生成详细日志=====================")
+
+    while user_state.current_hp > 0 and wild_state.current_hp > 0 and turn < max_turns:
+        turn += 1
+        logger_obj.log_event(EV_TURN, None, turn)
+
+        battle_ended = battle_logic.process_turn(user_state, wild_state, logger_obj)
+
+        logger_obj.log_event(EV_HP_LEFT, None, max(0, user_state.current_hp), max(0, wild_state.current_hp))
+
+        if battle_ended:
+            if user_state.current_hp > 0:
+                winner = "user"
+            else:
+                winner = "wild"
+            break
+
+    if not winner:
+        result = "fail"
+        logger_obj.log_event(EV_TIMEOUT)
+    else:
+        result = "win" if winner == "user" else "fail"
+
+    logger.debug("[DEBUG] =====================实战结束=====================")
+
+    # 使用 commit 模式同步状态变化到上下文，确保数据一致性
+    user_state.commit_to_context()
+    wild_state.commit_to_context()
+
+    return result, logger_obj.to_details(), wild_state.current_hp, user_state.current_hp
+
+
+# --- 紧凑的可序列化对局描述 ---
+
+@dataclass
+class PokemonSnapshot:
+    """工作进程中使用的宝可梦快照，仅包含战斗引擎会读取的字段"""
+    id: int
+    name: str
+    species_id: int
+    level: int
+    stats: PokemonStats
+    ability_id: Optional[int] = None
+    held_item_id: Optional[int] = None
+
+
+def pack_context(ctx: BattleContext) -> tuple:
+    """将 BattleContext 压缩为只含基础类型的元组，便于跨进程传输"""
+    pokemon = ctx.pokemon
+    return (
+        (getattr(pokemon, 'id', 0), pokemon.name, getattr(pokemon, 'species_id', 0), pokemon.level,
+         astuple(pokemon.stats), getattr(pokemon, 'ability_id', None), getattr(pokemon, 'held_item_id', None)),
+        tuple(astuple(m) for m in ctx.moves),
+        tuple(ctx.types),
+        ctx.current_hp,
+        ctx.is_user,
+        tuple((ctx.stat_levels or {}).items()),
+        ctx.non_volatile_status,
+        ctx.status_turns,
+        tuple((ctx.volatile_statuses or {}).items()),
+        ctx.charging_move_id,
+        ctx.protection_status,
+    )
+
+
+def unpack_context(packed: tuple) -> BattleContext:
+    """pack_context 的逆过程"""
+    (pokemon, moves, types, current_hp, is_user, stat_levels, non_volatile_status, status_turns,
+     volatile_statuses, charging_move_id, protection_status) = packed
+    pid, name, species_id, level, stats, ability_id, held_item_id = pokemon
+    return BattleContext(
+        pokemon=PokemonSnapshot(pid, name, species_id, level, PokemonStats(*stats), ability_id, held_item_id),
+        moves=[BattleMoveInfo(*m) for m in moves],
+        types=list(types),
+        current_hp=current_hp,
+        is_user=is_user,
+        stat_levels=dict(stat_levels),
+        non_volatile_status=non_volatile_status,
+        status_turns=status_turns,
+        volatile_statuses=dict(volatile_statuses),
+        charging_move_id=charging_move_id,
+        protection_status=protection_status,
+    )
+
+
+def pack_committed_state(ctx: BattleContext) -> tuple:
+    """提取实战结束后 commit_to_context 写回的字段"""
+    return (
+        ctx.current_hp,
+        tuple(m.current_pp for m in ctx.moves),
+        tuple((ctx.stat_levels or {}).items()),
+        ctx.non_volatile_status,
+        ctx.status_turns,
+        tuple((ctx.volatile_statuses or {}).items()),
+        ctx.charging_move_id,
+        ctx.protection_status,
+    )
+
+
+def apply_committed_state(ctx: BattleContext, packed: tuple):
+    """将工作进程返回的实战结果写回调用方的 BattleContext"""
+    (current_hp, pps, stat_levels, non_volatile_status, status_turns,
+     volatile_statuses, charging_move_id, protection_status) = packed
+    ctx.current_hp = current_hp
+    for move, pp in zip(ctx.moves, pps):
+        move.current_pp = pp
+    ctx.stat_levels = dict(stat_levels)
+    ctx.non_volatile_status = non_volatile_status
+    ctx.status_turns = status_turns
+    ctx.volatile_statuses = dict(volatile_statuses)
+    ctx.charging_move_id = charging_move_id
+    ctx.protection_status = protection_status
+
+
+# --- 可重放的实战记录 ---
+
+def new_battle_seed() -> int:
+    """为一场实战生成随机种子"""
+    return random.getrandbits(63)
+
+
+def build_battle_replay(user_ctx: BattleContext, wild_ctx: BattleContext, seed: int) -> Dict[str, Any]:
+    """
+    在实战开始前调用：记录 (引擎版本, 种子, 双方上下文快照)，
+    代替完整日志存入 battle_logs，查看时由 replay_real_battle 重新生成详细过程
+    """
+    return {
+        "engine": BATTLE_ENGINE_VERSION,
+        "seed": seed,
+        "user": pack_context(user_ctx),
+        "wild": pack_context(wild_ctx),
+    }
+
+
+def is_battle_replay(details: Any) -> bool:
+    return isinstance(details, dict) and "seed" in details and "engine" in details
+
+
+def replay_real_battle(replay: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """按重放记录重新执行实战并返回结构化日志；引擎版本不一致时无法重放，返回 None"""
+    if replay.get("engine") != BATTLE_ENGINE_VERSION:
+        return None
+    _, details, _, _ = run_real_battle(BattleLogic(seed=replay["seed"]),
+                                       unpack_context(replay["user"]), unpack_context(replay["wild"]))
+    return details
+
+
+# --- 工作进程 ---
+
+_worker_logic: Optional[BattleLogic] = None
+_worker_simulator: Optional[VectorizedBattleSimulator] = None
+
+
+def _init_worker():
+    """工作进程初始化：模块导入时已加载 battle_config 并完成状态/特性/持有物插件注册，这里预建引擎实例"""
+    global _worker_logic, _worker_simulator
+    _worker_logic = BattleLogic()
+    _worker_simulator = VectorizedBattleSimulator(_worker_logic)
+
+
+def _warmup_task() -> int:
+    return os.getpid()
+
+
+def _win_count_task(packed_user: tuple, packed_wild: tuple, simulations: int) -> int:
+    return simulate_win_count(_worker_logic, _worker_simulator,
+                              unpack_context(packed_user), unpack_context(packed_wild), simulations)
+
+
+def _real_battle_task(packed_user: tuple, packed_wild: tuple, seed: Optional[int] = None) -> tuple:
+    user_ctx = unpack_context(packed_user)
+    wild_ctx = unpack_context(packed_wild)
+    # 实战会改变天气等场域状态，每场使用独立的 BattleLogic，避免影响后续模拟
+    result, logs, wild_hp, user_hp = run_real_battle(BattleLogic(seed=seed), user_ctx, wild_ctx)
+    return result, logs, wild_hp, user_hp, pack_committed_state(user_ctx), pack_committed_state(wild_ctx)
+
+
+# --- 执行器 ---
+
+class SimulationExecutor:
+    """模拟执行器接口"""
+
+    # 可同时执行模拟的工作进程数
+    parallelism = 1
+
+    def batch_size_for(self, batch_size: int) -> int:
+        """胜率估计每批的模拟场数：至少让每个工作进程分到一个分片"""
+        return max(batch_size, self.parallelism * MIN_SIMULATIONS_PER_CHUNK)
+
+    def count_user_wins(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+        raise NotImplementedError
+
+    def run_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                        seed: Optional[int] = None) -> Tuple[str, Dict[str, Any], int, int]:
+        """执行实战；指定 seed 时使用该种子的独立随机流"""
+        raise NotImplementedError
+
+    async def count_user_wins_async(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+        """count_user_wins 的异步版本：在默认线程池中执行，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.count_user_wins, user_ctx, wild_ctx, simulations)
+
+    async def run_real_battle_async(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                                    seed: Optional[int] = None) -> Tuple[str, Dict[str, Any], int, int]:
+        """run_real_battle 的异步版本"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run_real_battle, user_ctx, wild_ctx, seed)
+
+    def shutdown(self):
+        pass
+
+
+class InProcessSimulationExecutor(SimulationExecutor):
+    """在当前进程内直接执行"""
+
+    def __init__(self, battle_logic: BattleLogic, simulator: Optional[VectorizedBattleSimulator] = None):
+        self.battle_logic = battle_logic
+        self.simulator = simulator or VectorizedBattleSimulator(battle_logic)
+
+    def count_user_wins(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+        return simulate_win_count(self.battle_logic, self.simulator, user_ctx, wild_ctx, simulations)
+
+    def run_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                        seed: Optional[int] = None) -> Tuple[str, Dict[str, Any], int, int]:
+        battle_logic = self.battle_logic if seed is None else BattleLogic(seed=seed)
+        return run_real_battle(battle_logic, user_ctx, wild_ctx)
+
+
+class ProcessPoolSimulationExecutor(SimulationExecutor):
+    """基于进程池的执行器，进程池不可用或任务失败时回退到进程内执行"""
+
+    def __init__(self, max_workers: int, fallback: SimulationExecutor, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.fallback = fallback
+        self._pool: Optional[ProcessPoolExecutor] = None
+        try:
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+            )
+            # 预热：立即拉起全部工作进程，避免首场战斗承担进程启动开销
+            for _ in range(max_workers):
+                self._pool.submit(_warmup_task)
+            logger.info(f"战斗模拟进程池已启动，工作进程数: {max_workers}")
+        except Exception as e:
+            logger.warning(f"战斗模拟进程池启动失败，使用进程内执行: {e}")
+            self._pool = None
+
+    @property
+    def is_pool_active(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def parallelism(self) -> int:
+        return self.max_workers if self._pool is not None else self.fallback.parallelism
+
+    def _split_simulations(self, simulations: int) -> List[int]:
+        chunks = max(1, min(self.max_workers, simulations // MIN_SIMULATIONS_PER_CHUNK))
+        base, extra = divmod(simulations, chunks)
+        return [base + (1 if i < extra else 0) for i in range(chunks)]
+
+    def _disable_pool(self, error: Exception):
+        logger.warning(f"战斗模拟进程池不可用，回退到进程内执行: {error}")
+        pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_win_counts(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> List[Future]:
+        packed_user, packed_wild = pack_context(user_ctx), pack_context(wild_ctx)
+        return [self._pool.submit(_win_count_task, packed_user, packed_wild, n)
+                for n in self._split_simulations(simulations)]
+
+    def _submit_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext, seed: Optional[int]) -> Future:
+        return self._pool.submit(_real_battle_task, pack_context(user_ctx), pack_context(wild_ctx), seed)
+
+    @staticmethod
+    def _apply_real_battle(user_ctx: BattleContext, wild_ctx: BattleContext,
+                           outcome: tuple) -> Tuple[str, Dict[str, Any], int, int]:
+        result, logs, wild_hp, user_hp, user_committed, wild_committed = outcome
+        apply_committed_state(user_ctx, user_committed)
+        apply_committed_state(wild_ctx, wild_committed)
+        return result, logs, wild_hp, user_hp
+
+    def count_user_wins(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+        if self._pool is None:
+            return self.fallback.count_user_wins(user_ctx, wild_ctx, simulations)
+        try:
+            return sum(f.result() for f in self._submit_win_counts(user_ctx, wild_ctx, simulations))
+        except Exception as e:
+            self._disable_pool(e)
+            return self.fallback.count_user_wins(user_ctx, wild_ctx, simulations)
+
+    async def count_user_wins_async(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int) -> int:
+        if self._pool is None:
+            return await self.fallback.count_user_wins_async(user_ctx, wild_ctx, simulations)
+        try:
+            futures = self._submit_win_counts(user_ctx, wild_ctx, simulations)
+            return sum(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+        except Exception as e:
+            self._disable_pool(e)
+            return await self.fallback.count_user_wins_async(user_ctx, wild_ctx, simulations)
+
+    def run_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                        seed: Optional[int] = None) -> Tuple[str, Dict[str, Any], int, int]:
+        if self._pool is None:
+            return self.fallback.run_real_battle(user_ctx, wild_ctx, seed)
+        try:
+            outcome = self._submit_real_battle(user_ctx, wild_ctx, seed).result()
+        except Exception as e:
+            self._disable_pool(e)
+            return self.fallback.run_real_battle(user_ctx, wild_ctx, seed)
+        return self._apply_real_battle(user_ctx, wild_ctx, outcome)
+
+    async def run_real_battle_async(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                                    seed: Optional[int] = None) -> Tuple[str, Dict[str, Any], int, int]:
+        if self._pool is None:
+            return await self.fallback.run_real_battle_async(user_ctx, wild_ctx, seed)
+        try:
+            outcome = await asyncio.wrap_future(self._submit_real_battle(user_ctx, wild_ctx, seed))
+        except Exception as e:
+            self._disable_pool(e)
+            return await self.fallback.run_real_battle_async(user_ctx, wild_ctx, seed)
+        return self._apply_real_battle(user_ctx, wild_ctx, outcome)
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def create_simulation_executor(battle_logic: BattleLogic, simulator: VectorizedBattleSimulator,
+                               workers: int = 0) -> SimulationExecutor:
+    """根据配置的工作进程数创建执行器；workers <= 0 时在进程内执行"""
+    in_process = InProcessSimulationExecutor(battle_logic, simulator)
+    if workers and workers > 0:
+        return ProcessPoolSimulationExecutor(workers, fallback=in_process)
+    return in_process
@@ -1,5 +1,6 @@
 """宝可梦战斗状态修改服务"""
 
+import random
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -29,7 +30,9 @@ class StatModifier:
 class StatModifierService:
     """状态修改服务，处理战斗中的状态变化"""
 
-    def __init__(self):
+    def __init__(self, rng=None):
+        # 随机数来源：由 BattleLogic 传入其随机流，使随机目标的选择也可随战斗重放
+        self.rng = rng if rng is not None else random
         # 官方标准：等级→倍率完整映射表
         self._stat_level_multiplier_map = {
             -6: 1/3,   # 0.333...
@@ -176,8 +179,7 @@ class StatModifierService:
         elif target_id == 8:  # Random opponent - 随机对手
             opponents = [i for i in range(4) if (i < 2 and attacker_index >= 2) or (i >= 2 and attacker_index < 2)]
             if opponents:
-                import random
-                targets = [random.choice(opponents)]
+                targets = [self.rng.choice(opponents)]
         elif target_id == 10:  # Selected Pokémon - 由训练家选择（和target_id=2类似）
             targets = [opponent_start, opponent_start + 1]  # 对手方所有
         elif target_id == 11:  # All opponents - 所有对手
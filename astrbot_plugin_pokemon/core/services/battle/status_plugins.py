@@ -1,5 +1,4 @@
 from typing import Dict, Type, Any, Optional, TYPE_CHECKING
-import random
 from dataclasses import dataclass, field
 
 from .hook_manager import BattleHook
@@ -51,7 +50,7 @@ class ParalysisStatus(VolatileStatusPlugin):
         self.owner.hooks.register("on_stat_calc", BattleHook("para_speed", 10, self.stat_mod))
 
     def before_move_check(self, attacker, move, logger_obj) -> bool:
-        if random.random() < 0.25:
+        if self.owner.rng.random() < 0.25:
             logger_obj.log(f"{attacker.context.pokemon.name} 身体麻痹无法动弹！\n\n")
             return False
         return True
@@ -95,7 +94,7 @@ class FreezeStatus(VolatileStatusPlugin):
             logger_obj.log(f"{attacker.context.pokemon.name} 的火焰融化了周围的冰！\n\n")
             return True
 
-        if random.random() < 0.20:
+        if self.owner.rng.random() < 0.20:
             self.owner.remove_status(3)
             logger_obj.log(f"{attacker.context.pokemon.name} 的冰融化了！\n\n")
             return True
@@ -155,7 +154,7 @@ class ConfusionStatus(VolatileStatusPlugin):
             return True
 
         logger_obj.log(f"{attacker.context.pokemon.name} 混乱了！\n\n")
-        if random.random() < 0.33: # Gen 7+ 33%
+        if self.owner.rng.random() < 0.33: # Gen 7+ 33%
             # 自伤逻辑
             level = attacker.context.pokemon.level
             attack = attacker.context.pokemon.stats.attack
@@ -178,7 +177,7 @@ class InfatuationStatus(VolatileStatusPlugin):
 
     def before_move_check(self, attacker, move, logger_obj) -> bool:
         logger_obj.log(f"{attacker.context.pokemon.name} 着迷了！\n\n")
-        if random.random() < 0.5:
+        if self.owner.rng.random() < 0.5:
             logger_obj.log(f"{attacker.context.pokemon.name} 因为着迷而无法行动！\n\n")
             return False
         return True
@@ -0,0 +1,103 @@
+"""
+整数化属性克制表
+
+属性名（中文或英文）在创建 BattleContext 时一次性转换为小整数ID，
+战斗中的克制倍率直接查 18x18 矩阵；双属性防御方的乘积也预先计算好，
+出招与 AI 评估时不再做字符串映射和嵌套字典查找。
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from ...models.adventure_models import BattleContext
+from .battle_config import battle_config
+
+# 18 种属性，下标即属性ID
+TYPE_NAMES: Tuple[str, ...] = (
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground',
+    'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy',
+)
+TYPE_COUNT = len(TYPE_NAMES)
+# 未知属性：矩阵中额外的一行一列，与任何属性的克制倍率均为 1.0
+UNKNOWN_TYPE_ID = TYPE_COUNT
+
+# 属性映射（中英文 -> 英文）
+TYPE_NAME_MAPPING: Dict[str, str] = {
+    '一般': 'normal', 'normal': 'normal', '火': 'fire', 'fire': 'fire',
+    '水': 'water', 'water': 'water', '电': 'electric', 'electric': 'electric',
+    '草': 'grass', 'grass': 'grass', '冰': 'ice', 'ice': 'ice',
+    '格斗': 'fighting', 'fighting': 'fighting', '毒': 'poison', 'poison': 'poison',
+    '地面': 'ground', 'ground': 'ground', '飞行': 'flying', 'flying': 'flying',
+    '超能力': 'psychic', 'psychic': 'psychic', '虫': 'bug', 'bug': 'bug',
+    '岩石': 'rock', 'rock': 'rock', '幽灵': 'ghost', 'ghost': 'ghost',
+    '龙': 'dragon', 'dragon': 'dragon', '恶': 'dark', 'dark': 'dark',
+    '钢': 'steel', 'steel': 'steel', '妖精': 'fairy', 'fairy': 'fairy'
+}
+
+
+class TypeChart:
+    """属性克制矩阵"""
+
+    def __init__(self, chart: Dict[str, Dict[str, float]]):
+        size = TYPE_COUNT + 1
+        index = {name: i for i, name in enumerate(TYPE_NAMES)}
+        self._ids: Dict[str, int] = {raw: index[en] for raw, en in TYPE_NAME_MAPPING.items()}
+
+        # matrix[攻击属性][防御属性]
+        self.matrix: List[List[float]] = [[1.0] * size for _ in range(size)]
+        for atk_name, row in chart.items():
+            atk = index.get(atk_name)
+            if atk is None:
+                continue
+            for def_name, value in row.items():
+                dfd = index.get(def_name)
+                if dfd is not None:
+                    self.matrix[atk][dfd] = float(value)
+
+        # dual[攻击属性][防御属性1][防御属性2]，单属性时第二维取 UNKNOWN_TYPE_ID
+        self.dual: List[List[List[float]]] = [
+            [[self.matrix[atk][d1] * self.matrix[atk][d2] for d2 in range(size)] for d1 in range(size)]
+            for atk in range(size)
+        ]
+
+    def type_id(self, type_name: str) -> int:
+        """属性名（中文/英文，不区分大小写）-> 属性ID，未知属性返回 UNKNOWN_TYPE_ID"""
+        type_id = self._ids.get(type_name)
+        if type_id is None:
+            type_id = self._ids.get(type_name.lower(), UNKNOWN_TYPE_ID) if type_name else UNKNOWN_TYPE_ID
+        return type_id
+
+    def type_ids(self, type_names: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self.type_id(name) for name in type_names)
+
+    def effectiveness(self, atk_id: int, def_ids: Tuple[int, ...]) -> float:
+        """单个攻击属性对防御方（任意属性数）的克制倍率"""
+        n = len(def_ids)
+        if n == 2:
+            return self.dual[atk_id][def_ids[0]][def_ids[1]]
+        if n == 1:
+            return self.matrix[atk_id][def_ids[0]]
+        row = self.matrix[atk_id]
+        eff = 1.0
+        for dfd in def_ids:
+            eff *= row[dfd]
+        return eff
+
+    def effectiveness_by_names(self, atk_types: Iterable[str], def_types: Iterable[str]) -> float:
+        """字符串接口：多个攻击属性的倍率连乘"""
+        def_ids = self.type_ids(def_types)
+        eff = 1.0
+        for at in atk_types:
+            eff *= self.effectiveness(self.type_id(at), def_ids)
+        return eff
+
+    def normalize_context(self, ctx: BattleContext) -> BattleContext:
+        """为 BattleContext 及其招式填充属性ID（已填充时跳过）"""
+        if ctx.type_ids is None:
+            ctx.type_ids = self.type_ids(ctx.types)
+        for move in ctx.moves:
+            if move.type_id is None:
+                move.type_id = self.type_id(move.type_name)
+        return ctx
+
+
+# 全局属性克制表
+type_chart = TypeChart(battle_config.get_type_chart())
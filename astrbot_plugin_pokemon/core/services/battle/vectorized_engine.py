@@ -0,0 +1,489 @@
+"""
+向量化蒙特卡洛对战模拟器
+
+将 N 场相互独立的模拟组织为"数组结构"(Struct of Arrays)：
+HP、PP、能力等级、主要异常状态各自是一个 numpy 数组，每回合对所有仍在进行的模拟同时推进。
+结算规则逐条对齐标量引擎 BattleLogic（AI 评分、先后手、命中、伤害公式、Meta 效果、回合末结算），
+只用于胜率估算，不产生任何日志。
+
+仅覆盖常见招式类别 (0/1/2/3/4/6/7/8) 与主要异常状态 (1-5)。
+遇到无法向量化的情况（特性/持有物插件钩子、蓄力技能、连续攻击、自爆、挥发性状态、天气等场域钩子），
+supports() 返回 False，调用方应回退到标量引擎。
+"""
+import random
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时由调用方回退到标量引擎
+    np = None
+
+from ...models.adventure_models import BattleContext, BattleMoveInfo
+from .ability_plugins import AbilityRegistry
+from .item_plugins import ItemRegistry
+from .stat_modifier_service import StatModifierService
+
+# 可向量化的招式元类别
+SUPPORTED_CATEGORIES = {0, 1, 2, 3, 4, 6, 7, 8}
+# AI 评分中视为攻击招式的类别（与 BattleLogic._calculate_unified_move_score 一致）
+SCORE_DAMAGING_CATEGORIES = (0, 4, 6, 7, 8, 9)
+# 实际结算伤害的类别（与 BattleLogic._calculate_move_outcome 一致）
+DEALING_CATEGORIES = (0, 4, 6, 7, 8)
+# 可向量化的主要异常状态：1麻痹 2睡眠 3冰冻 4灼伤 5中毒
+SUPPORTED_AILMENTS = {1, 2, 3, 4, 5}
+# 能力等级数组按 stat_id 索引 (0-8)
+NUM_STAT_SLOTS = 9
+
+
+def _ailment_blocked(ailment_id: int, types: List[str]) -> bool:
+    """与 BattleLogic._gen_ailment_effect 相同的属性免疫判定"""
+    target_types = [t.lower() for t in types]
+    return (ailment_id == 1 and 'electric' in target_types) or \
+        (ailment_id == 5 and ('poison' in target_types or 'steel' in target_types)) or \
+        (ailment_id == 4 and 'fire' in target_types) or \
+        (ailment_id == 3 and 'ice' in target_types)
+
+
+def _parse_stat_changes(move: BattleMoveInfo) -> List[Tuple[int, int]]:
+    """将招式的 stat_changes 解析为 (stat_id, change) 列表，跳过无效项"""
+    parsed = []
+    for change in move.stat_changes or []:
+        sid = change.get('stat_id') if isinstance(change, dict) else getattr(change, 'stat_id', None)
+        amt = change.get('change') if isinstance(change, dict) else getattr(change, 'change', 0)
+        if sid is None or amt == 0:
+            continue
+        parsed.append((int(sid), int(amt)))
+    return parsed
+
+
+class _SideArrays:
+    """单方宝可梦：静态招式表 + N 场模拟的动态状态数组"""
+
+    def __init__(self, ctx: BattleContext, opponent_ctx: BattleContext, logic, n: int):
+        pokemon = ctx.pokemon
+        stats = pokemon.stats
+        self.level = pokemon.level
+        self.max_hp = stats.hp
+        self.level_factor = 2 * self.level / 5 + 2
+        # 按 stat_id 排列的基础能力值 (2攻击 3防御 4特攻 5特防 6速度)
+        self.base_stats = np.array(
+            [stats.attack, stats.defense, stats.sp_attack, stats.sp_defense, stats.speed], dtype=np.float64)
+
+        # --- 静态招式表：最后一列为挣扎 ---
+        self.num_moves = len(ctx.moves)
+        self.struggle_idx = self.num_moves
+        moves = list(ctx.moves) + [logic.get_struggle_move()]
+        self.moves = moves
+
+        self.power = np.array([m.power for m in moves], dtype=np.float64)
+        self.accuracy = np.array([m.accuracy for m in moves], dtype=np.float64)
+        self.physical = np.array([m.damage_class_id == 2 for m in moves])
+        self.priority = np.array([m.priority for m in moves], dtype=np.int64)
+        self.category = [m.meta_category_id for m in moves]
+        chart = logic.type_chart
+        opponent_type_ids = chart.type_ids(opponent_ctx.types)
+        self.effectiveness = np.array(
+            [chart.effectiveness(chart.type_id(m.type_name), opponent_type_ids) for m in moves], dtype=np.float64)
+        self.stab = np.array([1.5 if m.type_name in ctx.types else 1.0 for m in moves], dtype=np.float64)
+        self.deals_damage = np.array([m.meta_category_id in DEALING_CATEGORIES for m in moves])
+        # 冰冻状态下可自我解冻的火系攻击招式
+        self.thaws = np.array([m.type_name in ['fire', '火'] and m.power > 0 for m in moves])
+        # PP 扣除位置：与 list.index(move) 一致，取第一个相等招式的位置
+        self.pp_slot = np.array([ctx.moves.index(m) for m in ctx.moves] + [0], dtype=np.int64)
+
+        self.targets_self: List[bool] = []
+        self.stat_changes: List[List[Tuple[int, int]]] = []
+        self.ailment_blocked: List[bool] = []
+        self.heal_amount: List[int] = []
+        self.stat_roll_chance: List[int] = []
+        self.static_bonus: List[float] = []
+        for m in moves:
+            targets_self = logic._get_target_by_target_id('self', 'opponent', m.target_id) == 'self'
+            target_ctx = ctx if targets_self else opponent_ctx
+            self.targets_self.append(targets_self)
+            self.stat_changes.append(_parse_stat_changes(m))
+            self.ailment_blocked.append(_ailment_blocked(m.meta_ailment_id, target_ctx.types))
+            self.heal_amount.append(int(target_ctx.pokemon.stats.hp * (m.healing / 100.0)))
+            raw_chance = int(m.stat_chance * 100) if m.stat_chance is not None else 0
+            self.stat_roll_chance.append(raw_chance if raw_chance > 0 else 100)
+            self.static_bonus.append(self._static_score_bonus(m))
+
+        # --- 动态状态数组 ---
+        self.hp = np.full(n, ctx.current_hp, dtype=np.int64)
+        self.pp = np.tile(np.array([m.current_pp for m in ctx.moves], dtype=np.int64), (n, 1)) \
+            if self.num_moves else np.zeros((n, 0), dtype=np.int64)
+        self.stages = np.zeros((n, NUM_STAT_SLOTS), dtype=np.int64)
+        for sid, stage in (ctx.stat_levels or {}).items():
+            self.stages[:, sid] = stage
+        self.status = np.full(n, ctx.non_volatile_status or 0, dtype=np.int64)
+        self.status_turns = np.full(n, ctx.status_turns or 0, dtype=np.int64)
+
+    @staticmethod
+    def _static_score_bonus(move: BattleMoveInfo) -> float:
+        """AI 评分中与战况无关的附加分 (Cat 4/6/7)"""
+        cat = move.meta_category_id
+        bonus = 0.0
+        if cat == 4:
+            ailment_value = 8.0
+            if move.meta_ailment_id in [1, 4, 5]:
+                ailment_value = 15.0
+            elif move.meta_ailment_id in [2, 3]:
+                ailment_value = 12.0
+            chance = (move.ailment_chance / 100.0) if move.ailment_chance > 0 else 1.0
+            bonus += ailment_value * chance
+        elif cat == 6:
+            for change in move.stat_changes or []:
+                if change.get('change', 0) < 0:
+                    bonus += 5.0 + abs(change.get('change', 0)) * 2
+        elif cat == 7:
+            for change in move.stat_changes or []:
+                if change.get('change', 0) > 0:
+                    bonus += 5.0 + change.get('change', 0) * 3
+        return bonus
+
+    def modified_stats(self, sims: 'np.ndarray', stage_multipliers: 'np.ndarray') -> 'np.ndarray':
+        """
+        计算指定模拟的修正能力值，列依次为 攻击/防御/特攻/特防/速度。
+        等价于 StatModifierService.apply_stat_changes + 麻痹/灼伤的 on_stat_calc 钩子。
+        """
+        stats = np.floor(self.base_stats * stage_multipliers[self.stages[sims, 2:7] + 6])
+        status = self.status[sims]
+        burned = status == 4
+        stats[burned, 0] = np.floor(stats[burned, 0] * 0.5)
+        paralyzed = status == 1
+        stats[paralyzed, 4] = np.floor(stats[paralyzed, 4] * 0.5)
+        return stats
+
+
+class VectorizedBattleSimulator:
+    """基于 numpy 的批量对战模拟器，规则与 BattleLogic 对齐"""
+
+    def __init__(self, battle_logic):
+        self.battle_logic = battle_logic
+        if np is not None:
+            service = StatModifierService()
+            self._stage_multipliers = np.array(
+                [service.get_stat_multiplier(level) for level in range(-6, 7)], dtype=np.float64)
+
+    @staticmethod
+    def is_available() -> bool:
+        """numpy 是否可用"""
+        return np is not None
+
+    def supports(self, user_ctx: BattleContext, wild_ctx: BattleContext) -> bool:
+        """判断该对局是否能完全向量化；否则应回退到标量引擎"""
+        if np is None:
+            return False
+
+        logic = self.battle_logic
+        # 天气等场域钩子仍然存活时，伤害/能力计算需要走钩子
+        if logic.current_weather or logic.field_hooks.has_hooks():
+            return False
+
+        return self._supports_side(user_ctx) and self._supports_side(wild_ctx)
+
+    def _supports_side(self, ctx: BattleContext) -> bool:
+        logic = self.battle_logic
+        pokemon = ctx.pokemon
+        if pokemon.stats.hp <= 0:
+            return False
+
+        # 特性 / 持有物插件会注册任意钩子
+        ability_id = getattr(pokemon, 'ability_id', None)
+        if ability_id and ability_id in AbilityRegistry._registry:
+            return False
+        item_id = getattr(pokemon, 'held_item_id', None)
+        if item_id and item_id in ItemRegistry._registry:
+            return False
+
+        # 挥发性状态、蓄力与保护状态
+        if ctx.volatile_statuses or ctx.charging_move_id or ctx.protection_status:
+            return False
+        if ctx.non_volatile_status and ctx.non_volatile_status not in SUPPORTED_AILMENTS:
+            return False
+        for sid in (ctx.stat_levels or {}):
+            if not isinstance(sid, int) or not 0 <= sid < NUM_STAT_SLOTS:
+                return False
+
+        for move in ctx.moves:
+            cat = move.meta_category_id
+            if cat not in SUPPORTED_CATEGORIES:
+                return False
+            if move.move_id in logic.TWO_TURN_MOVES_CONFIG or move.move_id == logic.SELF_DESTRUCT_ID:
+                return False
+            if move.min_hits > 1 or move.max_hits > 1:
+                return False
+            if cat in (1, 4) and move.meta_ailment_id and move.meta_ailment_id not in SUPPORTED_AILMENTS:
+                return False
+            # 攻击招式附带的额外能力变化 (_apply_residual_stat_changes)
+            if move.move_id > 0 and move.stat_changes and cat not in [2, 6, 7]:
+                return False
+            for sid, _ in _parse_stat_changes(move):
+                if not 0 <= sid < NUM_STAT_SLOTS:
+                    return False
+        return True
+
+    def simulate(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int,
+                 max_turns: int = 50, seed: Optional[int] = None) -> int:
+        """
+        批量模拟 simulations 场对战，返回用户方获胜场数。
+        与标量实现一致：达到回合上限时用户方 HP 大于 0 也计为获胜。
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+
+        user = _SideArrays(user_ctx, wild_ctx, self.battle_logic, simulations)
+        wild = _SideArrays(wild_ctx, user_ctx, self.battle_logic, simulations)
+
+        for _ in range(max_turns):
+            sims = np.flatnonzero((user.hp > 0) & (wild.hp > 0))
+            if sims.size == 0:
+                break
+            self._process_turn(user, wild, sims, rng)
+
+        return int(np.count_nonzero(user.hp > 0))
+
+    # --- 回合推进 ---
+
+    def _process_turn(self, user: _SideArrays, wild: _SideArrays, sims: 'np.ndarray', rng):
+        # 1. AI 决策
+        u_moves = self._choose_moves(user, wild, sims, rng)
+        w_moves = self._choose_moves(wild, user, sims, rng)
+
+        # 2. 速度判定
+        user_first = self._is_user_first(user, wild, sims, u_moves, w_moves, rng)
+
+        # 3. 先手行动（不同模拟的先手方不同，但互不相交，可分两批执行）
+        self._execute_action(user, wild, sims[user_first], u_moves[user_first], rng)
+        self._execute_action(wild, user, sims[~user_first], w_moves[~user_first], rng)
+
+        # 4. 后手行动
+        alive = (user.hp[sims] > 0) & (wild.hp[sims] > 0)
+        mask = alive & ~user_first
+        self._execute_action(user, wild, sims[mask], u_moves[mask], rng)
+        mask = alive & user_first
+        self._execute_action(wild, user, sims[mask], w_moves[mask], rng)
+
+        # 5. 回合末结算
+        sims = sims[(user.hp[sims] > 0) & (wild.hp[sims] > 0)]
+        self._apply_turn_end_effects(user, sims)
+        sims = sims[(user.hp[sims] > 0) & (wild.hp[sims] > 0)]
+        self._apply_turn_end_effects(wild, sims)
+
+    def _choose_moves(self, att: _SideArrays, dfn: _SideArrays, sims: 'np.ndarray', rng) -> 'np.ndarray':
+        """向量化的 get_best_move：评分 + 随机抖动，PP 耗尽时使用挣扎"""
+        if att.num_moves == 0:
+            return np.full(sims.size, att.struggle_idx, dtype=np.int64)
+
+        scores = self._score_moves(att, dfn, sims)
+        scores += rng.uniform(0, 3, scores.shape)
+        available = att.pp[sims] > 0
+        scores[~available] = -np.inf
+
+        choice = np.argmax(scores, axis=1)
+        choice[~available.any(axis=1)] = att.struggle_idx
+        return choice
+
+    def _score_moves(self, att: _SideArrays, dfn: _SideArrays, sims: 'np.ndarray') -> 'np.ndarray':
+        """向量化的 _calculate_unified_move_score（不含随机抖动）"""
+        num_moves = att.num_moves
+        a_stats = att.modified_stats(sims, self._stage_multipliers)
+        d_stats = dfn.modified_stats(sims, self._stage_multipliers)
+        ratio_physical = a_stats[:, 0] / np.maximum(1, d_stats[:, 1])
+        ratio_special = a_stats[:, 2] / np.maximum(1, d_stats[:, 3])
+        ratio = np.where(att.physical[:num_moves], ratio_physical[:, None], ratio_special[:, None])
+        raw_damage = (att.level_factor * att.power[:num_moves] * ratio) / 50 + 2
+
+        defender_hp = dfn.hp[sims]
+        attacker_hp_ratio = att.hp[sims] / att.max_hp
+        defender_hp_ratio = defender_hp / dfn.max_hp
+
+        # 斩杀线：是否存在其他攻击招式可直接击倒对手
+        can_finish = np.zeros(sims.size, dtype=bool)
+        for j in range(num_moves):
+            if att.power[j] > 0 and att.category[j] in SCORE_DAMAGING_CATEGORIES:
+                can_finish |= raw_damage[:, j] * att.effectiveness[j] >= defender_hp
+
+        scores = np.zeros((sims.size, num_moves), dtype=np.float64)
+        for j in range(num_moves):
+            move = att.moves[j]
+            cat = att.category[j]
+            is_damaging = cat in SCORE_DAMAGING_CATEGORIES
+            score = np.zeros(sims.size, dtype=np.float64)
+            expected_damage = 0.0
+
+            if is_damaging:
+                eff = att.effectiveness[j]
+                if eff == 0:
+                    scores[:, j] = -100.0
+                    continue
+                expected_damage = raw_damage[:, j] * (move.accuracy / 100.0) * eff * att.stab[j]
+                score = expected_damage + np.where(expected_damage >= defender_hp, 1000.0, 0.0)
+
+            if cat == 1:
+                chance_multiplier = (move.ailment_chance / 100.0) if move.ailment_chance > 0 else 1.0
+                score = score + 15.0 * chance_multiplier
+                if move.meta_ailment_id in [1, 4, 5]:
+                    score = score * 1.4
+                elif move.meta_ailment_id in [2, 3]:
+                    score = score * 1.2
+                score = np.where(defender_hp_ratio > 0.7, score * 1.3, score)
+            elif cat == 2:
+                score = score + 5.0
+                for change in move.stat_changes or []:
+                    if change.get('change', 0) > 0:
+                        stage = att.stages[sims, change.get('stat_id', 0)]
+                        score = score + np.where(stage < 6, 10.0 * 0.7 ** np.maximum(0, stage), 0.0)
+            elif cat == 3:
+                heal_ratio = move.healing / 100.0
+                if heal_ratio > 0:
+                    score = score + heal_ratio * 100.0
+                    score = np.where(attacker_hp_ratio < 0.5, score * 2.0, score)
+                elif heal_ratio < 0:
+                    score = score + np.where(attacker_hp_ratio > 0.8, 20.0, 0.0)
+            elif cat == 8:
+                drain_ratio = getattr(move, 'drain', 50) / 100.0
+                heal_value = expected_damage * drain_ratio * 0.8
+                score = score + np.where(attacker_hp_ratio < 0.5, heal_value * 2.0, heal_value)
+            else:
+                score = score + att.static_bonus[j]
+
+            if not is_damaging:
+                score = np.where(can_finish, -100.0, score)
+                if cat not in [3, 8]:
+                    score = np.where(attacker_hp_ratio < 0.4, score * 0.1, score)
+                score = np.where(defender_hp_ratio < 0.25, score * 0.1, score)
+
+            scores[:, j] = score
+        return scores
+
+    def _is_user_first(self, user: _SideArrays, wild: _SideArrays, sims: 'np.ndarray',
+                       u_moves: 'np.ndarray', w_moves: 'np.ndarray', rng) -> 'np.ndarray':
+        u_prio = user.priority[u_moves]
+        w_prio = wild.priority[w_moves]
+        u_spd = user.modified_stats(sims, self._stage_multipliers)[:, 4]
+        w_spd = wild.modified_stats(sims, self._stage_multipliers)[:, 4]
+        coin = rng.random(sims.size) < 0.5
+        return np.where(u_prio != w_prio, u_prio > w_prio, np.where(u_spd != w_spd, u_spd > w_spd, coin))
+
+    def _execute_action(self, att: _SideArrays, dfn: _SideArrays, sims: 'np.ndarray',
+                        moves: 'np.ndarray', rng):
+        """向量化的 _execute_action（单次攻击）"""
+        if sims.size == 0:
+            return
+
+        # 1. 状态检查 (before_move)
+        can_move = np.ones(sims.size, dtype=bool)
+        status = att.status[sims]
+        roll = rng.random(sims.size)
+
+        can_move &= ~((status == 1) & (roll < 0.25))
+
+        sleeping = status == 2
+        asleep = sleeping & (att.status_turns[sims] > 0)
+        att.status_turns[sims[asleep]] -= 1
+        att.status[sims[sleeping & ~asleep]] = 0
+        can_move &= ~asleep
+
+        frozen = status == 3
+        thawed = frozen & (att.thaws[moves] | (roll < 0.20))
+        att.status[sims[thawed]] = 0
+        can_move &= ~(frozen & ~thawed)
+
+        sims = sims[can_move]
+        moves = moves[can_move]
+        if sims.size == 0:
+            return
+        is_struggle = moves == att.struggle_idx
+
+        # 2. 消耗 PP
+        rows = sims[~is_struggle]
+        cols = att.pp_slot[moves[~is_struggle]]
+        current = att.pp[rows, cols]
+        att.pp[rows, cols] = current - (current > 0)
+
+        # 3. 命中判定
+        hit = rng.random(sims.size) * 100 <= att.accuracy[moves]
+
+        # 4. 伤害计算
+        a_stats = att.modified_stats(sims, self._stage_multipliers)
+        d_stats = dfn.modified_stats(sims, self._stage_multipliers)
+        physical = att.physical[moves]
+        atk = np.where(physical, a_stats[:, 0], a_stats[:, 2])
+        defense = np.where(physical, d_stats[:, 1], d_stats[:, 3])
+        base_raw = (att.level_factor * att.power[moves] * (atk / np.maximum(1, defense))) / 50 + 2
+        crit_mod = np.where(rng.random(sims.size) < self.battle_logic.CRIT_RATE, 1.5, 1.0)
+        rand_mod = rng.uniform(0.85, 1.0, sims.size)
+        eff = att.effectiveness[moves]
+        final_dmg = base_raw * eff * att.stab[moves] * crit_mod * rand_mod
+        dealing = hit & att.deals_damage[moves] & (eff != 0)
+        damage = np.where(dealing, np.floor(final_dmg), 0).astype(np.int64)
+        dfn.hp[sims] -= damage
+
+        # 5. Meta 效果（仅命中时）
+        for j in np.unique(moves[hit]):
+            selected = hit & (moves == j)
+            self._apply_meta_effects(att, dfn, int(j), sims[selected], damage[selected], rng)
+
+        # 6. 挣扎反伤
+        att.hp[sims[is_struggle]] -= max(1, att.max_hp // 4)
+
+    def _apply_meta_effects(self, att: _SideArrays, dfn: _SideArrays, j: int, rows: 'np.ndarray',
+                            damage: 'np.ndarray', rng):
+        move = att.moves[j]
+        cat = att.category[j]
+
+        if cat in (1, 4):
+            ailment_id = move.meta_ailment_id
+            if ailment_id not in SUPPORTED_AILMENTS or att.ailment_blocked[j]:
+                return
+            chance = move.ailment_chance if move.ailment_chance > 0 else 100
+            rows = rows[rng.integers(1, 101, rows.size) <= chance]
+            # 异常状态始终施加给防御方，且只能在没有主要状态时施加
+            rows = rows[dfn.status[rows] == 0]
+            dfn.status[rows] = ailment_id
+            dfn.status_turns[rows] = rng.integers(2, 5, rows.size) if ailment_id == 2 else 0
+
+        elif cat == 2:
+            target = att if att.targets_self[j] else dfn
+            self._apply_stage_changes(target, rows, att.stat_changes[j])
+
+        elif cat in (6, 7):
+            target = att if (cat == 7 or att.targets_self[j]) else dfn
+            rows = rows[rng.integers(1, 101, rows.size) <= att.stat_roll_chance[j]]
+            self._apply_stage_changes(target, rows, att.stat_changes[j])
+
+        elif cat == 3:
+            amount = att.heal_amount[j]
+            if amount > 0:
+                att.hp[rows] = np.maximum(0, np.minimum(att.max_hp, att.hp[rows] + amount))
+            elif amount < 0:
+                att.hp[rows] = np.maximum(0, att.hp[rows] + amount)
+
+        elif cat == 8:
+            drain_pct = getattr(move, 'drain', 50) or 50
+            heal = np.trunc(damage * (drain_pct / 100.0)).astype(np.int64)
+            rows = rows[heal > 0]
+            heal = heal[heal > 0]
+            att.hp[rows] = np.maximum(0, np.minimum(att.max_hp, att.hp[rows] + heal))
+
+    @staticmethod
+    def _apply_stage_changes(target: _SideArrays, rows: 'np.ndarray', changes: List[Tuple[int, int]]):
+        """所有变化均基于施加前的等级计算，与标量引擎先生成效果、再统一应用的顺序一致"""
+        if rows.size == 0 or not changes:
+            return
+        before = target.stages[rows]
+        for sid, amt in changes:
+            target.stages[rows, sid] = np.clip(before[:, sid] + amt, -6, 6)
+
+    @staticmethod
+    def _apply_turn_end_effects(side: _SideArrays, sims: 'np.ndarray'):
+        """灼伤 / 中毒的回合末伤害"""
+        if sims.size == 0:
+            return
+        status = side.status[sims]
+        burn_dmg = max(1, int(side.max_hp / 16))
+        poison_dmg = max(1, int(side.max_hp / 8))
+        dmg = np.where(status == 4, burn_dmg, np.where(status == 5, poison_dmg, 0))
+        side.hp[sims] = np.maximum(0, side.hp[sims] - dmg)
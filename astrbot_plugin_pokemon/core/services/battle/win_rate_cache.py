@@ -0,0 +1,131 @@
+"""
+对局指纹胜率缓存
+
+同一支队伍反复挑战同一道馆/训练家、或在固定等级遇到常见野生宝可梦时，对局完全相同，
+没有必要每次重新运行蒙特卡洛模拟。这里对双方 BattleContext 生成规范化指纹，
+命中时直接返回上次的胜率估计：
+- 进程内使用有界 LRU（OrderedDict）
+- 可选地通过战斗仓储持久化到 SQLite，重启后仍可命中（表的行数由后台维护按上限裁剪）
+- 容量为 0 时关闭缓存，既不读写内存也不访问持久化存储
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import astuple
+from typing import Any, Dict, Optional, Tuple
+
+from ...models.adventure_models import BattleContext
+from .battle_engine import BATTLE_ENGINE_VERSION
+from .win_rate_estimator import WinRateEstimate
+
+# 指纹格式版本，指纹字段变化时递增；战斗引擎版本同时计入指纹，引擎变化后旧的持久化结果不再命中
+FINGERPRINT_VERSION = 1
+
+
+def _stats_key(stats: Any) -> Tuple:
+    return (stats.hp, stats.attack, stats.defense, stats.sp_attack, stats.sp_defense, stats.speed)
+
+
+def _context_key(ctx: BattleContext) -> Tuple:
+    """提取影响对战结果的全部字段：种族、等级、能力值、当前HP/PP、招式、特性、携带物品与状态"""
+    pokemon = ctx.pokemon
+    return (
+        pokemon.species_id,
+        pokemon.level,
+        _stats_key(pokemon.stats),
+        getattr(pokemon, "ability_id", 0) or 0,
+        getattr(pokemon, "held_item_id", 0) or 0,
+        tuple(ctx.types),
+        ctx.current_hp,
+        # 招式的全部字段（含当前PP）
+        tuple(astuple(move) for move in ctx.moves),
+        tuple(sorted((ctx.stat_levels or {}).items())),
+        ctx.non_volatile_status,
+        ctx.status_turns,
+        tuple(sorted((ctx.volatile_statuses or {}).items())),
+        ctx.charging_move_id,
+        ctx.protection_status,
+    )
+
+
+def matchup_fingerprint(user_ctx: BattleContext, wild_ctx: BattleContext) -> str:
+    """对局的规范化指纹（与宝可梦实例ID、名称无关）"""
+    key = (FINGERPRINT_VERSION, BATTLE_ENGINE_VERSION, _context_key(user_ctx), _context_key(wild_ctx))
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class WinRateCache:
+    """有界 LRU 胜率缓存，可选 SQLite 持久化"""
+
+    def __init__(self, max_entries: int = 1024, store: Optional[Any] = None):
+        """
+        store: 提供 get_cached_win_rate / save_cached_win_rate 的仓储（如 SqliteBattleRepository），
+        为 None 时仅使用内存缓存；max_entries 为 0 时不使用 store
+        """
+        self.max_entries = max(0, max_entries)
+        self.store = store
+        self._entries: "OrderedDict[str, WinRateEstimate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, fingerprint: str) -> Optional[WinRateEstimate]:
+        if self.max_entries == 0:
+            return None
+        estimate = self._entries.get(fingerprint)
+        if estimate is not None:
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return estimate
+
+        if self.store is not None:
+            row = self.store.get_cached_win_rate(fingerprint)
+            if row:
+                estimate = WinRateEstimate(
+                    win_rate=row["win_rate"], lower=row["lower"], upper=row["upper"],
+                    simulations=row["simulations"], elapsed_ms=0.0, stop_reason=row["stop_reason"],
+                )
+                self._remember(fingerprint, estimate)
+                self.hits += 1
+                self.store_hits += 1
+                return estimate
+
+        self.misses += 1
+        return None
+
+    def put(self, fingerprint: str, estimate: WinRateEstimate) -> None:
+        if self.max_entries == 0:
+            return
+        self._remember(fingerprint, estimate)
+        if self.store is not None:
+            self.store.save_cached_win_rate(fingerprint, {
+                "win_rate": estimate.win_rate,
+                "lower": estimate.lower,
+                "upper": estimate.upper,
+                "simulations": estimate.simulations,
+                "stop_reason": estimate.stop_reason,
+            })
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "store_hits": self.store_hits,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+        }
+
+    def _remember(self, fingerprint: str, estimate: WinRateEstimate) -> None:
+        if self.max_entries == 0:
+            return
+        self._entries[fingerprint] = estimate
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,128 @@
+"""
+自适应胜率估计
+
+按小批次运行蒙特卡洛模拟，每批结束后计算胜率的 Wilson 置信区间：
+区间宽度小于配置值、耗时超过时间预算或达到模拟上限时立即停止。
+悬殊对局通常几十场即可收敛，势均力敌的对局则会继续模拟直到精度满足要求。
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 20
+# 默认上限与改造前固定的 100 场模拟一致；势均力敌（p≈0.5）时约 96 场即可使区间宽度小于 20 个百分点
+DEFAULT_MAX_SIMULATIONS = 100
+DEFAULT_CI_WIDTH = 20.0
+
+# 停止原因
+STOP_PRECISION = "precision"  # 置信区间已足够窄
+STOP_TIME_BUDGET = "time_budget"  # 时间预算耗尽
+STOP_MAX_SIMULATIONS = "max_simulations"  # 达到模拟上限
+
+
+@dataclass
+class WinRateEstimate:
+    """胜率估计结果，数值均为百分比"""
+    win_rate: float
+    lower: float
+    upper: float
+    simulations: int
+    elapsed_ms: float
+    stop_reason: str
+
+    @property
+    def margin(self) -> float:
+        """置信区间半宽"""
+        return (self.upper - self.lower) / 2
+
+    def as_rates(self) -> Tuple[float, float]:
+        """兼容旧接口的 (用户胜率, 对手胜率)"""
+        return round(self.win_rate, 1), round(100 - self.win_rate, 1)
+
+
+def wilson_interval(wins: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson 得分区间，返回 [0, 1] 范围内的 (下界, 上界)"""
+    if n <= 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class AdaptiveWinRateEstimator:
+    """序贯胜率估计器"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, min_simulations: int = 40,
+                 max_simulations: int = DEFAULT_MAX_SIMULATIONS, ci_width: float = DEFAULT_CI_WIDTH,
+                 time_budget_ms: float = 300.0, z: float = 1.96):
+        self.batch_size = max(1, batch_size)
+        self.min_simulations = max(1, min_simulations)
+        self.max_simulations = max(self.min_simulations, max_simulations)
+        self.ci_width = ci_width  # 置信区间总宽度阈值（百分点）
+        self.time_budget_ms = time_budget_ms
+        self.z = z
+
+    @classmethod
+    def from_config(cls, adventure_config: Dict[str, Any],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> 'AdaptiveWinRateEstimator':
+        """batch_size 由模拟执行器决定（见 SimulationExecutor.batch_size_for），使每批能分到所有工作进程"""
+        return cls(
+            batch_size=batch_size,
+            max_simulations=adventure_config.get("win_rate_max_simulations", DEFAULT_MAX_SIMULATIONS),
+            ci_width=adventure_config.get("win_rate_ci_width", DEFAULT_CI_WIDTH),
+            time_budget_ms=adventure_config.get("win_rate_time_budget_ms", 300),
+        )
+
+    def estimate(self, run_batch: Callable[[int], int]) -> WinRateEstimate:
+        """
+        run_batch(n) 负责模拟 n 场对战并返回用户方获胜场数。
+        至少运行 min_simulations 场，之后任一停止条件满足即返回。
+        """
+        start = time.perf_counter()
+        wins = n = 0
+        while True:
+            batch = min(self.batch_size, self.max_simulations - n)
+            wins += run_batch(batch)
+            n += batch
+            stop_reason = self._stop_reason(wins, n, start)
+            if stop_reason:
+                return self._result(wins, n, start, stop_reason)
+
+    async def estimate_async(self, run_batch: Callable[[int], Awaitable[int]]) -> WinRateEstimate:
+        """estimate 的异步版本：run_batch(n) 为协程函数（如 SimulationExecutor.count_user_wins_async）"""
+        start = time.perf_counter()
+        wins = n = 0
+        while True:
+            batch = min(self.batch_size, self.max_simulations - n)
+            wins += await run_batch(batch)
+            n += batch
+            stop_reason = self._stop_reason(wins, n, start)
+            if stop_reason:
+                return self._result(wins, n, start, stop_reason)
+
+    def _stop_reason(self, wins: int, n: int, start: float) -> Optional[str]:
+        """已模拟 n 场后是否停止，返回停止原因"""
+        if n < self.min_simulations:
+            return None
+        lower, upper = wilson_interval(wins, n, self.z)
+        if (upper - lower) * 100 <= self.ci_width:
+            return STOP_PRECISION
+        if n >= self.max_simulations:
+            return STOP_MAX_SIMULATIONS
+        if (time.perf_counter() - start) * 1000 >= self.time_budget_ms:
+            return STOP_TIME_BUDGET
+        return None
+
+    def _result(self, wins: int, n: int, start: float, stop_reason: str) -> WinRateEstimate:
+        lower, upper = wilson_interval(wins, n, self.z)
+        return WinRateEstimate(
+            win_rate=wins / n * 100 if n else 0.0,
+            lower=round(lower * 100, 1),
+            upper=round(upper * 100, 1),
+            simulations=n,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            stop_reason=stop_reason,
+        )
@@ -4,6 +4,7 @@ from ...models.pokemon_models import (
     UserPokemonInfo, PokemonIVs, PokemonEVs, PokemonStats, PokemonMoves, PokemonEvolution
 )
 from ..mechanics.nature_service import NatureService
+from .stats_kernel import calculate_pokemon_stats
 from ....infrastructure.repositories.abstract_repository import (
     AbstractUserPokemonRepository, AbstractPokemonRepository, AbstractNatureRepository
 )
@@ -58,8 +59,9 @@ class EvolutionService:
                 current_pokemon.nature_id  # 使用原来的性格
             )
 
-            # 6. 记录原始物种ID到图鉴历史，确保在图鉴中保持"已捕获"状态
+            # 6. 记录原始物种与进化后物种到图鉴历史，确保在图鉴中保持"已捕获"状态
             self.user_pokemon_repo.record_pokedex_capture(user_id, current_pokemon.species_id)
+            self.user_pokemon_repo.record_pokedex_capture(user_id, evolved_species.id)
 
             # 7. 写入数据库 - 保留用户设置的昵称
             self.user_pokemon_repo._update_user_pokemon_fields(
@@ -142,32 +144,6 @@ class EvolutionService:
 
     def _calculate_new_stats(self, base_stats, ivs: PokemonIVs, evs: PokemonEVs, level: int, nature_id: int = 1) -> PokemonStats:
         """
-        根据种族值、个体值、努力值和等级计算属性值
-        HP公式: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 等级 + 10
-        其他公式: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 5
+        根据种族值、个体值、努力值、等级和性格计算属性值（公式见 stats_kernel）
         """
-
-        def _calc(base: int, iv: int, ev: int, lvl: int, is_hp: bool = False) -> int:
-            # 核心计算部分 (使用整除 //)
-            core_val = ((base * 2 + iv + (ev // 4)) * lvl) // 100
-            if is_hp:
-                return core_val + lvl + 10
-            else:
-                return core_val + 5
-
-        # 创建基础属性对象
-        base_stats_obj = PokemonStats(
-            hp=_calc(base_stats.base_hp, ivs.hp_iv, evs.hp_ev, level, is_hp=True),
-            attack=_calc(base_stats.base_attack, ivs.attack_iv, evs.attack_ev, level),
-            defense=_calc(base_stats.base_defense, ivs.defense_iv, evs.defense_ev, level),
-            sp_attack=_calc(base_stats.base_sp_attack, ivs.sp_attack_iv, evs.sp_attack_ev, level),
-            sp_defense=_calc(base_stats.base_sp_defense, ivs.sp_defense_iv, evs.sp_defense_ev, level),
-            speed=_calc(base_stats.base_speed, ivs.speed_iv, evs.speed_ev, level)
-        )
-
-        # 如果需要应用性格修正，创建并使用NatureService
-
-        # 应用性格修正
-        final_stats = self.nature_service.apply_nature_modifiers(base_stats_obj, nature_id)
-
-        return final_stats
\ No newline at end of file
+        return calculate_pokemon_stats(base_stats, ivs, evs, level, self.nature_service.nature_multipliers(nature_id))
\ No newline at end of file
@@ -1,14 +1,17 @@
+import dataclasses
 import math
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple
 
-from ...models.pokemon_models import PokemonBaseStats, \
-    PokemonMoves, PokemonStats
+from ...models.pokemon_models import PokemonMoves, PokemonStats, PokemonEVs, PokemonSpecies, UserPokemonInfo
 from ..mechanics.nature_service import NatureService
+from .growth_rate_table import MAX_LEVEL, exp_for_level, exp_table, exp_to_next_level, level_for_exp
+from .stats_kernel import base_stats_row, calculate_pokemon_stats, calculate_stats_batch, evs_row, ivs_row
 from ....infrastructure.repositories.abstract_repository import (
     AbstractUserRepository, AbstractPokemonRepository, AbstractTeamRepository, AbstractMoveRepository,
     AbstractUserPokemonRepository,
 )
 
+
 class ExpService:
     """经验系统服务类，处理用户和宝可梦的经验值逻辑"""
 
@@ -33,53 +36,19 @@ class ExpService:
     # 计算达到指定等级所需的总经验值（基于 growth_rate_id 对应公式）
     def get_required_exp_for_level(self, level: int, growth_rate_id: int = 2) -> int:
         """
-        计算达到指定等级所需的总经验值（基于 growth_rate_id 对应公式）
+        计算达到指定等级所需的总经验值（查预先生成的经验表，见 growth_rate_table）
         Args:
             level: 目标等级
             growth_rate_id: 升级速率组ID (1=slow, 2=medium, 3=fast, 4=medium-slow, 5=slow-then-very-fast, 6=fast-then-very-slow)
         """
-        if level <= 1:
-            return 0
-
-        # 根据growth_rate_id选择对应的升级公式
-        if growth_rate_id == 1:  # slow: (5x³)/4
-            exp = int((5 * (level ** 3)) / 4)
-        elif growth_rate_id == 2:  # medium: x³
-            exp = int(level ** 3)
-        elif growth_rate_id == 3:  # fast: (4x³)/5
-            exp = int((4 * (level ** 3)) / 5)
-        elif growth_rate_id == 4:  # medium-slow: (6x³)/5 - 15x² + 100x - 140
-            exp = int((6 * (level ** 3)) / 5 - 15 * (level ** 2) + 100 * level - 140)
-        elif growth_rate_id == 5:  # slow-then-very-fast: 分段函数
-            if level <= 50:
-                exp = int((level ** 3 * (100 - level)) / 50)
-            elif level <= 68:
-                exp = int((level ** 3 * (150 - level)) / 100)
-            elif level <= 98:
-                exp = int((level ** 3 * (1274 + (level % 3) ** 2 - 9 * (level % 3) - 20 * (level // 3))) / 1000)
-            else:  # level > 98
-                exp = int((level ** 3 * (160 - level)) / 100)
-        elif growth_rate_id == 6:  # fast-then-very-slow: 分段函数
-            if level <= 15:
-                exp = int((level ** 3 * (24 + (level + 1) // 3)) / 50)
-            elif level <= 35:
-                exp = int((level ** 3 * (14 + level)) / 50)
-            else:  # level > 35
-                exp = int((level ** 3 * (32 + level // 2)) / 50)
-        else:  # 默认使用medium公式
-            exp = int(level ** 3)
-
-        # 确保经验值不小于0
-        return max(0, exp)
+        return exp_for_level(level, growth_rate_id)
 
     # 计算从当前等级升到下一级所需的经验值
     def get_exp_needed_for_next_level(self, current_level: int, growth_rate_id: int = 2) -> int:
         """
         计算从当前等级升到下一级所需的经验值
         """
-        if current_level < 1:
-            return 1
-        return self.get_required_exp_for_level(current_level + 1, growth_rate_id) - self.get_required_exp_for_level(current_level, growth_rate_id)
+        return exp_to_next_level(current_level, growth_rate_id)
 
     # 计算野生宝可梦在战斗后获得的经验值
     def calculate_pokemon_exp_gain(self, wild_pokemon_id: int, wild_pokemon_level: int, battle_result: str) -> int:
@@ -178,13 +147,12 @@ class ExpService:
         # 获取宝可梦的生长率
         species_data = self.pokemon_repo.get_pokemon_by_id(species_id)
         growth_rate_id = species_data.growth_rate_id if species_data and species_data.growth_rate_id else 2  # 默认为medium
+        return self._resolve_level_up(current_level, total_exp, growth_rate_id)
 
-        new_level = current_level
-
-        # 2. 只要总经验 >= 下一级门槛，就提升等级
-        while new_level < 100 and total_exp >= self.get_required_exp_for_level(new_level + 1, growth_rate_id):
-            new_level += 1
-
+    def _resolve_level_up(self, current_level: int, total_exp: int, growth_rate_id: int) -> Dict[str, Any]:
+        """在经验表上二分查找总经验对应的等级（只升不降，最高100级）"""
+        table = exp_table(growth_rate_id)
+        new_level = min(MAX_LEVEL, max(current_level, level_for_exp(total_exp, growth_rate_id)))
         levels_gained = new_level - current_level
 
         return {
@@ -192,76 +160,119 @@ class ExpService:
             "levels_gained": levels_gained,
             "new_level": new_level,
             "new_exp": total_exp,
-            "required_exp_for_next": self.get_required_exp_for_level(new_level + 1,
-                                                                     growth_rate_id) if new_level < 100 else 0
+            "required_exp_for_next": table[new_level + 1] if new_level < MAX_LEVEL else 0
         }
 
     # 战斗后更新宝可梦的经验值和等级（考虑EV值）
-    def update_pokemon_after_battle(self, user_id: str, pokemon_id: int, exp_gained: int, ev_gained: Dict[str, int] = None) -> Dict[str, Any]:
+    def update_pokemon_after_battle(self, user_id: str, pokemon_id: int, exp_gained: int, ev_gained: Dict[str, int] = None,
+                                    pokemon_data: Optional[UserPokemonInfo] = None) -> Dict[str, Any]:
         """
-        战斗后更新宝可梦的经验值和等级
+        战斗后更新宝可梦的经验值和等级（pokemon_data 为调用方已批量查询的宝可梦信息）
         """
-        # 获取用户宝可梦信息
-        pokemon_data = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
-        if not pokemon_data:
-            return {"success": False, "message": "宝可梦不存在"}
+        team_pokemon = {int(pokemon_id): pokemon_data} if pokemon_data else None
+        return self.apply_team_battle_rewards(user_id, [(pokemon_id, exp_gained)], ev_gained, team_pokemon)[0]
 
-        current_level = pokemon_data.level
-        current_exp = pokemon_data.exp
-        new_total_exp = current_exp + exp_gained
-
-        # 如果有EV奖励，更新EV值
+    # 战斗后批量更新队伍宝可梦的经验值、EV和等级
+    def apply_team_battle_rewards(self, user_id: str, exp_gains: List[Tuple[int, int]], ev_gained: Dict[str, int] = None,
+                                  team_pokemon: Optional[Dict[int, UserPokemonInfo]] = None) -> List[Dict[str, Any]]:
+        """
+        战斗后批量更新队伍宝可梦：在经验表上二分查找新等级，按新的EV和等级经属性内核的批量接口一次算出全队属性，
+        全队的等级/经验/EV/属性用一次 executemany 写入；升级的宝可梦随后检查新技能与进化
+        Args:
+            exp_gains: [(宝可梦ID, 获得的经验)]，结果按此顺序返回
+            ev_gained: 每只宝可梦获得的EV（全队相同）
+            team_pokemon: 调用方已查询的宝可梦信息（宝可梦ID -> 信息），缺少的在此一次查询
+        Returns:
+            每只宝可梦一项，结构与 update_pokemon_after_battle 相同
+        """
+        # 验证EV值在合理范围内
         if ev_gained:
-            # 验证EV值在合理范围内
             for key in ev_gained:
                 if ev_gained[key] < 0:
                     ev_gained[key] = 0
 
-            # 更新宝可梦的EV值
-            self._update_pokemon_ev(user_id, pokemon_id, ev_gained)
-            # 根据新的EV值重新计算属性
-            self._calculate_and_update_pokemon_stats(pokemon_id, pokemon_data.species_id, current_level, user_id)
-
-        # 检查是否升级
-        level_up_info = self.check_pokemon_level_up(current_level, new_total_exp, pokemon_data.species_id)
-        # 使用宝可梦的数字ID，而不是短码ID
-        # 从数据库返回的数据中获取数字ID
-        pokemon_id = pokemon_data.id
-
-        # 更新宝可梦数据
-        self.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, level=level_up_info["new_level"], exp=level_up_info["new_exp"])
-
-        # 如果有升级，更新属性
-        if level_up_info.get("levels_gained", 0) > 0:
-            self._calculate_and_update_pokemon_stats(pokemon_id, pokemon_data.species_id, level_up_info["new_level"], user_id)
-
-            # 升级后检查并学习新技能 - 使用升级前和升级后的等级
-            move_learning_result = self.learn_moves_after_level_up_with_levels(user_id, pokemon_data.id, current_level, level_up_info["new_level"])
-            level_up_info["move_learning_result"] = move_learning_result
-
-            # 检查是否可以进化
-            evolution_info = self.check_evolution(user_id, pokemon_id, level_up_info["new_level"])
-            level_up_info["evolution_info"] = evolution_info
+        team_pokemon = dict(team_pokemon or {})
+        missing_ids = [int(pid) for pid, _ in exp_gains if int(pid) not in team_pokemon]
+        if missing_ids:
+            for pokemon_data in self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, missing_ids):
+                team_pokemon[pokemon_data.id] = pokemon_data
+
+        species_cache = {}
+        results: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        recalculate = []   # [(写入项, (物种, 新EV的宝可梦, 新等级))]
+        for pokemon_id, exp_gained in exp_gains:
+            pokemon_data = team_pokemon.get(int(pokemon_id))
+            if not pokemon_data:
+                results.append({"success": False, "message": "宝可梦不存在"})
+                continue
+
+            species_id = pokemon_data.species_id
+            if species_id not in species_cache:
+                species_cache[species_id] = self.pokemon_repo.get_pokemon_by_id(species_id)
+            species_data = species_cache[species_id]
+            growth_rate_id = species_data.growth_rate_id if species_data and species_data.growth_rate_id else 2  # 默认为medium
+
+            # 新的EV与等级（有EV奖励或升级时，稍后按新的EV和等级批量重新计算属性）
+            evs = PokemonEVs(**self._allocate_evs(pokemon_data, ev_gained)) if ev_gained else pokemon_data.evs
+            level_up_info = self._resolve_level_up(pokemon_data.level, pokemon_data.exp + exp_gained, growth_rate_id)
+            update = {
+                "id": pokemon_data.id,
+                "level": level_up_info["new_level"],
+                "exp": level_up_info["new_exp"],
+                **dataclasses.asdict(evs),
+                **dataclasses.asdict(pokemon_data.stats),
+            }
+            if species_data and (ev_gained or level_up_info["levels_gained"] > 0):
+                recalculate.append((update, (species_data, dataclasses.replace(pokemon_data, evs=evs),
+                                             level_up_info["new_level"])))
+            updates.append(update)
+            results.append({
+                "success": True,
+                "exp_gained": exp_gained,
+                "ev_gained": ev_gained or {"hp_ev": 0, "attack_ev": 0, "defense_ev": 0, "sp_attack_ev": 0, "sp_defense_ev": 0, "speed_ev": 0},
+                "level_up_info": level_up_info,
+                "pokemon_id": pokemon_data.id,
+                "pokemon_name": pokemon_data.name or '未知宝可梦'
+            })
+
+        stats_list = self._calculate_pokemon_stats_many([entry for _, entry in recalculate])
+        for (update, _), stats in zip(recalculate, stats_list):
+            update.update(dataclasses.asdict(stats))
+        self.user_pokemon_repo._update_user_pokemon_fields_many(user_id, updates)
+
+        # 升级后检查并学习新技能、检查是否可以进化（读取已写入的新等级）
+        for result in results:
+            level_up_info = result.get("level_up_info")
+            if not level_up_info or level_up_info["levels_gained"] <= 0:
+                continue
+            pokemon_data = team_pokemon[result["pokemon_id"]]
+            new_level = level_up_info["new_level"]
+            level_up_info["move_learning_result"] = self.learn_moves_after_level_up_with_levels(
+                user_id, pokemon_data.id, pokemon_data.level, new_level)
+            level_up_info["evolution_info"] = self.check_evolution(user_id, pokemon_data.id, new_level)
 
-        return {
-            "success": True,
-            "exp_gained": exp_gained,
-            "ev_gained": ev_gained or {"hp_ev": 0, "attack_ev": 0, "defense_ev": 0, "sp_attack_ev": 0, "sp_defense_ev": 0, "speed_ev": 0},
-            "level_up_info": level_up_info,
-            "pokemon_id": pokemon_id,
-            "pokemon_name": pokemon_data.name or '未知宝可梦'
-        }
+        return results
 
     # 更新宝可梦的EV值（考虑单个属性的上限252和总和的上限510）
-    def _update_pokemon_ev(self, user_id: str, pokemon_id: int, ev_gained: Dict[str, int]) -> bool:
+    def _update_pokemon_ev(self, user_id: str, pokemon_id: int, ev_gained: Dict[str, int],
+                           pokemon_data: Optional[UserPokemonInfo] = None) -> bool:
         """
         更新宝可梦的EV值（考虑单个属性的上限252和总和的上限510）
         """
         # 获取当前宝可梦的EV数据
-        pokemon_data = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
+        if pokemon_data is None:
+            pokemon_data = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
         if not pokemon_data:
             return False
 
+        # 更新数据库中的EV值
+        ev_data = self._allocate_evs(pokemon_data, ev_gained)
+        self.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, **ev_data)
+        return True
+
+    def _allocate_evs(self, pokemon_data: UserPokemonInfo, ev_gained: Dict[str, int]) -> Dict[str, int]:
+        """按比例分配获得的EV，返回新的六项EV（单项不超过252，总和不超过510）"""
         # 计算当前总EV值
         current_total_ev = (pokemon_data.evs.hp_ev + pokemon_data.evs.attack_ev +
                            pokemon_data.evs.defense_ev + pokemon_data.evs.sp_attack_ev +
@@ -426,8 +437,7 @@ class ExpService:
         new_sp_defense_ev = min(252, new_sp_defense_ev)
         new_speed_ev = min(252, new_speed_ev)
 
-        # 更新数据库中的EV值
-        ev_data = {
+        return {
             'hp_ev': new_hp_ev,
             'attack_ev': new_attack_ev,
             'defense_ev': new_defense_ev,
@@ -436,9 +446,6 @@ class ExpService:
             'speed_ev': new_speed_ev
         }
 
-        self.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, **ev_data)
-        return True
-
     # 检查宝可梦是否满足进化条件
     def check_evolution(self, user_id: str, pokemon_id: int, new_level: int) -> Dict[str, Any]:
         """
@@ -475,23 +482,7 @@ class ExpService:
     def _calculate_and_update_pokemon_stats(self, pokemon_id: int, species_id: int, new_level: int, user_id: str) -> bool:
         """
         根据新的等级计算并更新宝可梦的属性
-        使用官方宝可梦公式: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 5 或 + 10 (HP)
-        """
-        def calculate_stat(base: int, iv: int, ev: int, level: int, is_hp: bool = False) -> int:
-            """
-            根据种族值、IV、EV、等级计算最终属性值
-            Args:
-                base: 种族值
-                iv: 个体值
-                ev: 努力值
-                level: 等级
-                is_hp: 是否为HP属性（HP公式不同）
-            """
-            base_calculation = (base * 2 + iv + ev // 4) * level / 100
-            if is_hp:
-                return int(base_calculation) + level + 10
-            return int(base_calculation) + 5
-
+        """
         # 获取宝可梦的种族值
         species_data = self.pokemon_repo.get_pokemon_by_id(species_id)
         if not species_data:
@@ -502,66 +493,52 @@ class ExpService:
         if not pokemon_data:
             return False
 
-        # 获取各种族值
-        base_data: PokemonBaseStats = species_data.base_stats
-        base_hp = base_data.base_hp
-        base_attack = base_data.base_attack
-        base_defense = base_data.base_defense
-        base_sp_attack = base_data.base_sp_attack
-        base_sp_defense = base_data.base_sp_defense
-        base_speed = base_data.base_speed
-
-        # 获取IV值
-        hp_iv = pokemon_data.ivs.hp_iv
-        attack_iv = pokemon_data.ivs.attack_iv
-        defense_iv = pokemon_data.ivs.defense_iv
-        sp_attack_iv = pokemon_data.ivs.sp_attack_iv
-        sp_defense_iv = pokemon_data.ivs.sp_defense_iv
-        speed_iv = pokemon_data.ivs.speed_iv
-
-        # 获取EV值
-        hp_ev = pokemon_data.evs.hp_ev
-        attack_ev = pokemon_data.evs.attack_ev
-        defense_ev = pokemon_data.evs.defense_ev
-        sp_attack_ev = pokemon_data.evs.sp_attack_ev
-        sp_defense_ev = pokemon_data.evs.sp_defense_ev
-        speed_ev = pokemon_data.evs.speed_ev
-
-        # 根据公式计算新属性值
-        # HP: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 等级 + 10
-        base_hp_val = calculate_stat(base_hp, hp_iv, hp_ev, new_level, is_hp=True)
-        # 非HP属性: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 5
-        base_attack_val = calculate_stat(base_attack, attack_iv, attack_ev, new_level)
-        base_defense_val = calculate_stat(base_defense, defense_iv, defense_ev, new_level)
-        base_sp_attack_val = calculate_stat(base_sp_attack, sp_attack_iv, sp_attack_ev, new_level)
-        base_sp_defense_val = calculate_stat(base_sp_defense, sp_defense_iv, sp_defense_ev, new_level)
-        base_speed_val = calculate_stat(base_speed, speed_iv, speed_ev, new_level)
-
-        # 创建基础属性对象
-        base_stats_obj = PokemonStats(
-            hp=base_hp_val,
-            attack=base_attack_val,
-            defense=base_defense_val,
-            sp_attack=base_sp_attack_val,
-            sp_defense=base_sp_defense_val,
-            speed=base_speed_val
-        )
-
-        # 应用性格修正
-        final_stats = self.nature_service.apply_nature_modifiers(base_stats_obj, pokemon_data.nature_id)
+        final_stats = self._calculate_pokemon_stats(species_data, pokemon_data, new_level)
 
         # 更新宝可梦的属性
-        new_pokemon_attributes = {
-            'hp': final_stats.hp,
-            'attack': final_stats.attack,
-            'defense': final_stats.defense,
-            'sp_attack': final_stats.sp_attack,
-            'sp_defense': final_stats.sp_defense,
-            'speed': final_stats.speed,
-        }
-        self.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, **new_pokemon_attributes)
+        self.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, **dataclasses.asdict(final_stats))
         return True
 
+    def _calculate_pokemon_stats(self, species_data: PokemonSpecies, pokemon_data: UserPokemonInfo, new_level: int) -> PokemonStats:
+        """按种族值、宝可梦的IV/EV/性格计算指定等级的属性"""
+        return calculate_pokemon_stats(species_data.base_stats, pokemon_data.ivs, pokemon_data.evs, new_level,
+                                       self.nature_service.nature_multipliers(pokemon_data.nature_id))
+
+    def _calculate_pokemon_stats_many(self, entries: List[Tuple[PokemonSpecies, UserPokemonInfo, int]]) -> List[PokemonStats]:
+        """批量版 _calculate_pokemon_stats：entries 为 [(物种, 宝可梦, 等级)]，一次向量化计算"""
+        rows = calculate_stats_batch(
+            [base_stats_row(species_data.base_stats) for species_data, _, _ in entries],
+            [ivs_row(pokemon_data.ivs) for _, pokemon_data, _ in entries],
+            [evs_row(pokemon_data.evs) for _, pokemon_data, _ in entries],
+            [level for _, _, level in entries],
+            [self.nature_service.nature_multipliers(pokemon_data.nature_id) for _, pokemon_data, _ in entries],
+        )
+        return [PokemonStats(*row) for row in rows]
+
+    # 按当前种族值/IV/EV/性格重新计算玩家全部宝可梦的属性
+    def recalculate_user_pokemon_stats(self, user_id: str) -> int:
+        """
+        重新计算玩家全部宝可梦（整个盒子）的属性：一次查询、一次向量化计算、一次 executemany 写入
+        用于种族值数据或计算公式调整之后修正已有宝可梦；当前HP不变
+        Returns:
+            更新的宝可梦数量
+        """
+        species_cache = {}
+        entries = []
+        for pokemon_data in self.user_pokemon_repo.get_user_pokemon(user_id):
+            species_id = pokemon_data.species_id
+            if species_id not in species_cache:
+                species_cache[species_id] = self.pokemon_repo.get_pokemon_by_id(species_id)
+            if species_cache[species_id]:
+                entries.append((species_cache[species_id], pokemon_data, pokemon_data.level))
+
+        stats_list = self._calculate_pokemon_stats_many(entries)
+        self.user_pokemon_repo._update_user_pokemon_fields_many(user_id, [
+            {"id": pokemon_data.id, **dataclasses.asdict(stats)}
+            for (_, pokemon_data, _), stats in zip(entries, stats_list)
+        ])
+        return len(entries)
+
     # 检查宝可梦在升级过程中可以学习的新技能
     def _check_and_learn_new_moves(self, species_id: int, current_level: int, new_level: int, current_moves: PokemonMoves) -> tuple[list, list]:
         """
@@ -814,11 +791,8 @@ class ExpService:
         """
         战斗后更新队伍中所有宝可梦的经验值和等级
         """
-        results = []
-        for pokemon_id in team_pokemon_ids:
-            result = self.update_pokemon_after_battle(user_id, int(pokemon_id), exp_gained, ev_gained)
-            results.append(result)
-        return results
+        return self.apply_team_battle_rewards(user_id, [(int(pokemon_id), exp_gained) for pokemon_id in team_pokemon_ids],
+                                              ev_gained)
 
     # 检查宝可梦在升级过程中可以学习的新技能（使用升级前和升级后的等级）
     def check_learnable_moves(self, species_id: int, current_level: int, new_level: int, current_moves) -> tuple[list, list]:
@@ -882,10 +856,8 @@ class ExpService:
         new_total_exp = user.exp + exp_gained
         current_level = user.level
 
-        new_level = current_level
-        # 只要总经验 >= 下一级门槛，就升级
-        while new_level < 100 and new_total_exp >= self.get_required_exp_for_level(new_level + 1, 2):
-            new_level += 1
+        # 总经验达到的最高等级（只升不降）
+        new_level = max(current_level, level_for_exp(new_total_exp))
 
         levels_gained = new_level - current_level
 
@@ -0,0 +1,97 @@
+"""
+升级速率经验表
+
+6 个升级速率组在 0~100 级所需的总经验在导入时按公式一次性生成（6x101 的整数表），
+之后查询某等级所需经验是一次下标访问，由总经验反查等级是一次二分查找，
+不再逐级循环地重复计算分段多项式。
+所有公式在 0~100 级内单调不减（0、1 级均为 0），二分查找的结果与逐级比较一致。
+"""
+from bisect import bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+MAX_LEVEL = 100
+DEFAULT_GROWTH_RATE_ID = 2   # 未知的升级速率组按 medium 计算
+
+# 升级速率组ID (1=slow, 2=medium, 3=fast, 4=medium-slow, 5=slow-then-very-fast, 6=fast-then-very-slow)
+GROWTH_RATE_IDS: Tuple[int, ...] = (1, 2, 3, 4, 5, 6)
+
+
+def exp_formula(level: int, growth_rate_id: int = DEFAULT_GROWTH_RATE_ID) -> int:
+    """按公式计算达到指定等级所需的总经验值（经验表的生成依据，也用于 100 级以外的等级）"""
+    if level <= 1:
+        return 0
+
+    if growth_rate_id == 1:  # slow: (5x³)/4
+        exp = int((5 * (level ** 3)) / 4)
+    elif growth_rate_id == 2:  # medium: x³
+        exp = int(level ** 3)
+    elif growth_rate_id == 3:  # fast: (4x³)/5
+        exp = int((4 * (level ** 3)) / 5)
+    elif growth_rate_id == 4:  # medium-slow: (6x³)/5 - 15x² + 100x - 140
+        exp = int((6 * (level ** 3)) / 5 - 15 * (level ** 2) + 100 * level - 140)
+    elif growth_rate_id == 5:  # slow-then-very-fast: 分段函数
+        if level <= 50:
+            exp = int((level ** 3 * (100 - level)) / 50)
+        elif level <= 68:
+            exp = int((level ** 3 * (150 - level)) / 100)
+        elif level <= 98:
+            exp = int((level ** 3 * (1274 + (level % 3) ** 2 - 9 * (level % 3) - 20 * (level // 3))) / 1000)
+        else:  # level > 98
+            exp = int((level ** 3 * (160 - level)) / 100)
+    elif growth_rate_id == 6:  # fast-then-very-slow: 分段函数
+        if level <= 15:
+            exp = int((level ** 3 * (24 + (level + 1) // 3)) / 50)
+        elif level <= 35:
+            exp = int((level ** 3 * (14 + level)) / 50)
+        else:  # level > 35
+            exp = int((level ** 3 * (32 + level // 2)) / 50)
+    else:  # 默认使用medium公式
+        exp = int(level ** 3)
+
+    # 确保经验值不小于0
+    return max(0, exp)
+
+
+# 升级速率组ID -> 各等级所需总经验（下标为等级 0~100）
+EXP_TABLES: Dict[int, Tuple[int, ...]] = {
+    growth_rate_id: tuple(exp_formula(level, growth_rate_id) for level in range(MAX_LEVEL + 1))
+    for growth_rate_id in GROWTH_RATE_IDS
+}
+
+
+def exp_table(growth_rate_id: int) -> Tuple[int, ...]:
+    """升级速率组的经验表，未知的组返回 medium 的表"""
+    return EXP_TABLES.get(growth_rate_id) or EXP_TABLES[DEFAULT_GROWTH_RATE_ID]
+
+
+def exp_for_level(level: int, growth_rate_id: int = DEFAULT_GROWTH_RATE_ID) -> int:
+    """达到指定等级所需的总经验值"""
+    if 0 <= level <= MAX_LEVEL:
+        return exp_table(growth_rate_id)[level]
+    return exp_formula(level, growth_rate_id)
+
+
+def level_for_exp(exp: int, growth_rate_id: int = DEFAULT_GROWTH_RATE_ID) -> int:
+    """总经验对应的等级：所需经验不超过 exp 的最高等级（1~100）"""
+    return max(1, min(MAX_LEVEL, bisect_right(exp_table(growth_rate_id), exp) - 1))
+
+
+def exp_to_next_level(level: int, growth_rate_id: int = DEFAULT_GROWTH_RATE_ID) -> int:
+    """从当前等级升到下一级还需的经验值差"""
+    if level < 1:
+        return 1
+    return exp_for_level(level + 1, growth_rate_id) - exp_for_level(level, growth_rate_id)
+
+
+def levels_for_exp(growth_rate_ids: Sequence[int], exps: Sequence[int]) -> List[int]:
+    """批量版 level_for_exp：growth_rate_ids 与 exps 一一对应"""
+    if len(growth_rate_ids) != len(exps):
+        raise ValueError("growth_rate_ids 与 exps 长度不一致")
+    return [level_for_exp(exp, growth_rate_id) for growth_rate_id, exp in zip(growth_rate_ids, exps)]
+
+
+def exp_for_levels(growth_rate_ids: Sequence[int], levels: Sequence[int]) -> List[int]:
+    """批量版 exp_for_level：growth_rate_ids 与 levels 一一对应"""
+    if len(growth_rate_ids) != len(levels):
+        raise ValueError("growth_rate_ids 与 levels 长度不一致")
+    return [exp_for_level(level, growth_rate_id) for growth_rate_id, level in zip(growth_rate_ids, levels)]
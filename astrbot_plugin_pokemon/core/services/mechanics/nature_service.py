@@ -1,7 +1,8 @@
 import random
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from ...models.pokemon_models import PokemonStats
+from .stats_kernel import NatureTable, build_nature_table, nature_row, stats_row
 from ....infrastructure.repositories.abstract_repository import AbstractNatureRepository
 
 
@@ -23,6 +24,7 @@ class NatureService:
     def __init__(self, nature_repo: AbstractNatureRepository):
         self.nature_repo = nature_repo
         self._all_natures = None  # 缓存所有性格数据
+        self._nature_table: Optional[NatureTable] = None  # 25x6 性格倍率表
 
     def _load_all_natures(self) -> None:
         """加载所有性格数据到缓存"""
@@ -44,40 +46,14 @@ class NatureService:
         nature = random.choice(self._all_natures)
         return nature
 
-    def apply_nature_modifiers(self, stats: PokemonStats, nature_id: int) -> PokemonStats:
-        """根据性格修正属性值"""
-        # 如果是平衡性格，直接返回原属性
-        if nature_id in self.BALANCED_NATURE_IDS:
-            return stats
-
-        # 获取性格数据
-        nature = self.nature_repo.get_nature_by_id(nature_id)
-        if not nature:
-            return stats
-
-        decreased_stat_id = nature.get('decreased_stat_id')
-        increased_stat_id = nature.get('increased_stat_id')
-
-        # 创建新的stats对象以避免修改原始对象
-        new_stats = PokemonStats(
-            hp=stats.hp,
-            attack=stats.attack,
-            defense=stats.defense,
-            sp_attack=stats.sp_attack,
-            sp_defense=stats.sp_defense,
-            speed=stats.speed
-        )
+    def nature_multipliers(self, nature_id: int) -> Tuple[float, ...]:
+        """性格对六项属性的倍率（提升 1.1，降低 0.9，其余 1.0），查首次使用时生成的 25x6 倍率表"""
+        if self._nature_table is None:
+            self._load_all_natures()
+            self._nature_table = build_nature_table(self._all_natures, self.BALANCED_NATURE_IDS)
+        return nature_row(self._nature_table, nature_id)
 
-        # 应用提升修正 (×1.1)
-        if increased_stat_id in self.STAT_ID_MAP:
-            stat_name = self.STAT_ID_MAP[increased_stat_id]
-            current_value = getattr(new_stats, stat_name)
-            setattr(new_stats, stat_name, int(current_value * 1.1))
-
-        # 应用降低修正 (×0.9)
-        if decreased_stat_id in self.STAT_ID_MAP:
-            stat_name = self.STAT_ID_MAP[decreased_stat_id]
-            current_value = getattr(new_stats, stat_name)
-            setattr(new_stats, stat_name, max(1, int(current_value * 0.9)))  # 最小值为1
-
-        return new_stats
\ No newline at end of file
+    def apply_nature_modifiers(self, stats: PokemonStats, nature_id: int) -> PokemonStats:
+        """根据性格修正属性值（返回新的对象，不修改原始对象）"""
+        multipliers = self.nature_multipliers(nature_id)
+        return PokemonStats(*(max(1, int(value * m)) for value, m in zip(stats_row(stats), multipliers)))
\ No newline at end of file
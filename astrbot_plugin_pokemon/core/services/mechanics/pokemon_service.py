@@ -3,6 +3,8 @@ from typing import Dict, Any, Optional, List
 
 from astrbot.api import logger
 from .exp_service import ExpService
+from .growth_rate_table import exp_for_level
+from .stats_kernel import STAT_NAMES, calculate_stats
 from ...models.common_models import BaseResult
 from ....infrastructure.repositories.abstract_repository import (
     AbstractPokemonRepository, AbstractMoveRepository, AbstractUserPokemonRepository)
@@ -17,9 +19,6 @@ from .nature_service import NatureService
 class PokemonService:
     """封装与宝可梦相关的业务逻辑"""
 
-    HP_FORMULA_CONSTANT = 10  # HP计算公式常量
-    NON_HP_FORMULA_CONSTANT = 5  # 非HP属性计算公式常量
-
     def __init__(
             self,
             pokemon_repo: AbstractPokemonRepository,
@@ -41,13 +40,6 @@ class PokemonService:
     def generate_iv() -> int:
         return random.randint(0, 31)
 
-    # 移出内部函数，改为方法
-    def _calculate_stat(self, base: int, iv: int, ev: int, level: int, is_hp: bool = False) -> int:
-        base_calculation = (base * 2 + iv + ev // 4) * level / 100
-        if is_hp:
-            return int(base_calculation) + level + self.HP_FORMULA_CONSTANT
-        return int(base_calculation) + self.NON_HP_FORMULA_CONSTANT
-
     def create_single_pokemon(self, species_id: int, max_level: int, min_level: int) -> BaseResult[PokemonDetail]:
         """
         创建一个新的宝可梦实例，使用指定的宝可梦ID和等级范围
@@ -71,7 +63,7 @@ class PokemonService:
         level = random.randint(min_level, max_level)
         # exp = 0
         growth_rate_id = pokemon_template.growth_rate_id if pokemon_template.growth_rate_id else 2
-        exp = self.exp_service.get_required_exp_for_level(level, growth_rate_id)
+        exp = exp_for_level(level, growth_rate_id)
 
         # 获取招式
         move_list = self.move_repo.get_level_up_moves(species_id, level)
@@ -107,37 +99,17 @@ class PokemonService:
             "speed": pokemon_template.base_stats["base_speed"]
         }
 
-        # 5. 计算基础属性（使用局部函数，避免重复代码）
-        base_stats_calculated = {
-            "hp": self._calculate_stat(base_stats["hp"], ivs["hp"], evs["hp"], level, is_hp=True),
-            "attack": self._calculate_stat(base_stats["attack"], ivs["attack"], evs["attack"], level),
-            "defense": self._calculate_stat(base_stats["defense"], ivs["defense"], evs["defense"], level),
-            "sp_attack": self._calculate_stat(base_stats["sp_attack"], ivs["sp_attack"], evs["sp_attack"], level),
-            "sp_defense": self._calculate_stat(base_stats["sp_defense"], ivs["sp_defense"], evs["sp_defense"], level),
-            "speed": self._calculate_stat(base_stats["speed"], ivs["speed"], evs["speed"], level)
-        }
-
-        # 6. 获取并应用性格
+        # 5. 获取性格，按种族值/IV/EV/等级与性格倍率计算属性
         nature = self.nature_service.get_random_nature()
         nature_id = nature['id']
+        final_stats = PokemonStats(*calculate_stats(
+            [base_stats[name] for name in STAT_NAMES], [ivs[name] for name in STAT_NAMES],
+            [evs[name] for name in STAT_NAMES], level, self.nature_service.nature_multipliers(nature_id)))
 
-        # 创建基础属性对象用于修正
-        base_stats_obj = PokemonStats(
-            hp=base_stats_calculated["hp"],
-            attack=base_stats_calculated["attack"],
-            defense=base_stats_calculated["defense"],
-            sp_attack=base_stats_calculated["sp_attack"],
-            sp_defense=base_stats_calculated["sp_defense"],
-            speed=base_stats_calculated["speed"]
-        )
-        # 应用性格修正
-        final_stats = self.nature_service.apply_nature_modifiers(base_stats_obj, nature_id)
-
-
-        # 7. 确保HP最小值（原逻辑保留，优化写法）
+        # 6. 确保HP最小值（原逻辑保留，优化写法）
         final_stats.hp = max(1, final_stats.hp, base_stats["hp"] // 2)
 
-        # 8. 返回结果（统一键名格式，IV/EV使用一致的键）
+        # 7. 返回结果（统一键名格式，IV/EV使用一致的键）
         result = BaseResult(
             success=True,
             message=AnswerEnum.POKEMON_CREATE_SUCCESS.value,
@@ -0,0 +1,125 @@
+"""
+属性计算内核
+
+六项能力值的公式只在这里实现：
+- HP: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 等级 + 10
+- 其他: ((种族值 × 2 + IV + EV ÷ 4) × 等级) ÷ 100 + 5
+然后乘以性格倍率：提升为 ×1.1，降低为 ×0.9，结果向下取整且最小为 1。
+
+性格倍率存放在一张 25x6 的表里，行号为性格ID - 1，六列对应六项能力，HP 列恒为 1.0。
+NatureService 根据性格数据生成这张表，只生成一次。
+
+提供两套接口：
+- 标量接口，用于单只宝可梦；
+- 批量接口，在 N x 6 的矩阵上一次算出 N 只宝可梦的六项能力。
+  numpy 不可用，或行数少于 BATCH_MIN_ROWS（一支队伍这样的小批量，数组转换的开销大于收益）时，逐只回退到标量接口。
+两者的浮点运算顺序与原先逐项计算的写法一致，结果逐位相同。
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时批量接口逐只计算
+    np = None
+
+from ...models.pokemon_models import PokemonStats, PokemonIVs, PokemonEVs
+
+STAT_NAMES: Tuple[str, ...] = ("hp", "attack", "defense", "sp_attack", "sp_defense", "speed")
+HP_FORMULA_CONSTANT = 10  # HP计算公式常量
+NON_HP_FORMULA_CONSTANT = 5  # 非HP属性计算公式常量
+
+NATURE_COUNT = 25
+INCREASED_MULTIPLIER = 1.1
+DECREASED_MULTIPLIER = 0.9
+NEUTRAL_NATURE: Tuple[float, ...] = (1.0,) * len(STAT_NAMES)
+# 性格数据中的 stat_id -> 列号（1 为 HP，性格不影响）
+STAT_ID_COLUMNS = {2: 1, 3: 2, 4: 3, 5: 4, 6: 5}
+
+# 少于该行数时批量接口逐只计算
+BATCH_MIN_ROWS = 16
+
+NatureTable = Tuple[Tuple[float, ...], ...]
+StatRow = Tuple[int, ...]
+
+
+def build_nature_table(natures: Iterable[Dict[str, Any]], balanced_ids: Iterable[int] = ()) -> NatureTable:
+    """由性格数据（含 id、increased_stat_id、decreased_stat_id）生成 25x6 的倍率表，缺失与平衡性格为全 1.0"""
+    balanced_ids = set(balanced_ids)
+    rows = [list(NEUTRAL_NATURE) for _ in range(NATURE_COUNT)]
+    for nature in natures or ():
+        nature_id = nature.get("id")
+        if nature_id in balanced_ids or not isinstance(nature_id, int) or not 1 <= nature_id <= NATURE_COUNT:
+            continue
+        row = rows[nature_id - 1]
+        increased = STAT_ID_COLUMNS.get(nature.get("increased_stat_id"))
+        decreased = STAT_ID_COLUMNS.get(nature.get("decreased_stat_id"))
+        if increased == decreased:   # 提升与降低为同一项：等同平衡性格
+            continue
+        if increased is not None:
+            row[increased] *= INCREASED_MULTIPLIER
+        if decreased is not None:
+            row[decreased] *= DECREASED_MULTIPLIER
+    return tuple(tuple(row) for row in rows)
+
+
+def nature_row(table: Optional[NatureTable], nature_id: Optional[int]) -> Tuple[float, ...]:
+    """性格ID对应的六项倍率，未知性格为全 1.0"""
+    if table and isinstance(nature_id, int) and 1 <= nature_id <= len(table):
+        return table[nature_id - 1]
+    return NEUTRAL_NATURE
+
+
+def calculate_stat(base: int, iv: int, ev: int, level: int, is_hp: bool = False) -> int:
+    """单项能力值（未计性格）"""
+    core = (base * 2 + iv + ev // 4) * level // 100
+    if is_hp:
+        return core + level + HP_FORMULA_CONSTANT
+    return core + NON_HP_FORMULA_CONSTANT
+
+
+def calculate_stats(base: Sequence[int], ivs: Sequence[int], evs: Sequence[int], level: int,
+                    nature: Sequence[float] = NEUTRAL_NATURE) -> StatRow:
+    """六项能力值：base/ivs/evs 与 nature 均按 STAT_NAMES 的顺序排列"""
+    return tuple(
+        max(1, int(calculate_stat(base[i], ivs[i], evs[i], level, is_hp=(i == 0)) * nature[i]))
+        for i in range(len(STAT_NAMES))
+    )
+
+
+def calculate_stats_batch(base: Sequence[Sequence[int]], ivs: Sequence[Sequence[int]], evs: Sequence[Sequence[int]],
+                          levels: Sequence[int], natures: Sequence[Sequence[float]]) -> List[StatRow]:
+    """批量版 calculate_stats：每个参数的第 i 行对应第 i 只宝可梦，返回 N 行六项能力值"""
+    if np is None or len(levels) < BATCH_MIN_ROWS:
+        return [calculate_stats(*row) for row in zip(base, ivs, evs, levels, natures)]
+
+    levels = np.asarray(levels, dtype=np.int64)
+    core = ((np.asarray(base, dtype=np.int64) * 2 + np.asarray(ivs, dtype=np.int64)
+             + np.asarray(evs, dtype=np.int64) // 4) * levels[:, None]) // 100
+    stats = core + NON_HP_FORMULA_CONSTANT
+    stats[:, 0] = core[:, 0] + levels + HP_FORMULA_CONSTANT
+    # int64 -> float64 相乘后截断，与 int(value * 倍率) 一致
+    stats = np.maximum(1, (stats * np.asarray(natures, dtype=np.float64)).astype(np.int64))
+    return [tuple(row) for row in stats.tolist()]
+
+
+def base_stats_row(base_stats) -> StatRow:
+    """种族值（PokemonBaseStats 或含 base_hp 等键的字典）-> 六元组"""
+    return tuple(base_stats[f"base_{name}"] for name in STAT_NAMES)
+
+
+def ivs_row(ivs: PokemonIVs) -> StatRow:
+    return (ivs.hp_iv, ivs.attack_iv, ivs.defense_iv, ivs.sp_attack_iv, ivs.sp_defense_iv, ivs.speed_iv)
+
+
+def evs_row(evs: PokemonEVs) -> StatRow:
+    return (evs.hp_ev, evs.attack_ev, evs.defense_ev, evs.sp_attack_ev, evs.sp_defense_ev, evs.speed_ev)
+
+
+def stats_row(stats: PokemonStats) -> StatRow:
+    return (stats.hp, stats.attack, stats.defense, stats.sp_attack, stats.sp_defense, stats.speed)
+
+
+def calculate_pokemon_stats(base_stats, ivs: PokemonIVs, evs: PokemonEVs, level: int,
+                            nature: Sequence[float] = NEUTRAL_NATURE) -> PokemonStats:
+    """按领域对象计算六项能力值"""
+    return PokemonStats(*calculate_stats(base_stats_row(base_stats), ivs_row(ivs), evs_row(evs), level, nature))
@@ -49,7 +49,7 @@ class TeamService:
         user_team_pokemon_list = []
         user_team_pokemon_name_list = []
         for id in pokemon_ids:
-            pokemon = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, id)
+            pokemon = user_pokemon_dict[str(int(id))]
             pokemon_id = pokemon.id
             pokemon_name = pokemon.name
             user_team_pokemon_list.append(pokemon_id)
@@ -83,12 +83,12 @@ class TeamService:
             return BaseResult(success=False, message=AnswerEnum.TEAM_GET_NO_TEAM.value, data=None)
 
         team_pokemon_ids = user_team.team_pokemon_ids
-        team_info: List[UserPokemonInfo] = []
-        for pokemon_id in team_pokemon_ids:
-            pokemon_info = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
-            if not pokemon_info:
-                return BaseResult(success=False, message=AnswerEnum.TEAM_GET_INVALID_POKEMON_ID.value.format(id=pokemon_id), data=None)
-            team_info.append(pokemon_info)
+        # 一次查询取回整个队伍（按队伍顺序返回，跳过不存在的ID）
+        team_info: List[UserPokemonInfo] = self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, team_pokemon_ids)
+        if len(team_info) != len(team_pokemon_ids):
+            found_ids = {pokemon.id for pokemon in team_info}
+            missing_id = next(pokemon_id for pokemon_id in team_pokemon_ids if int(pokemon_id) not in found_ids)
+            return BaseResult(success=False, message=AnswerEnum.TEAM_GET_INVALID_POKEMON_ID.value.format(id=missing_id), data=None)
 
         return BaseResult(
             success=True,
@@ -13,6 +13,7 @@ from ....utils.utils import get_today, userid_to_base32
 from ....core.models.user_models import User, UserItemInfo
 from ....core.models.pokemon_models import UserPokemonInfo, PokemonDetail, PokemonStats, WildPokemonInfo
 from ....interface.response.answer_enum import AnswerEnum
+from ..world.encounter_store import EncounterStore
 
 class UserPokemonService:
     """封装与用户宝可梦相关的业务逻辑"""
@@ -25,7 +26,8 @@ class UserPokemonService:
             pokemon_ability_repo: AbstractPokemonAbilityRepository,
             user_item_repo: AbstractUserItemRepository,
             move_repo: AbstractMoveRepository,
-            config: Dict[str, Any]
+            config: Dict[str, Any],
+            encounter_store: Optional[EncounterStore] = None
     ):
         self.user_repo = user_repo
         self.pokemon_repo = pokemon_repo
@@ -35,6 +37,8 @@ class UserPokemonService:
         self.user_item_repo = user_item_repo
         self.move_repo = move_repo
         self.config = config
+        # 未处理的野生遭遇（与 AdventureService 共用同一个缓存）
+        self.encounter_store = encounter_store if encounter_store is not None else EncounterStore(pokemon_repo, user_pokemon_repo)
 
     def _assign_random_ability(self, species_id: int) -> int:
         """
@@ -336,12 +340,19 @@ class UserPokemonService:
         Returns:
             Optional[WildPokemonInfo]: 野生宝可梦的详细信息，如果不存在则返回None
         """
-        encountered_wild_pokemon = self.user_pokemon_repo.get_user_encountered_wild_pokemon(user_id)
-        if not encountered_wild_pokemon:
-            return None
-        wild_pokemon_id = encountered_wild_pokemon.wild_pokemon_id
-        wild_pokemon_info = self.pokemon_repo.get_wild_pokemon_by_id(wild_pokemon_id)
-        return wild_pokemon_info
+        encounter = self.encounter_store.get(user_id)
+        return encounter.wild_pokemon if encounter else None
+
+    def resolve_wild_encounter(self, user_id: str, captured: bool = False) -> Optional[int]:
+        """
+        结束用户当前的野生遭遇（捕捉成功或逃跑）
+        Args:
+            user_id (str): 用户ID
+            captured (bool): 是否被捕捉；未战斗就逃跑的遭遇不会写入遭遇记录
+        Returns:
+            Optional[int]: 野生宝可梦ID，未战斗就逃跑时为None
+        """
+        return self.encounter_store.resolve(user_id, captured=captured)
 
     def get_user_current_trainer_encounter(self, user_id: str) -> Optional[int]:
         """
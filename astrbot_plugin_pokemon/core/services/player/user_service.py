@@ -10,6 +10,7 @@ from ....infrastructure.repositories.abstract_repository import (
 
 from ....utils.utils import get_today, userid_to_base32
 from ....core.models.user_models import User
+from ....core.services.mechanics.growth_rate_table import exp_for_level
 from ....core.models.pokemon_models import UserPokemonInfo, PokemonDetail, WildPokemonEncounterLog
 from ....interface.response.answer_enum import AnswerEnum
 
@@ -218,23 +219,6 @@ class UserService:
             message=AnswerEnum.USER_ITEM_ADDED.value
         )
 
-    def _update_encounter_log(self, user_id: str, wild_id: int, captured: bool = False, deleted: bool = False):
-        """更新遭遇日志 (封装Repo操作)"""
-        try:
-            logs = self.user_pokemon_repo.get_user_encounters(user_id, limit=5)
-            # 找到最近一条匹配且未处理的记录
-            target_log = next((l for l in logs if l.wild_pokemon_id == wild_id and l.is_captured == 0), None)
-
-            if target_log:
-                self.user_pokemon_repo.update_encounter_log(
-                    log_id=target_log.id,
-                    is_captured=1 if captured else 0,
-                    isdel=1 if deleted else 0
-                )
-        except Exception as e:
-            # 日志更新失败不应阻断主流程，打印错误即可
-            logger.error(f"Error updating encounter log: {e}")
-
     def update_encounter_log(self, log_id: int, is_captured: int, isdel: int) -> BaseResult:
         """
         更新遭遇记录。
@@ -263,11 +247,7 @@ class UserService:
             return BaseResult(success=False, message=AnswerEnum.USER_NOT_EXISTS.value)
 
         # 计算下一级所需经验
-        if self.exp_service:
-            required_exp_for_next = self.exp_service.get_required_exp_for_level(user.level + 1)
-            exp_needed_for_next = required_exp_for_next - user.exp if user.level < 100 else 0
-        else:
-            exp_needed_for_next = 0
+        exp_needed_for_next = exp_for_level(user.level + 1) - user.exp if user.level < 100 else 0
 
         profile_data = {
             "user_id": user.user_id,
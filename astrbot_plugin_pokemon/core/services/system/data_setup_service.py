@@ -1,5 +1,6 @@
 import os
-import pandas as pd
+from typing import Callable, List, Tuple
+
 from ....infrastructure.repositories.abstract_repository import (
     AbstractPokemonRepository,
     AbstractAdventureRepository,
@@ -8,6 +9,8 @@ from ....infrastructure.repositories.abstract_repository import (
     AbstractNatureRepository, AbstractTrainerRepository,
     AbstractAbilityRepository, AbstractPokemonAbilityRepository,
 )
+from ....infrastructure.database.connection_manager import SqliteConnectionManager
+from ....infrastructure.database.csv_importer import CsvImporter, DEFAULT_CHUNK_SIZE
 from astrbot.api import logger
 
 
@@ -24,7 +27,9 @@ class DataSetupService:
                  trainer_repo: AbstractTrainerRepository,
                  ability_repo: AbstractAbilityRepository,
                  pokemon_ability_repo: AbstractPokemonAbilityRepository,
-                 data_path: str = None
+                 db_manager: SqliteConnectionManager,
+                 data_path: str = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE
                  ):
         self.pokemon_repo = pokemon_repo
         self.adventure_repo = adventure_repo
@@ -44,13 +49,35 @@ class DataSetupService:
         else:
             self.data_path = data_path
 
-    def _read_csv_data(self, filename: str) -> pd.DataFrame:
-        """读取CSV文件数据"""
-        file_path = os.path.join(self.data_path, filename)
-        if not os.path.exists(file_path):
-            logger.warning(f"CSV文件不存在: {file_path}")
-            return pd.DataFrame()
-        return pd.read_csv(file_path)
+        # 流式导入：逐行读取 CSV，按 chunk_size 分批写入
+        self.importer = CsvImporter(db_manager, self.data_path, chunk_size)
+
+    def _import_steps(self) -> List[Tuple[Callable[[], object], Tuple[str, ...]]]:
+        """(是否已有数据的检查, 为空时导入的 CSV)。检查只读取一行，避免为判空读取整张表"""
+        return [
+            (lambda: self.pokemon_repo.get_pokemon_by_id(1), ("pokemon_species.csv",)),
+            (lambda: self.pokemon_repo.get_pokemon_types(1), ("pokemon_types.csv",)),
+            (lambda: self.pokemon_repo.get_pokemon_species_types(1), ("pokemon_species_types.csv",)),
+            (lambda: self.pokemon_repo.get_pokemon_evolutions(1, 100), ("pokemon_evolution.csv",)),
+            (lambda: self.item_repo.get_item_name(1), ("items.csv",)),
+            (lambda: self.adventure_repo.get_location_by_id(1), ("locations.csv",)),
+            (lambda: self.adventure_repo.get_gym_by_location(1), ("gyms.csv",)),
+            (lambda: self.adventure_repo.get_location_pokemon_by_location_id(1), ("location_pokemon.csv",)),
+            (lambda: self.move_repo.get_move_by_id(1), ("moves.csv",)),
+            (lambda: self.move_repo.get_pokemon_moves_by_species_id(1), ("pokemon_moves.csv",)),
+            (lambda: self.shop_repo.get_shop_by_id(1), ("shops.csv",)),
+            (lambda: self.shop_repo.get_shop_items_by_shop_id(1), ("shop_items.csv",)),
+            (lambda: self.nature_repo.get_nature_by_id(1), ("natures.csv",)),
+            (lambda: self.nature_repo.get_nature_stats_by_nature_id(1), ("nature_stats.csv",)),
+            (lambda: self.trainer_repo.get_trainer_by_id(1),
+             ("trainers.csv", "trainer_pokemon.csv", "location_trainers.csv")),
+            (lambda: self.move_repo.get_move_meta_by_move_id(1),
+             ("move_flag_map.csv", "move_meta.csv", "move_meta_stat_changes.csv")),
+            (lambda: self.ability_repo.get_ability_by_id(1), ("abilities.csv",)),
+            (lambda: self.pokemon_ability_repo.get_abilities_by_pokemon_id(1), ("pokemon_abilities.csv",)),
+            # 用常见的宝可梦（12 巴大蝶）检查携带物品数据
+            (lambda: self.pokemon_repo.get_pokemon_items_by_pokemon_id(12), ("pokemon_items.csv",)),
+        ]
 
     def setup_initial_data(self):
         """
@@ -60,575 +87,15 @@ class DataSetupService:
         """
         logger.info("开始检查并初始化游戏数据...")
 
-        try:
-            # 1. 填充 Pokemon 数据
-            if not self.pokemon_repo.get_all_pokemon():
-                df = self._read_csv_data("pokemon_species.csv")
-                if not df.empty:
-                    logger.info("正在初始化宝可梦种族数据...")
-                    df = df.where(pd.notnull(df), None)
-
-                    pokemon_data_list = [
-                        {
-                            "id": row['id'],
-                            "name_en": row['name_en'],
-                            "name_zh": row['name_zh'],
-                            "generation_id": row['generation_id'],
-                            "base_hp": row['base_hp'],
-                            "base_attack": row['base_attack'],
-                            "base_defense": row['base_defense'],
-                            "base_sp_attack": row['base_sp_attack'],
-                            "base_sp_defense": row['base_sp_defense'],
-                            "base_speed": row['base_speed'],
-                            "height": row['height'],
-                            "weight": row['weight'],
-                            "base_experience": row['base_experience'],
-                            "gender_rate": row['gender_rate'],
-                            "capture_rate": row['capture_rate'],
-                            "growth_rate_id": row['growth_rate_id'],
-                            "description": row['description'],
-                            "orders": row.get('order', row['id']),
-                            "effort": row.get('effort', '[]')
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.pokemon_repo, 'add_pokemon_templates_batch'):
-                        self.pokemon_repo.add_pokemon_templates_batch(pokemon_data_list)
-                    else:
-                        for data in pokemon_data_list:
-                            self.pokemon_repo.add_pokemon_template(data)
-
-            # 2. 填充 Pokemon 类型数据
-            if not self.pokemon_repo.get_pokemon_types(1):
-                df = self._read_csv_data("pokemon_types.csv")
-                if not df.empty:
-                    for row in df.to_dict('records'):
-                        self.pokemon_repo.add_pokemon_type_template({
-                            "id": row['id'],
-                            "name_en": row['name_en'],
-                            "name_zh": row['name_zh'],
-                        })
-
-            # 3. 填充 Pokemon 类型关联
-            if not self.pokemon_repo.get_pokemon_species_types(1):
-                df = self._read_csv_data("pokemon_species_types.csv")
-                if not df.empty:
-                    for row in df.to_dict('records'):
-                        try:
-                            self.pokemon_repo.add_pokemon_species_type_template({
-                                "species_id": int(row['pokemon_id']) if pd.notna(row['pokemon_id']) else 0,
-                                "type_id": int(row['type_id']) if pd.notna(row['type_id']) else 0,
-                            })
-                        except Exception as e:
-                            logger.error(f"宝可梦类型数据错误 (Species: {row.get('pokemon_id')}, Type: {row.get('type_id')}): {e}")
-
-            # 4. 填充 Pokemon 进化数据
-            if not self.pokemon_repo.get_pokemon_evolutions(1, 100):
-                df = self._read_csv_data("pokemon_evolution.csv")
-                if not df.empty:
-                    logger.info("正在初始化宝可梦进化数据...")
-                    df = df.where(pd.notnull(df), None)
-
-                    evolution_data_list = [
-                        {
-                            "id": row['id'],
-                            "pre_species_id": row['pre_species_id'],
-                            "evolved_species_id": row['evolved_species_id'],
-                            "evolution_trigger_id": row.get('evolution_trigger_id', 0),
-                            "trigger_item_id": row.get('trigger_item_id', 0),
-                            "minimum_level": row.get('minimum_level', 0),
-                            "gender_id": row.get('gender_id', 0),
-                            "location_id": row.get('location_id', 0),
-                            "held_item_id": row.get('held_item_id', 0),
-                            "time_of_day": row.get('time_of_day', ''),
-                            "known_move_id": row.get('known_move_id', 0),
-                            "known_move_type_id": row.get('known_move_type_id', 0),
-                            "minimum_happiness": row.get('minimum_happiness', 0),
-                            "minimum_beauty": row.get('minimum_beauty', 0),
-                            "minimum_affection": row.get('minimum_affection', 0),
-                            "relative_physical_stats": row.get('relative_physical_stats', 0),
-                            "party_species_id": row.get('party_species_id', 0),
-                            "party_type_id": row.get('party_type_id', 0),
-                            "trade_species_id": row.get('trade_species_id', 0),
-                            "needs_overworld_rain": row.get('needs_overworld_rain', 0),
-                            "turn_upside_down": row.get('turn_upside_down', 0),
-                            "region_id": row.get('region_id', 0),
-                            "base_form_id": row.get('base_form_id', 0)
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.pokemon_repo, 'add_pokemon_evolutions_batch'):
-                        self.pokemon_repo.add_pokemon_evolutions_batch(evolution_data_list)
-                    else:
-                        for data in evolution_data_list:
-                            self.pokemon_repo.add_pokemon_evolution_template(data)
-
-            # 5. 填充物品数据
-            if not self.item_repo.get_item_name(1):
-                df = self._read_csv_data("items.csv")
-                if not df.empty:
-                    logger.info("正在初始化物品数据...")
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            item_data = {
-                                "id": int(row['id']),
-                                "name_en": str(row['name_en']),
-                                "name_zh": str(row['name_zh']),
-                                "category_id": int(row['category_id']),
-                                "cost": int(row['cost']),
-                                "description": str(row['description']) if row['description'] else ""
-                            }
-                            self.item_repo.add_item_template(item_data)
-                        except Exception as e:
-                            logger.error(f"物品数据错误 (ID: {row.get('id')}): {e}")
-
-            # 6. 填充地点数据
-            if not self.adventure_repo.get_location_by_id(1):
-                df = self._read_csv_data("locations.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            self.adventure_repo.add_location_template({
-                                "id": int(row['id']),
-                                "name": str(row['name']),
-                                "description": str(row['description']) if row['description'] else "",
-                                "min_level": int(row['min_level']) if row['min_level'] else 1,
-                                "max_level": int(row['max_level']) if row['max_level'] else 100
-                            })
-                        except Exception as e:
-                            logger.error(f"地点数据错误 (ID: {row.get('id')}): {e}")
-
-            # 6.5 填充道馆数据
-            if not self.adventure_repo.get_gym_by_location(1):
-                df = self._read_csv_data("gyms.csv")
-                if not df.empty:
-                    logger.info("正在初始化道馆数据...")
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            # elite_trainer_ids will be handled by add_gym_template
-                            self.adventure_repo.add_gym_template({
-                                "id": int(row['id']),
-                                "location_id": int(row['location_id']),
-                                "name": str(row['name']),
-                                "description": str(row['description']) if row['description'] else "",
-                                "elite_trainer_ids": row['elite_trainer_ids'] if row['elite_trainer_ids'] else "",
-                                "boss_trainer_id": int(row['boss_trainer_id']),
-                                "required_level": int(row['required_level']),
-                                "unlock_location_id": int(row['unlock_location_id']),
-                                "reward_item_id": int(row['reward_item_id']) if pd.notna(row['reward_item_id']) else None
-                            })
-                        except Exception as e:
-                            logger.error(f"道馆数据错误 (ID: {row.get('id')}): {e}")
-
-            # 7. 填充地点宝可梦关联
-            if not self.adventure_repo.get_location_pokemon_by_location_id(1):
-                df = self._read_csv_data("location_pokemon.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            self.adventure_repo.add_location_pokemon_template({
-                                "id": int(row['id']),
-                                "location_id": int(row['location_id']),
-                                "pokemon_species_id": int(row['pokemon_species_id']),
-                                "encounter_rate": float(row['encounter_rate']) if row['encounter_rate'] else 10.0,
-                                "min_level": int(row['min_level']) if row['min_level'] else 1,
-                                "max_level": int(row['max_level']) if row['max_level'] else 10
-                            })
-                        except Exception as e:
-                            logger.error(f"地点宝可梦错误 (Loc: {row.get('location_id')}): {e}")
-
-            # 8. 填充技能数据
-            if not self.move_repo.get_move_by_id(1):
-                df = self._read_csv_data("moves.csv")
-                if not df.empty:
-                    logger.info("正在初始化技能数据...")
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            move_data = {
-                                "id": int(row['id']) if pd.notna(row['id']) else 0,
-                                "name_en": str(row['name_en']) if pd.notna(row['name_en']) else "",
-                                "name_zh": str(row['name_zh']) if pd.notna(row['name_zh']) else None,
-                                "generation_id": int(row['generation_id']) if pd.notna(row['generation_id']) else 0,
-                                "type_id": int(row['type_id']) if pd.notna(row['type_id']) else 0,
-                                "power": int(row['power']) if pd.notna(row['power']) else None,
-                                "pp": int(row['pp']) if pd.notna(row['pp']) else None,
-                                "accuracy": int(row['accuracy']) if pd.notna(row['accuracy']) else None,
-                                "priority": int(row['priority']) if pd.notna(row['priority']) else 0,
-                                "target_id": int(row['target_id']) if pd.notna(row['target_id']) else 0,
-                                "damage_class_id": int(row['damage_class_id']) if pd.notna(row['damage_class_id']) else 0,
-                                "effect_id": int(row['effect_id']) if pd.notna(row['effect_id']) else None,
-                                "effect_chance": int(row['effect_chance']) if pd.notna(row['effect_chance']) else None,
-                                "description": str(row['description']) if pd.notna(row['description']) else ""
-                            }
-                            self.move_repo.add_move_template(move_data)
-                        except Exception as e:
-                            logger.error(f"技能数据错误 (ID: {row.get('id')}): {e}")
-
-            # 9. 填充宝可梦技能关联 (大批量数据)
-            if not self.move_repo.get_pokemon_moves_by_species_id(1):
-                df = self._read_csv_data("pokemon_moves.csv")
-                if not df.empty:
-                    logger.info("正在初始化宝可梦技能学习表 (可能需要几秒钟)...")
-                    df = df.where(pd.notnull(df), None)
-                    # 排序
-                    df.sort_values(['pokemon_id', 'pokemon_move_method_id'], inplace=True)
-
-                    records = df.to_dict('records')
-                    batch_size = 1000
-
-                    for i in range(0, len(records), batch_size):
-                        batch = records[i:i + batch_size]
-                        batch_data = []
-                        for row in batch:
-                            try:
-                                batch_data.append({
-                                    "pokemon_species_id": int(row['pokemon_id']) if pd.notna(row['pokemon_id']) else 0,
-                                    "move_id": int(row['move_id']) if pd.notna(row['move_id']) else 0,
-                                    "move_method_id": int(row['pokemon_move_method_id']) if pd.notna(row['pokemon_move_method_id']) else 0,
-                                    "level": int(row['level']) if pd.notna(row['level']) else 0
-                                })
-                            except Exception:
-                                continue
-
-                        if batch_data:
-                            try:
-                                self.move_repo.add_pokemon_species_move_templates_batch(batch_data)
-                            except Exception as e:
-                                logger.error(f"批量插入技能失败，尝试单条插入: {e}")
-                                for data in batch_data:
-                                    try:
-                                        self.move_repo.add_pokemon_species_move_template(data)
-                                    except:
-                                        pass
-
-            # 10. 填充商店数据
-            if not self.shop_repo.get_shop_by_id(1):
-                df = self._read_csv_data("shops.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            self.shop_repo.add_shop_template({
-                                "id": int(row['id']),
-                                "name": str(row['name']),
-                                "description": str(row['description']) if row['description'] else "",
-                                "shop_type": str(row['shop_type']),
-                                "is_active": int(row['is_active'])
-                            })
-                        except Exception as e:
-                            logger.error(f"商店数据错误 (ID: {row.get('id')}): {e}")
-
-            # 11. 填充商店物品
-            if not self.shop_repo.get_shop_items_by_shop_id(1):
-                df = self._read_csv_data("shop_items.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-                    for row in df.to_dict('records'):
-                        try:
-                            self.shop_repo.add_shop_item_template({
-                                "id": int(row['id']),
-                                "shop_id": int(row['shop_id']),
-                                "item_id": int(row['item_id']),
-                                "price": int(row['price']),
-                                "stock": int(row['stock']),
-                                "is_active": int(row['is_active'])
-                            })
-                        except Exception as e:
-                            logger.error(f"商店物品错误 (ID: {row.get('id')}): {e}")
-
-            # 12. 填充性格数据
-            if not self.nature_repo.get_nature_by_id(1):
-                df = self._read_csv_data("natures.csv")
-                if not df.empty:
-                    logger.info("正在初始化性格数据...")
-                    df = df.where(pd.notnull(df), None)
-
-                    natures_list = [
-                        {
-                            "id": int(row['id']) if pd.notna(row['id']) else 0,
-                            "name_en": str(row['name_en']) if pd.notna(row['name_en']) else "",
-                            "name_zh": str(row['name_zh']) if pd.notna(row['name_zh']) else "",
-                            "decreased_stat_id": int(row['decreased_stat_id']) if pd.notna(row['decreased_stat_id']) else 0,
-                            "increased_stat_id": int(row['increased_stat_id']) if pd.notna(row['increased_stat_id']) else 0,
-                            "hates_flavor_id": int(row['hates_flavor_id']) if pd.notna(row['hates_flavor_id']) else 0,
-                            "likes_flavor_id": int(row['likes_flavor_id']) if pd.notna(row['likes_flavor_id']) else 0,
-                            "game_index": int(row['game_index']) if pd.notna(row['game_index']) else 0
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.nature_repo, 'add_nature_templates_batch'):
-                        self.nature_repo.add_nature_templates_batch(natures_list)
-                    else:
-                        for data in natures_list:
-                            self.nature_repo.add_nature_template(data)
-
-
-            if not self.nature_repo.get_nature_stats_by_nature_id(1):
-                # 填充性格统计 (Pokeathlon)
-                df_stats = self._read_csv_data("nature_stats.csv")
-                if not df_stats.empty:
-                    df_stats = df_stats.where(pd.notnull(df_stats), None)
-                    stats_list = [
-                        {
-                            "nature_id": int(row['nature_id']) if pd.notna(row['nature_id']) else 0,
-                            "pokeathlon_stat_id": int(row['pokeathlon_stat_id']) if pd.notna(row['pokeathlon_stat_id']) else 0,
-                            "max_change": int(row['max_change']) if pd.notna(row['max_change']) else 0
-                        }
-                        for row in df_stats.to_dict('records')
-                    ]
-
-                    if hasattr(self.nature_repo, 'add_nature_stat_templates_batch'):
-                        self.nature_repo.add_nature_stat_templates_batch(stats_list)
-                    else:
-                        for data in stats_list:
-                            self.nature_repo.add_nature_stat_template(data)
-
-            # 13. 填充训练家数据
-            if not self.trainer_repo.get_trainer_by_id(1):
-
-                logger.info("正在初始化训练家数据...")
-
-                # --- 13.1 训练家基础信息 (Trainers) ---
-                trainers_df = self._read_csv_data("trainers.csv")
-                if not trainers_df.empty:
-                    trainers_df = trainers_df.where(pd.notnull(trainers_df), None)
-
-                    # 预处理数据
-                    trainers_data_list = [
-                        {
-                            "id": int(row['id']),
-                            "name": str(row['name']),
-                            "trainer_class": str(row['trainer_class']),
-                            "base_payout": int(row['base_payout']),
-                            "description": str(row['description']) if row['description'] else None
-                        }
-                        for row in trainers_df.to_dict('records')
-                    ]
-
-                    # 尝试批量插入，如果Repo不支持则降级为单条插入
-                    if hasattr(self.trainer_repo, 'create_trainers_batch'):
-                        from ...models.trainer_models import Trainer
-                        # 将字典转换为Trainer对象列表
-                        trainer_list = [Trainer(**data) for data in trainers_data_list if data]
-                        self.trainer_repo.create_trainers_batch(trainer_list)
-                    else:
-                        from ...models.trainer_models import Trainer
-                        for data in trainers_data_list:
-                            try:
-                                self.trainer_repo.create_trainer(Trainer(**data))
-                            except Exception as e:
-                                logger.error(f"训练家插入失败 (ID: {data.get('id')}): {e}")
-
-                # --- 13.2 训练家宝可梦 (Trainer Pokemon) ---
-                trainer_pokemon_df = self._read_csv_data("trainer_pokemon.csv")
-                if not trainer_pokemon_df.empty:
-                    trainer_pokemon_df = trainer_pokemon_df.where(pd.notnull(trainer_pokemon_df),
-                                                                  None)
-
-                    tp_data_list = [
-                        {
-                            "id": int(row['id']),
-                            "trainer_id": int(row['trainer_id']),
-                            "pokemon_species_id": int(row['pokemon_species_id']),
-                            "level": int(row['level']),
-                            "position": int(row['position'])
-                        }
-                        for row in trainer_pokemon_df.to_dict('records')
-                    ]
-
-                    if hasattr(self.trainer_repo, 'create_trainer_pokemons_batch'):
-                        from ...models.trainer_models import TrainerPokemon
-                        # 将字典转换为TrainerPokemon对象列表
-                        trainer_pokemon_list = [TrainerPokemon(**data) for data in tp_data_list if data]
-                        self.trainer_repo.create_trainer_pokemons_batch(trainer_pokemon_list)
-                    else:
-                        from ...models.trainer_models import TrainerPokemon
-                        for data in tp_data_list:
-                            try:
-                                self.trainer_repo.create_trainer_pokemon(TrainerPokemon(**data))
-                            except Exception as e:
-                                logger.error(f"训练家宝可梦插入失败 (ID: {data.get('id')}): {e}")
-
-                # --- 13.3 训练家分布位置 (Trainer Locations) ---
-                location_trainers_df = self._read_csv_data("location_trainers.csv")
-                if not location_trainers_df.empty:
-                    location_trainers_df = location_trainers_df.where(
-                        pd.notnull(location_trainers_df), None)
-
-                    # 准备批量插入的元组列表
-                    tl_params = [
-                        {
-                            "id": int(row['id']),
-                            "trainer_id": int(row['trainer_id']),
-                            "location_id": int(row['location_id']),
-                            "encounter_rate": float(row['encounter_rate'])
-                        }
-                        for row in location_trainers_df.to_dict('records')
-                    ]
-
-                    if hasattr(self.trainer_repo, 'create_location_trainers_batch'):
-                        from ...models.trainer_models import TrainerLocation
-                        # 将字典转换为TrainerLocation对象列表
-                        location_trainers_list = [TrainerLocation(**data) for data in tl_params if data]
-                        self.trainer_repo.create_location_trainers_batch(location_trainers_list)
-
-                logger.info("训练家数据初始化完成")
-
-            # 14. 填充 Move Flag Map (招式标志映射)
-            if hasattr(self.move_repo, 'add_move_flag_map_templates_batch'): # Check method existence just in case, though we know we added it.
-                 # Optimization: check if table is empty. Since we don't have a direct method to check count, we can try to get one record, 
-                 # or reliance on idempotent insert (INSERT OR IGNORE). 
-                 # However, data_setup_service pattern seems to be check-if-repo-has-data -> load.
-                 # We added `get_move_meta_by_move_id` but not for flags. 
-                 # Let's check `move_meta` as a proxy for all 3 tables or just assume if one is empty others might be too, 
-                 # or just rely on 'INSERT OR IGNORE' logic in repo if we skip check.
-                 # BUT, the pattern here is `if not self.repo.check(): load()`. 
-                 # Let's add specific checks if possible, or just load since it's idempotent.
-                 # The user request said "same logic", so we should check first.
-                 # I will blindly try to load if I can't check cheaply, but let's see if we can check.
-                 # Actually, I added `get_move_meta_by_move_id`. I can use that for `move_meta`.
-                 # For `move_flag_map` and `move_meta_stat_changes`, I didn't add specific check methods.
-                 # I will trust the migration/setup process. Since I can't check efficiently without new repo methods,
-                 # and adding them now might be overkill vs just running the batch insert which uses INSERT OR IGNORE.
-                 # Wait, for consistency, I should probably use `get_move_meta_by_move_id(1)` for move_meta.
-                 
-                # Move Meta
-                if not self.move_repo.get_move_meta_by_move_id(1):
-                    logger.info("正在初始化招式元数据 (Move Meta)...")
-                    
-                    # 14.1 move_flag_map.csv
-                    df_flag = self._read_csv_data("move_flag_map.csv")
-                    if not df_flag.empty:
-                        df_flag = df_flag.where(pd.notnull(df_flag), None)
-                        flag_data = [
-                            {"move_id": int(row['move_id']), "move_flag_id": int(row['move_flag_id'])} 
-                            for row in df_flag.to_dict('records')
-                        ]
-                        self.move_repo.add_move_flag_map_templates_batch(flag_data)
-
-                    # 14.2 move_meta.csv
-                    df_meta = self._read_csv_data("move_meta.csv")
-                    if not df_meta.empty:
-                        df_meta = df_meta.where(pd.notnull(df_meta), None)
-                        meta_data = []
-                        for row in df_meta.to_dict('records'):
-                            meta_data.append({
-                                "move_id": int(row['move_id']),
-                                "meta_category_id": int(row['meta_category_id']),
-                                "meta_ailment_id": int(row['meta_ailment_id']),
-                                "min_hits": int(row['min_hits']) if pd.notna(row['min_hits']) else None,
-                                "max_hits": int(row['max_hits']) if pd.notna(row['max_hits']) else None,
-                                "min_turns": int(row['min_turns']) if pd.notna(row['min_turns']) else None,
-                                "max_turns": int(row['max_turns']) if pd.notna(row['max_turns']) else None,
-                                "drain": int(row['drain']),
-                                "healing": int(row['healing']),
-                                "crit_rate": int(row['crit_rate']),
-                                "ailment_chance": int(row['ailment_chance']),
-                                "flinch_chance": int(row['flinch_chance']),
-                                "stat_chance": int(row['stat_chance'])
-                            })
-                        self.move_repo.add_move_meta_templates_batch(meta_data)
-                    
-                    # 14.3 move_meta_stat_changes.csv
-                    df_stat = self._read_csv_data("move_meta_stat_changes.csv")
-                    if not df_stat.empty:
-                        df_stat = df_stat.where(pd.notnull(df_stat), None)
-                        stat_change_data = [
-                            {
-                                "move_id": int(row['move_id']),
-                                "stat_id": int(row['stat_id']),
-                                "change": int(row['change'])
-                            }
-                            for row in df_stat.to_dict('records')
-                        ]
-                        self.move_repo.add_move_stat_change_templates_batch(stat_change_data)
-                    
-                    logger.info("招式元数据初始化完成")
-
-            # 15. 填充 Abilities 数据
-            if not self.ability_repo.get_ability_by_id(1):
-                logger.info("正在初始化特性数据...")
-                df = self._read_csv_data("abilities.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-
-                    ability_data_list = [
-                        {
-                            "id": int(row['id']),
-                            "name_en": str(row['name_en']) if pd.notna(row['name_en']) else "",
-                            "name_zh": str(row['name_zh']) if pd.notna(row['name_zh']) else "",
-                            "generation_id": int(row['generation_id']) if pd.notna(row['generation_id']) else 0,
-                            "is_main_series": int(row['is_main_series']) if pd.notna(row['is_main_series']) else 0,
-                            "description": str(row['description']) if pd.notna(row['description']) else ""
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.ability_repo, 'add_pokemon_ability_templates_batch'):
-                        self.ability_repo.add_pokemon_ability_templates_batch(ability_data_list)
-                    else:
-                        for data in ability_data_list:
-                            self.ability_repo.add_pokemon_ability_template(data)
-
-                    logger.info(f"特性数据初始化完成，共加载 {len(ability_data_list)} 条数据")
-
-            # 16. 填充 Pokemon Abilities 关联数据
-            # Check if there are any existing pokemon_ability relations by checking if the table is empty
-            # Since we added the get_all_pokemon_ability_relations method, we can check if there are any records
-            if not self.pokemon_ability_repo.get_all_pokemon_ability_relations():
-                logger.info("正在初始化宝可梦特性关联数据...")
-                df = self._read_csv_data("pokemon_abilities.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-
-                    relation_data_list = [
-                        {
-                            "pokemon_id": int(row['pokemon_id']) if pd.notna(row['pokemon_id']) else 0,
-                            "ability_id": int(row['ability_id']) if pd.notna(row['ability_id']) else 0,
-                            "is_hidden": int(row['is_hidden']) if pd.notna(row['is_hidden']) else 0,
-                            "slot": int(row['slot']) if pd.notna(row['slot']) else 0
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.pokemon_ability_repo, 'add_pokemon_ability_relation_templates_batch'):
-                        self.pokemon_ability_repo.add_pokemon_ability_relation_templates_batch(relation_data_list)
-                    else:
-                        for data in relation_data_list:
-                            self.pokemon_ability_repo.add_pokemon_ability_relation_template(data)
-
-                    logger.info(f"宝可梦特性关联数据初始化完成，共加载 {len(relation_data_list)} 条数据")
-
-            # 17. 填充 Pokemon Items 关联数据
-            if not self.pokemon_repo.get_pokemon_items_by_pokemon_id(12): # Use a common pokemon ID like 12 (Butterfree) to check
-                logger.info("正在初始化宝可梦携带物品数据...")
-                df = self._read_csv_data("pokemon_items.csv")
-                if not df.empty:
-                    df = df.where(pd.notnull(df), None)
-
-                    item_data_list = [
-                        {
-                            "pokemon_id": int(row['pokemon_id']) if pd.notna(row['pokemon_id']) else 0,
-                            "version_id": int(row['version_id']) if pd.notna(row['version_id']) else 0,
-                            "item_id": int(row['item_id']) if pd.notna(row['item_id']) else 0,
-                            "rarity": int(row['rarity']) if pd.notna(row['rarity']) else 0
-                        }
-                        for row in df.to_dict('records')
-                    ]
-
-                    if hasattr(self.pokemon_repo, 'add_pokemon_item_templates_batch'):
-                        self.pokemon_repo.add_pokemon_item_templates_batch(item_data_list)
-                    
-                    logger.info(f"宝可梦携带物品数据初始化完成，共加载 {len(item_data_list)} 条数据")
-
-        except Exception as e:
-            logger.error(f"初始化数据时发生全局错误: {e}")
-            # 允许继续运行，因为部分数据可能已经加载成功
\ No newline at end of file
+        for has_data, csv_names in self._import_steps():
+            try:
+                if has_data():
+                    continue
+                for csv_name in csv_names:
+                    count = self.importer.import_table(csv_name)
+                    stats = self.importer.stats.get(csv_name)
+                    if stats:
+                        logger.info(f"已导入 {csv_name}: {count} 条（跳过 {stats['skipped']} 行，耗时 {stats['ms']} ms）")
+            except Exception as e:
+                # 单张表失败不影响其他表的导入
+                logger.error(f"导入 {', '.join(csv_names)} 时出错: {e}")
@@ -0,0 +1,60 @@
+"""
+种子库构建脚本：assets/data/v3 下的 CSV 更新后由维护者运行，生成的种子库随插件一起发布。
+
+在 AstrBot 根目录下执行：
+    python -m data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon.core.services.system.seed_builder
+"""
+import os
+import tempfile
+from typing import Dict
+
+from .data_setup_service import DataSetupService
+from ....infrastructure.database.connection_manager import SqliteConnectionManager
+from ....infrastructure.database.migration import run_migrations
+from ....infrastructure.database.seed_database import (
+    DEFAULT_CSV_DIR, DEFAULT_SEED_PATH, SEED_TABLES, build_seed_database
+)
+from ....infrastructure.repositories.sqlite_ability_repo import SqliteAbilityRepository
+from ....infrastructure.repositories.sqlite_adventure_repo import SqliteAdventureRepository
+from ....infrastructure.repositories.sqlite_item_repo import SqliteItemRepository
+from ....infrastructure.repositories.sqlite_move_repo import SqliteMoveRepository
+from ....infrastructure.repositories.sqlite_nature_repo import SqliteNatureRepository
+from ....infrastructure.repositories.sqlite_pokemon_ability_repo import SqlitePokemonAbilityRepository
+from ....infrastructure.repositories.sqlite_pokemon_repo import SqlitePokemonRepository
+from ....infrastructure.repositories.sqlite_shop_repo import SqliteShopRepository
+from ....infrastructure.repositories.sqlite_trainer_repo import SqliteTrainerRepository
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..",
+                              "infrastructure", "database", "migrations")
+
+
+def compile_seed_database(csv_dir: str = DEFAULT_CSV_DIR, seed_path: str = DEFAULT_SEED_PATH) -> Dict[str, int]:
+    """在临时数据库上执行全部迁移与 CSV 导入（与首次启动完全相同的路径），再导出为种子库"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "seed_source.db")
+        run_migrations(db_path, os.path.abspath(MIGRATIONS_DIR))
+        manager = SqliteConnectionManager(db_path)
+        try:
+            DataSetupService(
+                SqlitePokemonRepository(db_path, manager),
+                SqliteAdventureRepository(db_path, manager),
+                SqliteShopRepository(db_path, manager),
+                SqliteMoveRepository(db_path, manager),
+                SqliteItemRepository(db_path, manager),
+                SqliteNatureRepository(db_path, manager),
+                SqliteTrainerRepository(db_path, manager),
+                SqliteAbilityRepository(db_path, manager),
+                SqlitePokemonAbilityRepository(db_path, manager),
+                manager,
+                data_path=csv_dir,
+            ).setup_initial_data()
+        finally:
+            manager.close_all()
+        return build_seed_database(db_path, csv_dir, seed_path)
+
+
+if __name__ == "__main__":
+    counts = compile_seed_database()
+    for table, _ in SEED_TABLES:
+        print(f"{table}: {counts.get(table, '缺失')}")
+    print(f"种子库已生成: {DEFAULT_SEED_PATH}")
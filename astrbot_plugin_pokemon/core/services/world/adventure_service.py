@@ -1,11 +1,13 @@
 import math
 import random
-from typing import Dict, Any, List, Tuple, Optional, Union
+from contextlib import nullcontext
+from typing import Dict, Any, List, Tuple, Optional, Union, Callable, ContextManager
 from dataclasses import dataclass, replace
 
 from ..player import user_pokemon_service
 from ..mechanics.exp_service import ExpService
 from ..mechanics.pokemon_service import PokemonService
+from ..mechanics.stats_kernel import calculate_pokemon_stats, calculate_stats, evs_row, ivs_row, stats_row
 from ...models.common_models import BaseResult
 from ....interface.response.answer_enum import AnswerEnum
 from ...models.pokemon_models import (
@@ -21,6 +23,18 @@ from ....infrastructure.repositories.abstract_repository import (
 )
 from ...models.adventure_models import AdventureResult, LocationInfo, BattleResult, BattleMoveInfo, BattleContext, GymInfo, UserGymState, UserBadge
 from ..battle.battle_engine import BattleLogic, BattleState, ListBattleLogger, NoOpBattleLogger
+from ..battle.vectorized_engine import VectorizedBattleSimulator
+from ..battle.simulation_executor import (
+    SimulationExecutor, create_simulation_executor,
+    new_battle_seed, build_battle_replay, is_battle_replay, replay_real_battle
+)
+from ..battle.win_rate_estimator import (
+    AdaptiveWinRateEstimator, WinRateEstimate, DEFAULT_BATCH_SIZE, STOP_PRECISION, STOP_TIME_BUDGET, STOP_MAX_SIMULATIONS, wilson_interval
+)
+from ..battle.win_rate_cache import WinRateCache, matchup_fingerprint
+from .encounter_store import EncounterStore, DEFAULT_TTL_SECONDS
+from ..battle.battle_events import render_battle_details
+from ..battle.type_chart import type_chart
 from astrbot.api import logger
 
 
@@ -47,6 +61,9 @@ class AdventureService:
             pokemon_ability_repo: AbstractPokemonAbilityRepository,
             exp_service: ExpService,
             config: Dict[str, Any],
+            simulation_executor: Optional[SimulationExecutor] = None,
+            unit_of_work: Optional[Callable[[], ContextManager]] = None,
+            encounter_store: Optional[EncounterStore] = None,
     ):
         self.adventure_repo = adventure_repo
         self.pokemon_repo = pokemon_repo
@@ -63,6 +80,35 @@ class AdventureService:
         self.pokemon_ability_repo = pokemon_ability_repo
         self.trainer_service = None
         self.battle_logic = BattleLogic(move_repo=self.move_repo)
+        self.vectorized_simulator = VectorizedBattleSimulator(self.battle_logic)
+        # 模拟执行器：配置了工作进程数时使用进程池，否则在进程内执行
+        self.simulation_executor = simulation_executor or create_simulation_executor(
+            self.battle_logic, self.vectorized_simulator,
+            workers=self.config.get("adventure", {}).get("simulation_workers", 0)
+        )
+        # 自适应胜率估计器与统计
+        self.win_rate_estimator = AdaptiveWinRateEstimator.from_config(
+            self.config.get("adventure", {}),
+            batch_size=self.simulation_executor.batch_size_for(DEFAULT_BATCH_SIZE)
+        )
+        self.win_rate_metrics = {"estimates": 0, "simulations": 0, "precision_stops": 0, "time_budget_stops": 0}
+        # 对局指纹胜率缓存（可选持久化到 SQLite）
+        adventure_config = self.config.get("adventure", {})
+        self.win_rate_cache = WinRateCache(
+            max_entries=adventure_config.get("win_rate_cache_size", 1024),
+            store=self.battle_repo if adventure_config.get("win_rate_cache_persist", False) else None
+        )
+        # 开启后战斗日志只保存 (引擎版本, 种子, 双方快照)，查看时重新生成详细过程
+        self.battle_log_replay = adventure_config.get("battle_log_replay", False)
+        # 工作单元：一场战斗后的所有写入在同一个事务中提交（未注入时每次写入单独提交）
+        self.unit_of_work = unit_of_work or nullcontext
+        # 未处理的野生遭遇只保存在内存中，被捕捉或发生战斗时才写入数据库
+        if encounter_store is None:
+            encounter_store = EncounterStore(
+                self.pokemon_repo, self.user_pokemon_repo,
+                ttl_seconds=adventure_config.get("encounter_ttl_seconds", DEFAULT_TTL_SECONDS)
+            )
+        self.encounter_store = encounter_store
 
     def set_trainer_service(self, trainer_service):
         """设置训练家服务"""
@@ -207,13 +253,8 @@ class AdventureService:
             held_item_id=held_item_id,
         )
 
-        wild_pokemon_id = self.pokemon_repo.add_wild_pokemon(wild_pokemon_info)
-        self.user_pokemon_repo.add_user_encountered_wild_pokemon(
-            user_id=user_id,
-            wild_pokemon_id=wild_pokemon_id,
-            location_id=location.id,
-            encounter_rate=selected_ap.encounter_rate,
-        )
+        self.encounter_store.put(user_id, wild_pokemon_info, location.id, selected_ap.encounter_rate)
+        self.user_pokemon_repo.record_pokedex_seen(user_id, wild_pokemon_info.species_id)
 
         # 检查该宝可梦物种是否已被用户捕捉
         pokedex_result = self.user_pokemon_repo.get_user_pokedex_ids(user_id)
@@ -311,7 +352,8 @@ class AdventureService:
     def _run_team_battle(self, user_id: str, user_team_list: List[int], opponent_contexts: List[BattleContext],
                          opponent_list, battle_type: str, target_name: str,
                          save_battle_log: bool = True, update_persistence: bool = True,
-                         user_contexts: List[BattleContext] = None) -> Tuple[str, List[Dict], float, float, List[BattleContext]]:
+                         user_contexts: List[BattleContext] = None,
+                         user_pokemon_list: List[UserPokemonInfo] = None) -> Tuple[str, List[Dict], float, float, List[BattleContext]]:
         """
         通用战斗循环方法
         Args:
@@ -322,16 +364,15 @@ class AdventureService:
             battle_type: 战斗类型 ('wild' 或 'trainer')
             target_name: 目标名称
             save_battle_log: 是否保存战斗日志
+            user_pokemon_list: 调用方已查询的队伍宝可梦（未传入时在此一次性查询）
         Returns:
             tuple: (battle_result_str, battle_log, final_u_rate, final_w_rate, user_pokemon_contexts)
         """
-        # 性能优化：一次性获取所有用户宝可梦的完整信息，避免N次数据库查询
-        # 首先批量获取所有用户宝可梦的基本信息
-        user_pokemon_map = {}
-        for pid in user_team_list:
-            u_info = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pid)
-            if u_info and u_info.current_hp > 0:  # 只处理HP>0的宝可梦
-                user_pokemon_map[pid] = u_info
+        # 性能优化：一次查询获取所有用户宝可梦的完整信息，避免N次数据库查询
+        if user_pokemon_list is None:
+            user_pokemon_list = self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, user_team_list)
+        user_pokemon_map = {u_info.id: u_info for u_info in user_pokemon_list
+                            if u_info.current_hp > 0}  # 只处理HP>0的宝可梦
 
         # 性能优化：一次性获取所有用户宝可梦的技能数据，避免N次数据库查询
         all_user_move_ids = set()
@@ -357,7 +398,7 @@ class AdventureService:
         else:
             user_pokemon_contexts = []
             for pid in user_team_list:
-                u_info = user_pokemon_map.get(pid)
+                u_info = user_pokemon_map.get(int(pid))
                 if u_info:
                     user_pokemon_contexts.append(self._create_battle_context(u_info, is_user=True,
                                                                            all_moves_cache=all_moves_cache,
@@ -383,12 +424,17 @@ class AdventureService:
             opponent_ctx = opponent_contexts[opponent_idx]
 
             # 计算胜率 (基于当前实际状态)
-            u_win_rate, o_win_rate = self.calculate_battle_win_rate(user_ctx, opponent_ctx)
+            estimate = self.estimate_battle_win_rate(user_ctx, opponent_ctx)
+            u_win_rate, o_win_rate = estimate.as_rates()
 
             all_win_rates.append((u_win_rate, o_win_rate))
 
-            # 实战
-            battle_outcome, log_data, rem_opponent_hp, rem_user_hp = self.execute_real_battle(user_ctx, opponent_ctx)
+            # 实战（使用独立种子；开启重放记录时须在实战改变上下文之前生成快照）
+            seed = new_battle_seed()
+            replay = build_battle_replay(user_ctx, opponent_ctx, seed) if self.battle_log_replay else None
+            battle_outcome, log_data, rem_opponent_hp, rem_user_hp = self.execute_real_battle(user_ctx, opponent_ctx, seed)
+            if replay is not None:
+                log_data = replay
 
             # 更新对手状态
             if battle_type == 'wild':
@@ -424,6 +470,8 @@ class AdventureService:
                     "target_current_hp": opponent_ctx.current_hp,
                     "target_max_hp": opponent_ctx.pokemon.stats.hp,
                     "win_rate": u_win_rate,
+                    "win_rate_interval": [estimate.lower, estimate.upper],
+                    "simulations": estimate.simulations,
                     "result": battle_outcome,
                     "details": log_data
                 })
@@ -444,6 +492,8 @@ class AdventureService:
                     "target_current_hp": opponent_ctx.current_hp,
                     "target_max_hp": opponent_ctx.pokemon.stats.hp,
                     "win_rate": u_win_rate,
+                    "win_rate_interval": [estimate.lower, estimate.upper],
+                    "simulations": estimate.simulations,
                     "result": battle_outcome,
                     "details": log_data
                 })
@@ -511,6 +561,12 @@ class AdventureService:
         return battle_result_str, battle_log, final_u_rate, final_w_rate, user_pokemon_contexts
 
     def start_battle(self, user_id: str, wild_pokemon_info: WildPokemonInfo, user_team_list: List[int] = None) -> \
+    BaseResult[BattleResult]:
+        """开始一场与野生宝可梦的战斗（战后的HP/PP、经验、努力值、日志、遭遇记录与掉落在一个事务中提交）"""
+        with self.unit_of_work():
+            return self._start_battle(user_id, wild_pokemon_info, user_team_list)
+
+    def _start_battle(self, user_id: str, wild_pokemon_info: WildPokemonInfo, user_team_list: List[int] = None) -> \
     BaseResult[BattleResult]:
         """开始一场与野生宝可梦的战斗"""
         if user_team_list is None:
@@ -519,13 +575,9 @@ class AdventureService:
                 return BaseResult(success=False, message=AnswerEnum.USER_TEAM_NOT_SET.value)
             user_team_list = user_team_data.team_pokemon_ids
         
-        # 检查是否有存活的宝可梦
-        has_alive_pokemon = False
-        for pid in user_team_list:
-            p_info = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pid)
-            if p_info and p_info.current_hp > 0:
-                has_alive_pokemon = True
-                break
+        # 检查是否有存活的宝可梦（一次查询取回整个队伍，供战斗复用）
+        user_pokemon_list = self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, user_team_list)
+        has_alive_pokemon = any(p_info.current_hp > 0 for p_info in user_pokemon_list)
         
         if not has_alive_pokemon:
              return BaseResult(success=False, message="你的队伍中没有可以战斗的宝可梦！请先治疗。")
@@ -557,7 +609,8 @@ class AdventureService:
         # 使用通用战斗方法
         battle_result_str, battle_log, final_u_rate, final_w_rate, user_pokemon_contexts = \
             self._run_team_battle(user_id, user_team_list, opponent_contexts,
-                                [wild_pokemon_info], 'wild', wild_pokemon_info.name)
+                                [wild_pokemon_info], 'wild', wild_pokemon_info.name,
+                                user_pokemon_list=user_pokemon_list)
 
         # 保持野生对战特定的处理逻辑
         log_id = 0
@@ -570,7 +623,8 @@ class AdventureService:
             )
         logger.debug(f"[DEBUG] 战斗日志ID: {log_id}")
         exp_details = self._handle_battle_experience(user_id, battle_result_str, wild_pokemon_info, battle_log)
-        self._update_encounter_log(user_id, wild_pokemon_info.id, battle_result_str)
+        # 发生过战斗的遭遇才写入野生宝可梦与遭遇记录（战斗后仍可捕捉或逃跑）
+        self.encounter_store.record_battle(user_id, "win" if battle_result_str == "success" else "lose")
 
         user_exp_result = None
         dropped_items = []
@@ -655,7 +709,7 @@ class AdventureService:
             current_hp = pokemon_info.current_hp
         else:
             current_hp = pokemon_info.stats.hp
-        return BattleContext(
+        context = BattleContext(
             pokemon=pokemon_info,
             moves=moves_list,
             types=types,
@@ -669,6 +723,8 @@ class AdventureService:
             charging_move_id=None,
             protection_status=None
         )
+        # 属性名一次性换算为整数ID，战斗中直接查克制矩阵
+        return type_chart.normalize_context(context)
 
     def _preload_moves(self, pokemon: Any, all_moves_cache: Dict[int, Dict[str, Any]] = None,
                       all_stat_changes_cache: Dict[int, List[Dict[str, Any]]] = None) -> List[BattleMoveInfo]:
@@ -754,88 +810,27 @@ class AdventureService:
 
         return loaded_moves
 
-    def execute_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext) -> tuple[str, Any, int, int]:
-        """执行实战，生成详细日志"""
-        logger_obj = ListBattleLogger(log_details=True)  # 真实战斗时启用详细日志
-        logger_obj.log(f"战斗开始！{user_ctx.pokemon.name} (Lv.{user_ctx.pokemon.level}) VS {wild_ctx.pokemon.name} (Lv.{wild_ctx.pokemon.level})\n\n")
-        logger_obj.log(f"{user_ctx.pokemon.name} HP: {user_ctx.current_hp}, {wild_ctx.pokemon.name} HP: {wild_ctx.current_hp}\n\n")
-
-        # Create BattleState linked to the contexts
-        # Note: In real battle, we want to update the context's HP and PP as well?
-        # The original code modified user_ctx.current_hp and wild_ctx.current_hp directly.
-        # BattleState takes initial values from context.
-        # We need to sync back or just use the state to track progress and then update context at the end?
-        # Actually, the original code updated user_ctx.current_hp in place.
-        # Let's use BattleState to track the battle, and then update the context.
-
-        user_state = BattleState.from_context(user_ctx)
-        wild_state = BattleState.from_context(wild_ctx)
-
-        # 触发登场特性 (按速度顺序)
-        self.battle_logic.handle_battle_start(user_state, wild_state, logger_obj)
-
-        turn = 0
-        max_turns = 50
-        winner = None
-        logger.debug(f"[DEBUG] =====================执行实战，生成详细日志=====================")
-        
-        while user_state.current_hp > 0 and wild_state.current_hp > 0 and turn < max_turns:
-            turn += 1
-            logger_obj.log(f"--- 第 {turn} 回合 ---\n\n")
-
-            battle_ended = self.battle_logic.process_turn(user_state, wild_state, logger_obj)
-            
-            logger_obj.log(f"剩余HP - {user_ctx.pokemon.name}: {max(0, user_state.current_hp)}, {wild_ctx.pokemon.name}: {max(0, wild_state.current_hp)}\n\n")
-
-            if battle_ended:
-                if user_state.current_hp > 0:
-                    winner = "user"
-                else:
-                    winner = "wild"
-                break
-
-        if not winner:
-            result = "fail"
-            logger_obj.log("战斗超时，强制结束。\n\n")
-        else:
-            result = "win" if winner == "user" else "fail"
-        
-        logger.debug("[DEBUG] =====================实战结束=====================")
-
-        # 使用 commit 模式同步状态变化到上下文，确保数据一致性
-        user_state.commit_to_context()
-        wild_state.commit_to_context()
-
-        return result, logger_obj.logs, wild_state.current_hp, user_state.current_hp
-        # return result, logger_obj.logs, wild_state.current_hp
-
+    def execute_real_battle(self, user_ctx: BattleContext, wild_ctx: BattleContext,
+                            seed: Optional[int] = None) -> tuple[str, Any, int, int]:
+        """执行实战，生成详细日志（由模拟执行器执行，最终状态会同步回双方的 BattleContext）"""
+        return self.simulation_executor.run_real_battle(user_ctx, wild_ctx, seed)
 
     def calculate_battle_win_rate(self, user_ctx: BattleContext, wild_ctx: BattleContext, simulations: int = 100) -> \
     Tuple[float, float]:
-        """优化版蒙特卡洛模拟：减少对象创建，仅追踪整数PP"""
+        """优化版蒙特卡洛模拟：减少对象创建，仅追踪整数PP；相同对局命中缓存时直接返回"""
         import time
 
+        fingerprint = matchup_fingerprint(user_ctx, wild_ctx)
+        cached = self.win_rate_cache.get(fingerprint)
+        # 仅复用模拟次数不少于本次要求的缓存结果
+        if cached is not None and cached.simulations >= simulations:
+            return cached.as_rates()
+
         # 添加开始时间日志
         start_time = time.time()
         logger.debug(f"[DEBUG]开始进行 {simulations} 次对战模拟...")
 
-        user_wins = 0
-        logger_obj = NoOpBattleLogger()
-
-        for i in range(simulations):
-            # Create fresh state for each simulation
-            user_state = BattleState.from_context(user_ctx)
-            wild_state = BattleState.from_context(wild_ctx)
-
-            turn = 0
-            while user_state.current_hp > 0 and wild_state.current_hp > 0 and turn < 50:
-                turn += 1
-                battle_ended = self.battle_logic.process_turn(user_state, wild_state, logger_obj)
-                if battle_ended:
-                    break
-
-            if user_state.current_hp > 0:
-                user_wins += 1
+        user_wins = self.simulation_executor.count_user_wins(user_ctx, wild_ctx, simulations)
 
         win_rate = (user_wins / simulations) * 100
 
@@ -844,8 +839,36 @@ class AdventureService:
         elapsed_time = end_time - start_time
         logger.debug(f"[DEBUG]完成 {simulations} 次对战模拟，耗时 {elapsed_time:.3f} 秒")
 
+        lower, upper = wilson_interval(user_wins, simulations)
+        self.win_rate_cache.put(fingerprint, WinRateEstimate(
+            win_rate=win_rate, lower=round(lower * 100, 1), upper=round(upper * 100, 1), simulations=simulations,
+            elapsed_ms=elapsed_time * 1000, stop_reason=STOP_MAX_SIMULATIONS
+        ))
         return round(win_rate, 1), round(100 - win_rate, 1)
 
+    def estimate_battle_win_rate(self, user_ctx: BattleContext, wild_ctx: BattleContext) -> WinRateEstimate:
+        """自适应蒙特卡洛：分批模拟，置信区间足够窄或时间预算耗尽时提前停止；相同对局命中缓存时直接返回"""
+        fingerprint = matchup_fingerprint(user_ctx, wild_ctx)
+        cached = self.win_rate_cache.get(fingerprint)
+        if cached is not None:
+            return cached
+
+        estimate = self.win_rate_estimator.estimate(
+            lambda n: self.simulation_executor.count_user_wins(user_ctx, wild_ctx, n)
+        )
+        self.win_rate_cache.put(fingerprint, estimate)
+
+        self.win_rate_metrics["estimates"] += 1
+        self.win_rate_metrics["simulations"] += estimate.simulations
+        if estimate.stop_reason == STOP_PRECISION:
+            self.win_rate_metrics["precision_stops"] += 1
+        elif estimate.stop_reason == STOP_TIME_BUDGET:
+            self.win_rate_metrics["time_budget_stops"] += 1
+
+        logger.debug(f"[DEBUG]胜率估计: {estimate.win_rate:.1f}% [{estimate.lower}, {estimate.upper}], "
+                     f"模拟 {estimate.simulations} 次, 耗时 {estimate.elapsed_ms:.1f} ms, 停止原因: {estimate.stop_reason}")
+        return estimate
+
     def calculate_type_effectiveness(self, attacker_types: List[str], defender_types: List[str]) -> float:
         """计算属性克制系数"""
         return self.battle_logic.calculate_type_effectiveness(attacker_types, defender_types)
@@ -942,13 +965,17 @@ class AdventureService:
                     if b_info.get("result") == "fail":
                         battle_deaths.add(pid)
 
+            # 一次查询取回战斗后的整个队伍（HP已在战斗中写回）
+            team_pokemon = {p.id: p for p in
+                            self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, user_team.team_pokemon_ids)}
+            rewards = []  # (宝可梦ID, 经验, 说明, 是否出场)
             for pokemon_id in user_team.team_pokemon_ids:
                 pid = int(pokemon_id)
                 if pid in battle_deaths:
                     continue  # 死亡无经验
 
                 # 检查宝可梦当前的HP状态，濒死（HP=0）的宝可梦不应该获得经验
-                current_pokemon = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pid)
+                current_pokemon = team_pokemon.get(pid)
                 if not current_pokemon or current_pokemon.current_hp <= 0:
                     # 濒死的宝可梦不获得经验
                     continue
@@ -956,8 +983,12 @@ class AdventureService:
                 is_participant = pid in battle_participants
                 p_exp = base_exp_gained if is_participant else (base_exp_gained // 2)
                 msg = "获得全部经验" if is_participant else "获得一半经验"
+                rewards.append((pid, p_exp, msg, is_participant))
 
-                res = self.exp_service.update_pokemon_after_battle(user_id, pid, p_exp, ev_gained)
+            # 全队的经验、EV与升级一次批量写入
+            batch_results = self.exp_service.apply_team_battle_rewards(
+                user_id, [(pid, p_exp) for pid, p_exp, _, _ in rewards], ev_gained, team_pokemon)
+            for (pid, p_exp, msg, is_participant), res in zip(rewards, batch_results):
                 res.update({"message": msg, "original_base_exp": base_exp_gained, "applied_exp": p_exp})
                 team_results.append(res)
 
@@ -974,14 +1005,6 @@ class AdventureService:
             "team_pokemon_results": team_results
         }
 
-    def _update_encounter_log(self, user_id: str, wild_pokemon_id: int, result_str: str):
-        recent_encounters = self.user_pokemon_repo.get_user_encounters(user_id, limit=5)
-        for encounter in recent_encounters:
-            if encounter.wild_pokemon_id == wild_pokemon_id and encounter.is_battled == 0:
-                outcome = "win" if result_str == "success" else "lose"
-                self.user_pokemon_repo.update_encounter_log(encounter.id, is_battled=1, battle_result=outcome)
-                break
-
     def _format_pokemon_summary(self, poke_info: Union[UserPokemonInfo, WildPokemonInfo], is_wild: bool = False):
         if not poke_info:
             return {"name": "Unknown", "hp": 0}
@@ -996,7 +1019,17 @@ class AdventureService:
         }
 
     def get_battle_log_by_id(self, log_id: int) -> Optional[Dict[str, Any]]:
-        return self.battle_repo.get_battle_log_by_id(log_id)
+        """获取战斗日志；重放记录在此时重新执行，结构化事件日志在此时才渲染为文本/分段"""
+        log = self.battle_repo.get_battle_log_by_id(log_id)
+        if log and isinstance(log.get("log_data"), list):
+            for record in log["log_data"]:
+                if not isinstance(record, dict):
+                    continue
+                details = record.get("details")
+                if is_battle_replay(details):
+                    details = replay_real_battle(details) or ["战斗引擎已更新，无法重放该场战斗的详细过程。\n\n"]
+                record["details"] = render_battle_details(details)
+        return log
 
     def adventure_with_trainer(self, user_id: str, location_id: int) -> BaseResult:
         if not self.trainer_service:
@@ -1017,19 +1050,22 @@ class AdventureService:
         self.user_pokemon_repo.set_user_current_trainer_encounter(user_id, trainer.id)
         return BaseResult(success=True, message="遇到了训练家！", data=battle_trainer)
 
-    def start_trainer_battle(self, user_id: str, battle_trainer: BattleTrainer, user_team_list: List[int]) -> \
-    BaseResult[BattleResult]:
-        """开始与训练家的战斗"""
+    def start_trainer_battle(self, user_id: str, battle_trainer: BattleTrainer, user_team_list: List[int],
+                             user_pokemon_list: List[UserPokemonInfo] = None) -> BaseResult[BattleResult]:
+        """开始与训练家的战斗（战后的所有写入在一个事务中提交）"""
+        with self.unit_of_work():
+            return self._start_trainer_battle(user_id, battle_trainer, user_team_list, user_pokemon_list)
+
+    def _start_trainer_battle(self, user_id: str, battle_trainer: BattleTrainer, user_team_list: List[int],
+                              user_pokemon_list: List[UserPokemonInfo] = None) -> BaseResult[BattleResult]:
+        """开始与训练家的战斗（user_pokemon_list 为调用方已查询的队伍宝可梦）"""
         if not user_team_list:
             return BaseResult(success=False, message=AnswerEnum.USER_TEAM_NOT_SET.value)
 
-        # 检查是否有存活的宝可梦
-        has_alive_pokemon = False
-        for pid in user_team_list:
-            p_info = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pid)
-            if p_info and p_info.current_hp > 0:
-                has_alive_pokemon = True
-                break
+        # 检查是否有存活的宝可梦（一次查询取回整个队伍，供战斗复用）
+        if user_pokemon_list is None:
+            user_pokemon_list = self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, user_team_list)
+        has_alive_pokemon = any(p_info.current_hp > 0 for p_info in user_pokemon_list)
         
         if not has_alive_pokemon:
              return BaseResult(success=False, message="你的队伍中没有可以战斗的宝可梦！请先治疗。")
@@ -1065,7 +1101,8 @@ class AdventureService:
         # 使用通用战斗方法
         battle_result_str, battle_log, final_u_rate, final_w_rate, user_contexts = \
             self._run_team_battle(user_id, user_team_list, trainer_contexts,
-                                trainer_pokes, 'trainer', battle_trainer.trainer.name or '训练家')
+                                trainer_pokes, 'trainer', battle_trainer.trainer.name or '训练家',
+                                user_pokemon_list=user_pokemon_list)
 
         # 保持训练家战斗特定的处理逻辑
         log_id = 0
@@ -1118,30 +1155,10 @@ class AdventureService:
         level = 50
         species = self.pokemon_repo.get_pokemon_by_id(pokemon_info.species_id)
 
-        # 1. 重新计算 50 级属性
-        base = species.base_stats
-        ivs = pokemon_info.ivs
-        evs = pokemon_info.evs
-
-        def calc(b, i, e, is_hp=False):
-            res = (b * 2 + i + e // 4) * level / 100
-            if is_hp:
-                return int(res) + level + 10
-            else:
-                return int(res) + 5
-
-        new_stats = PokemonStats(
-            hp=calc(base["base_hp"], ivs.hp_iv, evs.hp_ev, True),
-            attack=calc(base["base_attack"], ivs.attack_iv, evs.attack_ev),
-            defense=calc(base["base_defense"], ivs.defense_iv, evs.defense_ev),
-            sp_attack=calc(base["base_sp_attack"], ivs.sp_attack_iv, evs.sp_attack_ev),
-            sp_defense=calc(base["base_sp_defense"], ivs.sp_defense_iv, evs.sp_defense_ev),
-            speed=calc(base["base_speed"], ivs.speed_iv, evs.speed_ev)
-        )
-
-        # 应用性格修正
-        # nature_service is in self.pokemon_service.nature_service
-        final_stats = self.pokemon_service.nature_service.apply_nature_modifiers(new_stats, pokemon_info.nature_id)
+        # 1. 重新计算 50 级属性（含性格修正，nature_service 位于 pokemon_service 上）
+        final_stats = calculate_pokemon_stats(
+            species.base_stats, pokemon_info.ivs, pokemon_info.evs, level,
+            self.pokemon_service.nature_service.nature_multipliers(pokemon_info.nature_id))
 
         # 2. 使用宝可梦现有技能，而不是重新生成
         # 保留宝可梦当前拥有的技能，而不是根据等级重新生成
@@ -1169,20 +1186,12 @@ class AdventureService:
         if not d_team or not d_team.team_pokemon_ids:
             return BaseResult(success=False, message="对方玩家还没有设置队伍")
     
-        # 2. 构造 50 级上下文列表
-        attacker_contexts = []
-        for pid in a_team.team_pokemon_ids:
-            p_info = self.user_pokemon_repo.get_user_pokemon_by_id(attacker_id, pid)
-            if p_info:
-                attacker_contexts.append(self._create_pvp_battle_context(attacker_id, p_info))
-            
-        defender_contexts = []
-        defender_pokes = []
-        for pid in d_team.team_pokemon_ids:
-            p_info = self.user_pokemon_repo.get_user_pokemon_by_id(defender_id, pid)
-            if p_info:
-                defender_contexts.append(self._create_pvp_battle_context(defender_id, p_info))
-                defender_pokes.append(p_info)
+        # 2. 构造 50 级上下文列表（每方一次查询取回整个队伍）
+        attacker_pokes = self.user_pokemon_repo.get_user_pokemon_by_ids(attacker_id, a_team.team_pokemon_ids)
+        attacker_contexts = [self._create_pvp_battle_context(attacker_id, p_info) for p_info in attacker_pokes]
+
+        defender_pokes = self.user_pokemon_repo.get_user_pokemon_by_ids(defender_id, d_team.team_pokemon_ids)
+        defender_contexts = [self._create_pvp_battle_context(defender_id, p_info) for p_info in defender_pokes]
     
         if not attacker_contexts:
              return BaseResult(success=False, message="你的队伍中没有任何有效的宝可梦")
@@ -1201,7 +1210,8 @@ class AdventureService:
             "对方玩家",
             save_battle_log=True, # 强制保存日志
             update_persistence=False, # PvP 不保存状态（无损）
-            user_contexts=attacker_contexts # 使用自定义的50级上下文
+            user_contexts=attacker_contexts, # 使用自定义的50级上下文
+            user_pokemon_list=attacker_pokes
         )
     
         # 4. 保存对战日志
@@ -1278,10 +1288,12 @@ class AdventureService:
                     if battle_info.get("result") == "fail":
                         battle_deaths.add(pokemon_id)
 
-            # 计算每只宝可梦的经验值
+            # 计算每只宝可梦的经验值（一次查询取回战斗后的整个队伍）
+            team_pokemon = {p.id: p for p in self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, team_pokemon_ids)}
+            rewards = []  # (宝可梦ID, 经验, 说明)
             for pokemon_id in team_pokemon_ids:
                 pokemon_id = int(pokemon_id)  # 确保是整数
-                current_pokemon = self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
+                current_pokemon = team_pokemon.get(pokemon_id)
 
                 if not current_pokemon:
                     continue
@@ -1304,10 +1316,12 @@ class AdventureService:
                     pokemon_exp = base_exp_gained // 2
                     exp_message = f"宝可梦未参与训练家对战，获得{base_exp_gained // 2}经验"
 
-                # 更新单个宝可梦的经验
-                pokemon_result = self.exp_service.update_pokemon_after_battle(
-                    user_id, pokemon_id, pokemon_exp, ev_gained
-                )
+                rewards.append((pokemon_id, pokemon_exp, exp_message))
+
+            # 全队的经验、EV与升级一次批量写入
+            batch_results = self.exp_service.apply_team_battle_rewards(
+                user_id, [(pokemon_id, pokemon_exp) for pokemon_id, pokemon_exp, _ in rewards], ev_gained, team_pokemon)
+            for (pokemon_id, pokemon_exp, exp_message), pokemon_result in zip(rewards, batch_results):
                 pokemon_result["message"] = exp_message
                 pokemon_result["original_base_exp"] = base_exp_gained
                 pokemon_result["applied_exp"] = pokemon_exp  # 添加实际应用的经验值
@@ -1347,27 +1361,10 @@ class AdventureService:
             # 这里采用均衡强化策略
             pokemon.evs = PokemonEVs(20, 20, 20, 20, 20, 20)
             
-            # 重新计算属性 (基础属性 + IV + EV)
-            # 注意：base_stats 不变，但由 stats (实战数值) 需要重新计算
-            # 公式: floor(((2 * Base + IV + (EV/4)) * Level) / 100) + 5
-            # HP公式: floor(((2 * Base + IV + (EV/4)) * Level) / 100) + Level + 10
-            
-            level = pokemon.level
-            base = pokemon.stats # 这是一个PokemonStats对象
-            
-            # Helper to calc stat
-            def calc_stat(base_val, iv, ev, is_hp=False):
-                if is_hp:
-                    return math.floor(((2 * base_val + iv + (ev / 4)) * level) / 100) + level + 10
-                else:
-                    return math.floor(((2 * base_val + iv + (ev / 4)) * level) / 100) + 5
-
-            pokemon.stats.hp = calc_stat(base.hp, 31, 20, is_hp=True)
-            pokemon.stats.attack = calc_stat(base.attack, 31, 20)
-            pokemon.stats.defense = calc_stat(base.defense, 31, 20)
-            pokemon.stats.sp_attack = calc_stat(base.sp_attack, 31, 20)
-            pokemon.stats.sp_defense = calc_stat(base.sp_defense, 31, 20)
-            pokemon.stats.speed = calc_stat(base.speed, 31, 20)
+            # 重新计算属性 (基础属性 + IV + EV，公式见 stats_kernel，不计性格)
+            # 注意：这里以 stats (实战数值) 作为基础值重新计算
+            pokemon.stats = PokemonStats(*calculate_stats(
+                stats_row(pokemon.stats), ivs_row(pokemon.ivs), evs_row(pokemon.evs), pokemon.level))
             
             # 满血复活 (Buffed HP)
             pokemon.current_hp = pokemon.stats.hp
@@ -1464,12 +1461,12 @@ class AdventureService:
         # 6. 执行战斗
         # 检查队伍存活
         current_team = self.team_repo.get_user_team(user_id)
-        has_alive = any(self.user_pokemon_repo.get_user_pokemon_by_id(user_id, pid).current_hp > 0 
-                        for pid in current_team.team_pokemon_ids)
+        team_pokemon = self.user_pokemon_repo.get_user_pokemon_by_ids(user_id, current_team.team_pokemon_ids)
+        has_alive = any(p_info.current_hp > 0 for p_info in team_pokemon)
         if not has_alive:
              return BaseResult(success=False, message=f"你的队伍全军覆没！无法挑战 {trainer_title}{battle_trainer.trainer.name}。")
 
-        res = self.start_trainer_battle(user_id, battle_trainer, current_team.team_pokemon_ids)
+        res = self.start_trainer_battle(user_id, battle_trainer, current_team.team_pokemon_ids, team_pokemon)
         
         if not res.success or res.data.result != "success":
             # 挑战失败 -> 重置状态
@@ -0,0 +1,271 @@
+"""
+野生遭遇缓存
+
+每次 /冒险 都会刷新一只野生宝可梦，但大多数遭遇最终是逃跑或放置不管，之后不会再被引用。
+这里把未处理的遭遇按玩家保存在内存中（带过期时间），只有被捕捉或发生战斗的遭遇
+才写入 wild_pokemon / wild_pokemon_encounter_log：
+- 内存中每位玩家最多一条未处理遭遇，超过 ttl_seconds 视为已离开
+- 战斗后遭遇仍可继续捕捉/逃跑：战斗时写入记录，之后由 resolve() 更新该记录
+- 可选写穿到 pending_wild_encounters（每位玩家一行），进程重启后恢复尚未过期的遭遇
+- collect_garbage() 分批清理历史遗留的、未被捕捉/战斗记录引用的野生宝可梦
+
+指令在数据库线程中访问遭遇，后台清理也可能在其他线程中运行，内存字典与计数由一把锁保护；
+数据库写入在锁外进行。过期与结束都先在锁内把遭遇从字典中取出，只有取出的一方处理它，
+因此同一条遭遇不会既被清理又被捕捉/逃跑结束。
+战斗在工作单元中写入记录；工作单元回滚时只把该场战斗的遭遇恢复为未战斗状态，其他玩家的遭遇不受影响。
+"""
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ...models.pokemon_models import WildPokemonInfo, PokemonStats, PokemonIVs, PokemonEVs, PokemonMoves
+from ....infrastructure.repositories.abstract_repository import (
+    AbstractPokemonRepository, AbstractUserPokemonRepository
+)
+
+# 遭遇的默认保留时间（秒）
+DEFAULT_TTL_SECONDS = 1800
+# 后台清理每批处理的野生宝可梦条数
+GC_BATCH_SIZE = 500
+
+
+@dataclass
+class PendingEncounter:
+    """玩家当前未处理的野生遭遇"""
+    wild_pokemon: WildPokemonInfo
+    location_id: int
+    encounter_rate: float
+    encounter_time: str
+    expires_at: float
+    # 发生过战斗后写入的遭遇记录ID（未战斗时为 None）
+    log_id: Optional[int] = None
+
+
+def _wild_to_json(wild: WildPokemonInfo) -> str:
+    return json.dumps(asdict(wild), ensure_ascii=False)
+
+
+def _wild_from_json(payload: str) -> WildPokemonInfo:
+    data = json.loads(payload)
+    return WildPokemonInfo(
+        **{k: v for k, v in data.items() if k not in ("stats", "ivs", "evs", "moves")},
+        stats=PokemonStats(**data["stats"]),
+        ivs=PokemonIVs(**data["ivs"]),
+        evs=PokemonEVs(**data["evs"]),
+        moves=PokemonMoves(**data["moves"]),
+    )
+
+
+class EncounterStore:
+    """按玩家保存未处理野生遭遇的 TTL 缓存，可选写穿到 SQLite"""
+
+    def __init__(self, pokemon_repo: AbstractPokemonRepository, user_pokemon_repo: AbstractUserPokemonRepository,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, write_through: bool = False,
+                 clock: Callable[[], float] = time.time,
+                 on_rollback: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        pokemon_repo / user_pokemon_repo: 遭遇结束需要保留时写入野生宝可梦与遭遇记录
+        write_through: 为 True 时同时把未处理遭遇写入 pending_wild_encounters，重启后可恢复
+        on_rollback: 登记当前工作单元回滚时的撤销动作（如 SqliteConnectionManager.on_rollback）
+        """
+        self.pokemon_repo = pokemon_repo
+        self.user_pokemon_repo = user_pokemon_repo
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.write_through = write_through
+        self._clock = clock
+        self._on_rollback = on_rollback
+        self._lock = threading.Lock()
+        self._entries: Dict[str, PendingEncounter] = {}
+        # 写穿模式下首次访问时从数据库恢复
+        self._loaded = not write_through
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.persisted = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ensure_loaded(self) -> None:
+        """写穿模式下首次访问时恢复遭遇（仅执行一次，加载完成后才标记为已加载）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for row in self.user_pokemon_repo.get_pending_encounters(self._clock()):
+                self._entries.setdefault(row["user_id"], PendingEncounter(
+                    wild_pokemon=_wild_from_json(row["wild_pokemon"]),
+                    location_id=row["location_id"],
+                    encounter_rate=row["encounter_rate"],
+                    encounter_time=row["encounter_time"],
+                    expires_at=row["expires_at"],
+                    log_id=row["log_id"],
+                ))
+            self._loaded = True
+
+    def get(self, user_id: str) -> Optional[PendingEncounter]:
+        """玩家当前未过期的遭遇"""
+        self._ensure_loaded()
+        expired = None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.expires_at <= self._clock():
+                expired = self._entries.pop(user_id)
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if expired is not None:
+            self._expire(user_id, expired)
+        return entry
+
+    def put(self, user_id: str, wild_pokemon: WildPokemonInfo, location_id: int,
+            encounter_rate: float) -> PendingEncounter:
+        """记录一次新的遭遇（替换该玩家之前的未处理遭遇）"""
+        self._ensure_loaded()
+        entry = PendingEncounter(
+            wild_pokemon=wild_pokemon,
+            location_id=location_id,
+            encounter_rate=encounter_rate,
+            encounter_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[user_id] = entry
+        self._save(user_id, entry)
+        return entry
+
+    def record_battle(self, user_id: str, battle_result: str) -> Optional[int]:
+        """
+        记录与当前遭遇的战斗结果：首次战斗时写入野生宝可梦与遭遇记录，遭遇保持未处理状态
+        （之后仍可捕捉或逃跑）。返回野生宝可梦ID，没有遭遇时返回 None
+        """
+        entry = self.get(user_id)
+        if entry is None:
+            return None
+        if entry.log_id is None:
+            if self._on_rollback is not None:
+                self._on_rollback(self._undo_battle_record(user_id, entry, entry.wild_pokemon.id))
+            entry.wild_pokemon.id = self.pokemon_repo.add_wild_pokemon(entry.wild_pokemon)
+            entry.log_id = self.user_pokemon_repo.add_user_encountered_wild_pokemon(
+                user_id=user_id,
+                wild_pokemon_id=entry.wild_pokemon.id,
+                location_id=entry.location_id,
+                encounter_rate=entry.encounter_rate,
+                encounter_time=entry.encounter_time,
+                is_battled=1,
+                battle_result=battle_result,
+            )
+            with self._lock:
+                self.persisted += 1
+                current = self._entries.get(user_id) is entry
+            if current:
+                self._save(user_id, entry)
+            else:
+                # 写入期间遭遇已过期被清理：记录同样标记为已处理
+                self.user_pokemon_repo.update_encounter_log(entry.log_id, isdel=1)
+        else:
+            self.user_pokemon_repo.update_encounter_log(entry.log_id, is_battled=1, battle_result=battle_result, isdel=0)
+        return entry.wild_pokemon.id
+
+    def resolve(self, user_id: str, captured: bool = False) -> Optional[int]:
+        """
+        结束玩家当前的遭遇。被捕捉或战斗过的遭遇写入/更新遭遇记录并返回野生宝可梦ID，
+        未战斗就逃跑的遭遇直接丢弃（返回 None）
+        """
+        if self.get(user_id) is None:
+            return None
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+        if entry is None:   # 与后台清理竞争时已被过期处理
+            return None
+        self._delete_saved(user_id)
+        if entry.log_id is not None:
+            self.user_pokemon_repo.update_encounter_log(entry.log_id, is_captured=1 if captured else 0, isdel=1)
+            return entry.wild_pokemon.id
+        if not captured:
+            with self._lock:
+                self.discarded += 1
+            return None
+
+        entry.wild_pokemon.id = self.pokemon_repo.add_wild_pokemon(entry.wild_pokemon)
+        self.user_pokemon_repo.add_user_encountered_wild_pokemon(
+            user_id=user_id,
+            wild_pokemon_id=entry.wild_pokemon.id,
+            location_id=entry.location_id,
+            encounter_rate=entry.encounter_rate,
+            encounter_time=entry.encounter_time,
+            is_captured=1,
+            isdel=1,
+        )
+        with self._lock:
+            self.persisted += 1
+        return entry.wild_pokemon.id
+
+    def purge_expired(self) -> int:
+        """移除内存与写穿副本中已过期的遭遇，返回移除的内存条数"""
+        self._ensure_loaded()
+        now = self._clock()
+        with self._lock:
+            expired = [(user_id, entry) for user_id, entry in self._entries.items() if entry.expires_at <= now]
+            for user_id, _ in expired:
+                del self._entries[user_id]
+        for user_id, entry in expired:
+            # 写穿副本随后按过期时间统一删除；不按玩家删除，以免删掉该玩家刚写入的新遭遇
+            self._expire(user_id, entry, delete_saved=False)
+        if self.write_through:
+            self.user_pokemon_repo.delete_expired_pending_encounters(now)
+        return len(expired)
+
+    def collect_garbage(self, batch_size: int = GC_BATCH_SIZE) -> int:
+        """清理过期遭遇与一批无引用的历史野生宝可梦，返回本批删除的野生宝可梦条数"""
+        self.purge_expired()
+        return self.pokemon_repo.delete_orphan_wild_pokemon(batch_size)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "write_through": self.write_through,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+                "expired": self.expired,
+                "persisted": self.persisted,
+                "discarded": self.discarded,
+            }
+
+    def _undo_battle_record(self, user_id: str, entry: PendingEncounter, wild_id: int) -> Callable[[], None]:
+        """首次战斗写入记录所在的工作单元回滚时：遭遇恢复为未战斗状态（写穿副本随事务一起回滚）"""
+        def undo() -> None:
+            with self._lock:
+                entry.log_id = None
+                entry.wild_pokemon.id = wild_id
+        return undo
+
+    def _save(self, user_id: str, entry: PendingEncounter) -> None:
+        if self.write_through:
+            self.user_pokemon_repo.save_pending_encounter(
+                user_id, _wild_to_json(entry.wild_pokemon), entry.location_id, entry.encounter_rate,
+                entry.encounter_time, entry.expires_at, entry.log_id)
+
+    def _expire(self, user_id: str, entry: PendingEncounter, delete_saved: bool = True) -> None:
+        """遭遇超时离开（调用方已在锁内将其移出字典）：已写入的战斗记录标记为已处理"""
+        with self._lock:
+            self.expired += 1
+        if delete_saved:
+            self._delete_saved(user_id)
+        if entry.log_id is not None:
+            self.user_pokemon_repo.update_encounter_log(entry.log_id, isdel=1)
+
+    def _delete_saved(self, user_id: str) -> None:
+        if self.write_through:
+            self.user_pokemon_repo.delete_pending_encounter(user_id)
@@ -0,0 +1,111 @@
+"""
+异步数据访问层
+
+指令处理器都是 async 的，但仓储/服务是同步的 sqlite3 调用，直接调用会阻塞事件循环，
+使其他群聊的指令一起排队。DatabaseExecutor 把这些同步调用放到专用的数据库线程中执行，
+AsyncFacade 则把任意同步对象包装为可 await 的门面：
+
+    adventure = db_executor.facade(container.adventure_service)
+    result = await adventure.adventure_in_location(user_id, location_id)
+
+冒险相关的全部指令（查看区域、冒险、战斗、捕捉、逃跑、道馆、学习招式等）都经由门面访问服务，
+并在 AdventureHandlers 中按用户加锁，同一用户的指令不会交错执行。
+默认只使用一个数据库线程（database.executor_workers = 1）：这些指令的数据库访问串行执行，
+即单写者，与原先在事件循环中执行时的语义一致；连接由 SqliteConnectionManager 按线程复用。
+线程数大于 1 时只有同一用户的指令保证串行。
+"""
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# 默认数据库线程数
+DEFAULT_MAX_WORKERS = 1
+# 延迟统计保留的最近调用数
+LATENCY_WINDOW = 1024
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class DatabaseExecutor:
+    """在专用线程中执行同步的数据库调用，并统计排队与执行耗时"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, thread_name_prefix: str = "pokemon-db"):
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._queue_ms = deque(maxlen=LATENCY_WINDOW)
+        self._run_ms = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在数据库线程中执行 func(*args, **kwargs) 并等待结果"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._timed, func, args, kwargs, time.perf_counter())
+
+    def _timed(self, func: Callable, args: tuple, kwargs: dict, submitted: float) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.calls += 1
+                self._queue_ms.append((started - submitted) * 1000)
+                self._run_ms.append((finished - started) * 1000)
+
+    def facade(self, target: Any) -> 'AsyncFacade':
+        """将同步对象包装为可 await 的门面"""
+        return AsyncFacade(target, self)
+
+    def metrics(self) -> Dict[str, Any]:
+        """调用次数与最近调用的排队/执行延迟（毫秒）"""
+        with self._lock:
+            queue_ms, run_ms = list(self._queue_ms), list(self._run_ms)
+        return {
+            "workers": self.max_workers,
+            "calls": self.calls,
+            "errors": self.errors,
+            "queue_p50_ms": round(_percentile(queue_ms, 50), 3),
+            "queue_p99_ms": round(_percentile(queue_ms, 99), 3),
+            "run_p50_ms": round(_percentile(run_ms, 50), 3),
+            "run_p99_ms": round(_percentile(run_ms, 99), 3),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭数据库线程（插件卸载时调用）"""
+        self._pool.shutdown(wait=wait)
+
+
+class AsyncFacade:
+    """同步对象的异步门面：方法调用返回协程，在 DatabaseExecutor 的线程中执行"""
+
+    def __init__(self, target: Any, executor: DatabaseExecutor):
+        self._target = target
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self._executor.run(attr, *args, **kwargs)
+
+        # 缓存包装后的方法，后续调用不再经过 __getattr__
+        self.__dict__[name] = method
+        return method
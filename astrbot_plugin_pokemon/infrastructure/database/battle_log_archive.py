@@ -0,0 +1,91 @@
+"""
+战斗日志的月度归档文件
+
+超出保留策略的战斗日志从主库移出后按月份写入独立的 SQLite 文件（battle_logs_YYYY-MM.db），
+主库的 battle_log_archives 表记录每个文件覆盖的 ID 区间。查看日志时若主库中已不存在，
+再按 ID 区间只读打开对应的归档文件，平时不会打开任何归档文件。
+"""
+import os
+import re
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+# 归档文件与主库 battle_logs 的公共列（顺序即读写顺序）
+ARCHIVE_COLUMNS = ("id", "user_id", "target_name", "log_data", "result", "created_at", "format_version")
+
+_MONTH = re.compile(r"^\d{4}-\d{2}")
+
+
+def month_of(created_at) -> str:
+    """记录所属月份（YYYY-MM）；无法识别的时间统一归入 unknown"""
+    match = _MONTH.match(str(created_at or ""))
+    return match.group(0) if match else "unknown"
+
+
+class BattleLogArchive:
+    """按月份存放已移出主库的战斗日志"""
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+
+    @staticmethod
+    def file_name_of(month: str) -> str:
+        return f"battle_logs_{month}.db"
+
+    def path_of(self, file_name: str) -> str:
+        return os.path.join(self.archive_dir, file_name)
+
+    def write(self, rows: Sequence[Sequence]) -> List[Tuple[str, str, int, int, int]]:
+        """
+        将按 ARCHIVE_COLUMNS 排列的记录写入各自月份的归档文件（按 ID 覆盖写入，重复归档是幂等的）。
+        返回每个涉及的文件的 (月份, 文件名, 最小ID, 最大ID, 记录数)，用于更新主库的归档清单。
+        """
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[month_of(row[5])].append(tuple(row))
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        manifest = []
+        for month, month_rows in sorted(by_month.items()):
+            file_name = self.file_name_of(month)
+            conn = sqlite3.connect(self.path_of(file_name))
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS battle_logs (
+                            id INTEGER PRIMARY KEY,
+                            user_id TEXT NOT NULL,
+                            target_name TEXT NOT NULL,
+                            log_data TEXT,
+                            result TEXT NOT NULL,
+                            created_at TEXT,
+                            format_version INTEGER NOT NULL DEFAULT 0
+                        )
+                    """)
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO battle_logs
+                        (id, user_id, target_name, log_data, result, created_at, format_version)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, month_rows)
+                min_id, max_id, row_count = conn.execute(
+                    "SELECT MIN(id), MAX(id), COUNT(*) FROM battle_logs").fetchone()
+            finally:
+                conn.close()
+            manifest.append((month, file_name, min_id, max_id, row_count))
+        return manifest
+
+    def fetch(self, file_name: str, log_id: int) -> Optional[tuple]:
+        """以只读方式打开归档文件读取一条记录（按 ARCHIVE_COLUMNS 排列），文件不存在时返回 None"""
+        path = self.path_of(file_name)
+        if not os.path.exists(path):
+            return None
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return conn.execute("""
+                SELECT id, user_id, target_name, log_data, result, created_at, format_version
+                FROM battle_logs WHERE id = ?
+            """, (log_id,)).fetchone()
+        finally:
+            conn.close()
@@ -0,0 +1,38 @@
+"""
+战斗日志的存储编码
+
+battle_logs.log_data 的内容由 battle_logs.format_version 决定：
+
+    0  JSON 文本（迁移 024 之前写入的旧记录）
+    1  紧凑 JSON 经 zlib 压缩后的 BLOB
+
+读取时按版本解码，因此新旧记录可以共存，旧记录由后台维护任务分批转换。
+"""
+import json
+import zlib
+from typing import Any, Tuple, Union
+
+LOG_FORMAT_JSON = 0
+LOG_FORMAT_ZLIB = 1
+
+# zlib 压缩等级：6 为默认值，再提高压缩率收益很小而耗时明显增加
+COMPRESS_LEVEL = 6
+
+
+def encode_log(log_data: Any, compress: bool = True) -> Tuple[Union[str, bytes], int]:
+    """编码战斗日志，返回 (写入 log_data 列的内容, format_version)"""
+    if not compress:
+        return json.dumps(log_data, ensure_ascii=False), LOG_FORMAT_JSON
+    text = json.dumps(log_data, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL), LOG_FORMAT_ZLIB
+
+
+def decode_log(payload: Union[str, bytes, None], format_version: int) -> Any:
+    """按 format_version 解码 log_data 列的内容"""
+    if payload is None:
+        return None
+    if format_version == LOG_FORMAT_ZLIB:
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+    if format_version == LOG_FORMAT_JSON:
+        return json.loads(payload)
+    raise ValueError(f"未知的战斗日志格式版本: {format_version}")
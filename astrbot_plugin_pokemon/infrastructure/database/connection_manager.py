@@ -0,0 +1,239 @@
+"""
+SQLite 连接管理器
+
+所有 Sqlite*Repository 共用同一个管理器：每个线程按连接配置（类型解析、外键约束）复用一个连接，
+连接建立时统一设置 WAL、synchronous、cache_size、mmap_size、temp_store 与 busy_timeout，
+注册 blob_or() 函数（按位或合并两个小端位图，用于图鉴位图的原子合并写入），
+并启用 sqlite3 的预编译语句缓存（cached_statements），同时统计连接与语句执行指标。
+
+unit_of_work() 提供工作单元：作用域内当前线程的所有仓储共用同一个事务连接，
+仓储自身的 commit / `with conn:` 只登记变更而不提交，作用域结束时统一提交一次
+（任一写入出错则整体回滚）。
+
+SQLite 同一时刻只允许一个写连接，工作单元无法按配置各开一个事务连接，只能共用一个。
+事务连接使用用户数据仓储的配置（类型解析 + 外键约束），战斗中写入的仓储几乎都是这一配置；
+其余按默认配置取连接的仓储中，静态数据仓储在目录加载后不执行 SQL，
+战斗仓储读写的 battle_logs / win_rate_cache 没有外键，读取的列也没有 TIMESTAMP/DATE 声明类型，
+因此在工作单元内外的行为一致（见 test_unit_of_work）。新增在战斗中执行 SQL 的默认配置仓储时需重新确认。
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from astrbot.api import logger
+
+# 仓储常用的类型解析方式（TIMESTAMP 列解析为 datetime）
+TYPED = sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+# 工作单元事务连接的配置 (detect_types, foreign_keys)，与用户数据仓储一致
+UNIT_OF_WORK_CONNECTION = (TYPED, True)
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "journal_mode": "WAL",        # 读写互不阻塞
+    "synchronous": "NORMAL",      # WAL 模式下 NORMAL 已能保证不损坏数据库
+    "cache_size_kb": 8192,        # 页缓存大小（KB）
+    "mmap_size_mb": 64,           # 内存映射读取大小（MB），0 表示关闭
+    "temp_store": "MEMORY",       # 临时表与排序使用内存
+    "busy_timeout_ms": 5000,      # 遇到写锁时的等待时间
+    "statement_cache_size": 256,  # 每个连接缓存的预编译语句数
+}
+
+# 字符串类 PRAGMA 的合法取值（会被拼接进 SQL）
+ALLOWED_VALUES: Dict[str, tuple] = {
+    "journal_mode": ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+
+def blob_or(a: Optional[bytes], b: Optional[bytes]) -> bytes:
+    """SQL 函数 blob_or(a, b)：两个小端位图（SpeciesBitset.to_blob 的格式）按位或"""
+    bits = int.from_bytes(a or b"", "little") | int.from_bytes(b or b"", "little")
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+class UnitOfWork:
+    """一次工作单元的事务连接：屏蔽仓储的单独提交，记录写入是否出错"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self.rollback_only = False
+        # 本工作单元回滚时执行的撤销动作（由 on_rollback() 登记）
+        self.rollback_actions: List[Callable[[], None]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __enter__(self) -> 'UnitOfWork':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # 仓储内的写入出错：即使上层服务吞掉了异常，整个工作单元也会回滚
+        if exc_type is not None:
+            self.rollback_only = True
+        return False
+
+    def commit(self):
+        """由工作单元统一提交"""
+
+    def rollback(self):
+        self.rollback_only = True
+
+
+class SqliteConnectionManager:
+    """按线程复用 SQLite 连接，并统一应用 PRAGMA 配置"""
+
+    def __init__(self, db_path: str, **settings):
+        self.db_path = db_path
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update({k: v for k, v in settings.items() if k in DEFAULT_SETTINGS and v is not None})
+        for key, allowed in ALLOWED_VALUES.items():
+            value = str(self.settings[key]).upper()
+            if value not in allowed:
+                logger.warning(f"数据库配置 {key}={self.settings[key]} 无效，使用默认值 {DEFAULT_SETTINGS[key]}")
+                value = DEFAULT_SETTINGS[key]
+            self.settings[key] = value
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.connections_opened = 0
+        self.connection_requests = 0
+        self.statements_executed = 0
+        self.units_committed = 0
+        self.units_rolled_back = 0
+        # 工作单元回滚后的回调（内存缓存借此丢弃可能读到的未提交数据）
+        self._rollback_listeners: List[Callable[[], None]] = []
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Optional[Dict[str, Any]] = None) -> 'SqliteConnectionManager':
+        """从 config["database"] 创建"""
+        return cls(db_path, **((config or {}).get("database", {})))
+
+    def get_connection(self, detect_types: int = 0, foreign_keys: bool = False) -> sqlite3.Connection:
+        """获取当前线程对应配置的连接（不存在时创建）；处于工作单元中时返回其事务连接"""
+        self.connection_requests += 1
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            return uow
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+        key = (detect_types, foreign_keys)
+        conn = pool.get(key)
+        if conn is None:
+            conn = pool[key] = self._open(detect_types, foreign_keys)
+        return conn
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[UnitOfWork]:
+        """
+        工作单元：作用域内的所有写入在同一个事务中提交（一次 fsync），出错时整体回滚。
+        嵌套调用会加入外层工作单元。作用域内所有仓储共用 UNIT_OF_WORK_CONNECTION 配置的连接。
+        回滚后先执行本工作单元中 on_rollback() 登记的撤销动作，再依次调用 add_rollback_listener() 注册的回调。
+        """
+        outer = getattr(self._local, "uow", None)
+        if outer is not None:
+            yield outer
+            return
+
+        conn = self.get_connection(*UNIT_OF_WORK_CONNECTION)
+        if conn.in_transaction:
+            conn.commit()
+        uow = self._local.uow = UnitOfWork(conn)
+        try:
+            yield uow
+        except BaseException:
+            uow.rollback_only = True
+            raise
+        finally:
+            self._local.uow = None
+            if uow.rollback_only:
+                conn.rollback()
+                self.units_rolled_back += 1
+                logger.warning("工作单元中有写入失败，本次变更已整体回滚")
+                for listener in uow.rollback_actions + self._rollback_listeners:
+                    try:
+                        listener()
+                    except Exception as e:   # 某个缓存清理失败不影响其余缓存
+                        logger.error(f"工作单元回滚回调失败: {e}")
+            else:
+                conn.commit()
+                self.units_committed += 1
+
+    def _open(self, detect_types: int, foreign_keys: bool) -> sqlite3.Connection:
+        s = self.settings
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=detect_types,
+            timeout=s["busy_timeout_ms"] / 1000,
+            cached_statements=s["statement_cache_size"],
+            check_same_thread=False,  # 仍只在创建线程中使用，仅为了 close_all 能统一关闭
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode = {s['journal_mode']};")
+        conn.execute(f"PRAGMA synchronous = {s['synchronous']};")
+        conn.execute(f"PRAGMA cache_size = {-int(s['cache_size_kb'])};")
+        conn.execute(f"PRAGMA mmap_size = {int(s['mmap_size_mb']) * 1024 * 1024};")
+        conn.execute(f"PRAGMA temp_store = {s['temp_store']};")
+        conn.execute(f"PRAGMA busy_timeout = {int(s['busy_timeout_ms'])};")
+        if foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON;")
+        conn.create_function("blob_or", 2, blob_or, deterministic=True)
+        conn.set_trace_callback(self._count_statement)
+        with self._lock:
+            self._connections.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    def _count_statement(self, _sql: str):
+        self.statements_executed += 1
+
+    def add_rollback_listener(self, listener: Callable[[], None]) -> None:
+        """注册工作单元回滚后的回调（每次回滚都会调用）"""
+        self._rollback_listeners.append(listener)
+
+    def on_rollback(self, action: Callable[[], None]) -> None:
+        """登记当前线程工作单元回滚时的撤销动作（只撤销本工作单元涉及的内存状态）；不在工作单元中时忽略"""
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            uow.rollback_actions.append(action)
+
+    def metrics(self) -> Dict[str, Any]:
+        """连接与语句执行指标"""
+        with self._lock:
+            open_connections = len(self._connections)
+        return {
+            "open_connections": open_connections,
+            "connections_opened": self.connections_opened,
+            "connection_requests": self.connection_requests,
+            "connection_reuse_rate": round(
+                (1 - self.connections_opened / self.connection_requests) * 100, 1
+            ) if self.connection_requests else 0.0,
+            "statements_executed": self.statements_executed,
+            "units_committed": self.units_committed,
+            "units_rolled_back": self.units_rolled_back,
+        }
+
+    def health_check(self) -> Dict[str, Any]:
+        """在当前线程的连接上执行探测查询，返回可用性、延迟与生效的 PRAGMA"""
+        start = time.perf_counter()
+        try:
+            conn = self.get_connection()
+            conn.execute("SELECT 1").fetchone()
+            pragmas = {name: conn.execute(f"PRAGMA {name};").fetchone()[0]
+                       for name in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")}
+            return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 3), "pragmas": pragmas}
+        except sqlite3.Error as e:
+            return {"ok": False, "error": str(e)}
+
+    def close_all(self):
+        """关闭所有线程创建的连接（插件卸载时调用）"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,290 @@
+"""
+流式 CSV 导入
+
+用标准库 csv 逐行读取 assets/data/v3 下的 CSV，按每张表的声明（CsvTable / CsvColumn）完成列映射、
+类型转换与空值处理，再按 chunk_size 分批 executemany 写入，整张表在一个事务中完成。
+不再需要 pandas：内存占用与 CSV 大小无关，只与批大小有关。
+
+空单元格写入列的 default（默认 NULL）；required 列为空或任意列无法转换时跳过该行并计数。
+"""
+import csv
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from astrbot.api import logger
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def INT(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def REAL(value: str) -> float:
+    return float(value)
+
+
+def TEXT(value: str) -> str:
+    return value
+
+
+@dataclass(frozen=True)
+class CsvColumn:
+    """数据库列与 CSV 列的映射"""
+    name: str
+    kind: Callable[[str], Any] = INT
+    # CSV 列名；为元组时取第一个存在的列，缺省与 name 相同
+    source: Union[str, Tuple[str, ...], None] = None
+    default: Any = None
+    required: bool = False
+
+    def sources(self) -> Tuple[str, ...]:
+        if self.source is None:
+            return (self.name,)
+        return (self.source,) if isinstance(self.source, str) else self.source
+
+
+@dataclass(frozen=True)
+class CsvTable:
+    """一张静态数据表的导入声明"""
+    csv_name: str
+    table: str
+    columns: Tuple[CsvColumn, ...]
+    conflict: str = "OR IGNORE"
+    # CSV 应已按这些列（整数）排序，以保证自增 ID 与排序后的导入顺序一致；不满足时先排序再导入
+    order_by: Tuple[str, ...] = ()
+
+    def insert_sql(self) -> str:
+        names = ", ".join(c.name for c in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        verb = f"INSERT {self.conflict}" if self.conflict else "INSERT"
+        return f"{verb} INTO {self.table} ({names}) VALUES ({placeholders})"
+
+    def signature(self) -> str:
+        """导入规则的摘要：规则变化时与 CSV 内容变化一样需要重新导入"""
+        rules = [self.table, self.conflict, list(self.order_by)] + [
+            [c.name, c.kind.__name__, list(c.sources()), c.default, c.required] for c in self.columns]
+        return hashlib.sha256(json.dumps(rules, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _cols(*names: str, kind: Callable[[str], Any] = INT, default: Any = None,
+          required: bool = False) -> Tuple[CsvColumn, ...]:
+    """批量声明同类型、同空值规则的列"""
+    return tuple(CsvColumn(name, kind, default=default, required=required) for name in names)
+
+
+# 按依赖顺序排列的全部静态数据表
+CSV_TABLES: Tuple[CsvTable, ...] = (
+    CsvTable("pokemon_species.csv", "pokemon_species", (
+        CsvColumn("id", required=True),
+        CsvColumn("name_en", TEXT), CsvColumn("name_zh", TEXT),
+        *_cols("generation_id", "base_hp", "base_attack", "base_defense", "base_sp_attack", "base_sp_defense",
+               "base_speed"),
+        CsvColumn("height", REAL), CsvColumn("weight", REAL),
+        *_cols("base_experience", "gender_rate", "capture_rate", "growth_rate_id"),
+        CsvColumn("description", TEXT),
+        CsvColumn("orders", source=("order", "id")),
+        CsvColumn("effort", TEXT, default="[]"),
+    )),
+    # 属性与进化记录的 ID 由数据库自增生成（与已有数据库保持一致），不使用 CSV 中的 id
+    CsvTable("pokemon_types.csv", "pokemon_types", (CsvColumn("name_en", TEXT), CsvColumn("name_zh", TEXT))),
+    CsvTable("pokemon_species_types.csv", "pokemon_species_types", (
+        CsvColumn("species_id", source="pokemon_id", default=0), CsvColumn("type_id", default=0),
+    )),
+    CsvTable("pokemon_evolution.csv", "pokemon_evolutions", (
+        *_cols("pre_species_id", "evolved_species_id", "evolution_trigger_id", "trigger_item_id", "minimum_level",
+               "gender_id", "held_item_id"),
+        CsvColumn("time_of_day", TEXT),
+        *_cols("known_move_id", "minimum_happiness", "minimum_beauty", "minimum_affection",
+               "relative_physical_stats", "party_species_id", "trade_species_id", "needs_overworld_rain"),
+    )),
+    CsvTable("items.csv", "items", (
+        CsvColumn("id", required=True), CsvColumn("name_en", TEXT, required=True), CsvColumn("name_zh", TEXT),
+        CsvColumn("category_id", required=True), CsvColumn("cost", required=True),
+        CsvColumn("description", TEXT, default=""),
+    )),
+    CsvTable("locations.csv", "locations", (
+        CsvColumn("id", required=True), CsvColumn("name", TEXT, required=True),
+        CsvColumn("description", TEXT, default=""),
+        CsvColumn("min_level", default=1), CsvColumn("max_level", default=100),
+    )),
+    CsvTable("gyms.csv", "gyms", (
+        *_cols("id", "location_id", required=True),
+        CsvColumn("name", TEXT, required=True), CsvColumn("description", TEXT, default=""),
+        CsvColumn("elite_trainer_ids", TEXT, default=""),
+        *_cols("boss_trainer_id", "required_level", "unlock_location_id", required=True),
+        CsvColumn("reward_item_id"),
+    ), conflict="OR REPLACE"),
+    CsvTable("location_pokemon.csv", "location_pokemon", (
+        *_cols("id", "location_id", "pokemon_species_id", required=True),
+        CsvColumn("encounter_rate", REAL, default=10.0),
+        CsvColumn("min_level", default=1), CsvColumn("max_level", default=10),
+    )),
+    CsvTable("moves.csv", "moves", (
+        CsvColumn("id", default=0), CsvColumn("name_en", TEXT, default=""), CsvColumn("name_zh", TEXT),
+        *_cols("generation_id", "type_id", default=0),
+        *_cols("power", "pp", "accuracy"),
+        *_cols("priority", "target_id", "damage_class_id", default=0),
+        *_cols("effect_id", "effect_chance"),
+        CsvColumn("description", TEXT, default=""),
+    )),
+    CsvTable("pokemon_moves.csv", "pokemon_moves", (
+        CsvColumn("pokemon_species_id", source="pokemon_id", default=0),
+        CsvColumn("move_id", default=0),
+        CsvColumn("move_method_id", source="pokemon_move_method_id", default=0),
+        CsvColumn("level", default=0),
+    ), order_by=("pokemon_id", "pokemon_move_method_id")),
+    CsvTable("shops.csv", "shops", (
+        CsvColumn("id", required=True), CsvColumn("name", TEXT, required=True),
+        CsvColumn("description", TEXT, default=""), CsvColumn("shop_type", TEXT, required=True),
+        CsvColumn("is_active", required=True),
+    )),
+    CsvTable("shop_items.csv", "shop_items",
+             _cols("id", "shop_id", "item_id", "price", "stock", "is_active", required=True)),
+    CsvTable("natures.csv", "natures", (
+        CsvColumn("id", default=0), CsvColumn("name_en", TEXT, default=""), CsvColumn("name_zh", TEXT, default=""),
+        *_cols("decreased_stat_id", "increased_stat_id", "hates_flavor_id", "likes_flavor_id", "game_index",
+               default=0),
+    )),
+    CsvTable("nature_stats.csv", "nature_stats",
+             _cols("nature_id", "pokeathlon_stat_id", "max_change", default=0)),
+    CsvTable("trainers.csv", "trainers", (
+        CsvColumn("id", required=True), CsvColumn("name", TEXT, required=True),
+        CsvColumn("trainer_class", TEXT, required=True), CsvColumn("base_payout", required=True),
+        CsvColumn("description", TEXT),
+    )),
+    CsvTable("trainer_pokemon.csv", "trainer_pokemon",
+             _cols("id", "trainer_id", "pokemon_species_id", "level", "position", required=True)),
+    CsvTable("location_trainers.csv", "location_trainers", (
+        *_cols("id", "trainer_id", "location_id", required=True),
+        CsvColumn("encounter_rate", REAL, required=True),
+    )),
+    CsvTable("move_flag_map.csv", "move_flag_map", _cols("move_id", "move_flag_id", required=True)),
+    CsvTable("move_meta.csv", "move_meta", (
+        *_cols("move_id", "meta_category_id", "meta_ailment_id", required=True),
+        *_cols("min_hits", "max_hits", "min_turns", "max_turns"),
+        *_cols("drain", "healing", "crit_rate", "ailment_chance", "flinch_chance", "stat_chance", required=True),
+    )),
+    CsvTable("move_meta_stat_changes.csv", "move_meta_stat_changes",
+             _cols("move_id", "stat_id", "change", required=True)),
+    CsvTable("abilities.csv", "abilities", (
+        CsvColumn("id", required=True), CsvColumn("name_en", TEXT, default=""), CsvColumn("name_zh", TEXT, default=""),
+        *_cols("generation_id", "is_main_series", default=0),
+        CsvColumn("description", TEXT, default=""),
+    )),
+    CsvTable("pokemon_abilities.csv", "pokemon_abilities",
+             _cols("pokemon_id", "ability_id", "is_hidden", "slot", default=0)),
+    CsvTable("pokemon_items.csv", "pokemon_items",
+             _cols("pokemon_id", "version_id", "item_id", "rarity", default=0)),
+)
+
+CSV_TABLES_BY_NAME: Dict[str, CsvTable] = {spec.csv_name: spec for spec in CSV_TABLES}
+
+
+class _NotSorted(Exception):
+    pass
+
+
+class CsvImporter:
+    """按 CsvTable 声明流式导入 CSV"""
+
+    def __init__(self, db_manager, data_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._db = db_manager
+        self.data_path = data_path
+        self.chunk_size = max(1, int(chunk_size))
+        # csv_name -> {"read", "written", "skipped", "ms"}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def _open(self, spec: CsvTable):
+        return open(os.path.join(self.data_path, spec.csv_name), newline="", encoding="utf-8-sig")
+
+    def _rows(self, spec: CsvTable, stats: Dict[str, Any], presorted: bool = True) -> Iterator[tuple]:
+        """逐行产出转换后的元组（presorted=False 时先按 order_by 稳定排序）"""
+        with self._open(spec) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            index = {name: i for i, name in enumerate(header)}
+            # 每列：(CSV 下标或 None, 转换函数, 默认值, 是否必填)
+            plan = [(next((index[s] for s in c.sources() if s in index), None), c.kind, c.default, c.required)
+                    for c in spec.columns]
+            order = [index[name] for name in spec.order_by]
+            if not presorted:
+                reader = sorted(reader, key=lambda r: tuple(INT(r[i]) for i in order))
+            # 所有列都存在且本行没有空单元格时走快速路径
+            fast_plan = [(i, kind) for i, kind, _, _ in plan] if all(i is not None for i, *_ in plan) else None
+            last_key = None
+            for line, row in enumerate(reader, start=2):
+                stats["read"] += 1
+                if order and presorted:
+                    key = tuple(INT(row[i]) for i in order)
+                    if last_key is not None and key < last_key:
+                        raise _NotSorted()
+                    last_key = key
+                try:
+                    if fast_plan is not None and "" not in row:
+                        yield tuple([kind(row[i]) for i, kind in fast_plan])
+                        continue
+                    values = []
+                    for i, kind, default, required in plan:
+                        cell = row[i] if i is not None and i < len(row) else ""
+                        if cell == "":
+                            if required:
+                                raise ValueError("必填列为空")
+                            values.append(default)
+                        else:
+                            values.append(kind(cell))
+                except (ValueError, IndexError) as e:
+                    stats["skipped"] += 1
+                    if stats["skipped"] <= 5:
+                        logger.warning(f"{spec.csv_name} 第 {line} 行数据无效，已跳过: {e}")
+                    continue
+                yield tuple(values)
+
+    def iter_chunks(self, spec: CsvTable, presorted: bool = True,
+                    stats: Optional[Dict[str, Any]] = None) -> Iterator[List[tuple]]:
+        """按 chunk_size 分批产出转换后的行"""
+        stats = stats if stats is not None else {"read": 0, "skipped": 0}
+        chunk: List[tuple] = []
+        for row in self._rows(spec, stats, presorted):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def import_table(self, spec: Union[CsvTable, str]) -> int:
+        """在一个事务中导入一张表，返回写入的行数；CSV 不存在时返回 0"""
+        if isinstance(spec, str):
+            spec = CSV_TABLES_BY_NAME[spec]
+        if not os.path.exists(os.path.join(self.data_path, spec.csv_name)):
+            logger.warning(f"CSV文件不存在: {os.path.join(self.data_path, spec.csv_name)}")
+            return 0
+
+        start = time.perf_counter()
+        sql = spec.insert_sql()
+        conn = self._db.get_connection()
+        for presorted in (True, False):
+            stats = {"read": 0, "written": 0, "skipped": 0}
+            before = conn.total_changes
+            try:
+                with conn:
+                    for chunk in self.iter_chunks(spec, presorted, stats):
+                        conn.executemany(sql, chunk)
+            except _NotSorted:
+                logger.warning(f"{spec.csv_name} 未按 {spec.order_by} 排序，排序后重新导入")
+                continue
+            stats["written"] = conn.total_changes - before
+            break
+        stats["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.stats[spec.csv_name] = stats
+        return stats["written"]
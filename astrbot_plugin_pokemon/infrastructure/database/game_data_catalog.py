@@ -0,0 +1,303 @@
+"""
+静态游戏数据目录
+
+种族、属性、招式（含元数据与能力变化）、特性、道具、性格、进化、可学招式与冒险区域
+在运行期间不会变化。GameDataCatalog 在初始数据写入完成后从 SQLite 一次性加载，
+建立按ID/名称的索引并冻结（MappingProxyType 与 tuple），之后的查询不再执行任何 SQL。
+
+查询方法返回与对应 Sqlite*Repository 完全相同的结构，并且每次返回新的 dict/list/模型对象，
+调用方修改返回值不会影响目录本身。
+"""
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ...core.models.adventure_models import LocationPokemon, LocationTemplate
+from ...core.models.pokemon_models import PokemonBaseStats, PokemonEvolutionInfo, PokemonSpecies
+
+Row = Mapping[str, Any]
+
+# 招式查询结果中对空值的默认处理（与 SqliteMoveRepository 一致）
+MOVE_DEFAULTS = {"power": 0, "pp": 1, "accuracy": 100, "priority": 0}
+MOVE_META_FIELDS = ("meta_category_id", "meta_ailment_id", "min_hits", "max_hits", "min_turns", "max_turns",
+                    "drain", "healing", "crit_rate", "ailment_chance", "flinch_chance", "stat_chance")
+
+
+def _freeze(row) -> Row:
+    return MappingProxyType(dict(row))
+
+
+def _group(rows, key: str) -> Mapping[Any, Tuple[Row, ...]]:
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row[key]].append(row)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+def _first_by_names(rows, *fields) -> Mapping[str, Row]:
+    """名称 -> 第一条匹配的记录（与 SQL 中 fetchone 的顺序一致）"""
+    index: Dict[str, Row] = {}
+    for row in rows:
+        for field in fields:
+            name = row[field]
+            if name is not None and name not in index:
+                index[name] = row
+    return MappingProxyType(index)
+
+
+class GameDataCatalog:
+    """只读的静态数据目录：加载后不可修改，可在多个线程间共享"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        start = time.perf_counter()
+        fetch = lambda sql: [_freeze(row) for row in conn.execute(sql).fetchall()]
+
+        # --- 种族与属性 ---
+        species = fetch("SELECT * FROM pokemon_species ORDER BY id")
+        self.species: Mapping[int, Row] = MappingProxyType({row["id"]: row for row in species})
+        self.active_species: Tuple[Row, ...] = tuple(row for row in species if row["isdel"] == 0)
+        self._species_by_name = _first_by_names(self.active_species, "name_zh", "name_en")
+        species_types = conn.execute("""
+            SELECT st.species_id, t.name_zh FROM pokemon_types t
+            JOIN pokemon_species_types st ON t.id = st.type_id
+            ORDER BY st.species_id, st.id
+        """).fetchall()
+        types_by_species = defaultdict(list)
+        for species_id, name in species_types:
+            types_by_species[species_id].append(name)
+        self.species_types: Mapping[int, Tuple[str, ...]] = MappingProxyType(
+            {k: tuple(v) for k, v in types_by_species.items()})
+        self.evolutions = _group(fetch("SELECT * FROM pokemon_evolutions WHERE isdel = 0 ORDER BY id"),
+                                 "pre_species_id")
+
+        # --- 招式 ---
+        type_names = {row["id"]: (row["name_zh"] or row["name_en"]).lower()
+                      for row in conn.execute("SELECT id, name_zh, name_en FROM pokemon_types").fetchall()}
+        moves = {}
+        for row in conn.execute("""
+            SELECT m.*, mm.* FROM moves m JOIN move_meta mm ON m.id = mm.move_id ORDER BY m.id
+        """).fetchall():
+            move = {
+                "id": row["id"], "name_en": row["name_en"], "name_zh": row["name_zh"],
+                "type_name": type_names.get(row["type_id"], "normal"),
+            }
+            for field, default in MOVE_DEFAULTS.items():
+                move[field] = row[field] if row[field] is not None else default
+            for field in ("target_id", "damage_class_id", "effect_id", "effect_chance", "description"):
+                move[field] = row[field]
+            for field in MOVE_META_FIELDS:
+                move[field] = row[field]
+            moves[row["id"]] = MappingProxyType(move)
+        self.moves: Mapping[int, Row] = MappingProxyType(moves)
+        self._moves_by_name_zh = _first_by_names(self.moves.values(), "name_zh")
+        self._moves_by_name_en = _first_by_names(self.moves.values(), "name_en")
+        self.move_meta: Mapping[int, Row] = MappingProxyType(
+            {row["move_id"]: row for row in fetch("SELECT * FROM move_meta")})
+        self.move_stat_changes = _group(fetch("SELECT * FROM move_meta_stat_changes ORDER BY rowid"),
+                                        "move_id")
+        # 可学招式：species_id -> ((move_id, move_method_id, level), ...)
+        learnsets = defaultdict(list)
+        for species_id, move_id, method_id, level in conn.execute(
+                "SELECT pokemon_species_id, move_id, move_method_id, level FROM pokemon_moves ORDER BY id").fetchall():
+            learnsets[species_id].append((move_id, method_id, level))
+        self.learnsets: Mapping[int, Tuple[tuple, ...]] = MappingProxyType(
+            {k: tuple(v) for k, v in learnsets.items()})
+
+        # --- 道具、性格、特性 ---
+        self.items_list: Tuple[Row, ...] = tuple(fetch("SELECT * FROM items ORDER BY id"))
+        self.items: Mapping[int, Row] = MappingProxyType({row["id"]: row for row in self.items_list})
+        self._items_by_name = _first_by_names(self.items_list, "name_zh", "name_en")
+        self.natures_list: Tuple[Row, ...] = tuple(fetch("SELECT * FROM natures WHERE isdel = 0 ORDER BY id"))
+        self.natures: Mapping[int, Row] = MappingProxyType({row["id"]: row for row in self.natures_list})
+        self.nature_stats = _group(fetch("SELECT * FROM nature_stats WHERE isdel = 0 ORDER BY id"), "nature_id")
+        self.abilities_list: Tuple[Row, ...] = tuple(fetch("SELECT * FROM abilities WHERE isdel = 0 ORDER BY id"))
+        self.abilities: Mapping[int, Row] = MappingProxyType({row["id"]: row for row in self.abilities_list})
+        self._abilities_by_name = _first_by_names(self.abilities_list, "name_zh", "name_en")
+        self.pokemon_abilities_list: Tuple[Row, ...] = tuple(
+            fetch("SELECT * FROM pokemon_abilities WHERE isdel = 0 ORDER BY pokemon_id, slot"))
+        self.pokemon_abilities = _group(self.pokemon_abilities_list, "pokemon_id")
+
+        # --- 冒险区域 ---
+        self.locations_list: Tuple[Row, ...] = tuple(fetch("SELECT * FROM locations ORDER BY id"))
+        self.locations: Mapping[int, Row] = MappingProxyType({row["id"]: row for row in self.locations_list})
+        location_pokemon = [row for row in fetch("SELECT * FROM location_pokemon ORDER BY id")
+                            if row["pokemon_species_id"] in self.species]
+        location_pokemon.sort(key=lambda row: -row["encounter_rate"])
+        self.location_pokemon = _group(location_pokemon, "location_id")
+
+        self.load_ms = (time.perf_counter() - start) * 1000
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> 'GameDataCatalog':
+        """从数据库加载（conn 需使用 sqlite3.Row 作为 row_factory）"""
+        return cls(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "species": len(self.species), "moves": len(self.moves), "learnsets": len(self.learnsets),
+            "items": len(self.items), "abilities": len(self.abilities), "natures": len(self.natures),
+            "locations": len(self.locations), "load_ms": round(self.load_ms, 1),
+        }
+
+    # --- 种族 ---
+
+    @staticmethod
+    def _to_species(row: Optional[Row]) -> Optional[PokemonSpecies]:
+        if row is None:
+            return None
+        data = dict(row)
+        for field in ("created_at", "updated_at", "isdel"):
+            data.pop(field, None)
+        base_stats = PokemonBaseStats(**{f: data.pop(f) for f in (
+            "base_hp", "base_attack", "base_defense", "base_sp_attack", "base_sp_defense", "base_speed")})
+        return PokemonSpecies(base_stats=base_stats, **data)
+
+    def get_pokemon_by_id(self, pokemon_id: int) -> Optional[PokemonSpecies]:
+        return self._to_species(self.species.get(pokemon_id))
+
+    def get_pokemon_by_name(self, name: str) -> Optional[PokemonSpecies]:
+        return self._to_species(self._species_by_name.get(name))
+
+    def get_pokemon_name_by_id(self, pokemon_id: int) -> Optional[str]:
+        row = self.species.get(pokemon_id)
+        return row["name_zh"] if row and row["isdel"] == 0 else None
+
+    def get_all_pokemon(self) -> List[PokemonSpecies]:
+        return [self._to_species(row) for row in self.active_species]
+
+    def get_pokemon_types(self, species_id: int) -> List[str]:
+        return list(self.species_types.get(species_id, ()))
+
+    def get_base_exp(self, pokemon_id: int) -> int:
+        row = self.species.get(pokemon_id)
+        return row["base_experience"] if row else 0
+
+    def get_pokemon_capture_rate(self, pokemon_id: int) -> int:
+        row = self.species.get(pokemon_id)
+        return row["capture_rate"] if row else 0
+
+    def get_pokemon_evolutions(self, species_id: int, new_level: int) -> List[PokemonEvolutionInfo]:
+        return [PokemonEvolutionInfo(**row) for row in self.evolutions.get(species_id, ())
+                if row["minimum_level"] is not None and row["minimum_level"] <= new_level]
+
+    # --- 招式 ---
+
+    def get_move_by_id(self, move_id: int) -> Optional[Dict[str, Any]]:
+        move = self.moves.get(move_id)
+        return dict(move) if move else None
+
+    def get_moves_by_ids(self, move_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        moves = self.moves
+        return {mid: dict(moves[mid]) for mid in move_ids if mid in moves}
+
+    def get_move_by_name(self, move_name: str) -> Optional[Dict[str, Any]]:
+        move = self._moves_by_name_zh.get(move_name) or self._moves_by_name_en.get(move_name)
+        return dict(move) if move else None
+
+    def get_move_meta_by_move_id(self, move_id: int) -> Optional[Dict[str, Any]]:
+        meta = self.move_meta.get(move_id)
+        return dict(meta) if meta else None
+
+    def get_move_stat_changes_by_move_id(self, move_id: int) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.move_stat_changes.get(move_id, ())]
+
+    def get_level_up_moves(self, pokemon_species_id: int, level: int) -> List[int]:
+        learned = [(lv, move_id) for move_id, method, lv in self.learnsets.get(pokemon_species_id, ())
+                   if method == 1 and lv is not None and lv <= level]
+        learned.sort(key=lambda x: -x[0])
+        return [move_id for _, move_id in learned]
+
+    def get_moves_learned_in_level_range(self, pokemon_species_id: int, min_level: int, max_level: int) -> List[int]:
+        learned = [(lv, move_id) for move_id, method, lv in self.learnsets.get(pokemon_species_id, ())
+                   if method == 1 and lv is not None and min_level < lv <= max_level]
+        learned.sort(key=lambda x: x[0])
+        seen, result = set(), []
+        for _, move_id in learned:
+            if move_id is not None and move_id not in seen:
+                seen.add(move_id)
+                result.append(move_id)
+        return result
+
+    def get_pokemon_moves_by_species_id(self, pokemon_species_id: int) -> List[Dict[str, Any]]:
+        return [{"move_id": move_id, "move_method_id": method, "level": lv}
+                for move_id, method, lv in self.learnsets.get(pokemon_species_id, ())]
+
+    # --- 道具 ---
+
+    def get_item_by_id(self, item_id: int) -> Optional[Dict[str, Any]]:
+        item = self.items.get(item_id)
+        return dict(item) if item else None
+
+    def get_item_name(self, item_id: int) -> Optional[str]:
+        item = self.items.get(item_id)
+        return item["name_zh"] if item else None
+
+    def get_all_items(self) -> List[Dict[str, Any]]:
+        return [dict(item) for item in self.items_list]
+
+    def get_random_item(self) -> Optional[Dict[str, Any]]:
+        return dict(random.choice(self.items_list)) if self.items_list else None
+
+    def get_item_by_exact_name(self, item_name: str) -> Optional[Dict[str, Any]]:
+        item = self._items_by_name.get(item_name)
+        return dict(item) if item else None
+
+    # --- 性格 ---
+
+    def get_nature_by_id(self, nature_id: int) -> Optional[Dict[str, Any]]:
+        nature = self.natures.get(nature_id)
+        return dict(nature) if nature else None
+
+    def get_all_natures(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.natures_list]
+
+    def get_nature_stats_by_nature_id(self, nature_id: int) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.nature_stats.get(nature_id, ())]
+
+    # --- 特性 ---
+
+    def get_ability_by_id(self, ability_id: int) -> Optional[Dict[str, Any]]:
+        ability = self.abilities.get(ability_id)
+        return dict(ability) if ability else None
+
+    def get_all_abilities(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.abilities_list]
+
+    def get_ability_by_exact_name(self, name: str) -> Optional[Dict[str, Any]]:
+        ability = self._abilities_by_name.get(name)
+        return dict(ability) if ability else None
+
+    def get_abilities_by_pokemon_id(self, pokemon_id: int) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.pokemon_abilities.get(pokemon_id, ())]
+
+    def get_ability_relation_by_pokemon_and_ability_id(self, pokemon_id: int, ability_id: int) -> Optional[Dict[str, Any]]:
+        for row in self.pokemon_abilities.get(pokemon_id, ()):
+            if row["ability_id"] == ability_id:
+                return dict(row)
+        return None
+
+    def get_all_pokemon_ability_relations(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.pokemon_abilities_list]
+
+    # --- 冒险区域 ---
+
+    @staticmethod
+    def _to_location(row: Row) -> LocationTemplate:
+        return LocationTemplate(id=row["id"], name=row["name"], description=row["description"],
+                                min_level=row["min_level"], max_level=row["max_level"])
+
+    def get_all_locations(self) -> List[LocationTemplate]:
+        return [self._to_location(row) for row in self.locations_list]
+
+    def get_location_by_id(self, location_id: int) -> Optional[LocationTemplate]:
+        row = self.locations.get(location_id)
+        return self._to_location(row) if row else None
+
+    def get_location_pokemon_by_location_id(self, location_id: int) -> List[LocationPokemon]:
+        return [LocationPokemon(id=row["id"], location_id=row["location_id"],
+                                pokemon_species_id=row["pokemon_species_id"], encounter_rate=row["encounter_rate"],
+                                min_level=row["min_level"], max_level=row["max_level"])
+                for row in self.location_pokemon.get(location_id, ())]
@@ -0,0 +1,18 @@
+from sqlite3 import Cursor
+
+def up(cursor: Cursor):
+    # 对局指纹 -> 胜率估计结果（可选的胜率缓存持久化）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS win_rate_cache (
+            fingerprint TEXT PRIMARY KEY,
+            win_rate REAL NOT NULL,
+            lower_bound REAL NOT NULL,
+            upper_bound REAL NOT NULL,
+            simulations INTEGER NOT NULL,
+            stop_reason TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+def down(cursor: Cursor):
+    cursor.execute("DROP TABLE IF EXISTS win_rate_cache;")
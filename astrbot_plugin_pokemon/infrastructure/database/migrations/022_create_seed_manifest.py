@@ -0,0 +1,16 @@
+from sqlite3 import Cursor
+
+def up(cursor: Cursor):
+    # 已导入的静态数据表 -> 来源 CSV 的校验值（用于种子库的增量更新）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS seed_manifest (
+            table_name TEXT PRIMARY KEY,
+            csv_name TEXT NOT NULL,
+            csv_sha256 TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+def down(cursor: Cursor):
+    cursor.execute("DROP TABLE IF EXISTS seed_manifest;")
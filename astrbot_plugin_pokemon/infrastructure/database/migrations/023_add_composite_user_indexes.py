@@ -0,0 +1,33 @@
+from sqlite3 import Cursor
+
+# 按用户查询的热点语句所需的复合索引（由 tests/test_query_plans.py 的执行计划审计得出）
+COMPOSITE_INDEXES = [
+    # 对战记录分页：WHERE user_id = ? ORDER BY created_at DESC（原为全表扫描 + 临时排序）
+    ("idx_battle_logs_user_created", "battle_logs", "user_id, created_at"),
+    # 最近遭遇 / 遭遇记录分页（含 is_battled 回写前的查询）：WHERE user_id = ? ORDER BY encounter_time DESC
+    ("idx_wild_encounter_user_time", "wild_pokemon_encounter_log", "user_id, encounter_time"),
+    # 图鉴：WHERE user_id = ? AND isdel = 0 取 species_id，覆盖索引无需回表
+    ("idx_user_pokemon_user_isdel_species", "user_pokemon", "user_id, isdel, species_id"),
+    ("idx_user_pokedex_capture_user_isdel_species", "user_pokedex_capture_history", "user_id, isdel, species_id"),
+]
+
+# 已被上面复合索引的前缀覆盖的单列索引，删除以减少写入开销
+REDUNDANT_INDEXES = [
+    ("idx_user_pokemon_user_id", "user_pokemon", "user_id"),
+    ("idx_wild_pokemon_encounter_user_id", "wild_pokemon_encounter_log", "user_id"),
+    ("idx_user_pokedex_capture_user_id", "user_pokedex_capture_history", "user_id"),
+]
+
+
+def up(cursor: Cursor):
+    for name, table, columns in COMPOSITE_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+    for name, _, _ in REDUNDANT_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def down(cursor: Cursor):
+    for name, table, columns in REDUNDANT_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+    for name, _, _ in COMPOSITE_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,24 @@
+from sqlite3 import Cursor
+
+def up(cursor: Cursor):
+    # log_data 的编码版本（见 battle_log_codec）：已有记录均为 JSON 文本
+    cursor.execute("PRAGMA table_info(battle_logs)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'format_version' not in columns:
+        cursor.execute("ALTER TABLE battle_logs ADD COLUMN format_version INTEGER NOT NULL DEFAULT 0")
+
+    # 按月归档的战斗日志文件：查看已移出主库的日志时按 ID 区间找到对应文件
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS battle_log_archives (
+            month TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+def down(cursor: Cursor):
+    cursor.execute("DROP TABLE IF EXISTS battle_log_archives;")
+    cursor.execute("ALTER TABLE battle_logs DROP COLUMN format_version")
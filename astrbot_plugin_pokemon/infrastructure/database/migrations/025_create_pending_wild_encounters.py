@@ -0,0 +1,22 @@
+from sqlite3 import Cursor
+
+def up(cursor: Cursor):
+    # 未处理的野生遭遇（遭遇缓存的写穿副本，每位玩家最多一行）：重启后恢复尚未过期的遭遇
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pending_wild_encounters (
+            user_id TEXT PRIMARY KEY,
+            wild_pokemon TEXT NOT NULL,               -- 野生宝可梦（JSON）
+            location_id INTEGER NOT NULL,
+            encounter_rate REAL,
+            encounter_time TEXT NOT NULL,
+            expires_at REAL NOT NULL,                 -- 过期时间（Unix 时间戳）
+            log_id INTEGER                            -- 已战斗过的遭遇对应的遭遇记录ID
+        );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pending_wild_encounters_expires ON pending_wild_encounters(expires_at)")
+    # 清理无引用的野生宝可梦时按 wild_pokemon_id 反查遭遇记录
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_wild_encounter_wild_pokemon_id ON wild_pokemon_encounter_log(wild_pokemon_id)")
+
+def down(cursor: Cursor):
+    cursor.execute("DROP INDEX IF EXISTS idx_wild_encounter_wild_pokemon_id")
+    cursor.execute("DROP TABLE IF EXISTS pending_wild_encounters;")
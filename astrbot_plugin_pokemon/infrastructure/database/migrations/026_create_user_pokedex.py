@@ -0,0 +1,51 @@
+from collections import defaultdict
+from sqlite3 import Cursor
+
+
+def _to_blob(species_ids) -> bytes:
+    """物种ID集合 -> 小端位图字节串（与 SpeciesBitset.to_blob 一致）"""
+    bits = 0
+    for species_id in species_ids:
+        bits |= 1 << species_id
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def up(cursor: Cursor):
+    # 每位玩家一行的图鉴位图：遇到过(seen)与捕捉过(caught)的物种，遭遇/捕捉时增量更新
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_pokedex (
+            user_id TEXT PRIMARY KEY,
+            seen BLOB NOT NULL DEFAULT x'',           -- 遇到过的物种位图（第 n 位 = 物种 n）
+            caught BLOB NOT NULL DEFAULT x'',         -- 捕捉过的物种位图
+            updated_at TEXT DEFAULT (datetime('now', '+8 hours'))
+        );
+    """)
+
+    # 回填：与原 get_user_pokedex_ids 的三路查询口径一致
+    caught = defaultdict(set)
+    seen = defaultdict(set)
+    for user_id, species_id, isdel in cursor.execute("SELECT user_id, species_id, isdel FROM user_pokemon"):
+        seen[user_id].add(species_id)
+        if not isdel:
+            caught[user_id].add(species_id)
+    for user_id, species_id, isdel in cursor.execute(
+            "SELECT user_id, species_id, isdel FROM user_pokedex_capture_history"):
+        seen[user_id].add(species_id)
+        if not isdel:
+            caught[user_id].add(species_id)
+    for user_id, species_id in cursor.execute("""
+        SELECT log.user_id, w.species_id
+        FROM wild_pokemon_encounter_log log
+                 JOIN wild_pokemon w ON log.wild_pokemon_id = w.id
+        WHERE w.isdel = 0
+    """):
+        seen[user_id].add(species_id)
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO user_pokedex (user_id, seen, caught) VALUES (?, ?, ?)",
+        [(user_id, _to_blob(species_ids), _to_blob(caught[user_id])) for user_id, species_ids in seen.items()]
+    )
+
+
+def down(cursor: Cursor):
+    cursor.execute("DROP TABLE IF EXISTS user_pokedex;")
@@ -0,0 +1,192 @@
+"""
+预编译的静态数据种子库
+
+首次启动时逐个解析 assets/data/v3 下的 CSV 并逐表写入需要数秒到数十秒。种子库是构建时
+由同一套迁移脚本 + CSV 导入逻辑生成的 SQLite 文件（只包含静态数据表），随插件一起发布：
+
+    assets/data/seed/pokemon_seed.db         种子库
+    assets/data/seed/pokemon_seed.db.sha256  种子库文件的 SHA-256 校验值
+
+种子库内的 seed_manifest 记录每张表数据来源（CSV 内容 + 导入规则）的 SHA-256 与行数，seed_info 记录格式版本。
+启动时 ATTACH 种子库，与游戏库中的 seed_manifest 比对：只有 CSV 发生变化（或表为空）的表
+才会在一个事务中整体替换，其余表保持不动；种子库缺失或校验失败时返回 None，由 CSV 导入兜底。
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.request import pathname2url
+from typing import Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+from .csv_importer import CSV_TABLES, CSV_TABLES_BY_NAME
+
+# 种子库格式版本：seed_manifest / seed_info 结构变化时递增
+SEED_FORMAT_VERSION = 1
+
+# 静态数据表及其来源 CSV（按 CsvImporter 的导入顺序）
+SEED_TABLES: Tuple[Tuple[str, str], ...] = tuple((spec.table, spec.csv_name) for spec in CSV_TABLES)
+
+_PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_CSV_DIR = os.path.join(_PLUGIN_ROOT, "assets", "data", "v3")
+DEFAULT_SEED_PATH = os.path.join(_PLUGIN_ROOT, "assets", "data", "seed", "pokemon_seed.db")
+
+# 与迁移 022 中游戏库的 seed_manifest 结构一致
+MANIFEST_SCHEMA = """
+    CREATE TABLE seed_manifest (
+        table_name TEXT PRIMARY KEY,
+        csv_name TEXT NOT NULL,
+        csv_sha256 TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_sha256(csv_dir: str, csv_name: str) -> str:
+    """CSV 内容与其导入规则（CsvTable.signature）的联合摘要：任一变化都需要重新导入该表"""
+    digest = hashlib.sha256(file_sha256(os.path.join(csv_dir, csv_name)).encode("ascii"))
+    spec = CSV_TABLES_BY_NAME.get(csv_name)
+    if spec is not None:
+        digest.update(spec.signature().encode("ascii"))
+    return digest.hexdigest()
+
+
+def checksum_path(seed_path: str) -> str:
+    return seed_path + ".sha256"
+
+
+def _readonly_uri(path: str) -> str:
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def build_seed_database(source_db: str, csv_dir: str, seed_path: str) -> Dict[str, int]:
+    """
+    从已完成迁移与 CSV 导入的数据库中导出静态数据表，生成种子库及其校验文件。
+    返回每张表写入的行数；缺少 CSV 或源表的表会被跳过。
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(seed_path)), exist_ok=True)
+    tmp_path = seed_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    counts: Dict[str, int] = {}
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (source_db,))
+        schema_version = conn.execute("SELECT MAX(version) FROM src.schema_version").fetchone()[0]
+        conn.execute("BEGIN")
+        conn.execute(MANIFEST_SCHEMA)
+        conn.execute("CREATE TABLE seed_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for table, csv_name in SEED_TABLES:
+            csv_path = os.path.join(csv_dir, csv_name)
+            row = conn.execute("SELECT sql FROM src.sqlite_master WHERE type = 'table' AND name = ?",
+                               (table,)).fetchone()
+            if row is None or not os.path.exists(csv_path):
+                continue
+            # 保留原表结构（不复制索引：种子库只用于整表复制）
+            conn.execute(row[0])
+            conn.execute(f"INSERT INTO main.{table} SELECT * FROM src.{table}")
+            counts[table] = conn.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+            conn.execute("INSERT INTO seed_manifest (table_name, csv_name, csv_sha256, row_count) VALUES (?, ?, ?, ?)",
+                         (table, csv_name, source_sha256(csv_dir, csv_name), counts[table]))
+        conn.executemany("INSERT INTO seed_info (key, value) VALUES (?, ?)", [
+            ("format_version", str(SEED_FORMAT_VERSION)),
+            ("schema_version", str(schema_version)),
+            ("built_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+        ])
+        conn.execute("COMMIT")
+        conn.execute("DETACH DATABASE src")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, seed_path)
+    with open(checksum_path(seed_path), "w", encoding="utf-8") as f:
+        f.write(f"{file_sha256(seed_path)}  {os.path.basename(seed_path)}\n")
+    return counts
+
+
+def verify_seed_database(seed_path: str) -> Optional[str]:
+    """校验种子库文件与格式版本，通过时返回 None，否则返回原因"""
+    if not os.path.exists(seed_path):
+        return "种子库不存在"
+    try:
+        with open(checksum_path(seed_path), encoding="utf-8") as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        return "缺少校验文件"
+    if file_sha256(seed_path) != expected:
+        return "校验值不匹配"
+    try:
+        conn = sqlite3.connect(_readonly_uri(seed_path), uri=True)
+        try:
+            row = conn.execute("SELECT value FROM seed_info WHERE key = 'format_version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        return f"无法读取: {e}"
+    if row is None or int(row[0]) != SEED_FORMAT_VERSION:
+        return f"格式版本不兼容: {row[0] if row else None}"
+    return None
+
+
+def apply_seed_database(db_path: str, seed_path: str = DEFAULT_SEED_PATH) -> Optional[Dict[str, int]]:
+    """
+    用种子库填充/更新游戏库中的静态数据表。
+    返回本次替换的表及行数（全部最新时为空字典）；种子库不可用时返回 None。
+    """
+    problem = verify_seed_database(seed_path)
+    if problem:
+        logger.warning(f"跳过种子库 {seed_path}: {problem}")
+        return None
+
+    copied: Dict[str, int] = {}
+    conn = sqlite3.connect(db_path, isolation_level=None, uri=True)
+    try:
+        # 整表替换期间不触发外键级联（ID 保持不变，用户数据中的引用依然有效）
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("ATTACH DATABASE ? AS seed", (_readonly_uri(seed_path),))
+        try:
+            applied = dict(conn.execute("SELECT table_name, csv_sha256 FROM main.seed_manifest").fetchall())
+            manifest = conn.execute(
+                "SELECT table_name, csv_name, csv_sha256, row_count FROM seed.seed_manifest").fetchall()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table, csv_name, sha256, row_count in manifest:
+                    live_columns = _columns(conn, "main", table)
+                    if not live_columns:
+                        logger.warning(f"游戏库中不存在表 {table}，跳过种子数据")
+                        continue
+                    is_empty = conn.execute(f"SELECT 1 FROM main.{table} LIMIT 1").fetchone() is None
+                    if applied.get(table) == sha256 and not is_empty:
+                        continue
+                    seed_columns = set(_columns(conn, "seed", table))
+                    columns = ", ".join(c for c in live_columns if c in seed_columns)
+                    conn.execute(f"DELETE FROM main.{table}")
+                    conn.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM seed.{table}")
+                    conn.execute(
+                        "INSERT OR REPLACE INTO main.seed_manifest (table_name, csv_name, csv_sha256, row_count) "
+                        "VALUES (?, ?, ?, ?)", (table, csv_name, sha256, row_count))
+                    copied[table] = row_count
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.execute("DETACH DATABASE seed")
+    finally:
+        conn.close()
+    return copied
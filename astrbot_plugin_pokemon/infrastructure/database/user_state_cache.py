@@ -0,0 +1,136 @@
+"""
+玩家热点状态缓存
+
+一次 /冒险 会经由多个服务反复读取同一位玩家的用户行、队伍、队伍中的宝可梦和道馆状态。
+这里按玩家缓存这些行（有界 LRU，每位玩家的缓存在首次加载 ttl_seconds 秒后整体过期）：
+- 缓存的是只读的 sqlite3.Row（图鉴为不可变的位图二元组），仓储命中后照常转换为领域对象，调用方修改返回值不会污染缓存
+- 仓储的每个写入方法在写入后使对应的键失效，下次读取重新加载（写入语义仍由 SQL 决定）
+- 工作单元回滚时由连接管理器回调 clear()，丢弃可能读到的未提交数据
+- 未处理的野生遭遇由 EncounterStore 保存在内存中，不在此重复缓存
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+# 每个键的含义（值为 sqlite3.Row 或 None，图鉴除外）
+USER = "user"                # users 行（含当前遭遇的训练家）
+TEAM = "team"                # user_team 行
+GYM_STATE = "gym_state"      # user_gym_state 行
+POKEMON = "pokemon"          # (POKEMON, 宝可梦ID) -> user_pokemon 行（含物种名）
+POKEDEX = "pokedex"          # 图鉴 (seen, caught) SpeciesBitset 二元组
+
+DEFAULT_MAX_USERS = 512
+DEFAULT_TTL_SECONDS = 300
+
+_MISSING = object()
+
+
+class UserStateCache:
+    """按玩家分组的有界 LRU + TTL 行缓存，max_users 为 0 时关闭"""
+
+    def __init__(self, max_users: int = DEFAULT_MAX_USERS, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_users = max(0, max_users)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # user_id -> (过期时间, {键: 行})
+        self._users: "OrderedDict[str, Tuple[float, Dict[Hashable, Any]]]" = OrderedDict()
+        # 每次失效递增：加载期间发生过写入时不缓存加载结果（避免其他线程写入后缓存旧行）
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def get_or_load(self, user_id: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """返回缓存的行；未命中时调用 loader() 查询并缓存结果（包括 None）"""
+        value, generation = self._get(user_id, key)
+        if value is _MISSING:
+            value = loader()
+            self._put(user_id, key, value, generation)
+        return value
+
+    def get_or_load_many(self, user_id: str, keys: Iterable[Hashable],
+                         loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """批量版本：只对未命中的键调用一次 loader(未命中的键列表)，loader 未返回的键按 None 缓存"""
+        result, missing, generation = self._get_many(user_id, dict.fromkeys(keys))
+        if missing:
+            loaded = loader(missing)
+            for key in missing:
+                result[key] = loaded.get(key)
+                self._put(user_id, key, result[key], generation)
+        return result
+
+    def invalidate(self, user_id: str, key: Hashable = None) -> None:
+        """写入后调用：key 为 None 时丢弃该玩家的全部缓存"""
+        with self._lock:
+            self._generation += 1
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            if key is None:
+                del self._users[user_id]
+            elif entry[1].pop(key, _MISSING) is _MISSING:
+                return
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _get(self, user_id: str, key: Hashable) -> Tuple[Any, int]:
+        found, _, generation = self._get_many(user_id, (key,))
+        return found.get(key, _MISSING), generation
+
+    def _get_many(self, user_id: str, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List[Hashable], int]:
+        """返回 (命中的键 -> 值, 未命中的键, 当前代数)"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] <= self._clock():
+                del self._users[user_id]
+                self.expirations += 1
+                entry = None
+            cached = entry[1] if entry is not None else {}
+            found = {key: cached[key] for key in keys if key in cached}
+            missing = [key for key in keys if key not in cached]
+            self.hits += len(found)
+            self.misses += len(missing)
+            if found:
+                self._users.move_to_end(user_id)
+            return found, missing, self._generation
+
+    def _put(self, user_id: str, key: Hashable, value: Any, generation: int) -> None:
+        if self.max_users == 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            entry = self._users.get(user_id)
+            if entry is None:
+                entry = self._users[user_id] = (self._clock() + self.ttl_seconds, {})
+            entry[1][key] = value
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
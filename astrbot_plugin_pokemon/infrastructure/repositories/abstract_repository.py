@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List, Dict, Any
+from datetime import datetime
 
 from ...core.models.trainer_models import TrainerEncounter, TrainerLocation, TrainerPokemon, Trainer
 from ...core.models.user_models import User, UserTeam, UserItems, UserItemInfo
@@ -76,6 +77,10 @@ class AbstractPokemonRepository(ABC):
     @abstractmethod
     def add_wild_pokemon(self, wild_pokemon_info: WildPokemonInfo) -> int: pass
 
+    # 删除一批不再被任何捕捉/战斗遭遇记录引用的野生宝可梦
+    @abstractmethod
+    def delete_orphan_wild_pokemon(self, batch_size: int) -> int: pass
+
     # 添加宝可梦模板批量
     @abstractmethod
     def add_pokemon_templates_batch(self, pokemon_data_list: List[Dict[str, Any]]) -> None: pass
@@ -313,6 +318,24 @@ class AbstractBattleRepository(ABC):
     @abstractmethod
     def get_user_battle_logs(self, user_id: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]: pass
 
+    # 日志维护：旧格式记录压缩、按保留策略移出（归档）
+    @abstractmethod
+    def compress_legacy_battle_logs(self, batch_size: int) -> int: pass
+
+    @abstractmethod
+    def prune_battle_logs(self, keep_per_user: int = 0, keep_days: int = 0, archive: bool = True,
+                          batch_size: int = 500) -> int: pass
+
+    # 胜率缓存（对局指纹 -> 胜率估计）
+    @abstractmethod
+    def get_cached_win_rate(self, fingerprint: str) -> Optional[Dict[str, Any]]: pass
+
+    @abstractmethod
+    def save_cached_win_rate(self, fingerprint: str, data: Dict[str, Any]) -> None: pass
+
+    @abstractmethod
+    def prune_win_rate_cache(self, max_rows: int, batch_size: int = 500) -> int: pass
+
 class AbstractTeamRepository(ABC):
     """队伍数据仓储接口"""
     # ==========改==========
@@ -337,7 +360,23 @@ class AbstractUserPokemonRepository(ABC):
 
     # 添加野生宝可梦遇到记录
     @abstractmethod
-    def add_user_encountered_wild_pokemon(self, user_id: str, wild_pokemon_id: int, location_id: int, encounter_rate: float) -> None: pass
+    def add_user_encountered_wild_pokemon(self, user_id: str, wild_pokemon_id: int, location_id: int, encounter_rate: float,
+                                          encounter_time: Optional[datetime] = None, is_captured: int = 0,
+                                          is_battled: int = 0, battle_result: Optional[str] = None, isdel: int = 0) -> int: pass
+
+    # 未处理的遭遇（遭遇缓存的写穿副本）
+    @abstractmethod
+    def save_pending_encounter(self, user_id: str, wild_pokemon: str, location_id: int, encounter_rate: float,
+                               encounter_time: str, expires_at: float, log_id: Optional[int] = None) -> None: pass
+
+    @abstractmethod
+    def get_pending_encounters(self, now: float) -> List[Dict[str, Any]]: pass
+
+    @abstractmethod
+    def delete_pending_encounter(self, user_id: str) -> None: pass
+
+    @abstractmethod
+    def delete_expired_pending_encounters(self, now: float) -> int: pass
 
 
     # ==========改==========
@@ -350,6 +389,10 @@ class AbstractUserPokemonRepository(ABC):
     # 更新用户宝可梦字段
     def _update_user_pokemon_fields(self, user_id: str, pokemon_id: int, **kwargs) -> None: pass
 
+    # 批量更新多只宝可梦的相同字段（每项包含 id 与相同的字段集合）
+    @abstractmethod
+    def _update_user_pokemon_fields_many(self, user_id: str, updates: List[Dict[str, Any]]) -> None: pass
+
     @abstractmethod
     def update_user_pokemon_happiness(self, user_id: str, pokemon_id: int, happiness: int) -> None: pass
 
@@ -388,6 +431,10 @@ class AbstractUserPokemonRepository(ABC):
     @abstractmethod
     def get_user_pokemon_by_id(self, user_id: str, pokemon_id: int) -> Optional[UserPokemonInfo]: pass
 
+    # 根据宝可梦ID列表批量获取用户宝可梦记录（按传入顺序，跳过不存在的ID）
+    @abstractmethod
+    def get_user_pokemon_by_ids(self, user_id: str, pokemon_ids: List[int]) -> List[UserPokemonInfo]: pass
+
     # 获取用户图鉴的宝可梦ids
     @abstractmethod
     def get_user_pokedex_ids(self, user_id: str) -> dict[str, Any]: pass
@@ -427,6 +474,10 @@ class AbstractUserPokemonRepository(ABC):
     @abstractmethod
     def record_pokedex_capture(self, user_id: str, species_id: int) -> None: pass
 
+    # 记录用户遇到的宝可梦物种到图鉴
+    @abstractmethod
+    def record_pokedex_seen(self, user_id: str, species_id: int) -> None: pass
+
 class AbstractUserItemRepository(ABC):
     """用户物品数据仓储接口"""
     # ==========增==========
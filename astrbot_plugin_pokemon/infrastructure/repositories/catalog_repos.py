@@ -0,0 +1,114 @@
+"""
+由静态数据目录支撑的仓储实现
+
+与对应的 Sqlite*Repository 接口完全一致：GameDataCatalog 加载前所有查询照常走 SQL
+（初始数据写入阶段），use_catalog() 之后静态数据查询直接读取内存中的冻结索引，不再执行 SQL；
+写入与用户数据查询仍由 SQLite 实现处理。
+"""
+from typing import Any, Dict, Optional
+
+from .sqlite_ability_repo import SqliteAbilityRepository
+from .sqlite_adventure_repo import SqliteAdventureRepository
+from .sqlite_item_repo import SqliteItemRepository
+from .sqlite_move_repo import SqliteMoveRepository
+from .sqlite_nature_repo import SqliteNatureRepository
+from .sqlite_pokemon_ability_repo import SqlitePokemonAbilityRepository
+from .sqlite_pokemon_repo import SqlitePokemonRepository
+from ..database.game_data_catalog import GameDataCatalog
+
+
+def _catalog_method(base: type, name: str, catalog_name: Optional[str] = None):
+    """生成查询方法：目录已加载时从目录读取，否则调用 SQLite 实现"""
+    fallback = getattr(base, name)
+    lookup = catalog_name or name
+
+    def method(self, *args, **kwargs):
+        if self.catalog is None:
+            return fallback(self, *args, **kwargs)
+        return getattr(self.catalog, lookup)(*args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = fallback.__doc__
+    return method
+
+
+class CatalogBackedRepository:
+    """静态数据目录的注入点"""
+    catalog: Optional[GameDataCatalog] = None
+
+    def use_catalog(self, catalog: Optional[GameDataCatalog]) -> None:
+        """切换到（新的）静态数据目录；传入 None 恢复为 SQL 查询"""
+        self.catalog = catalog
+
+
+class CatalogPokemonRepository(CatalogBackedRepository, SqlitePokemonRepository):
+    get_pokemon_by_id = _catalog_method(SqlitePokemonRepository, "get_pokemon_by_id")
+    get_pokemon_by_name = _catalog_method(SqlitePokemonRepository, "get_pokemon_by_name")
+    get_pokemon_name_by_id = _catalog_method(SqlitePokemonRepository, "get_pokemon_name_by_id")
+    get_all_pokemon = _catalog_method(SqlitePokemonRepository, "get_all_pokemon")
+    get_pokemon_types = _catalog_method(SqlitePokemonRepository, "get_pokemon_types")
+    get_pokemon_species_types = _catalog_method(SqlitePokemonRepository, "get_pokemon_species_types",
+                                                "get_pokemon_types")
+    get_base_exp = _catalog_method(SqlitePokemonRepository, "get_base_exp")
+    get_pokemon_capture_rate = _catalog_method(SqlitePokemonRepository, "get_pokemon_capture_rate")
+    get_pokemon_evolutions = _catalog_method(SqlitePokemonRepository, "get_pokemon_evolutions")
+
+
+class CatalogMoveRepository(CatalogBackedRepository, SqliteMoveRepository):
+    get_move_by_id = _catalog_method(SqliteMoveRepository, "get_move_by_id")
+    get_moves_by_ids = _catalog_method(SqliteMoveRepository, "get_moves_by_ids")
+    get_move_by_name = _catalog_method(SqliteMoveRepository, "get_move_by_name")
+    get_move_meta_by_move_id = _catalog_method(SqliteMoveRepository, "get_move_meta_by_move_id")
+    get_move_stat_changes_by_move_id = _catalog_method(SqliteMoveRepository, "get_move_stat_changes_by_move_id")
+    get_level_up_moves = _catalog_method(SqliteMoveRepository, "get_level_up_moves")
+    get_moves_learned_in_level_range = _catalog_method(SqliteMoveRepository, "get_moves_learned_in_level_range")
+    get_pokemon_moves_by_species_id = _catalog_method(SqliteMoveRepository, "get_pokemon_moves_by_species_id")
+
+
+class CatalogItemRepository(CatalogBackedRepository, SqliteItemRepository):
+    get_item_by_id = _catalog_method(SqliteItemRepository, "get_item_by_id")
+    get_item_name = _catalog_method(SqliteItemRepository, "get_item_name")
+    get_all_items = _catalog_method(SqliteItemRepository, "get_all_items")
+    get_random_item = _catalog_method(SqliteItemRepository, "get_random_item")
+
+    def get_item_by_name(self, item_name: str) -> Optional[Dict[str, Any]]:
+        """根据物品名称获取物品信息；精确匹配走目录，模糊匹配仍使用 SQL"""
+        if self.catalog is not None:
+            item = self.catalog.get_item_by_exact_name(item_name)
+            if item:
+                return item
+        return super().get_item_by_name(item_name)
+
+
+class CatalogNatureRepository(CatalogBackedRepository, SqliteNatureRepository):
+    get_nature_by_id = _catalog_method(SqliteNatureRepository, "get_nature_by_id")
+    get_all_natures = _catalog_method(SqliteNatureRepository, "get_all_natures")
+    get_nature_stats_by_nature_id = _catalog_method(SqliteNatureRepository, "get_nature_stats_by_nature_id")
+
+
+class CatalogAbilityRepository(CatalogBackedRepository, SqliteAbilityRepository):
+    get_ability_by_id = _catalog_method(SqliteAbilityRepository, "get_ability_by_id")
+    get_all_abilities = _catalog_method(SqliteAbilityRepository, "get_all_abilities")
+
+    def get_ability_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """根据名称获取特性；精确匹配走目录，模糊匹配仍使用 SQL"""
+        if self.catalog is not None:
+            ability = self.catalog.get_ability_by_exact_name(name)
+            if ability:
+                return ability
+        return super().get_ability_by_name(name)
+
+
+class CatalogPokemonAbilityRepository(CatalogBackedRepository, SqlitePokemonAbilityRepository):
+    get_abilities_by_pokemon_id = _catalog_method(SqlitePokemonAbilityRepository, "get_abilities_by_pokemon_id")
+    get_ability_relation_by_pokemon_and_ability_id = _catalog_method(
+        SqlitePokemonAbilityRepository, "get_ability_relation_by_pokemon_and_ability_id")
+    get_all_pokemon_ability_relations = _catalog_method(
+        SqlitePokemonAbilityRepository, "get_all_pokemon_ability_relations")
+
+
+class CatalogAdventureRepository(CatalogBackedRepository, SqliteAdventureRepository):
+    get_all_locations = _catalog_method(SqliteAdventureRepository, "get_all_locations")
+    get_location_by_id = _catalog_method(SqliteAdventureRepository, "get_location_by_id")
+    get_location_pokemon_by_location_id = _catalog_method(
+        SqliteAdventureRepository, "get_location_pokemon_by_location_id")
@@ -1,26 +1,21 @@
 import sqlite3
-import threading
 from typing import Optional, List, Dict, Any
 
 from .abstract_repository import AbstractAbilityRepository
+from ..database.connection_manager import SqliteConnectionManager
 from ...core.models.pokemon_models import PokemonAbility
 
 
 class SqliteAbilityRepository(AbstractAbilityRepository):
     """宝可梦特性定义模板仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        """获取一个线程安全的数据库连接。"""
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection()
 
     def add_pokemon_ability_template(self, ability_data: Dict[str, Any]) -> None:
         with self._get_connection() as conn:
@@ -1,25 +1,24 @@
 import sqlite3
-import threading
 from typing import Optional, List, Dict, Any
 from ...core.models.adventure_models import LocationPokemon, LocationTemplate, GymInfo, UserBadge, UserGymState
 from .abstract_repository import AbstractAdventureRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
+from ..database.user_state_cache import UserStateCache, GYM_STATE
 
 
 class SqliteAdventureRepository(AbstractAdventureRepository):
     """冒险区域数据仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None,
+                 state_cache: Optional[UserStateCache] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 玩家热点状态缓存（容器注入共享实例；未注入时不缓存）
+        self._state_cache = state_cache if state_cache is not None else UserStateCache(max_users=0)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     def get_all_locations(self) -> List[LocationTemplate]:
         """获取所有冒险区域"""
@@ -186,26 +185,31 @@ class SqliteAdventureRepository(AbstractAdventureRepository):
                 VALUES (?, ?, ?, ?, ?)
             """, (state.user_id, state.gym_id, state.current_stage, 1 if state.is_active else 0, int(time.time())))
             conn.commit()
+        self._state_cache.invalidate(state.user_id, GYM_STATE)
 
     def get_gym_state(self, user_id: str) -> Optional[UserGymState]:
+        row = self._state_cache.get_or_load(user_id, GYM_STATE, lambda: self._fetch_gym_state_row(user_id))
+        if row:
+            return UserGymState(
+                user_id=row["user_id"],
+                gym_id=row["gym_id"],
+                current_stage=row["current_stage"],
+                is_active=bool(row["is_active"]),
+                last_updated=row["last_updated"]
+            )
+        return None
+
+    def _fetch_gym_state_row(self, user_id: str) -> Optional[sqlite3.Row]:
         sql = "SELECT * FROM user_gym_state WHERE user_id = ?"
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_id,))
-            row = cursor.fetchone()
-            if row:
-                return UserGymState(
-                    user_id=row["user_id"],
-                    gym_id=row["gym_id"],
-                    current_stage=row["current_stage"],
-                    is_active=bool(row["is_active"]),
-                    last_updated=row["last_updated"]
-                )
-            return None
+            return cursor.fetchone()
 
     def delete_gym_state(self, user_id: str) -> None:
         sql = "DELETE FROM user_gym_state WHERE user_id = ?"
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_id,))
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+        self._state_cache.invalidate(user_id, GYM_STATE)
\ No newline at end of file
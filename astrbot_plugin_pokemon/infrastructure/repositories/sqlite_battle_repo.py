@@ -1,23 +1,58 @@
-from typing import Dict, Any, Optional, List
+import os
+from typing import Dict, Any, Optional, List, Sequence
 from .abstract_repository import AbstractBattleRepository
+from ..database.connection_manager import SqliteConnectionManager
+from ..database.battle_log_archive import BattleLogArchive
+from ..database.battle_log_codec import encode_log, decode_log, LOG_FORMAT_JSON
 
 from astrbot.api import logger
 import sqlite3
-import json
+
+# 后台维护每批处理的战斗日志条数（压缩旧记录 / 按保留策略移出）
+MAINTENANCE_BATCH_SIZE = 500
+# 持久化胜率缓存默认保留的行数（对局指纹很少重复，不裁剪时每场战斗约新增一行）
+DEFAULT_WIN_RATE_PERSIST_ROWS = 10000
+
 
 class SqliteBattleRepository(AbstractBattleRepository):
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None,
+                 compress: bool = True, archive_dir: Optional[str] = None):
         self.db_path = db_path
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 是否以 zlib 压缩格式写入新的战斗日志
+        self.compress = compress
+        # 月度归档文件默认放在数据库同级的 battle_log_archive 目录
+        self.archive = BattleLogArchive(
+            archive_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "battle_log_archive"))
+        # 旧格式记录的压缩进度（已检查过的最大ID）
+        self._legacy_cursor = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection()
+
+    @staticmethod
+    def _row_to_log(row: Sequence) -> Dict[str, Any]:
+        """(id, user_id, target_name, log_data, result, created_at, format_version) -> 日志字典"""
+        return {
+            "id": row[0],
+            "user_id": row[1],
+            "target_name": row[2],
+            "log_data": decode_log(row[3], row[6]),
+            "result": row[4],
+            "created_at": row[5]
+        }
 
     def save_battle_log(self, user_id: str, target_name: str, log_data: List[str], result: str) -> int:
         """保存战斗日志，返回日志ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            payload, format_version = encode_log(log_data, self.compress)
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    INSERT INTO battle_logs (user_id, target_name, log_data, result)
-                    VALUES (?, ?, ?, ?)
-                """, (user_id, target_name, json.dumps(log_data, ensure_ascii=False), result))
+                    INSERT INTO battle_logs (user_id, target_name, log_data, result, format_version)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (user_id, target_name, payload, result, format_version))
                 conn.commit()
                 return cursor.lastrowid
         except Exception as e:
@@ -25,25 +60,28 @@ class SqliteBattleRepository(AbstractBattleRepository):
             return -1
 
     def get_battle_log_by_id(self, log_id: int) -> Optional[Dict[str, Any]]:
-        """获取战斗日志"""
+        """获取战斗日志；主库中已移出的日志从对应月份的归档文件中读取"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT id, user_id, target_name, log_data, result, created_at
+                    SELECT id, user_id, target_name, log_data, result, created_at, format_version
                     FROM battle_logs
                     WHERE id = ?
                 """, (log_id,))
                 row = cursor.fetchone()
                 if row:
-                    return {
-                        "id": row[0],
-                        "user_id": row[1],
-                        "target_name": row[2],
-                        "log_data": json.loads(row[3]),
-                        "result": row[4],
-                        "created_at": row[5]
-                    }
+                    return self._row_to_log(row)
+
+                cursor.execute("""
+                    SELECT file_name FROM battle_log_archives
+                    WHERE min_id <= ? AND max_id >= ?
+                    ORDER BY month
+                """, (log_id, log_id))
+                for (file_name,) in cursor.fetchall():
+                    archived = self.archive.fetch(file_name, log_id)
+                    if archived:
+                        return self._row_to_log(archived)
                 return None
         except Exception as e:
             logger.error(f"获取战斗日志失败: {e}")
@@ -52,28 +90,166 @@ class SqliteBattleRepository(AbstractBattleRepository):
     def get_user_battle_logs(self, user_id: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
         """获取用户的战斗日志"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT id, user_id, target_name, log_data, result, created_at
+                    SELECT id, user_id, target_name, log_data, result, created_at, format_version
                     FROM battle_logs
                     WHERE user_id = ?
                     ORDER BY created_at DESC
                     LIMIT ? OFFSET ?
                 """, (user_id, limit, offset))
-                rows = cursor.fetchall()
-
-                battle_logs = []
-                for row in rows:
-                    battle_logs.append({
-                        "id": row[0],
-                        "user_id": row[1],
-                        "target_name": row[2],
-                        "log_data": json.loads(row[3]),
-                        "result": row[4],
-                        "created_at": row[5]
-                    })
-                return battle_logs
+                return [self._row_to_log(row) for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"获取用户战斗日志失败: {e}")
             return []
+
+    def compress_legacy_battle_logs(self, batch_size: int = MAINTENANCE_BATCH_SIZE) -> int:
+        """将一批旧的 JSON 文本日志转换为压缩格式，返回本批检查的条数（为 0 时表示已全部转换）"""
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute("""
+                    SELECT id, log_data FROM battle_logs
+                    WHERE id > ? AND format_version = 0
+                    ORDER BY id
+                    LIMIT ?
+                """, (self._legacy_cursor, batch_size)).fetchall()
+                updates = []
+                for log_id, log_data in rows:
+                    try:
+                        payload, format_version = encode_log(decode_log(log_data, LOG_FORMAT_JSON))
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"战斗日志 {log_id} 无法解析，保留原格式: {e}")
+                        continue
+                    updates.append((payload, format_version, log_id))
+                conn.executemany("UPDATE battle_logs SET log_data = ?, format_version = ? WHERE id = ?", updates)
+                conn.commit()
+                if rows:
+                    self._legacy_cursor = rows[-1][0]
+                return len(rows)
+        except Exception as e:
+            logger.error(f"压缩旧战斗日志失败: {e}")
+            return 0
+
+    def _expired_log_ids(self, conn: sqlite3.Connection, keep_per_user: int, keep_days: int,
+                         batch_size: int) -> List[int]:
+        """按保留策略找出最多约 batch_size 条需要移出的日志ID"""
+        expired = set()
+        if keep_days > 0:
+            # 日志只追加，ID 顺序即时间顺序：从最旧的记录读起，遇到未过期的记录即停止
+            cutoff = conn.execute("SELECT datetime('now', '+8 hours', ?)", (f"-{int(keep_days)} days",)).fetchone()[0]
+            for log_id, created_at in conn.execute(
+                    "SELECT id, created_at FROM battle_logs ORDER BY id LIMIT ?", (batch_size,)).fetchall():
+                if str(created_at) >= cutoff:
+                    break
+                expired.add(log_id)
+        if keep_per_user > 0 and len(expired) < batch_size:
+            users = conn.execute("""
+                SELECT user_id FROM battle_logs GROUP BY user_id HAVING COUNT(*) > ?
+            """, (keep_per_user,)).fetchall()
+            for (user_id,) in users:
+                # 每位玩家保留最新的 keep_per_user 条
+                expired.update(row[0] for row in conn.execute("""
+                    SELECT id FROM battle_logs
+                    WHERE user_id = ?
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?
+                """, (user_id, batch_size - len(expired), keep_per_user)).fetchall())
+                if len(expired) >= batch_size:
+                    break
+        return sorted(expired)
+
+    def prune_battle_logs(self, keep_per_user: int = 0, keep_days: int = 0, archive: bool = True,
+                          batch_size: int = MAINTENANCE_BATCH_SIZE) -> int:
+        """
+        按保留策略（每位玩家保留最新 keep_per_user 条 / 保留 keep_days 天内的记录，0 表示不限制）
+        移出一批战斗日志，返回本批移出的条数。archive 为 True 时先写入月度归档文件，
+        再在同一事务中更新归档清单并从主库删除，归档写入失败时主库保持不变。
+        """
+        try:
+            with self._get_connection() as conn:
+                ids = self._expired_log_ids(conn, keep_per_user, keep_days, batch_size)
+                if not ids:
+                    return 0
+                placeholders = ",".join("?" * len(ids))
+                manifest = []
+                if archive:
+                    rows = conn.execute(f"""
+                        SELECT id, user_id, target_name, log_data, result, created_at, format_version
+                        FROM battle_logs WHERE id IN ({placeholders})
+                    """, ids).fetchall()
+                    manifest = self.archive.write(rows)
+                conn.executemany("""
+                    INSERT INTO battle_log_archives (month, file_name, min_id, max_id, row_count, updated_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(month) DO UPDATE SET
+                        file_name = excluded.file_name, min_id = excluded.min_id, max_id = excluded.max_id,
+                        row_count = excluded.row_count, updated_at = CURRENT_TIMESTAMP
+                """, manifest)
+                conn.execute(f"DELETE FROM battle_logs WHERE id IN ({placeholders})", ids)
+                conn.commit()
+                return len(ids)
+        except Exception as e:
+            logger.error(f"清理战斗日志失败: {e}")
+            return 0
+
+    def prune_win_rate_cache(self, max_rows: int, batch_size: int = MAINTENANCE_BATCH_SIZE) -> int:
+        """
+        持久化的胜率缓存超过 max_rows 行时删除一批最早写入的记录（INSERT OR REPLACE 会重新分配 rowid，
+        rowid 顺序即写入顺序），返回本批删除的条数；max_rows 为 0 时不限制
+        """
+        if max_rows <= 0:
+            return 0
+        try:
+            with self._get_connection() as conn:
+                excess = conn.execute("SELECT COUNT(*) FROM win_rate_cache").fetchone()[0] - max_rows
+                if excess <= 0:
+                    return 0
+                cursor = conn.execute("""
+                    DELETE FROM win_rate_cache
+                    WHERE rowid IN (SELECT rowid FROM win_rate_cache ORDER BY rowid LIMIT ?)
+                """, (min(excess, batch_size),))
+                conn.commit()
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"清理胜率缓存失败: {e}")
+            return 0
+
+    def get_cached_win_rate(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """按对局指纹获取持久化的胜率估计"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT win_rate, lower_bound, upper_bound, simulations, stop_reason
+                    FROM win_rate_cache
+                    WHERE fingerprint = ?
+                """, (fingerprint,))
+                row = cursor.fetchone()
+                if row:
+                    return {
+                        "win_rate": row[0],
+                        "lower": row[1],
+                        "upper": row[2],
+                        "simulations": row[3],
+                        "stop_reason": row[4]
+                    }
+                return None
+        except Exception as e:
+            logger.error(f"获取胜率缓存失败: {e}")
+            return None
+
+    def save_cached_win_rate(self, fingerprint: str, data: Dict[str, Any]) -> None:
+        """保存对局指纹对应的胜率估计"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO win_rate_cache
+                    (fingerprint, win_rate, lower_bound, upper_bound, simulations, stop_reason)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (fingerprint, data["win_rate"], data["lower"], data["upper"],
+                      data["simulations"], data.get("stop_reason")))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"保存胜率缓存失败: {e}")
@@ -1,16 +1,22 @@
 from typing import Dict, Any, Optional, List
 from .abstract_repository import AbstractMoveRepository
+from ..database.connection_manager import SqliteConnectionManager
 from astrbot.api import logger
 import sqlite3
 
 class SqliteMoveRepository(AbstractMoveRepository):
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None):
         self.db_path = db_path
+        self._db = db_manager or SqliteConnectionManager(db_path)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection()
 
     def add_move_template(self, move_data: Dict[str, Any]) -> None:
         """添加技能模板"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR IGNORE INTO moves (
@@ -30,7 +36,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def add_pokemon_species_move_template(self, pokemon_moves_data: Dict[str, Any]) -> None:
         """添加宝可梦物种招式模板"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR IGNORE INTO pokemon_moves (
@@ -46,7 +52,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def add_pokemon_species_move_templates_batch(self, pokemon_moves_list: List[Dict[str, Any]]) -> None:
         """批量添加宝可梦物种招式模板"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 # 准备批量插入的数据
                 batch_records = []
@@ -74,7 +80,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
         优先等级高的招式。
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pm.move_id
@@ -96,7 +102,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
         获取宝可梦在指定等级范围内新学会的升级招式
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT DISTINCT pm.move_id
@@ -118,7 +124,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
         获取招式详细信息
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT m.id, m.name_en, m.name_zh, m.type_id, m.power, m.pp, m.accuracy,
@@ -175,7 +181,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
         获取宝可梦物种的所有招式
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pm.move_id, pm.move_method_id, pm.level
@@ -198,7 +204,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def add_move_flag_map_templates_batch(self, data_list: List[Dict[str, Any]]) -> None:
         """批量添加招式Flag映射"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 batch_records = [(d['move_id'], d['move_flag_id']) for d in data_list]
                 cursor.executemany("INSERT OR IGNORE INTO move_flag_map (move_id, move_flag_id) VALUES (?, ?)", batch_records)
@@ -209,7 +215,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def add_move_meta_templates_batch(self, data_list: List[Dict[str, Any]]) -> None:
         """批量添加招式元数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 batch_records = []
                 for d in data_list:
@@ -235,7 +241,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def add_move_stat_change_templates_batch(self, data_list: List[Dict[str, Any]]) -> None:
         """批量添加招式能力变化"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 batch_records = [(d['move_id'], d['stat_id'], d['change']) for d in data_list]
                 cursor.executemany("""
@@ -249,8 +255,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def get_move_meta_by_move_id(self, move_id: int) -> Optional[Dict[str, Any]]:
         """获取招式元数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM move_meta WHERE move_id = ?", (move_id,))
                 row = cursor.fetchone()
@@ -264,8 +269,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
     def get_move_stat_changes_by_move_id(self, move_id: int) -> List[Dict[str, Any]]:
         """获取招式能力变化数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM move_meta_stat_changes WHERE move_id = ?", (move_id,))
                 rows = cursor.fetchall()
@@ -280,7 +284,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
             return {}
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 # 使用参数化查询和 IN 语句进行批量查询
                 placeholders = ','.join('?' for _ in move_ids)
@@ -344,7 +348,7 @@ class SqliteMoveRepository(AbstractMoveRepository):
         根据招式名称获取招式详细信息
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 # 首先尝试按中文名称匹配
                 cursor.execute("""
@@ -1,10 +1,10 @@
 import sqlite3
-import threading
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 # 导入抽象基类和领域模型
 from .abstract_repository import AbstractPokemonRepository
+from ..database.connection_manager import SqliteConnectionManager
 from ...core.models.pokemon_models import PokemonSpecies, PokemonBaseStats, PokemonDetail, WildPokemonInfo, \
     WildPokemonEncounterLog, PokemonIVs, PokemonEVs, PokemonStats, PokemonMoves, PokemonEvolutionInfo
 
@@ -12,18 +12,15 @@ from ...core.models.pokemon_models import PokemonSpecies, PokemonBaseStats, Poke
 class SqlitePokemonRepository(AbstractPokemonRepository):
     """物品模板仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 清理无引用野生宝可梦的进度（已检查过的最大ID）
+        self._wild_gc_cursor = 0
 
     def _get_connection(self) -> sqlite3.Connection:
-        """获取一个线程安全的数据库连接。"""
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection()
 
     def _row_to_pokemon(self, row: sqlite3.Row) -> Optional[PokemonSpecies]:
         if not row:
@@ -363,6 +360,32 @@ class SqlitePokemonRepository(AbstractPokemonRepository):
             conn.commit()
             return new_id
 
+    def delete_orphan_wild_pokemon(self, batch_size: int = 500) -> int:
+        """
+        删除一批不再被捕捉/战斗遭遇记录引用的历史野生宝可梦（连同其逃跑/未处理的遭遇记录），
+        返回本批删除的条数（为 0 时表示已检查到最新的记录）
+        """
+        with self._get_connection() as conn:
+            ids = [row[0] for row in conn.execute("""
+                SELECT w.id FROM wild_pokemon w
+                WHERE w.id > ? AND NOT EXISTS (
+                    SELECT 1 FROM wild_pokemon_encounter_log log
+                    WHERE log.wild_pokemon_id = w.id AND (log.is_captured = 1 OR log.is_battled = 1)
+                )
+                ORDER BY w.id
+                LIMIT ?
+            """, (self._wild_gc_cursor, batch_size)).fetchall()]
+            if not ids:
+                # 新的野生宝可梦只在捕捉/战斗时写入，不会成为孤儿：下次从当前最大ID之后开始检查
+                self._wild_gc_cursor = conn.execute("SELECT MAX(id) FROM wild_pokemon").fetchone()[0] or 0
+                return 0
+            placeholders = ",".join("?" * len(ids))
+            conn.execute(f"DELETE FROM wild_pokemon_encounter_log WHERE wild_pokemon_id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM wild_pokemon WHERE id IN ({placeholders})", ids)
+            conn.commit()
+            self._wild_gc_cursor = ids[-1]
+            return len(ids)
+
     def get_pokemon_capture_rate(self, pokemon_id: int) -> int:
         """获取宝可梦的捕捉率"""
         with self._get_connection() as conn:
@@ -1,27 +1,26 @@
 import json
 import sqlite3
-import threading
 import dataclasses
+from typing import Optional
 
-from data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon.core.models.user_models import UserTeam
 from .abstract_repository import AbstractTeamRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
+from ..database.user_state_cache import UserStateCache, TEAM
 from ...core.models.user_models import UserTeam
 
 
 class SqliteTeamRepository(AbstractTeamRepository):
     """队伍数据仓储的SQLite实现"""
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None,
+                 state_cache: Optional[UserStateCache] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 玩家热点状态缓存（容器注入共享实例；未注入时不缓存）
+        self._state_cache = state_cache if state_cache is not None else UserStateCache(max_users=0)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     def get_user_team(self, user_id: str) -> UserTeam | None:
         """
@@ -31,47 +30,41 @@ class SqliteTeamRepository(AbstractTeamRepository):
         Returns:
             队伍配置的字典，如果不存在或格式错误则返回空字典
         """
-        sql = "SELECT team FROM user_team WHERE user_id = ?"
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (user_id,))
-            row = cursor.fetchone()
-            if not row:
-                return None
+        row = self._state_cache.get_or_load(user_id, TEAM, lambda: self._fetch_team_row(user_id))
+        if not row:
+            return None
+        try:
+            team_data = json.loads(row["team"])
 
-            try:
-                team_data = json.loads(row["team"])
-
-                # 判断数据格式：如果是列表格式（新的格式）[2,3,4,5]
-                if isinstance(team_data, list):
-                    return UserTeam(
-                        user_id=user_id,
-                        team_pokemon_ids=team_data
-                    )
-                # 如果是字典格式（旧的格式）{"user_id": "xxx", "team_pokemon_ids": [2, 3, 4, 5]}
-                elif isinstance(team_data, dict) and 'team_pokemon_ids' in team_data:
-                    # 更新数据库格式为新格式
-                    self.update_user_team(user_id, UserTeam(
-                        user_id=user_id,
-                        team_pokemon_ids=team_data.get('team_pokemon_ids', [])
-                    ))
-                    return UserTeam(
-                        user_id=user_id,
-                        team_pokemon_ids=team_data.get('team_pokemon_ids', [])
-                    )
-                else:
-                    return UserTeam(
-                        user_id=user_id,
-                        team_pokemon_ids=[]
-                    )
-            except (json.JSONDecodeError, TypeError) as e:
-                # 处理 JSON 格式错误或字段为空的情况
-                print(f"解析队伍配置失败：{e}")
+            # 判断数据格式：如果是列表格式（新的格式）[2,3,4,5]
+            if isinstance(team_data, list):
+                return UserTeam(
+                    user_id=user_id,
+                    team_pokemon_ids=team_data
+                )
+            # 如果是字典格式（旧的格式）{"user_id": "xxx", "team_pokemon_ids": [2, 3, 4, 5]}
+            elif isinstance(team_data, dict) and 'team_pokemon_ids' in team_data:
+                # 更新数据库格式为新格式
+                self.update_user_team(user_id, UserTeam(
+                    user_id=user_id,
+                    team_pokemon_ids=team_data.get('team_pokemon_ids', [])
+                ))
+                return UserTeam(
+                    user_id=user_id,
+                    team_pokemon_ids=team_data.get('team_pokemon_ids', [])
+                )
+            else:
                 return UserTeam(
                     user_id=user_id,
                     team_pokemon_ids=[]
                 )
+        except (json.JSONDecodeError, TypeError) as e:
+            # 处理 JSON 格式错误或字段为空的情况
+            print(f"解析队伍配置失败：{e}")
+            return UserTeam(
+                user_id=user_id,
+                team_pokemon_ids=[]
+            )
 
     def update_user_team(self, user_id: str, team_data: UserTeam) -> None:
         """
@@ -90,4 +83,12 @@ class SqliteTeamRepository(AbstractTeamRepository):
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_id, team_json))
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+        self._state_cache.invalidate(user_id, TEAM)
+
+    def _fetch_team_row(self, user_id: str) -> Optional[sqlite3.Row]:
+        sql = "SELECT team FROM user_team WHERE user_id = ?"
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, (user_id,))
+            return cursor.fetchone()
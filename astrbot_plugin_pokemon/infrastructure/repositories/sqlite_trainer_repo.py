@@ -1,26 +1,22 @@
 """训练家数据仓储的SQLite实现"""
 
 import sqlite3
-import threading
 from typing import Optional, List
 from ...core.models.trainer_models import Trainer, TrainerPokemon, TrainerEncounter, TrainerLocation, TrainerDetail
 from .abstract_repository import AbstractTrainerRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
 from ...core.models.pokemon_models import PokemonSpecies
 
 class SqliteTrainerRepository(AbstractTrainerRepository):
     """训练家数据仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        if not hasattr(self._local, "connection"):
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return self._local.connection
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     # ========= 内部辅助方法 =========
 
@@ -1,26 +1,21 @@
 import sqlite3
-import threading
 from typing import Optional
 
 from .abstract_repository import AbstractUserItemRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
 from ...core.models.user_models import UserItems, UserItemInfo
 
 
 class SqliteUserItemRepository(AbstractUserItemRepository):
     """用户物品数据仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     def add_user_item(self, user_id: str, item_id: int, quantity: int) -> None:
         """
@@ -1,28 +1,31 @@
 import sqlite3
-import threading
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Tuple
 from datetime import datetime
 
 from .sqlite_move_repo import SqliteMoveRepository
 from ...core.models.pokemon_models import PokemonIVs, PokemonEVs, PokemonStats, PokemonMoves, WildPokemonEncounterLog
 from ...core.models.pokemon_models import UserPokemonInfo
-from .abstract_repository import AbstractUserPokemonRepository
+from ...core.models.pokedex_models import SpeciesBitset
+from .abstract_repository import AbstractUserPokemonRepository, AbstractMoveRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
+from ..database.user_state_cache import UserStateCache, USER, POKEMON, POKEDEX
 
 
 class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
     """用户宝可梦数据仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None,
+                 move_repo: Optional[AbstractMoveRepository] = None, state_cache: Optional[UserStateCache] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 玩家热点状态缓存（容器注入共享实例；未注入时不缓存）
+        self._state_cache = state_cache if state_cache is not None else UserStateCache(max_users=0)
+        # 查询招式最大PP（容器注入共享的招式仓储，以便使用静态数据目录）
+        self._move_repo = move_repo or SqliteMoveRepository(db_path, self._db)
 
     def _get_connection(self) -> sqlite3.Connection:
-        if not hasattr(self._local, "connection"):
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return self._local.connection
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     # ========= 内部辅助方法 (结构优化) =========
 
@@ -136,11 +139,10 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
             moves = [pokemon.moves.move1_id, pokemon.moves.move2_id,
                      pokemon.moves.move3_id, pokemon.moves.move4_id]
 
-            temp_repo = SqliteMoveRepository(self.db_path)
             current_pps = []
             for move_id in moves:
                 if move_id:
-                    move_info = temp_repo.get_move_by_id(move_id)
+                    move_info = self._move_repo.get_move_by_id(move_id)
                     max_pp = move_info['pp'] if move_info else 0
                     current_pps.append(max_pp)
                 else:
@@ -160,19 +162,61 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
                 current_pps[3] if len(current_pps) > 3 else 0,
                 new_id
             ))
+            # 在同一事务中标记图鉴"已捕获"，不依赖调用方另行调用 record_pokedex_capture
+            self._mark_pokedex(user_id, pokemon.species_id, caught=True, conn=conn)
+        self._state_cache.invalidate(user_id, (POKEMON, new_id))
+        self._state_cache.invalidate(user_id, POKEDEX)
 
         return new_id
 
     def add_user_encountered_wild_pokemon(self, user_id: str, wild_pokemon_id: int, location_id: int,
-                                          encounter_rate: float) -> None:
-        """添加野生宝可梦遇到记录"""
+                                          encounter_rate: float, encounter_time: Optional[datetime] = None,
+                                          is_captured: int = 0, is_battled: int = 0,
+                                          battle_result: Optional[str] = None, isdel: int = 0) -> int:
+        """添加野生宝可梦遇到记录（遭遇结束时写入，可直接带上捕捉/战斗结果），返回记录ID"""
         conn = self._get_connection()
         with conn:
-            conn.execute("""
+            cursor = conn.execute("""
                          INSERT INTO wild_pokemon_encounter_log
-                             (user_id, wild_pokemon_id, location_id, encounter_time, encounter_rate)
-                         VALUES (?, ?, ?, ?, ?)
-                         """, (user_id, wild_pokemon_id, location_id, datetime.now(), encounter_rate))
+                             (user_id, wild_pokemon_id, location_id, encounter_time, encounter_rate,
+                              is_captured, is_battled, battle_result, isdel)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         """, (user_id, wild_pokemon_id, location_id, encounter_time or datetime.now(), encounter_rate,
+                               is_captured, is_battled, battle_result, isdel))
+            return cursor.lastrowid
+
+    # =========未处理的遭遇（遭遇缓存的写穿副本）=========
+    def save_pending_encounter(self, user_id: str, wild_pokemon: str, location_id: int, encounter_rate: float,
+                               encounter_time: str, expires_at: float, log_id: Optional[int] = None) -> None:
+        """保存玩家当前未处理的遭遇（每位玩家只保留一条）"""
+        conn = self._get_connection()
+        with conn:
+            conn.execute("""
+                         INSERT OR REPLACE INTO pending_wild_encounters
+                             (user_id, wild_pokemon, location_id, encounter_rate, encounter_time, expires_at, log_id)
+                         VALUES (?, ?, ?, ?, ?, ?, ?)
+                         """, (user_id, wild_pokemon, location_id, encounter_rate, encounter_time, expires_at, log_id))
+
+    def get_pending_encounters(self, now: float) -> List[Dict[str, Any]]:
+        """获取所有尚未过期的未处理遭遇"""
+        conn = self._get_connection()
+        cursor = conn.execute("""
+                              SELECT user_id, wild_pokemon, location_id, encounter_rate, encounter_time, expires_at, log_id
+                              FROM pending_wild_encounters
+                              WHERE expires_at > ?
+                              """, (now,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def delete_pending_encounter(self, user_id: str) -> None:
+        conn = self._get_connection()
+        with conn:
+            conn.execute("DELETE FROM pending_wild_encounters WHERE user_id = ?", (user_id,))
+
+    def delete_expired_pending_encounters(self, now: float) -> int:
+        """删除已过期的未处理遭遇，返回删除条数"""
+        conn = self._get_connection()
+        with conn:
+            return conn.execute("DELETE FROM pending_wild_encounters WHERE expires_at <= ?", (now,)).rowcount
 
     # =========改=========
     def update_encounter_log(self, log_id: int, is_captured: int = None,
@@ -239,6 +283,28 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
         conn = self._get_connection()
         with conn:
             conn.execute(sql, params)
+        self._state_cache.invalidate(user_id, (POKEMON, pokemon_id))
+
+    def _update_user_pokemon_fields_many(self, user_id: str, updates: List[Dict[str, Any]]) -> None:
+        """
+        批量版本：每项为 {"id": 宝可梦ID, 字段: 值, ...}，所有项的字段集合相同，用一次 executemany 写入
+        """
+        if not updates:
+            return
+
+        set_clauses = [f"{key} = :{key}" for key in updates[0] if key != "id"]
+        set_clauses.append("updated_at = datetime('now', '+8 hours')")
+        sql = f"""
+            UPDATE user_pokemon
+            SET {', '.join(set_clauses)}
+            WHERE id = :id AND user_id = :user_id
+        """
+
+        conn = self._get_connection()
+        with conn:
+            conn.executemany(sql, [{**update, "user_id": user_id} for update in updates])
+        for update in updates:
+            self._state_cache.invalidate(user_id, (POKEMON, update["id"]))
 
     def update_user_pokemon_happiness(self, user_id: str, pokemon_id: int, happiness: int) -> None:
         """更新用户宝可梦的友好度"""
@@ -275,12 +341,11 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
             moves = [pokemon_info.moves.move1_id, pokemon_info.moves.move2_id,
                      pokemon_info.moves.move3_id, pokemon_info.moves.move4_id]
 
-            # 使用一个临时实例来获取技能PP
-            temp_repo = SqliteMoveRepository(self.db_path)
+            # 获取技能的最大PP
             current_pps = []
             for move_id in moves:
                 if move_id:
-                    move_info = temp_repo.get_move_by_id(move_id)
+                    move_info = self._move_repo.get_move_by_id(move_id)
                     max_pp = move_info['pp'] if move_info else 0
                     current_pps.append(max_pp)
                 else:
@@ -340,6 +405,11 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
         return cursor.fetchone()[0]
 
     def get_user_pokemon_by_id(self, user_id: str, pokemon_id: int) -> Optional[UserPokemonInfo]:
+        row = self._state_cache.get_or_load(user_id, (POKEMON, pokemon_id),
+                                            lambda: self._fetch_user_pokemon_row(user_id, pokemon_id))
+        return self._row_to_user_pokemon(row) if row else None
+
+    def _fetch_user_pokemon_row(self, user_id: str, pokemon_id: int) -> Optional[sqlite3.Row]:
         sql = """
               SELECT up.*, ps.name_zh as species_name, ps.name_en as species_en_name
               FROM user_pokemon up
@@ -348,11 +418,94 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
                 AND up.user_id = ? \
               """
         cursor = self._get_connection().execute(sql, (pokemon_id, user_id))
-        row = cursor.fetchone()
-        return self._row_to_user_pokemon(row) if row else None
+        return cursor.fetchone()
+
+    def get_user_pokemon_by_ids(self, user_id: str, pokemon_ids: List[int]) -> List[UserPokemonInfo]:
+        """批量获取用户宝可梦：未缓存的ID合并为一次 IN 查询，结果按传入顺序返回，跳过不存在的ID"""
+        keys = [(POKEMON, int(pokemon_id)) for pokemon_id in pokemon_ids]
+        rows = self._state_cache.get_or_load_many(user_id, keys, lambda missing: {
+            (POKEMON, row["id"]): row for row in self._fetch_user_pokemon_rows(user_id, [key[1] for key in missing])
+        })
+        return [self._row_to_user_pokemon(rows[key]) for key in keys if rows[key]]
+
+    def _fetch_user_pokemon_rows(self, user_id: str, pokemon_ids: List[int]) -> List[sqlite3.Row]:
+        placeholders = ",".join("?" for _ in pokemon_ids)
+        sql = f"""
+              SELECT up.*, ps.name_zh as species_name, ps.name_en as species_en_name
+              FROM user_pokemon up
+                       JOIN pokemon_species ps ON up.species_id = ps.id
+              WHERE up.id IN ({placeholders})
+                AND up.user_id = ?
+              """
+        return self._get_connection().execute(sql, (*pokemon_ids, user_id)).fetchall()
 
     def get_user_pokedex_ids(self, user_id: str) -> dict[str, Any]:
-        """优化：使用 UNION 一次性查询"""
+        """获取用户已捕捉/遇到的物种集合（读取 user_pokedex 位图，命中缓存时不访问数据库）"""
+        seen, caught = self._load_pokedex(user_id)
+        return {"caught": caught, "seen": seen}
+
+    def _load_pokedex(self, user_id: str, conn: Optional[sqlite3.Connection] = None
+                      ) -> Tuple[SpeciesBitset, SpeciesBitset]:
+        """
+        (seen, caught) 位图，缓存在玩家状态缓存中（有界、加锁，工作单元回滚时清空）。
+        传入调用方事务中的 conn 时直接在该连接上读取，不缓存可能未提交的结果
+        """
+        if conn is not None:
+            return self._read_pokedex(user_id, conn)
+        return self._state_cache.get_or_load(user_id, POKEDEX, lambda: self._read_pokedex(user_id))
+
+    def _read_pokedex(self, user_id: str, conn: Optional[sqlite3.Connection] = None
+                      ) -> Tuple[SpeciesBitset, SpeciesBitset]:
+        in_caller_transaction = conn is not None
+        conn = conn or self._get_connection()
+        row = conn.execute("SELECT seen, caught FROM user_pokedex WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            return SpeciesBitset.from_blob(row["seen"]), SpeciesBitset.from_blob(row["caught"])
+        # 尚无位图记录（迁移后新产生的玩家数据）：从明细表推导一次并保存
+        derived = self._derive_pokedex_ids(user_id)
+        caught = SpeciesBitset.from_ids(derived["caught"])
+        seen = SpeciesBitset.from_ids(derived["seen"]) | caught
+        if seen:
+            if in_caller_transaction:   # 随调用方的事务一起提交
+                self._save_pokedex(conn, user_id, seen, caught)
+            else:
+                with conn:
+                    self._save_pokedex(conn, user_id, seen, caught)
+        return seen, caught
+
+    @staticmethod
+    def _save_pokedex(conn: sqlite3.Connection, user_id: str, seen: SpeciesBitset, caught: SpeciesBitset) -> None:
+        """与库中已有的位图按位或合并写入：并发的标记在同一条语句中合并，不会互相覆盖"""
+        conn.execute("""
+                     INSERT INTO user_pokedex (user_id, seen, caught, updated_at)
+                     VALUES (?, ?, ?, datetime('now', '+8 hours'))
+                     ON CONFLICT(user_id) DO UPDATE SET
+                         seen = blob_or(user_pokedex.seen, excluded.seen),
+                         caught = blob_or(user_pokedex.caught, excluded.caught),
+                         updated_at = excluded.updated_at
+                     """, (user_id, seen.to_blob(), caught.to_blob()))
+
+    def _mark_pokedex(self, user_id: str, species_id: int, caught: bool,
+                      conn: Optional[sqlite3.Connection] = None) -> None:
+        """
+        在图鉴位图中标记物种；已标记过时不写数据库。
+        传入 conn 时在调用方的事务中读写（不提交），由调用方在提交后使缓存失效
+        """
+        old_seen, old_caught = self._load_pokedex(user_id, conn)
+        seen = old_seen if species_id in old_seen else old_seen.with_id(species_id)
+        new_caught = old_caught.with_id(species_id) if caught and species_id not in old_caught else old_caught
+        if seen is old_seen and new_caught is old_caught:
+            return
+        if conn is not None:
+            self._save_pokedex(conn, user_id, seen, new_caught)
+            return
+        conn = self._get_connection()
+        with conn:
+            self._save_pokedex(conn, user_id, seen, new_caught)
+        self._state_cache.invalidate(user_id, POKEDEX)
+
+    def _derive_pokedex_ids(self, user_id: str) -> dict[str, Any]:
+        """从宝可梦、图鉴捕获历史与遭遇记录推导图鉴（user_pokedex 缺失时使用）"""
         conn = self._get_connection()
 
         # 1. 查询已捕捉的 IDs (包括当前拥有的和历史上捕获过的)
@@ -438,17 +591,14 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
                 SET current_trainer_encounter_id = ?
                 WHERE user_id = ?
             """, (trainer_id, user_id))
+        self._state_cache.invalidate(user_id, USER)
 
     def get_user_current_trainer_encounter(self, user_id: str) -> Optional[int]:
         """获取用户当前遭遇的训练家ID"""
-        conn = self._get_connection()
-        cursor = conn.execute("""
-            SELECT current_trainer_encounter_id
-            FROM users
-            WHERE user_id = ?
-        """, (user_id,))
-        row = cursor.fetchone()
-        return row[0] if row and row[0] is not None else None
+        # 与用户仓储共用缓存的用户行
+        row = self._state_cache.get_or_load(user_id, USER, lambda: self._get_connection().execute(
+            "SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone())
+        return row["current_trainer_encounter_id"] if row else None
 
     def get_user_favorite_pokemon(self, user_id: str) -> List[UserPokemonInfo]:
         """获取用户收藏的宝可梦列表"""
@@ -485,6 +635,7 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
                 SET current_trainer_encounter_id = NULL
                 WHERE user_id = ?
             """, (user_id,))
+        self._state_cache.invalidate(user_id, USER)
 
     def record_pokedex_capture(self, user_id: str, species_id: int) -> None:
         """记录用户捕获的宝可梦物种到图鉴历史"""
@@ -494,4 +645,9 @@ class SqliteUserPokemonRepository(AbstractUserPokemonRepository):
                 INSERT OR IGNORE INTO user_pokedex_capture_history
                     (user_id, species_id)
                 VALUES (?, ?)
-            """, (user_id, species_id))
\ No newline at end of file
+            """, (user_id, species_id))
+        self._mark_pokedex(user_id, species_id, caught=True)
+
+    def record_pokedex_seen(self, user_id: str, species_id: int) -> None:
+        """记录用户遇到的宝可梦物种到图鉴"""
+        self._mark_pokedex(user_id, species_id, caught=False)
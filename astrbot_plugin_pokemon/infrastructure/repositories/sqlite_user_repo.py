@@ -1,5 +1,4 @@
 import sqlite3
-import threading
 import dataclasses
 from typing import Optional, List
 from datetime import datetime
@@ -8,22 +7,22 @@ from ...core.models.pokemon_models import PokemonIVs, PokemonEVs, PokemonStats,
 from ...core.models.user_models import User, UserItems, UserItemInfo
 from ...core.models.pokemon_models import UserPokemonInfo
 from .abstract_repository import AbstractUserRepository
+from ..database.connection_manager import SqliteConnectionManager, TYPED
+from ..database.user_state_cache import UserStateCache, USER
 
 class SqliteUserRepository(AbstractUserRepository):
     """用户数据仓储的SQLite实现"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_manager: Optional[SqliteConnectionManager] = None,
+                 state_cache: Optional[UserStateCache] = None):
         self.db_path = db_path
-        self._local = threading.local()
+        self._db = db_manager or SqliteConnectionManager(db_path)
+        # 玩家热点状态缓存（容器注入共享实例；未注入时不缓存）
+        self._state_cache = state_cache if state_cache is not None else UserStateCache(max_users=0)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = getattr(self._local, "connection", None)
-        if conn is None:
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            self._local.connection = conn
-        return conn
+        """获取当前线程的数据库连接（由共享的连接管理器复用）"""
+        return self._db.get_connection(TYPED, foreign_keys=True)
 
     def _row_to_user(self, row: sqlite3.Row) -> Optional[User]:
         """
@@ -76,11 +75,14 @@ class SqliteUserRepository(AbstractUserRepository):
         return User(**user_data)
 
     def get_user_by_id(self, user_id: str) -> Optional[User]:
+        row = self._state_cache.get_or_load(user_id, USER, lambda: self._fetch_user_row(user_id))
+        return self._row_to_user(row)
+
+    def _fetch_user_row(self, user_id: str) -> Optional[sqlite3.Row]:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            return self._row_to_user(row)
+            return cursor.fetchone()
 
     def add_pokemon_user(self, user: User) -> None:
         # 使用与 update 相同的动态方法，确保 add 也是完整的
@@ -99,6 +101,7 @@ class SqliteUserRepository(AbstractUserRepository):
             cursor = conn.cursor()
             cursor.execute(sql, tuple(values))
             conn.commit()
+        self._state_cache.invalidate(user.user_id, USER)
 
 
     def update_init_select(self, user_id: str, pokemon_id: int) -> None:
@@ -114,6 +117,7 @@ class SqliteUserRepository(AbstractUserRepository):
             cursor = conn.cursor()
             cursor.execute(sql, (pokemon_id, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def _row_to_user_pokemon(self, row: sqlite3.Row) -> UserPokemonInfo:
         """
@@ -183,6 +187,7 @@ class SqliteUserRepository(AbstractUserRepository):
                 WHERE user_id = ?
             """, (level, exp, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def has_user_checked_in_today(self, user_id: str, today: str) -> bool:
         """
@@ -234,6 +239,7 @@ class SqliteUserRepository(AbstractUserRepository):
                 WHERE user_id = ?
             """, (coins, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def add_user_coins(self, user_id: str, coins: int) -> None:
         """
@@ -250,6 +256,7 @@ class SqliteUserRepository(AbstractUserRepository):
                 WHERE user_id = ?
             """, (coins, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def update_user_last_adventure_time(self, user_id: str, last_adventure_time: float) -> None:
         """
@@ -266,6 +273,7 @@ class SqliteUserRepository(AbstractUserRepository):
                 WHERE user_id = ?
             """, (last_adventure_time, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def update_user_max_location(self, user_id: str, max_location: int) -> None:
         """
@@ -282,6 +290,7 @@ class SqliteUserRepository(AbstractUserRepository):
                 WHERE user_id = ?
             """, (max_location, user_id))
             conn.commit()
+        self._state_cache.invalidate(user_id, USER)
 
     def get_all_users(self) -> List[User]:
         """
@@ -1,6 +1,8 @@
+import asyncio
 import os
 import time
 import random
+import weakref
 from typing import List, Optional, TYPE_CHECKING, Any
 
 from astrbot.api.event import AstrMessageEvent
@@ -29,6 +31,17 @@ class AdventureHandlers:
         self.team_service = container.team_service
         self.exp_service = container.exp_service
         self.move_service = container.move_service
+        # 异步门面：在专用数据库线程中执行同步的服务调用，不阻塞事件循环
+        self.user_service_async = container.db_executor.facade(container.user_service)
+        self.adventure_service_async = container.db_executor.facade(container.adventure_service)
+        self.user_pokemon_service_async = container.db_executor.facade(container.user_pokemon_service)
+        self.team_service_async = container.db_executor.facade(container.team_service)
+        self.trainer_service_async = container.db_executor.facade(container.trainer_service)
+        self.exp_service_async = container.db_executor.facade(container.exp_service)
+        self.move_service_async = container.db_executor.facade(container.move_service)
+        self.adventure_repo_async = container.db_executor.facade(container.adventure_service.adventure_repo)
+        # 同一用户的指令串行处理：await 期间状态检查与写入不会被同一用户的并发指令（如战斗中的捕捉/逃跑）打断
+        self._user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
 
         self.adventure_cooldown = self.plugin.game_config["adventure"]["cooldown"]
         self.tmp_dir = container.tmp_dir
@@ -42,7 +55,7 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        result = self.adventure_service.get_all_locations(user_id)
+        result = await self.adventure_service_async.get_all_locations(user_id)
         if not result.success:
             yield event.plain_result(result.message)
             return
@@ -71,89 +84,90 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        # 1. 检查状态 (是否已遭遇、冷却时间、队伍设置)
-        if self.user_pokemon_service.get_user_encountered_wild_pokemon(user_id):
-            yield event.plain_result(AnswerEnum.USER_ADVENTURE_ALREADY_ENCOUNTERED.value)
-            return
+        async with self._user_lock(user_id):
+            # 1. 检查状态 (是否已遭遇、冷却时间、队伍设置)
+            if await self.user_pokemon_service_async.get_user_encountered_wild_pokemon(user_id):
+                yield event.plain_result(AnswerEnum.USER_ADVENTURE_ALREADY_ENCOUNTERED.value)
+                return
 
-        # 检查是否有当前遭遇的训练家
-        if self.user_pokemon_service.get_user_current_trainer_encounter(user_id):
-            yield event.plain_result("您当前正在与训练家遭遇中，请先完成当前遭遇（使用 /战斗 或 /逃跑）。")
-            return
+            # 检查是否有当前遭遇的训练家
+            if await self.user_pokemon_service_async.get_user_current_trainer_encounter(user_id):
+                yield event.plain_result("您当前正在与训练家遭遇中，请先完成当前遭遇（使用 /战斗 或 /逃跑）。")
+                return
 
-        user = self.user_service.get_user_by_id(user_id)
-        if not user.success:
-            yield event.plain_result(user.message)
-            return
-        user = user.data
-        current_time = time.time()
-        last_time = user.last_adventure_time if user and user.last_adventure_time else 0
-        cooldown_remaining = (last_time + self.adventure_cooldown) - current_time
+            user = await self.user_service_async.get_user_by_id(user_id)
+            if not user.success:
+                yield event.plain_result(user.message)
+                return
+            user = user.data
+            current_time = time.time()
+            last_time = user.last_adventure_time if user and user.last_adventure_time else 0
+            cooldown_remaining = (last_time + self.adventure_cooldown) - current_time
 
-        if cooldown_remaining > 0:
-            yield event.plain_result(AnswerEnum.USER_ADVENTURE_COOLDOWN.value.format(cooldown=int(cooldown_remaining)))
-            return
+            if cooldown_remaining > 0:
+                yield event.plain_result(AnswerEnum.USER_ADVENTURE_COOLDOWN.value.format(cooldown=int(cooldown_remaining)))
+                return
 
-        if not self.team_service.get_user_team(user_id).success:
-            yield event.plain_result(AnswerEnum.USER_TEAM_NOT_SET.value)
-            return
+            if not (await self.team_service_async.get_user_team(user_id)).success:
+                yield event.plain_result(AnswerEnum.USER_TEAM_NOT_SET.value)
+                return
 
-        # 2. 解析参数
-        args = event.message_str.split()
-        if len(args) < 2:
-            yield event.plain_result(AnswerEnum.USER_ADVENTURE_LOCATION_NOT_SPECIFIED.value)
-            return
+            # 2. 解析参数
+            args = event.message_str.split()
+            if len(args) < 2:
+                yield event.plain_result(AnswerEnum.USER_ADVENTURE_LOCATION_NOT_SPECIFIED.value)
+                return
 
-        try:
-            location_id = int(args[1])
-            if location_id <= 0: raise ValueError
-        except ValueError:
-            yield event.plain_result(AnswerEnum.ADVENTURE_LOCATION_INVALID.value.format(location_id=args[1]))
-            return
+            try:
+                location_id = int(args[1])
+                if location_id <= 0: raise ValueError
+            except ValueError:
+                yield event.plain_result(AnswerEnum.ADVENTURE_LOCATION_INVALID.value.format(location_id=args[1]))
+                return
 
-        # 3. 执行冒险 - 按7:3比例遭遇野生宝可梦和训练家
-        result = self.adventure_service.adventure_in_location(user_id, location_id, encounter_npc_only=False)
-        if not result.success:
-            yield event.plain_result(result.message)
-            return
+            # 3. 执行冒险 - 按7:3比例遭遇野生宝可梦和训练家
+            result = await self.adventure_service_async.adventure_in_location(user_id, location_id, encounter_npc_only=False)
+            if not result.success:
+                yield event.plain_result(result.message)
+                return
 
-        d: AdventureResult = result.data
-
-        # 4. 成功后处理
-        self.user_service.update_user_last_adventure_time(user_id, time.time())  # 更新冷却
-
-        # 检查是否遭遇了训练家
-        if d.trainer:
-            # 遭遇了训练家
-            pokemon_names = [f"{pokemon.name}(Lv.{pokemon.level})" for pokemon in d.trainer.pokemon_list]
-            pokemon_list_str = ", ".join(pokemon_names)
-
-            message = (
-                f"🌳 在 {d.location.name} 中冒险！\n\n"
-                f"⚔️ 遇到了训练家 {d.trainer.trainer.name}！\n\n"
-                f"职业: {d.trainer.trainer.trainer_class}\n\n"
-                f"宝可梦: {pokemon_list_str}\n\n"
-                f"基础赏金: {d.trainer.trainer.base_payout}金币\n\n"
-                f"您可以选择：\n\n"
-                f"💡 /战斗 - 与训练家战斗\n\n"
-                f"🏃 /逃跑 - 逃离战斗"
-            )
-        else:
-            # 遭遇了野生宝可梦
-            if not d.is_pokemon_caught:
-                caught_status = " 🔥未捕捉！"
-                additional_info = "\n\n💡 赶快捕捉它，这可能是一次珍贵的机会！"
+            d: AdventureResult = result.data
+
+            # 4. 成功后处理
+            await self.user_service_async.update_user_last_adventure_time(user_id, time.time())  # 更新冷却
+
+            # 检查是否遭遇了训练家
+            if d.trainer:
+                # 遭遇了训练家
+                pokemon_names = [f"{pokemon.name}(Lv.{pokemon.level})" for pokemon in d.trainer.pokemon_list]
+                pokemon_list_str = ", ".join(pokemon_names)
+
+                message = (
+                    f"🌳 在 {d.location.name} 中冒险！\n\n"
+                    f"⚔️ 遇到了训练家 {d.trainer.trainer.name}！\n\n"
+                    f"职业: {d.trainer.trainer.trainer_class}\n\n"
+                    f"宝可梦: {pokemon_list_str}\n\n"
+                    f"基础赏金: {d.trainer.trainer.base_payout}金币\n\n"
+                    f"您可以选择：\n\n"
+                    f"💡 /战斗 - 与训练家战斗\n\n"
+                    f"🏃 /逃跑 - 逃离战斗"
+                )
             else:
-                caught_status = " ✅已拥有"
-                additional_info = ""
-            message = (
-                f"🌳 在 {d.location.name} 中冒险！\n\n"
-                f"✨ 遇到了野生的 {d.wild_pokemon.name}{caught_status}！\n"
-                f"等级: {d.wild_pokemon.level}\n"
-                f"{AnswerEnum.ADVENTURE_LOCATION_POKEMON_ENCOUNTERED.value}{additional_info}"
-            )
+                # 遭遇了野生宝可梦
+                if not d.is_pokemon_caught:
+                    caught_status = " 🔥未捕捉！"
+                    additional_info = "\n\n💡 赶快捕捉它，这可能是一次珍贵的机会！"
+                else:
+                    caught_status = " ✅已拥有"
+                    additional_info = ""
+                message = (
+                    f"🌳 在 {d.location.name} 中冒险！\n\n"
+                    f"✨ 遇到了野生的 {d.wild_pokemon.name}{caught_status}！\n"
+                    f"等级: {d.wild_pokemon.level}\n"
+                    f"{AnswerEnum.ADVENTURE_LOCATION_POKEMON_ENCOUNTERED.value}{additional_info}"
+                )
 
-        yield event.plain_result(message)
+            yield event.plain_result(message)
 
     async def battle(self, event: AstrMessageEvent):
         """处理战斗指令"""
@@ -164,52 +178,53 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        # 检查是否遭遇了训练家
-        trainer_id = self.user_pokemon_service.get_user_current_trainer_encounter(user_id)
-        if trainer_id:
-            # 与训练家战斗
-            # 获取完整的训练家信息
-            battle_trainer = self.adventure_service.trainer_service.get_trainer_with_pokemon(trainer_id)
-            if not battle_trainer:
-                yield event.plain_result("获取训练家信息失败")
-                return
-
-            # 获取用户队伍
-            user_team_result = self.team_service.get_user_team(user_id)
-            if not user_team_result.success or not user_team_result.data or len(user_team_result.data) == 0:
-                yield event.plain_result(AnswerEnum.USER_TEAM_NOT_SET.value)
-                return
-
-            user_team_data = user_team_result.data
-            # 获取队伍宝可梦ID列表
-            user_team_list = [pokemon.id for pokemon in user_team_data]
-            # 开始训练家战斗
-            result = self.adventure_service.start_trainer_battle(user_id, battle_trainer, user_team_list)
-            if not result.success:
-                yield event.plain_result(result.message)
-                return
-
-            # 格式化输出 (逻辑抽取到私有方法)
-            message = self._format_battle_result_message(result.data)
-            yield event.plain_result(message)
-
-            # 清除当前训练家遭遇
-            self.user_pokemon_service.clear_user_current_trainer_encounter(user_id)
-        else:
-            # 与野生宝可梦战斗
-            wild_pokemon_info = self.user_pokemon_service.get_user_encountered_wild_pokemon(user_id)
-            if not wild_pokemon_info:
-                yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
-                return
+        async with self._user_lock(user_id):
+            # 检查是否遭遇了训练家
+            trainer_id = await self.user_pokemon_service_async.get_user_current_trainer_encounter(user_id)
+            if trainer_id:
+                # 与训练家战斗
+                # 获取完整的训练家信息
+                battle_trainer = await self.trainer_service_async.get_trainer_with_pokemon(trainer_id)
+                if not battle_trainer:
+                    yield event.plain_result("获取训练家信息失败")
+                    return
+
+                # 获取用户队伍
+                user_team_result = await self.team_service_async.get_user_team(user_id)
+                if not user_team_result.success or not user_team_result.data or len(user_team_result.data) == 0:
+                    yield event.plain_result(AnswerEnum.USER_TEAM_NOT_SET.value)
+                    return
+
+                user_team_data = user_team_result.data
+                # 获取队伍宝可梦ID列表
+                user_team_list = [pokemon.id for pokemon in user_team_data]
+                # 开始训练家战斗
+                result = await self.adventure_service_async.start_trainer_battle(user_id, battle_trainer, user_team_list)
+                if not result.success:
+                    yield event.plain_result(result.message)
+                    return
+
+                # 格式化输出 (逻辑抽取到私有方法)
+                message = self._format_battle_result_message(result.data)
+                yield event.plain_result(message)
+
+                # 清除当前训练家遭遇
+                await self.user_pokemon_service_async.clear_user_current_trainer_encounter(user_id)
+            else:
+                # 与野生宝可梦战斗
+                wild_pokemon_info = await self.user_pokemon_service_async.get_user_encountered_wild_pokemon(user_id)
+                if not wild_pokemon_info:
+                    yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
+                    return
 
-            # 执行战斗逻辑
-            result = self.adventure_service.adventure_in_battle(user_id, wild_pokemon_info)
-            if not result.success:
-                yield event.plain_result(result.message)
-                return
+                # 执行战斗逻辑
+                result = await self.adventure_service_async.adventure_in_battle(user_id, wild_pokemon_info)
+                if not result.success:
+                    yield event.plain_result(result.message)
+                    return
 
-            message = self._format_battle_result_message(result.data)
-            yield event.plain_result(message)
+                message = self._format_battle_result_message(result.data)
+                yield event.plain_result(message)
 
     async def pvp_battle(self, event: AstrMessageEvent):
         """处理 /pk @群友 指令"""
@@ -237,8 +252,9 @@ class AdventureHandlers:
             
         target_user_id = userid_to_base32(target_id)
         
-        # 执行对战
-        result = self.adventure_service.start_pvp_battle(user_id, target_user_id)
+        # 执行对战（只写入发起方的战斗日志）
+        async with self._user_lock(user_id):
+            result = await self.adventure_service_async.start_pvp_battle(user_id, target_user_id)
         if not result.success:
             yield event.plain_result(result.message)
             return
@@ -265,7 +281,7 @@ class AdventureHandlers:
 
         log_id = int(args[1])
 
-        log = self.adventure_service.get_battle_log_by_id(log_id)
+        log = await self.adventure_service_async.get_battle_log_by_id(log_id)
         if not log:
             yield event.plain_result("❌ 找不到该战斗日志")
             return
@@ -289,121 +305,122 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        wild_pokemon = self.user_pokemon_service.get_user_encountered_wild_pokemon(user_id)
-        if not wild_pokemon:
-            yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
-            return
+        async with self._user_lock(user_id):
+            wild_pokemon = await self.user_pokemon_service_async.get_user_encountered_wild_pokemon(user_id)
+            if not wild_pokemon:
+                yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
+                return
 
-        # 解析道具ID
-        args = event.message_str.split()
-        item_id = int(args[1]) if len(args) > 1 and args[1].isdigit() else None
-        if len(args) > 1 and not args[1].isdigit():
-            yield event.plain_result("❌ 无效的道具ID格式。")
-            return
+            # 解析道具ID
+            args = event.message_str.split()
+            item_id = int(args[1]) if len(args) > 1 and args[1].isdigit() else None
+            if len(args) > 1 and not args[1].isdigit():
+                yield event.plain_result("❌ 无效的道具ID格式。")
+                return
 
-        # 获取用户信息以检查等级限制
-        user_result = self.user_service.check_user_registered(user_id)
-        if not user_result.success:
-            yield event.plain_result(user_result.message)
-            return
-        user = user_result.data
-
-        # 根据玩家等级限制可捕捉的宝可梦等级
-        user_level = user.level
-
-        # 根据新的规则设置最大可捕捉等级限制
-        if user_level <= 10:
-            max_catchable_level = user_level + 5  # 新手期仅能捕捉略强于自身的宝可梦，避免碾压
-        elif 11 <= user_level <= 20:
-            max_catchable_level = user_level + 8  # 逐步放宽，但仍有等级压制
-        elif 21 <= user_level <= 30:
-            max_catchable_level = user_level + 10  # 20级后解锁更多空间，匹配玩家操作/阵容成长
-        elif 31 <= user_level <= 40:
-            max_catchable_level = user_level + 12  # 高等级小幅放宽，保留挑战
-        else:  # user_level >= 41
-        # 线性增长，允许捕捉比自己高15级的，直到达到系统总上限(如100)
-            max_catchable_level = min(user_level + 15, 100)
-
-        if wild_pokemon.level > max_catchable_level:
-            yield event.plain_result(f"❌ 您的等级({user_level})不足以捕捉此宝可梦({wild_pokemon.name} Lv.{wild_pokemon.level})。\n" +
-                                   f"等级 {user_level} 的训练家最多可捕捉等级 {max_catchable_level} 的宝可梦。")
-            return
+            # 获取用户信息以检查等级限制
+            user_result = await self.user_service_async.check_user_registered(user_id)
+            if not user_result.success:
+                yield event.plain_result(user_result.message)
+                return
+            user = user_result.data
+
+            # 根据玩家等级限制可捕捉的宝可梦等级
+            user_level = user.level
+
+            # 根据新的规则设置最大可捕捉等级限制
+            if user_level <= 10:
+                max_catchable_level = user_level + 5  # 新手期仅能捕捉略强于自身的宝可梦，避免碾压
+            elif 11 <= user_level <= 20:
+                max_catchable_level = user_level + 8  # 逐步放宽，但仍有等级压制
+            elif 21 <= user_level <= 30:
+                max_catchable_level = user_level + 10  # 20级后解锁更多空间，匹配玩家操作/阵容成长
+            elif 31 <= user_level <= 40:
+                max_catchable_level = user_level + 12  # 高等级小幅放宽，保留挑战
+            else:  # user_level >= 41
+            # 线性增长，允许捕捉比自己高15级的，直到达到系统总上限(如100)
+                max_catchable_level = min(user_level + 15, 100)
+
+            if wild_pokemon.level > max_catchable_level:
+                yield event.plain_result(f"❌ 您的等级({user_level})不足以捕捉此宝可梦({wild_pokemon.name} Lv.{wild_pokemon.level})。\n" +
+                                       f"等级 {user_level} 的训练家最多可捕捉等级 {max_catchable_level} 的宝可梦。")
+                return
 
-        # 计算概率
-        rate_result = self.adventure_service.calculate_catch_success_rate(user_id, wild_pokemon, item_id)
-        if not rate_result['success']:
-            yield event.plain_result(rate_result['message'])
-            return
+            # 计算概率
+            rate_result = await self.adventure_service_async.calculate_catch_success_rate(user_id, wild_pokemon, item_id)
+            if not rate_result['success']:
+                yield event.plain_result(rate_result['message'])
+                return
 
-        data = rate_result['data']
-        success_rate = data['success_rate']
-        pokeball = data['pokeball_item']
+            data = rate_result['data']
+            success_rate = data['success_rate']
+            pokeball = data['pokeball_item']
 
-        # 消耗道具
-        self.user_service.add_user_item(user_id, pokeball.item_id, -1)
+            # 消耗道具
+            await self.user_service_async.add_user_item(user_id, pokeball.item_id, -1)
 
-        # 判定结果
-        is_success = random.random() < success_rate
-        message = f"您尝试捕捉野生的 {wild_pokemon.name} (Lv.{wild_pokemon.level})，成功率 {success_rate * 100:.2f}%。\n\n"
+            # 判定结果
+            is_success = random.random() < success_rate
+            message = f"您尝试捕捉野生的 {wild_pokemon.name} (Lv.{wild_pokemon.level})，成功率 {success_rate * 100:.2f}%。\n\n"
 
-        if is_success:
-            # 检查这是否为首次捕捉该物种的宝可梦
-            pokedex_result = self.user_pokemon_service.get_user_pokedex_ids(user_id)
-            is_first_catch = False
-            if pokedex_result.success and wild_pokemon.species_id not in pokedex_result.data.get("caught", set()):
-                is_first_catch = True
+            if is_success:
+                # 检查这是否为首次捕捉该物种的宝可梦
+                pokedex_result = await self.user_pokemon_service_async.get_user_pokedex_ids(user_id)
+                is_first_catch = False
+                if pokedex_result.success and wild_pokemon.species_id not in pokedex_result.data.get("caught", set()):
+                    is_first_catch = True
 
-            # 构造并保存宝可梦
-            new_pokemon = self.user_pokemon_service._create_and_save_caught_pokemon(user_id, wild_pokemon)
+                # 构造并保存宝可梦
+                new_pokemon = await self.user_pokemon_service_async._create_and_save_caught_pokemon(user_id, wild_pokemon)
 
-            # 获取球的ID来处理特殊逻辑
-            ball_id = int(pokeball.item_id)
+                # 获取球的ID来处理特殊逻辑
+                ball_id = int(pokeball.item_id)
 
-            # 处理特殊精灵球效果
-            if ball_id == 11:  # 治愈球 - 初始友好度+200
-                self.user_pokemon_service.update_pokemon_happiness(user_id, new_pokemon.id, 270)  # 默认70 + 200
-            elif ball_id == 14:  # 治愈球 - 完全治愈
-                self.user_pokemon_service.heal_pokemon_fully(user_id, new_pokemon.id)
+                # 处理特殊精灵球效果
+                if ball_id == 11:  # 治愈球 - 初始友好度+200
+                    await self.user_pokemon_service_async.update_pokemon_happiness(user_id, new_pokemon.id, 270)  # 默认70 + 200
+                elif ball_id == 14:  # 治愈球 - 完全治愈
+                    await self.user_pokemon_service_async.heal_pokemon_fully(user_id, new_pokemon.id)
 
-            self.user_service._update_encounter_log(user_id, wild_pokemon.id, captured=True, deleted=True)
+                await self.user_pokemon_service_async.resolve_wild_encounter(user_id, captured=True)
 
-            # 如果是首次捕捉该物种，给予额外经验值奖励
-            first_catch_exp_result = None
-            if is_first_catch:
-                first_catch_exp_result = self.exp_service.add_exp_for_first_time_capture(user_id, wild_pokemon.level)
+                # 如果是首次捕捉该物种，给予额外经验值奖励
+                first_catch_exp_result = None
+                if is_first_catch:
+                    first_catch_exp_result = await self.exp_service_async.add_exp_for_first_time_capture(user_id, wild_pokemon.level)
 
-            message_parts = [
-                f"🎉 捕捉成功！\n\n",
-                f"已添加 {wild_pokemon.name} 到收藏 (ID: {new_pokemon.id})。\n\n",
-                f"消耗: 1个{pokeball.name_zh}[{pokeball.item_id}]  (剩余: {pokeball.quantity - 1})\n\n"
-            ]
+                message_parts = [
+                    f"🎉 捕捉成功！\n\n",
+                    f"已添加 {wild_pokemon.name} 到收藏 (ID: {new_pokemon.id})。\n\n",
+                    f"消耗: 1个{pokeball.name_zh}[{pokeball.item_id}]  (剩余: {pokeball.quantity - 1})\n\n"
+                ]
 
-            # 添加特殊球的提示信息
-            if ball_id == 11:
-                message_parts.append(f"\n🌟 使用豪华球捕捉，宝可梦初始友好度更高！\n\n")
-            elif ball_id == 14:
-                message_parts.append(f"\n✨ 使用治愈球捕捉，宝可梦已完全治愈！\n\n")
+                # 添加特殊球的提示信息
+                if ball_id == 11:
+                    message_parts.append(f"\n🌟 使用豪华球捕捉，宝可梦初始友好度更高！\n\n")
+                elif ball_id == 14:
+                    message_parts.append(f"\n✨ 使用治愈球捕捉，宝可梦已完全治愈！\n\n")
 
-            # 如果是首次捕捉，添加经验奖励信息
-            if is_first_catch and first_catch_exp_result and first_catch_exp_result.get("success"):
-                exp_gained = first_catch_exp_result.get("exp_gained", 0)
-                new_level = first_catch_exp_result.get("new_level", 0)
-                levels_gained = first_catch_exp_result.get("levels_gained", 0)
+                # 如果是首次捕捉，添加经验奖励信息
+                if is_first_catch and first_catch_exp_result and first_catch_exp_result.get("success"):
+                    exp_gained = first_catch_exp_result.get("exp_gained", 0)
+                    new_level = first_catch_exp_result.get("new_level", 0)
+                    levels_gained = first_catch_exp_result.get("levels_gained", 0)
 
-                message_parts.append(f"\n✨ 首次捕捉奖励: +{exp_gained} 经验")
-                if levels_gained > 0:
-                    message_parts.append(f"📈 玩家升至 {new_level} 级! (提升了 {levels_gained} 级)")
+                    message_parts.append(f"\n✨ 首次捕捉奖励: +{exp_gained} 经验")
+                    if levels_gained > 0:
+                        message_parts.append(f"📈 玩家升至 {new_level} 级! (提升了 {levels_gained} 级)")
 
-            message = "".join(message_parts)
+                message = "".join(message_parts)
 
-        else:
-            message += (
-                f"❌ 捕捉失败！{wild_pokemon.name} 挣脱了！\n"
-                f"消耗: [{pokeball.item_id}] {pokeball.name_zh} (剩余: {pokeball.quantity - 1})\n\n"
-                f"你可以继续 /捕捉 或 /逃跑。"
-            )
+            else:
+                message += (
+                    f"❌ 捕捉失败！{wild_pokemon.name} 挣脱了！\n"
+                    f"消耗: [{pokeball.item_id}] {pokeball.name_zh} (剩余: {pokeball.quantity - 1})\n\n"
+                    f"你可以继续 /捕捉 或 /逃跑。"
+                )
 
-        yield event.plain_result(message)
+            yield event.plain_result(message)
 
     async def run(self, event: AstrMessageEvent):
         """处理逃跑指令"""
@@ -414,32 +431,33 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        # 检查是否遭遇了训练家
-        trainer_id = self.user_pokemon_service.get_user_current_trainer_encounter(user_id)
-        if trainer_id:
-            # 逃离训练家遭遇
-            if random.random() < 0.9:  # 90% 几率逃跑（对训练家可能更高，因为可能比较困难）
-                self.user_pokemon_service.clear_user_current_trainer_encounter(user_id)
-                # 获取训练家信息用于显示
-                trainer = self.adventure_service.trainer_service.get_trainer_by_id(trainer_id)
-                trainer_name = trainer.name if trainer else "未知训练家"
-                yield event.plain_result(f"🏃 您成功从训练家 {trainer_name} 身边逃跑了！")
-            else:
-                # 在这里重新获取训练家信息
-                current_trainer = self.adventure_service.trainer_service.get_trainer_by_id(trainer_id)
-                yield event.plain_result(f"😅 逃跑失败！训练家 {current_trainer.name if current_trainer and current_trainer.name else '未知训练家'} 挑战了你！\n请选择 /战斗 或再次 /逃跑。")
-        else:
-            # 逃离野生宝可梦遭遇
-            wild_pokemon = self.user_pokemon_service.get_user_encountered_wild_pokemon(user_id)
-            if not wild_pokemon:
-                yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
-                return
-
-            if random.random() < 0.8:  # 80% 几率逃跑
-                self.user_service._update_encounter_log(user_id, wild_pokemon.id, deleted=True)
-                yield event.plain_result(f"🏃 您成功从 {wild_pokemon.name} 身边逃跑了！")
+        async with self._user_lock(user_id):
+            # 检查是否遭遇了训练家
+            trainer_id = await self.user_pokemon_service_async.get_user_current_trainer_encounter(user_id)
+            if trainer_id:
+                # 逃离训练家遭遇
+                if random.random() < 0.9:  # 90% 几率逃跑（对训练家可能更高，因为可能比较困难）
+                    await self.user_pokemon_service_async.clear_user_current_trainer_encounter(user_id)
+                    # 获取训练家信息用于显示
+                    trainer = await self.trainer_service_async.get_trainer_by_id(trainer_id)
+                    trainer_name = trainer.name if trainer else "未知训练家"
+                    yield event.plain_result(f"🏃 您成功从训练家 {trainer_name} 身边逃跑了！")
+                else:
+                    # 在这里重新获取训练家信息
+                    current_trainer = await self.trainer_service_async.get_trainer_by_id(trainer_id)
+                    yield event.plain_result(f"😅 逃跑失败！训练家 {current_trainer.name if current_trainer and current_trainer.name else '未知训练家'} 挑战了你！\n请选择 /战斗 或再次 /逃跑。")
             else:
-                yield event.plain_result(f"😅 逃跑失败！{wild_pokemon.name} 还在盯着你...\n请选择 /战斗 或再次 /逃跑。")
+                # 逃离野生宝可梦遭遇
+                wild_pokemon = await self.user_pokemon_service_async.get_user_encountered_wild_pokemon(user_id)
+                if not wild_pokemon:
+                    yield event.plain_result(AnswerEnum.USER_ADVENTURE_NOT_ENCOUNTERED.value)
+                    return
+
+                if random.random() < 0.8:  # 80% 几率逃跑
+                    await self.user_pokemon_service_async.resolve_wild_encounter(user_id)
+                    yield event.plain_result(f"🏃 您成功从 {wild_pokemon.name} 身边逃跑了！")
+                else:
+                    yield event.plain_result(f"😅 逃跑失败！{wild_pokemon.name} 还在盯着你...\n请选择 /战斗 或再次 /逃跑。")
 
     async def challenge_gym(self, event: AstrMessageEvent):
         """挑战道馆指令"""
@@ -449,48 +467,49 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        # 检查是否处于其他战斗状态
-        if self.user_pokemon_service.get_user_encountered_wild_pokemon(user_id) or \
-           self.user_pokemon_service.get_user_current_trainer_encounter(user_id):
-            yield event.plain_result("请先完成当前的野生遭遇或战斗！")
-            return
-
-        args = event.message_str.split()
-        # 如果参数不足，尝试自动获取当前进行中的道馆挑战（如果有）
-        location_id = None
-        if len(args) < 2:
-            state = self.adventure_service.adventure_repo.get_gym_state(user_id)
-            if state and state.is_active:
-                gym = self.adventure_service.adventure_repo.get_gym_by_location(state.gym_id) # Gym ID assumed same as Location ID for simplicity? 
-                # !!! Wait. Earlier I said Gym ID and Location ID are different.
-                # Repo: get_gym_by_location(loc_id). 
-                # GymInfo: id, location_id. 
-                # Repo: get_gym_state -> UserGymState(gym_id=...).
-                # If I want to auto-resume, I need to know location_id from gym_id.
-                # I don't have get_location_by_gym_id.
-                # However, usually Gym ID 1 is at Location 1.
-                # Let's require ID for now to be safe, or just check state.gym_id and assume gym has access to its location.
-                # For now prompt user to input ID if missing.
-                yield event.plain_result("请输入道馆所在区域ID，例如：/挑战道馆 1")
-                return
-        else:
-            try:
-                location_id = int(args[1])
-            except ValueError:
-                yield event.plain_result("无效的区域ID")
+        async with self._user_lock(user_id):
+            # 检查是否处于其他战斗状态
+            if await self.user_pokemon_service_async.get_user_encountered_wild_pokemon(user_id) or \
+               await self.user_pokemon_service_async.get_user_current_trainer_encounter(user_id):
+                yield event.plain_result("请先完成当前的野生遭遇或战斗！")
                 return
 
-        result = self.adventure_service.challenge_gym(user_id, location_id)
-        
-        # 如果包含战斗结果数据，格式化并显示
-        if result.success and result.data:
-            # result.data 是 BattleResult (来自 start_trainer_battle)
-            battle_msg = self._format_battle_result_message(result.data)
-            # 组合消息：道馆进度/奖励信息 + 战斗总结
-            full_msg = f"{result.message}\n\n{'-'*20}\n{battle_msg}"
-            yield event.plain_result(full_msg)
-        else:
-            yield event.plain_result(result.message)
+            args = event.message_str.split()
+            # 如果参数不足，尝试自动获取当前进行中的道馆挑战（如果有）
+            location_id = None
+            if len(args) < 2:
+                state = await self.adventure_repo_async.get_gym_state(user_id)
+                if state and state.is_active:
+                    gym = await self.adventure_repo_async.get_gym_by_location(state.gym_id) # Gym ID assumed same as Location ID for simplicity? 
+                    # !!! Wait. Earlier I said Gym ID and Location ID are different.
+                    # Repo: get_gym_by_location(loc_id). 
+                    # GymInfo: id, location_id. 
+                    # Repo: get_gym_state -> UserGymState(gym_id=...).
+                    # If I want to auto-resume, I need to know location_id from gym_id.
+                    # I don't have get_location_by_gym_id.
+                    # However, usually Gym ID 1 is at Location 1.
+                    # Let's require ID for now to be safe, or just check state.gym_id and assume gym has access to its location.
+                    # For now prompt user to input ID if missing.
+                    yield event.plain_result("请输入道馆所在区域ID，例如：/挑战道馆 1")
+                    return
+            else:
+                try:
+                    location_id = int(args[1])
+                except ValueError:
+                    yield event.plain_result("无效的区域ID")
+                    return
+
+            result = await self.adventure_service_async.challenge_gym(user_id, location_id)
+
+            # 如果包含战斗结果数据，格式化并显示
+            if result.success and result.data:
+                # result.data 是 BattleResult (来自 start_trainer_battle)
+                battle_msg = self._format_battle_result_message(result.data)
+                # 组合消息：道馆进度/奖励信息 + 战斗总结
+                full_msg = f"{result.message}\n\n{'-'*20}\n{battle_msg}"
+                yield event.plain_result(full_msg)
+            else:
+                yield event.plain_result(result.message)
 
     async def give_up_gym(self, event: AstrMessageEvent):
         """放弃道馆挑战"""
@@ -500,8 +519,9 @@ class AdventureHandlers:
             yield event.plain_result(check_res.message)
             return
 
-        result = self.adventure_service.give_up_gym(user_id)
-        yield event.plain_result(result.message)
+        async with self._user_lock(user_id):
+            result = await self.adventure_service_async.give_up_gym(user_id)
+            yield event.plain_result(result.message)
 
     async def learn_move(self, event: AstrMessageEvent):
         """处理学习新技能指令 (入口)"""
@@ -514,19 +534,27 @@ class AdventureHandlers:
             return
 
         args = event.message_str.split()
-        if len(args) == 1:
-            async for r in self._handle_show_learnable_moves(event, user_id): yield r
-        elif len(args) == 2:
-            async for r in self._handle_show_learnable_moves_for_single_pokemon(event, user_id, args): yield r
-        elif len(args) >= 3:
-            async for r in self._handle_learn_move_action(event, user_id, args): yield r
-        else:
-            yield event.plain_result("❌ 格式错误！正确格式: /学习招式 [宝可梦ID] [技能ID] [槽位编号(可选)]")
+        async with self._user_lock(user_id):
+            if len(args) == 1:
+                async for r in self._handle_show_learnable_moves(event, user_id): yield r
+            elif len(args) == 2:
+                async for r in self._handle_show_learnable_moves_for_single_pokemon(event, user_id, args): yield r
+            elif len(args) >= 3:
+                async for r in self._handle_learn_move_action(event, user_id, args): yield r
+            else:
+                yield event.plain_result("❌ 格式错误！正确格式: /学习招式 [宝可梦ID] [技能ID] [槽位编号(可选)]")
 
     # ----------------- 私有辅助方法 -----------------
 
     async def _check_registered(self, user_id) -> BaseResult:
-        return self.user_service.check_user_registered(user_id)
+        return await self.user_service_async.check_user_registered(user_id)
+
+    def _user_lock(self, user_id: str) -> asyncio.Lock:
+        """获取用户的指令锁（无人持有时自动回收）"""
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        return lock
 
     def _format_battle_result_message(self, d: BattleResult) -> str:
         """格式化战斗结果文本"""
@@ -558,8 +586,14 @@ class AdventureHandlers:
                     # 野生宝可梦战斗：使用野生宝可梦信息
                     opponent_info = f" vs {wild['name']} (Lv.{wild['level']})"
 
+                # 自适应估计会附带置信区间与模拟次数，旧日志没有这些字段
+                win_rate_text = f"胜率:{record['win_rate']}%"
+                if record.get('win_rate_interval') and record.get('simulations'):
+                    low, high = record['win_rate_interval']
+                    win_rate_text += f" [{low}~{high}], {record['simulations']}次模拟"
+
                 lines.append(
-                    f"  {i}. {record['pokemon_name']} (Lv.{record['level']}){opponent_info} - {res} (胜率:{record['win_rate']}%)")
+                    f"  {i}. {record['pokemon_name']} (Lv.{record['level']}){opponent_info} - {res} ({win_rate_text})")
             lines.append("")
 
         lines.append(f"🎯 战斗结果: {'胜利' if d.result == 'success' else '失败'}\n\n")
@@ -622,7 +656,7 @@ class AdventureHandlers:
 
     async def _handle_show_learnable_moves(self, event, user_id):
         """子逻辑：显示宝可梦可学习的技能"""
-        result = self.team_service.get_user_team(user_id)
+        result = await self.team_service_async.get_user_team(user_id)
         if not result.success or not result.data:
             yield event.plain_result(AnswerEnum.USER_TEAM_NOT_SET.value)
             return
@@ -630,15 +664,10 @@ class AdventureHandlers:
         message = ["🔍 检查队伍中是否有宝可梦可以学习新技能：\n"]
         has_new_move = False
 
-        for i in user_team:
-            pid = i.id
-            result = self.user_pokemon_service.get_user_pokemon_by_id(user_id, pid)
-            if not result.success or not result.data:
-                continue
-
-            p_data: UserPokemonInfo = result.data
+        # 队伍信息已包含每只宝可梦的完整数据，无需逐个再查询
+        for p_data in user_team:
             # 获取该宝可梦从1级到当前等级的所有可学习技能
-            all_learnable_moves = self.move_service.get_level_up_moves(p_data.species_id, p_data.level)
+            all_learnable_moves = await self.move_service_async.get_level_up_moves(p_data.species_id, p_data.level)
 
             # 获取当前已拥有的技能
             current_moves_ids = [getattr(p_data.moves, f"move{i}_id") or 0 for i in range(1, 5)]
@@ -647,7 +676,7 @@ class AdventureHandlers:
             learnable_moves = [move_id for move_id in all_learnable_moves if move_id not in current_moves_ids and move_id != 0]
             if learnable_moves:
                 has_new_move = True
-                move_names = [self.move_service.get_move_name_str(mid) for mid in learnable_moves]
+                move_names = [await self.move_service_async.get_move_name_str(mid) for mid in learnable_moves]
                 message.append(f"  🌟 {p_data.name} (Lv.{p_data.level}) 可以学习: {', '.join(move_names)}")
 
         if not has_new_move:
@@ -664,7 +693,7 @@ class AdventureHandlers:
             return
 
         # 获取指定的宝可梦信息
-        result = self.user_pokemon_service.get_user_pokemon_by_id(user_id, pokemon_id)
+        result = await self.user_pokemon_service_async.get_user_pokemon_by_id(user_id, pokemon_id)
         if not result.success or not result.data:
             yield event.plain_result("❌ 找不到指定的宝可梦！")
             return
@@ -672,7 +701,7 @@ class AdventureHandlers:
         p_data = result.data
 
         # 获取该宝可梦从1级到当前等级的所有可学习技能
-        all_learnable_moves = self.move_service.get_level_up_moves(p_data.species_id, p_data.level)
+        all_learnable_moves = await self.move_service_async.get_level_up_moves(p_data.species_id, p_data.level)
 
         # 获取当前已拥有的技能
         current_moves_ids = [getattr(p_data.moves, f"move{i}_id") or 0 for i in range(1, 5)]
@@ -681,7 +710,7 @@ class AdventureHandlers:
         learnable_moves = [move_id for move_id in all_learnable_moves if move_id not in current_moves_ids and move_id != 0]
 
         if learnable_moves:
-            move_names = [f"{self.move_service.get_move_name_str(mid)}[{mid}]" for mid in learnable_moves]
+            move_names = [f"{await self.move_service_async.get_move_name_str(mid)}[{mid}]" for mid in learnable_moves]
             message = [
                 f"📖 {p_data.name} (ID: {p_data.id}, Lv.{p_data.level}) 可以学习的技能：\n",
                 f"  💫 {', '.join(move_names)}"
@@ -703,7 +732,7 @@ class AdventureHandlers:
             yield event.plain_result("❌ ID必须是数字")
             return
 
-        result = self.user_pokemon_service.get_user_pokemon_by_id(user_id, pokemon_id)
+        result = await self.user_pokemon_service_async.get_user_pokemon_by_id(user_id, pokemon_id)
         if not result.success or not result.data:
             yield event.plain_result("❌ 找不到指定的宝可梦！")
             return
@@ -711,17 +740,17 @@ class AdventureHandlers:
         p_data = result.data
 
         # 1. 校验合法性
-        _, new_moves = self.exp_service.check_learnable_moves(
+        _, new_moves = await self.exp_service_async.check_learnable_moves(
             p_data.species_id, p_data.level, p_data.level, p_data.moves
         )
         # 允许学习 "新解锁技能" 或者 "当前等级本来就该有的技能"
         if move_id not in new_moves:
-            current_lvl_moves = self.move_service.get_level_up_moves(p_data.species_id, p_data.level)
+            current_lvl_moves = await self.move_service_async.get_level_up_moves(p_data.species_id, p_data.level)
             if move_id not in current_lvl_moves:
                 yield event.plain_result(f"❌ {p_data.name} 无法学习这个技能！")
                 return
 
-        target_move_name = self.move_service.get_move_name_str(move_id)
+        target_move_name = await self.move_service_async.get_move_name_str(move_id)
 
         # 2. 获取当前技能状态
         # current_moves_ids 示例: [10, 20, 0, 0] (0代表空槽位)
@@ -735,9 +764,9 @@ class AdventureHandlers:
         try:
             empty_slot_index = current_moves_ids.index(0)  # 找到第一个为0的索引 (0-3)
             # 有空位，直接学习
-            updated_moves, success = self.exp_service.add_move_to_pokemon(p_data.moves, move_id)
+            updated_moves, success = await self.exp_service_async.add_move_to_pokemon(p_data.moves, move_id)
             if success:
-                update_result = self.user_pokemon_service.update_user_pokemon_moves(user_id, p_data.id, updated_moves)
+                update_result = await self.user_pokemon_service_async.update_user_pokemon_moves(user_id, p_data.id, updated_moves)
                 if update_result.success:
                     yield event.plain_result(f"🎉 {p_data.name} 学会了技能 {target_move_name}！")
                 else:
@@ -754,7 +783,7 @@ class AdventureHandlers:
             # 显示替换菜单
             lines = [f"💥 {p_data.name} 的技能槽已满！请选择要替换的技能：\n"]
             for i, mid in enumerate(current_moves_ids, 1):
-                lines.append(f"  技能{i}: {self.move_service.get_move_name_str(mid)}")
+                lines.append(f"  技能{i}: {await self.move_service_async.get_move_name_str(mid)}")
 
             lines.append(f"\n💡 替换指令: /学习招式 {pokemon_id} {move_id} <槽位1-4>")
             yield event.plain_result("\n".join(lines))
@@ -776,9 +805,9 @@ class AdventureHandlers:
         # 动态设置属性
         setattr(p_data.moves, f"move{slot_num}_id", move_id)
 
-        update_result = self.user_pokemon_service.update_user_pokemon_moves(user_id, p_data.id, p_data.moves)
+        update_result = await self.user_pokemon_service_async.update_user_pokemon_moves(user_id, p_data.id, p_data.moves)
         if update_result.success:
-            old_move_name = self.move_service.get_move_name_str(old_move_id)
+            old_move_name = await self.move_service_async.get_move_name_str(old_move_id)
             yield event.plain_result(
                 f"✅ {p_data.name} 成功替换技能！\n"
                 f"  - 遗忘: {old_move_name}\n"
@@ -93,7 +93,8 @@ class BattleDrawer:
             'log_data': [
                 {
                     'pokemon_name': str, 'level': int, 'result': 'win'|'loss',
-                    'win_rate': float, 'trainer_pokemon_name': str(opt) ...
+                    'win_rate': float, 'win_rate_interval': [float, float](opt),
+                    'simulations': int(opt), 'trainer_pokemon_name': str(opt) ...
                 }, ...
             ]
         }
@@ -219,7 +220,11 @@ class BattleDrawer:
         bx = mx
         by = my - 40
         draw.text((bx, by), res_text, fill=res_col, font=self.fonts["result_win"], anchor="mm")
-        draw.text((mx, my + 40), f"胜率: {wr}%", fill=wr_col, font=self.fonts["subtitle"], anchor="mm")
+        wr_text = f"胜率: {wr}%"
+        interval = sk.get('win_rate_interval')
+        if interval:
+            wr_text += f" ±{round((interval[1] - interval[0]) / 2, 1)}"
+        draw.text((mx, my + 40), wr_text, fill=wr_col, font=self.fonts["subtitle"], anchor="mm")
 
         # --- 详细过程区域 (Bottom Details - Fixed Logic) ---
         if layout["details"]:
@@ -106,7 +106,7 @@ class ItemHandlers:
             if item_info:
                 # 构建返回信息
                 item_name = item_info.get('name_zh', item_info.get('name_en', f'Item {item_id}'))
-                if item_name == "None":
+                if item_name in (None, "None"):
                     item_name = item_info.get('name_en', f'Item {item_id}')
 
                 response = f"📦 道具信息:\n\n"
@@ -127,7 +127,7 @@ class ItemHandlers:
             if item_info:
                 # 构建返回信息
                 item_name = item_info.get('name_zh', item_info.get('name_en', f'Item {item_info["id"]}'))
-                if item_name == "None":
+                if item_name in (None, "None"):
                     item_name = item_info.get('name_en', f'Item {item_info["id"]}')
 
                 response = f"📦 道具信息:\n\n"
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 from astrbot.api.event import AstrMessageEvent
 from ...interface.response.answer_enum import AnswerEnum
+from ...core.services.mechanics.growth_rate_table import exp_for_level, level_for_exp
 from ...utils.utils import userid_to_base32
 
 if TYPE_CHECKING:
@@ -58,8 +59,8 @@ class UserHandlers:
         exp_percentage = 0
 
         # 检查用户的经验是否符合当前等级的范围
-        required_for_current_level = self.user_service.exp_service.get_required_exp_for_level(level)
-        required_for_next_level = self.user_service.exp_service.get_required_exp_for_level(level + 1) if level >= 1 else 0
+        required_for_current_level = exp_for_level(level)
+        required_for_next_level = exp_for_level(level + 1) if level >= 1 else 0
 
         # 如果用户的经验不足以达到当前等级要求，说明数据库可能有不一致，按实际情况计算
         if exp < required_for_current_level:
@@ -70,9 +71,7 @@ class UserHandlers:
                 exp_percentage = 100 if exp >= 0 else 0
             else:
                 # 检查用户实际应该在哪个等级
-                actual_level = level
-                while actual_level > 1 and exp < self.user_service.exp_service.get_required_exp_for_level(actual_level):
-                    actual_level -= 1
+                actual_level = min(level, level_for_exp(exp))
 
                 if actual_level == level:
                     # 如果计算出的等级等于当前等级，计算到下一级的进度
@@ -97,11 +96,11 @@ class UserHandlers:
 
         # 显示当前等级的经验范围
         if level > 1:
-            required_for_current_level = self.user_service.exp_service.get_required_exp_for_level(level)
-            required_for_next_level = self.user_service.exp_service.get_required_exp_for_level(level + 1)
+            required_for_current_level = exp_for_level(level)
+            required_for_next_level = exp_for_level(level + 1)
             exp_progress = f"{exp}"
         else:
-            required_for_next_level = self.user_service.exp_service.get_required_exp_for_level(2)
+            required_for_next_level = exp_for_level(2)
             exp_progress = f"{exp}"
 
         message = [
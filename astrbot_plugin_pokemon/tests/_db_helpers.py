@@ -0,0 +1,36 @@
+"""测试共用的数据库工具：按编号顺序执行迁移脚本，得到与首次启动相同的库结构
+
+迁移脚本依赖 astrbot.api，导入本模块前需先完成 astrbot 的 MagicMock 替换。
+"""
+import importlib
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'infrastructure', 'database', 'migrations')
+MIGRATIONS_PACKAGE = "astrbot_plugin_pokemon.infrastructure.database.migrations"
+
+
+def migration_files():
+    """按编号升序返回全部迁移脚本文件名"""
+    return sorted((f for f in os.listdir(MIGRATIONS_DIR) if re.match(r"^\d{3}_.*\.py$", f)),
+                  key=lambda f: int(f.split("_")[0]))
+
+
+def latest_version():
+    """最新迁移脚本的版本号"""
+    return int(migration_files()[-1].split("_")[0])
+
+
+def run_migrations(conn, skip=()):
+    """在给定连接上依次执行迁移脚本（skip 中列出的模块名除外）"""
+    for filename in migration_files():
+        if filename[:-3] not in skip:
+            importlib.import_module(f"{MIGRATIONS_PACKAGE}.{filename[:-3]}").up(conn.cursor())
+
+
+def create_migrated_db(path, skip=()):
+    """在 path 处创建执行过全部迁移脚本的空库"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn, skip)
+    conn.close()
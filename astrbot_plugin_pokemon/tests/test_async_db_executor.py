@@ -0,0 +1,253 @@
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+sys.modules['astrbot.api.event'] = MagicMock()
+sys.modules['astrbot.api.message_components'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# 指令处理器按插件安装路径（data.plugins...）导入模型，这里指向源码中的同一模块
+from astrbot_plugin_pokemon.core.models import pokemon_models
+sys.modules['data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon.core.models.pokemon_models'] = pokemon_models
+for name in ('data', 'data.plugins', 'data.plugins.astrbot_plugin_pokemon',
+             'data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon',
+             'data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon.core',
+             'data.plugins.astrbot_plugin_pokemon.astrbot_plugin_pokemon.core.models'):
+    sys.modules.setdefault(name, MagicMock())
+
+from astrbot_plugin_pokemon.infrastructure.database.async_executor import DatabaseExecutor, AsyncFacade
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.interface.commands import adventure_handlers
+from astrbot_plugin_pokemon.core.models.common_models import BaseResult
+
+# 约 1-3ms 的查询（sqlite 执行期间释放 GIL）
+SLOW_QUERY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 20000) SELECT count(*) FROM c"
+
+
+class FakeAdventureService:
+    """模拟同步服务：每次冒险执行若干次查询"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.name = "adventure"
+
+    def adventure_in_location(self, user_id, location_id):
+        conn = self.manager.get_connection()
+        for _ in range(3):
+            conn.execute(SLOW_QUERY).fetchone()
+        return user_id, location_id, threading.current_thread().name
+
+    def fail(self):
+        raise ValueError("boom")
+
+
+class BlockingService:
+    """调用会阻塞到 release 被设置，用于确认阻塞期间事件循环不被占用"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def wait(self):
+        self.started.set()
+        self.release.wait(2)
+        return threading.current_thread().name
+
+
+async def measure(adventure, users, commands_per_user):
+    """并发用户执行冒险指令的同时，测量事件循环对其他指令的响应延迟(ms)"""
+    lags = []
+    done = asyncio.Event()
+
+    async def other_commands():
+        # 其他群聊中的轻量指令：期望每 1ms 得到一次调度
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+    async def user(uid):
+        for i in range(commands_per_user):
+            await adventure(uid, i)
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(other_commands())
+    await asyncio.sleep(0.005)
+    await asyncio.gather(*(user(u) for u in range(users)))
+    done.set()
+    await ticker
+    lags.sort()
+    return lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+
+
+def run_benchmark(users=20, commands_per_user=5):
+    """对比在事件循环中直接调用同步服务与通过数据库线程 await 调用，返回其他指令的 p99 延迟(ms)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SqliteConnectionManager(os.path.join(tmp, "bench.db"))
+        service = FakeAdventureService(manager)
+        executor = DatabaseExecutor()
+        facade = executor.facade(service)
+
+        async def blocking(uid, i):
+            return service.adventure_in_location(uid, i)
+
+        blocking_p99 = asyncio.run(measure(blocking, users, commands_per_user))
+        async_p99 = asyncio.run(measure(facade.adventure_in_location, users, commands_per_user))
+        executor.shutdown()
+        manager.close_all()
+    return blocking_p99, async_p99
+
+
+class TestDatabaseExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = SqliteConnectionManager(os.path.join(self.tmp.name, "test.db"))
+        self.executor = DatabaseExecutor()
+        self.facade = self.executor.facade(FakeAdventureService(self.manager))
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def test_facade_runs_on_database_thread(self):
+        self.assertIsInstance(self.facade, AsyncFacade)
+        uid, location_id, thread_name = asyncio.run(self.facade.adventure_in_location("u1", location_id=3))
+        self.assertEqual((uid, location_id), ("u1", 3))
+        self.assertTrue(thread_name.startswith("pokemon-db"))
+        # 非方法属性直接透传，包装后的方法被缓存
+        self.assertEqual(self.facade.name, "adventure")
+        self.assertIs(self.facade.adventure_in_location, self.facade.adventure_in_location)
+
+    def test_exceptions_propagate_and_metrics(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.facade.fail())
+        asyncio.run(self.facade.adventure_in_location("u1", 1))
+        metrics = self.executor.metrics()
+        self.assertEqual(metrics["calls"], 2)
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["workers"], 1)
+        self.assertGreater(metrics["run_p99_ms"], 0)
+
+    def test_single_thread_serializes_calls(self):
+        async def run_all():
+            return await asyncio.gather(*(self.facade.adventure_in_location(u, 0) for u in range(8)))
+
+        threads = {name for _, _, name in asyncio.run(run_all())}
+        self.assertEqual(len(threads), 1)
+        # 数据库线程只建立一个连接
+        self.assertEqual(self.manager.metrics()["connections_opened"], 1)
+
+    def test_event_loop_stays_responsive(self):
+        """服务调用阻塞在数据库线程时，事件循环仍在调度其他指令（延迟对比见 __main__）"""
+        service = BlockingService()
+        facade = self.executor.facade(service)
+
+        async def scenario():
+            call = asyncio.ensure_future(facade.wait())
+            while not service.started.is_set():
+                await asyncio.sleep(0.001)
+            other = await asyncio.gather(*(asyncio.sleep(0, result=i) for i in range(3)))
+            still_running = not call.done()
+            service.release.set()
+            return other, still_running, await call
+
+        other, still_running, thread_name = asyncio.run(scenario())
+        self.assertEqual(other, [0, 1, 2])
+        self.assertTrue(still_running)
+        self.assertTrue(thread_name.startswith("pokemon-db"))
+
+
+class RecordingService:
+    """记录每次调用的方法名与所在线程；可为方法指定返回值"""
+
+    def __init__(self, calls, **returns):
+        self._calls = calls
+        self._returns = returns
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self._calls.append((name, threading.current_thread().name))
+            time.sleep(0.002)   # 给其他指令插入的机会
+            return self._returns.get(name)
+        return method
+
+
+class TestAdventureHandlersUseDatabaseThread(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        wild = MagicMock(level=5, species_id=25)
+        wild.name = "皮卡丘"
+        container = MagicMock()
+        container.db_executor = self.executor = DatabaseExecutor()
+        container.user_service = RecordingService(self.calls, check_user_registered=BaseResult(True, "", MagicMock(level=50)))
+        container.user_pokemon_service = RecordingService(self.calls, get_user_encountered_wild_pokemon=wild)
+        container.adventure_service = RecordingService(
+            self.calls, adventure_in_battle=BaseResult(False, "战斗结束"), get_all_locations=BaseResult(False, "暂无区域"),
+            give_up_gym=BaseResult(True, "已放弃道馆挑战"))
+        container.trainer_service = RecordingService(self.calls)
+        container.team_service = RecordingService(self.calls)
+        container.exp_service = RecordingService(self.calls)
+        container.move_service = RecordingService(self.calls)
+        plugin = MagicMock(game_config={"adventure": {"cooldown": 10}})
+        self.handlers = adventure_handlers.AdventureHandlers(plugin, container)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    @staticmethod
+    def event(text):
+        event = MagicMock(message_str=text)
+        event.get_sender_id.return_value = "10001"
+        event.plain_result.side_effect = lambda message: message
+        return event
+
+    async def collect(self, handler, text):
+        return [r async for r in handler(self.event(text))]
+
+    def test_run_waits_for_running_battle(self):
+        async def scenario():
+            return await asyncio.gather(self.collect(self.handlers.battle, "/战斗"),
+                                        self.collect(self.handlers.run, "/逃跑"))
+
+        with patch.object(adventure_handlers.random, "random", return_value=0.0):
+            battle_messages, run_messages = asyncio.run(scenario())
+
+        self.assertEqual(battle_messages, ["战斗结束"])
+        self.assertIn("逃跑", run_messages[0])
+        # 所有服务调用都在数据库线程中执行
+        self.assertTrue(all(thread.startswith("pokemon-db") for _, thread in self.calls))
+        # 逃跑在战斗结束之后才读取遭遇状态，不会与战斗交错
+        names = [name for name, _ in self.calls if name != "check_user_registered"]
+        self.assertEqual(names, ["get_user_current_trainer_encounter", "get_user_encountered_wild_pokemon",
+                                 "adventure_in_battle",
+                                 "get_user_current_trainer_encounter", "get_user_encountered_wild_pokemon",
+                                 "resolve_wild_encounter"])
+
+    def test_other_commands_use_facades(self):
+        async def scenario():
+            await self.collect(self.handlers.view_locations, "/冒险区域")
+            await self.collect(self.handlers.view_battle_log, "/查看战斗 abc")
+            await self.collect(self.handlers.give_up_gym, "/放弃道馆")
+            await self.collect(self.handlers.challenge_gym, "/挑战道馆 1")
+
+        asyncio.run(scenario())
+        names = {name for name, _ in self.calls}
+        self.assertTrue({"get_all_locations", "give_up_gym", "check_user_registered"} <= names)
+        self.assertTrue(all(thread.startswith("pokemon-db") for _, thread in self.calls))
+
+
+if __name__ == "__main__":
+    blocking, non_blocking = run_benchmark()
+    print(f"事件循环中同步调用: 其他指令 p99 延迟 {blocking:.2f} ms, 数据库线程异步调用: {non_blocking:.2f} ms")
@@ -0,0 +1,109 @@
+import sys
+import os
+import json
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleState, BattleLogic, ListBattleLogger
+from astrbot_plugin_pokemon.core.services.battle.battle_events import (
+    StructuredBattleLogger, render_battle_details, EV_TURN, EV_HP_LEFT
+)
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import run_real_battle
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def make_move(move_id, name, type_name, power, category=0, damage_class_id=2, accuracy=100, pp=10, **kwargs):
+    return BattleMoveInfo(
+        move_id=move_id, move_name=name, type_name=type_name, power=power, accuracy=accuracy,
+        damage_class_id=damage_class_id, priority=0, type_effectiveness=1.0, stab_bonus=1.0,
+        max_pp=pp, current_pp=pp, meta_category_id=category, **kwargs
+    )
+
+
+def create_context(name, types, moves, hp=120):
+    poke = MagicMock()
+    poke.name = name
+    poke.level = 50
+    poke.ability_id = None
+    poke.held_item_id = None
+    poke.stats = PokemonStats(hp=hp, attack=70, defense=60, sp_attack=70, sp_defense=60, speed=60)
+    return BattleContext(pokemon=poke, moves=moves, types=types, current_hp=hp, is_user=True,
+                         stat_levels={}, volatile_statuses={})
+
+
+def create_matchup():
+    user = create_context("皮卡丘", ["电"], [
+        make_move(85, "十万伏特", "电", 90, damage_class_id=3, pp=15),
+        make_move(98, "电光一闪", "一般", 40, pp=30),
+        make_move(45, "叫声", "一般", 0, category=2, damage_class_id=1, pp=40,
+                  stat_changes=[{"stat_id": 2, "change": -1}], target_id=10),
+    ])
+    wild = create_context("杰尼龟", ["水"], [
+        make_move(55, "水枪", "水", 40, damage_class_id=3, pp=25),
+        make_move(33, "撞击", "一般", 40, accuracy=70, pp=35),
+    ])
+    return user, wild
+
+
+
+
+class TestStructuredBattleLogger(unittest.TestCase):
+    def run_turns(self, logger_obj, seed):
+        user_ctx, wild_ctx = create_matchup()
+        logic = BattleLogic(seed=seed)
+        user_state = BattleState.from_context(user_ctx, rng=logic.rng)
+        wild_state = BattleState.from_context(wild_ctx, rng=logic.rng)
+        if isinstance(logger_obj, StructuredBattleLogger):
+            logger_obj.begin(user_ctx, wild_ctx)
+        for turn in range(1, 51):
+            logger_obj.log_event(EV_TURN, None, turn)
+            ended = logic.process_turn(user_state, wild_state, logger_obj)
+            logger_obj.log_event(EV_HP_LEFT, None, max(0, user_state.current_hp), max(0, wild_state.current_hp))
+            if ended:
+                break
+
+    def test_lazy_render_matches_eager_logs(self):
+        for seed in range(5):
+            eager = ListBattleLogger(log_details=True)
+            self.run_turns(eager, seed)
+            lazy = StructuredBattleLogger(log_details=True)
+            self.run_turns(lazy, seed)
+
+            stored = json.loads(json.dumps(lazy.to_details(), ensure_ascii=False))
+            self.assertEqual(render_battle_details(stored), eager.logs)
+            # 紧凑事件远小于渲染后的文本
+            self.assertLess(len(json.dumps(stored, ensure_ascii=False)),
+                            len(json.dumps(eager.logs, ensure_ascii=False)) / 2)
+
+    def test_run_real_battle_returns_events(self):
+        user_ctx, wild_ctx = create_matchup()
+        result, details, _, _ = run_real_battle(BattleLogic(seed=1), user_ctx, wild_ctx)
+        self.assertIn(result, ("win", "fail"))
+        self.assertEqual(details["actors"][0][0], "皮卡丘")
+        self.assertTrue(all(isinstance(e, tuple) for e in details["events"]))
+
+        lines = render_battle_details(details)
+        self.assertEqual(lines[0], "战斗开始！皮卡丘 (Lv.50) VS 杰尼龟 (Lv.50)\n\n")
+        self.assertEqual(lines[1], "皮卡丘 HP: 120, 杰尼龟 HP: 120\n\n")
+        self.assertEqual(lines[2], "--- 第 1 回合 ---\n\n")
+        move_lines = [l for l in lines if isinstance(l, list) and len(l) == 4 and l[1]['text'] == " 使用了 "]
+        self.assertTrue(move_lines)
+        self.assertIn(move_lines[0][0]['color'], ("type_电", "type_水"))
+
+    def test_legacy_details_pass_through(self):
+        legacy = ["--- 第 1 回合 ---\n\n", [{'text': "造成 ", 'color': 'default'}]]
+        self.assertIs(render_battle_details(legacy), legacy)
+        self.assertEqual(render_battle_details(None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
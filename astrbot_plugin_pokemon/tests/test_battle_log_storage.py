@@ -0,0 +1,223 @@
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.battle_log_archive import BattleLogArchive, month_of
+from astrbot_plugin_pokemon.infrastructure.database.battle_log_codec import (
+    encode_log, decode_log, LOG_FORMAT_JSON, LOG_FORMAT_ZLIB
+)
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleLogic
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import PokemonSnapshot, run_real_battle
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+from astrbot_plugin_pokemon.tests._db_helpers import create_migrated_db
+
+
+def make_move(move_id, name, type_name, power, damage_class_id=2, accuracy=100, pp=10):
+    return BattleMoveInfo(
+        move_id=move_id, move_name=name, type_name=type_name, power=power, accuracy=accuracy,
+        damage_class_id=damage_class_id, priority=0, type_effectiveness=1.0, stab_bonus=1.0,
+        max_pp=pp, current_pp=pp, meta_category_id=0
+    )
+
+
+def make_battle_log(seed):
+    """一场真实战斗的日志（与 AdventureService 保存的结构一致）"""
+    user = BattleContext(
+        pokemon=PokemonSnapshot(1, "皮卡丘", 25, 30, PokemonStats(90, 55, 40, 50, 50, 90)),
+        moves=[make_move(85, "十万伏特", "电", 90, damage_class_id=3, accuracy=90, pp=15),
+               make_move(98, "电光一闪", "一般", 40, pp=30)],
+        types=["电"], current_hp=90, is_user=True,
+    )
+    wild = BattleContext(
+        pokemon=PokemonSnapshot(2, "杰尼龟", 7, 30, PokemonStats(95, 48, 65, 50, 64, 43)),
+        moves=[make_move(55, "水枪", "水", 40, damage_class_id=3, pp=25),
+               make_move(33, "撞击", "一般", 40, accuracy=80, pp=35)],
+        types=["水"], current_hp=95, is_user=False,
+    )
+    outcome, details, _, _ = run_real_battle(BattleLogic(seed=seed), user, wild)
+    # 事件中的元组在存储后读回为列表
+    details = json.loads(json.dumps(details))
+    return [{
+        "pokemon_id": 1, "pokemon_name": "皮卡丘", "species_name": 25, "user_species_id": 25,
+        "user_types": ["电"], "level": 30, "target_species_id": 7, "target_types": ["水"], "target_level": 30,
+        "current_hp": user.current_hp, "max_hp": 90, "target_current_hp": wild.current_hp, "target_max_hp": 95,
+        "win_rate": 62.5, "win_rate_interval": [55.0, 70.0], "simulations": 200,
+        "result": outcome, "details": details,
+    }]
+
+
+def run_benchmark(battles=300):
+    """对比 JSON 文本与 zlib 压缩两种格式：写入 battles 条日志后的数据库大小(KB)与单条编解码耗时(us)"""
+    logs = [make_battle_log(seed) for seed in range(battles)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, compress in (("json", False), ("zlib", True)):
+            path = os.path.join(tmp, f"{name}.db")
+            create_migrated_db(path)
+            manager = SqliteConnectionManager(path)
+            repo = SqliteBattleRepository(path, manager, compress=compress)
+            for log in logs:
+                repo.save_battle_log("u1", "杰尼龟", log, "success")
+            manager.close_all()
+
+            start = time.perf_counter()
+            encoded = [encode_log(log, compress) for log in logs]
+            encode_us = (time.perf_counter() - start) / battles * 1e6
+            start = time.perf_counter()
+            for payload, version in encoded:
+                decode_log(payload, version)
+            decode_us = (time.perf_counter() - start) / battles * 1e6
+
+            conn = sqlite3.connect(path)
+            conn.execute("VACUUM")
+            conn.close()
+            results[name] = {
+                "db_kb": os.path.getsize(path) / 1024,
+                "payload_bytes": sum(len(p if isinstance(p, bytes) else p.encode("utf-8")) for p, _ in encoded) / battles,
+                "encode_us": encode_us,
+                "decode_us": decode_us,
+            }
+    return results
+
+
+class TestBattleLogStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "pokemon.db")
+        create_migrated_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+        self.archive_dir = os.path.join(self.tmp.name, "battle_log_archive")
+        self.repo = SqliteBattleRepository(self.db_path, self.manager, archive_dir=self.archive_dir)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def insert_log(self, user_id, created_at, log_data=None, format_version=LOG_FORMAT_JSON):
+        conn = self.manager.get_connection()
+        payload = json.dumps(log_data or [{"details": [user_id, created_at]}], ensure_ascii=False)
+        cursor = conn.execute(
+            "INSERT INTO battle_logs (user_id, target_name, log_data, result, created_at, format_version) "
+            "VALUES (?, '小拉达', ?, 'success', ?, ?)", (user_id, payload, created_at, format_version))
+        conn.commit()
+        return cursor.lastrowid
+
+    def main_ids(self, user_id=None):
+        sql = "SELECT id FROM battle_logs" + (" WHERE user_id = ?" if user_id else "") + " ORDER BY id"
+        return [row[0] for row in self.manager.get_connection().execute(sql, (user_id,) if user_id else ())]
+
+    def test_codec_round_trip(self):
+        log = make_battle_log(7)
+        payload, version = encode_log(log)
+        self.assertEqual(version, LOG_FORMAT_ZLIB)
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(decode_log(payload, version), log)
+        text, version = encode_log(log, compress=False)
+        self.assertEqual((version, decode_log(text, version)), (LOG_FORMAT_JSON, log))
+        with self.assertRaises(ValueError):
+            decode_log(payload, 99)
+
+    def test_saved_logs_are_compressed(self):
+        log = make_battle_log(1)
+        log_id = self.repo.save_battle_log("u1", "杰尼龟", log, "success")
+        stored, version = self.manager.get_connection().execute(
+            "SELECT log_data, format_version FROM battle_logs WHERE id = ?", (log_id,)).fetchone()
+        self.assertEqual(version, LOG_FORMAT_ZLIB)
+        self.assertLess(len(stored), len(json.dumps(log, ensure_ascii=False).encode("utf-8")))
+        self.assertEqual(self.repo.get_battle_log_by_id(log_id)["log_data"], log)
+        self.assertEqual(self.repo.get_user_battle_logs("u1")[0]["log_data"], log)
+
+    def test_legacy_logs_are_readable_and_backfilled(self):
+        legacy_ids = [self.insert_log("u1", f"2025-01-0{i} 12:00:00") for i in range(1, 4)]
+        new_id = self.repo.save_battle_log("u1", "杰尼龟", [{"details": ["new"]}], "success")
+        self.assertEqual(self.repo.get_battle_log_by_id(legacy_ids[0])["log_data"],
+                         [{"details": ["u1", "2025-01-01 12:00:00"]}])
+
+        self.assertEqual(self.repo.compress_legacy_battle_logs(batch_size=2), 2)
+        self.assertEqual(self.repo.compress_legacy_battle_logs(batch_size=2), 1)
+        self.assertEqual(self.repo.compress_legacy_battle_logs(batch_size=2), 0)
+        versions = dict(self.manager.get_connection().execute("SELECT id, format_version FROM battle_logs"))
+        self.assertEqual(set(versions.values()), {LOG_FORMAT_ZLIB})
+        self.assertEqual(self.repo.get_battle_log_by_id(legacy_ids[2])["log_data"],
+                         [{"details": ["u1", "2025-01-03 12:00:00"]}])
+        self.assertEqual(self.repo.get_battle_log_by_id(new_id)["log_data"], [{"details": ["new"]}])
+
+    def test_keep_per_user_archives_oldest_logs(self):
+        for day in range(1, 6):
+            for user_id in ("u1", "u2", "u3"):
+                self.insert_log(user_id, f"2025-0{1 + day // 3}-1{day} 08:00:00")
+        newest_u1 = self.main_ids("u1")[-2:]
+
+        pruned = 0
+        while True:
+            batch = self.repo.prune_battle_logs(keep_per_user=2, batch_size=4)
+            if not batch:
+                break
+            pruned += batch
+        self.assertEqual(pruned, 9)
+        self.assertEqual(self.main_ids("u1"), newest_u1)
+        for user_id in ("u2", "u3"):
+            self.assertEqual(len(self.main_ids(user_id)), 2)
+
+        # 月度归档文件与清单
+        self.assertEqual(sorted(os.listdir(self.archive_dir)), ["battle_logs_2025-01.db", "battle_logs_2025-02.db"])
+        manifest = self.manager.get_connection().execute(
+            "SELECT month, row_count FROM battle_log_archives ORDER BY month").fetchall()
+        self.assertEqual([tuple(row) for row in manifest], [("2025-01", 6), ("2025-02", 3)])
+
+        # 已移出主库的日志仍可按 ID 查看
+        archived = self.repo.get_battle_log_by_id(1)
+        self.assertEqual(archived["user_id"], "u1")
+        self.assertEqual(archived["log_data"], [{"details": ["u1", "2025-01-11 08:00:00"]}])
+        self.assertIsNone(self.repo.get_battle_log_by_id(999))
+
+    def test_keep_days_stops_at_first_recent_log(self):
+        old_ids = [self.insert_log("u1", "2020-03-01 00:00:00"), self.insert_log("u2", "2020-04-02 00:00:00")]
+        recent_id = self.repo.save_battle_log("u1", "杰尼龟", [{"details": ["recent"]}], "success")
+        self.assertEqual(self.repo.prune_battle_logs(keep_days=30), 2)
+        self.assertEqual(self.repo.prune_battle_logs(keep_days=30), 0)
+        self.assertEqual(self.main_ids(), [recent_id])
+        self.assertEqual(self.repo.get_battle_log_by_id(old_ids[1])["user_id"], "u2")
+
+    def test_prune_without_archive_deletes(self):
+        for day in range(1, 4):
+            self.insert_log("u1", f"2025-01-0{day} 00:00:00")
+        self.assertEqual(self.repo.prune_battle_logs(keep_per_user=1, archive=False), 2)
+        self.assertFalse(os.path.exists(self.archive_dir))
+        self.assertIsNone(self.repo.get_battle_log_by_id(1))
+        self.assertEqual(self.repo.prune_battle_logs(keep_per_user=0, keep_days=0), 0)
+
+    def test_archive_write_is_idempotent(self):
+        """归档写入后、主库删除前中断时，下一次维护重复写入同一批记录不会产生重复"""
+        archive = BattleLogArchive(self.archive_dir)
+        rows = [(1, "u1", "小拉达", "[]", "success", "2025-05-01 00:00:00", LOG_FORMAT_JSON),
+                (2, "u1", "小拉达", "[]", "fail", "2025-05-02 00:00:00", LOG_FORMAT_JSON)]
+        self.assertEqual(archive.write(rows), [("2025-05", "battle_logs_2025-05.db", 1, 2, 2)])
+        self.assertEqual(archive.write(rows[1:]), [("2025-05", "battle_logs_2025-05.db", 1, 2, 2)])
+        self.assertEqual(archive.fetch("battle_logs_2025-05.db", 2)[4], "fail")
+        self.assertIsNone(archive.fetch("battle_logs_2099-01.db", 2))
+        self.assertEqual(month_of(None), "unknown")
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    for name, r in results.items():
+        print(f"{name}: 数据库 {r['db_kb']:.0f} KB, 单条日志 {r['payload_bytes']:.0f} 字节, "
+              f"编码 {r['encode_us']:.0f} us, 解码 {r['decode_us']:.0f} us")
+    print(f"压缩后数据库大小为原来的 {results['zlib']['db_kb'] / results['json']['db_kb'] * 100:.0f}%")
@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleLogic, BATTLE_ENGINE_VERSION
+from astrbot_plugin_pokemon.core.services.battle.battle_events import render_battle_details
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import (
+    PokemonSnapshot, InProcessSimulationExecutor, run_real_battle,
+    build_battle_replay, is_battle_replay, replay_real_battle
+)
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def make_move(move_id, name, type_name, power, category=0, damage_class_id=2, accuracy=100, pp=10, **kwargs):
+    return BattleMoveInfo(
+        move_id=move_id, move_name=name, type_name=type_name, power=power, accuracy=accuracy,
+        damage_class_id=damage_class_id, priority=0, type_effectiveness=1.0, stab_bonus=1.0,
+        max_pp=pp, current_pp=pp, meta_category_id=category, **kwargs
+    )
+
+
+def create_matchup():
+    user = BattleContext(
+        pokemon=PokemonSnapshot(1, "皮卡丘", 25, 30, PokemonStats(90, 55, 40, 50, 50, 90)),
+        moves=[make_move(85, "十万伏特", "电", 90, damage_class_id=3, accuracy=90, pp=15),
+               make_move(98, "电光一闪", "一般", 40, pp=30)],
+        types=["电"], current_hp=90, is_user=True,
+        # 麻痹状态：插件的随机判定也应来自同一随机流
+        non_volatile_status=1,
+    )
+    wild = BattleContext(
+        pokemon=PokemonSnapshot(2, "杰尼龟", 7, 30, PokemonStats(95, 48, 65, 50, 64, 43)),
+        moves=[make_move(55, "水枪", "水", 40, damage_class_id=3, pp=25),
+               make_move(33, "撞击", "一般", 40, accuracy=80, pp=35)],
+        types=["水"], current_hp=95, is_user=False,
+    )
+    return user, wild
+
+
+class TestSeededBattleReplay(unittest.TestCase):
+    def run_seeded(self, seed):
+        user_ctx, wild_ctx = create_matchup()
+        return run_real_battle(BattleLogic(seed=seed), user_ctx, wild_ctx)
+
+    def test_same_seed_is_deterministic_and_ignores_global_random(self):
+        first = self.run_seeded(1234)
+        # 全局 random 的状态或替换不影响带种子的战斗
+        with patch.object(random, 'random', MagicMock(return_value=0.0)), \
+                patch.object(random, 'uniform', MagicMock(return_value=0.85)):
+            second = self.run_seeded(1234)
+        self.assertEqual(first, second)
+        self.assertEqual(render_battle_details(first[1]), render_battle_details(second[1]))
+
+    def test_unseeded_logic_has_own_stream(self):
+        logic = BattleLogic()
+        self.assertIsInstance(logic.seed, int)
+        self.assertIsInstance(logic.rng, random.Random)
+        self.assertIsNot(logic.rng, random._inst)
+        # 抽取的种子可以重放同一场战斗
+        user_ctx, wild_ctx = create_matchup()
+        self.assertEqual(run_real_battle(logic, user_ctx, wild_ctx), self.run_seeded(logic.seed))
+
+    def test_random_target_uses_battle_stream(self):
+        picks = []
+        for _ in range(2):
+            logic = BattleLogic(seed=99)
+            with patch.object(random, 'choice', MagicMock(side_effect=AssertionError("使用了全局 random"))):
+                picks.append([logic.stat_modifier_service.get_target_pokemon_index(0, 8, 4)
+                              for _ in range(20)])
+        self.assertIs(logic.stat_modifier_service.rng, logic.rng)
+        self.assertEqual(picks[0], picks[1])
+        self.assertEqual({t for pick in picks[0] for t in pick}, {2, 3})
+
+    def test_replay_record_regenerates_log(self):
+        user_ctx, wild_ctx = create_matchup()
+        replay = build_battle_replay(user_ctx, wild_ctx, seed=42)
+        result, details, wild_hp, user_hp = InProcessSimulationExecutor(BattleLogic()).run_real_battle(
+            user_ctx, wild_ctx, seed=42)
+
+        stored = json.loads(json.dumps(replay, ensure_ascii=False))
+        self.assertTrue(is_battle_replay(stored))
+        self.assertFalse(is_battle_replay(details))
+        # 快照在实战前生成，实战写回上下文不影响重放
+        self.assertEqual(user_ctx.current_hp, user_hp)
+        self.assertEqual(render_battle_details(replay_real_battle(stored)), render_battle_details(details))
+
+    def test_replay_rejects_other_engine_versions(self):
+        user_ctx, wild_ctx = create_matchup()
+        replay = build_battle_replay(user_ctx, wild_ctx, seed=7)
+        replay["engine"] = BATTLE_ENGINE_VERSION + 1
+        self.assertIsNone(replay_real_battle(replay))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+import timeit
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleState, NoOpBattleLogger
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import PokemonSnapshot
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def create_context(ability_id=9, held_item_id=211, status=4):
+    pokemon = PokemonSnapshot(id=1, name="Pikachu", species_id=25, level=40,
+                              stats=PokemonStats(hp=120, attack=80, defense=60, sp_attack=70, sp_defense=60, speed=110),
+                              ability_id=ability_id, held_item_id=held_item_id)
+    moves = [BattleMoveInfo(power=40, accuracy=100, type_name="电", damage_class_id=3, priority=0,
+                            type_effectiveness=1.0, stab_bonus=1.5, max_pp=30, current_pp=30, move_id=84, move_name="电击")]
+    return BattleContext(pokemon=pokemon, moves=moves, types=["电"], current_hp=100, is_user=True,
+                         stat_levels={2: 1}, non_volatile_status=status, status_turns=0, volatile_statuses={6: 2})
+
+
+def bench(fn, rounds, repeat=5):
+    """取多轮中的最小值以降低噪声"""
+    return min(timeit.repeat(fn, number=rounds, repeat=repeat)) / rounds * 1e6
+
+
+def run_benchmark(rounds=20000):
+    """每场模拟的初始状态构建耗时（微秒）：from_context 重建 vs 原型复制"""
+    ctx = create_context()
+    proto = BattleState.from_context(ctx)
+    rebuild_us = bench(lambda: BattleState.from_context(ctx), rounds)
+    clone_us = bench(proto.clone, rounds)
+    return rebuild_us, clone_us
+
+
+class TestBattleStateClone(unittest.TestCase):
+    def test_clone_is_independent_and_rebinds_plugins(self):
+        proto = BattleState.from_context(create_context())
+        state = proto.clone()
+
+        # 插件实例为新对象且 owner 指向副本
+        self.assertIsNot(state.ability_plugin, proto.ability_plugin)
+        self.assertIs(state.ability_plugin.owner, state)
+        self.assertIs(state.item_plugin.owner, state)
+        self.assertEqual(set(state.active_plugins), {4, 6})
+        for plugin in state.active_plugins.values():
+            self.assertIs(plugin.owner, state)
+
+        # 钩子回调绑定到副本的插件上
+        for event_hooks in state.hooks._hooks.values():
+            for hook in event_hooks:
+                self.assertIs(hook.callback.__self__.owner, state)
+
+        # 修改副本不影响原型
+        state.current_pps[0] = 0
+        state.stat_levels[2] = 6
+        state.remove_status(6)
+        self.assertEqual(proto.current_pps, [30])
+        self.assertEqual(proto.stat_levels, {2: 1})
+        self.assertEqual(proto.volatile_statuses, {6: 2})
+        self.assertIn("confusion_check", [h.name for h in proto.hooks._hooks["before_move"]])
+        self.assertNotIn("confusion_check", [h.name for h in state.hooks._hooks["before_move"]])
+
+    def test_clone_hooks_act_on_clone(self):
+        proto = BattleState.from_context(create_context(ability_id=None, held_item_id=211, status=None))
+        state = proto.clone()
+        state.hooks.trigger_event("turn_end", state, MagicMock(), NoOpBattleLogger())
+
+        # 吃剩的东西只回复副本的 HP
+        self.assertEqual(proto.current_hp, 100)
+        self.assertGreater(state.current_hp, 100)
+
+    def test_clone_excludes_template_and_stat_cache(self):
+        proto = BattleState.from_context(create_context())
+        proto.stat_cache = ("stale",)
+        first = proto.clone()
+        self.assertIn('_clone_template', proto.__dict__)
+        self.assertNotIn('_clone_template', first.__dict__)
+        self.assertIsNone(first.stat_cache)
+
+        # 副本写入的缓存不会传给原型或其他副本
+        first.stat_cache = ("first",)
+        second = proto.clone()
+        self.assertIsNone(second.stat_cache)
+        self.assertEqual(proto.stat_cache, ("stale",))
+        # 副本再复制时重新生成自己的模板，插件归属副本本身
+        third = first.clone()
+        self.assertIs(third.ability_plugin.owner, third)
+        self.assertIsNone(third.stat_cache)
+
+    def test_clone_does_not_rebuild(self):
+        """复制只在首次生成模板，之后既不重新初始化钩子与插件，也不做深拷贝（耗时对比见 __main__）"""
+        proto = BattleState.from_context(create_context())
+        with patch.object(BattleState, '_build_clone_template', wraps=proto._build_clone_template) as build, \
+                patch.object(BattleState, '_setup_initial_hooks') as setup_hooks, \
+                patch.object(BattleState, '_init_ability') as init_ability, \
+                patch.object(BattleState, '_init_item') as init_item, \
+                patch('copy.deepcopy') as deepcopy:
+            clones = [proto.clone() for _ in range(3)]
+
+        self.assertEqual(build.call_count, 1)
+        setup_hooks.assert_not_called()
+        init_ability.assert_not_called()
+        init_item.assert_not_called()
+        deepcopy.assert_not_called()
+        self.assertEqual(len({id(state.hooks) for state in clones}), 3)
+
+
+if __name__ == "__main__":
+    rebuild, clone = run_benchmark()
+    print(f"from_context: {rebuild:.2f} us/次, clone: {clone:.2f} us/次, 加速 {rebuild / clone:.1f}x")
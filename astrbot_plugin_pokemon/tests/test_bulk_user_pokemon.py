@@ -0,0 +1,153 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.user_state_cache import UserStateCache
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_team_repo import SqliteTeamRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.services.player.team_service import TeamService
+from astrbot_plugin_pokemon.core.services.world.adventure_service import AdventureService
+from astrbot_plugin_pokemon.core.models.pokemon_models import WildPokemonInfo
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+
+def create_migrated_db(path, team_size=6):
+    """按顺序执行全部迁移脚本，写入玩家 u1 的 team_size 只宝可梦（第 2 只濒死）与队伍，返回队伍ID列表"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn)
+        conn.executemany("INSERT INTO users (user_id, nickname) VALUES (?, ?)", [("u1", "小智"), ("u2", "小霞")])
+        conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (25, 'pikachu', '皮卡丘')")
+        ids = [conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender, current_hp) "
+                            "VALUES ('u1', 25, ?, 10, 0, 'M', ?)", (f"皮卡丘{i}", 0 if i == 1 else 30)).lastrowid
+               for i in range(team_size)]
+        conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender) "
+                     "VALUES ('u2', 25, '别人的', 10, 0, 'M')")
+        conn.execute("INSERT INTO user_team (user_id, team) VALUES ('u1', ?)", (str(list(reversed(ids))),))
+    conn.close()
+    return list(reversed(ids))
+
+
+def run_benchmark(rounds=500):
+    """对比逐个查询与批量查询一支 6 只宝可梦的队伍：返回两者每次的耗时(us)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        team_ids = create_migrated_db(path)
+        manager = SqliteConnectionManager(path)
+        repo = SqliteUserPokemonRepository(path, manager)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            [repo.get_user_pokemon_by_id("u1", pid) for pid in team_ids]
+        single_us = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            repo.get_user_pokemon_by_ids("u1", team_ids)
+        bulk_us = (time.perf_counter() - start) / rounds * 1e6
+        manager.close_all()
+    return single_us, bulk_us
+
+
+class TestBulkUserPokemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        self.team_ids = create_migrated_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def statements(self, func, *args):
+        before = self.manager.statements_executed
+        result = func(*args)
+        return result, self.manager.statements_executed - before
+
+    def test_one_query_in_requested_order(self):
+        repo = SqliteUserPokemonRepository(self.db_path, self.manager)
+        other_users_id = self.team_ids[0] + 1
+        ids = [self.team_ids[2], 99999, self.team_ids[0], other_users_id, str(self.team_ids[5])]
+        pokemon, count = self.statements(repo.get_user_pokemon_by_ids, "u1", ids)
+        self.assertEqual(count, 1)
+        self.assertEqual([p.id for p in pokemon], [self.team_ids[2], self.team_ids[0], self.team_ids[5]])
+        self.assertEqual(pokemon[0].name, "皮卡丘3")   # 队伍为倒序插入
+        self.assertEqual(repo.get_user_pokemon_by_ids("u1", []), [])
+
+    def test_only_uncached_ids_are_queried(self):
+        repo = SqliteUserPokemonRepository(self.db_path, self.manager, state_cache=UserStateCache())
+        repo.get_user_pokemon_by_id("u1", self.team_ids[0])
+        _, count = self.statements(repo.get_user_pokemon_by_ids, "u1", self.team_ids)
+        self.assertEqual(count, 1)
+        _, count = self.statements(repo.get_user_pokemon_by_ids, "u1", self.team_ids)
+        self.assertEqual(count, 0)
+
+        repo.update_user_pokemon_current_hp("u1", self.team_ids[3], 1)
+        pokemon, count = self.statements(repo.get_user_pokemon_by_ids, "u1", self.team_ids)
+        self.assertEqual(count, 1)
+        self.assertEqual(pokemon[3].current_hp, 1)
+
+    def test_team_service_query_budget(self):
+        user_pokemon_repo = SqliteUserPokemonRepository(self.db_path, self.manager)
+        team_service = TeamService(MagicMock(), MagicMock(), SqliteTeamRepository(self.db_path, self.manager),
+                                   user_pokemon_repo, {})
+        result, count = self.statements(team_service.get_user_team, "u1")
+        self.assertTrue(result.success)
+        self.assertEqual([p.id for p in result.data], self.team_ids)
+        self.assertEqual(count, 2)   # 队伍 + 一次批量查询（原先为 1 + 6）
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM user_pokemon WHERE id = ?", (self.team_ids[4],))
+        conn.close()
+        result = team_service.get_user_team("u1")
+        self.assertFalse(result.success)
+        self.assertIn(str(self.team_ids[4]), result.message)
+
+    def test_battle_experience_query_budget(self):
+        exp_service = MagicMock()
+        exp_service.calculate_pokemon_exp_gain.return_value = 100
+        exp_service.apply_team_battle_rewards.side_effect = \
+            lambda user_id, gains, ev, team: [{"pokemon_id": pid, "team_info": team[pid]} for pid, _ in gains]
+        service = AdventureService(
+            adventure_repo=MagicMock(), pokemon_repo=MagicMock(),
+            team_repo=SqliteTeamRepository(self.db_path, self.manager), pokemon_service=MagicMock(),
+            user_repo=MagicMock(), user_pokemon_repo=SqliteUserPokemonRepository(self.db_path, self.manager),
+            battle_repo=MagicMock(), user_item_repo=MagicMock(), item_repo=None, move_repo=MagicMock(),
+            pokemon_ability_repo=MagicMock(), exp_service=exp_service, config={},
+        )
+        wild = MagicMock(spec=WildPokemonInfo, species_id=25, level=5)
+        battle_log = [{"pokemon_id": self.team_ids[0], "result": "success"}]
+        result, count = self.statements(service._handle_battle_experience, "u1", "success", wild, battle_log)
+        self.assertEqual(count, 2)   # 队伍 + 一次批量查询
+        # 濒死的宝可梦不获得经验，其余宝可梦收到已查询的信息
+        rewarded = [p for p in self.team_ids if p != self.team_ids[-2]]
+        self.assertEqual([r["pokemon_id"] for r in result["team_pokemon_results"]], rewarded)
+        for res in result["team_pokemon_results"]:
+            self.assertEqual(res["team_info"].id, res["pokemon_id"])
+
+    def test_bulk_fetch_replaces_per_id_queries(self):
+        """整支队伍：逐个查询 6 条语句，批量查询 1 条且结果相同（耗时对比见 __main__）"""
+        repo = SqliteUserPokemonRepository(self.db_path, self.manager)
+        single, single_count = self.statements(lambda: [repo.get_user_pokemon_by_id("u1", pid) for pid in self.team_ids])
+        bulk, bulk_count = self.statements(repo.get_user_pokemon_by_ids, "u1", self.team_ids)
+        self.assertEqual(single_count, len(self.team_ids))
+        self.assertEqual(bulk_count, 1)
+        self.assertEqual(bulk, single)
+
+
+if __name__ == "__main__":
+    single_us, bulk_us = run_benchmark()
+    print(f"6 只队伍: 逐个查询 {single_us:.1f} us/次, 批量查询 {bulk_us:.1f} us/次, 加速 {single_us / bulk_us:.1f}x")
@@ -0,0 +1,158 @@
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager, TYPED
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_move_repo import SqliteMoveRepository
+
+SCHEMA = """
+CREATE TABLE battle_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, target_name TEXT,
+    log_data TEXT, result TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, format_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE user_pokemon (id INTEGER PRIMARY KEY, user_id TEXT, exp INTEGER, current_hp INTEGER);
+CREATE TABLE wild_pokemon_encounter_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, species_id INTEGER, level INTEGER,
+    encountered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE move_meta (move_id INTEGER PRIMARY KEY, meta_category_id INTEGER);
+"""
+
+
+def create_db(path):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO user_pokemon VALUES (?, 'u1', 0, 100)", [(i,) for i in range(6)])
+    conn.close()
+
+
+def adventure_workload(connect, rounds):
+    """写密集的冒险流程：每次冒险记录遭遇、写入战斗日志、更新队伍经验与HP"""
+    log_data = json.dumps([{"details": ["--- 第 1 回合 ---\n\n"] * 20}], ensure_ascii=False)
+    start = time.perf_counter()
+    for i in range(rounds):
+        with connect() as conn:
+            conn.execute("INSERT INTO wild_pokemon_encounter_log (user_id, species_id, level) VALUES (?, ?, ?)",
+                         ("u1", i % 151 + 1, 5))
+        with connect() as conn:
+            conn.execute("INSERT INTO battle_logs (user_id, target_name, log_data, result) VALUES (?, ?, ?, ?)",
+                         ("u1", "小拉达", log_data, "win"))
+        for pid in range(6):
+            with connect() as conn:
+                conn.execute("UPDATE user_pokemon SET exp = exp + ?, current_hp = ? WHERE id = ?", (10, 90, pid))
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run_benchmark(rounds=200):
+    """对比旧行为（每次操作新建连接、默认 DELETE 日志模式）与共享连接管理器，返回每次冒险耗时(ms)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = os.path.join(tmp, "old.db"), os.path.join(tmp, "new.db")
+        create_db(old_path)
+        create_db(new_path)
+
+        def legacy_connect():
+            # sqlite3.connect 的上下文管理器只提交不关闭，与旧仓储一样依赖垃圾回收关闭连接
+            return sqlite3.connect(old_path)
+
+        old_ms = adventure_workload(legacy_connect, rounds)
+        manager = SqliteConnectionManager(new_path)
+        new_ms = adventure_workload(manager.get_connection, rounds)
+        manager.close_all()
+    return old_ms, new_ms
+
+
+class TestSqliteConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        create_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path, synchronous="full", cache_size_kb=4096)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def test_pragmas_applied(self):
+        health = self.manager.health_check()
+        self.assertTrue(health["ok"])
+        pragmas = health["pragmas"]
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 2)  # FULL
+        self.assertEqual(pragmas["cache_size"], -4096)
+        self.assertEqual(pragmas["temp_store"], 2)  # MEMORY
+        self.assertEqual(pragmas["busy_timeout"], 5000)
+
+    def test_invalid_setting_falls_back_to_default(self):
+        manager = SqliteConnectionManager(self.db_path, journal_mode="WAL; DROP TABLE battle_logs")
+        self.assertEqual(manager.settings["journal_mode"], "WAL")
+
+    def test_repositories_share_connection_per_thread(self):
+        battle_repo = SqliteBattleRepository(self.db_path, self.manager)
+        move_repo = SqliteMoveRepository(self.db_path, self.manager)
+        self.assertIs(battle_repo._get_connection(), move_repo._get_connection())
+        # 不同的类型解析/外键配置使用各自的连接
+        typed = self.manager.get_connection(TYPED, foreign_keys=True)
+        self.assertIsNot(typed, battle_repo._get_connection())
+        self.assertEqual(typed.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.manager.get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], battle_repo._get_connection())
+        self.assertEqual(self.manager.metrics()["open_connections"], 3)
+
+    def test_repository_round_trip_and_metrics(self):
+        repo = SqliteBattleRepository(self.db_path, self.manager)
+        log_id = repo.save_battle_log("u1", "小拉达", [{"details": ["a"]}], "win")
+        log = repo.get_battle_log_by_id(log_id)
+        self.assertEqual(log["log_data"], [{"details": ["a"]}])
+        self.assertIsInstance(log["created_at"], str)  # 未启用类型解析的仓储仍得到字符串
+        self.assertEqual(repo.get_user_battle_logs("u1")[0]["id"], log_id)
+        self.assertIsNone(SqliteMoveRepository(self.db_path, self.manager).get_move_meta_by_move_id(1))
+
+        metrics = self.manager.metrics()
+        self.assertEqual(metrics["connections_opened"], 1)
+        self.assertGreaterEqual(metrics["connection_reuse_rate"], 75.0)
+        self.assertGreater(metrics["statements_executed"], 4)
+
+    def test_close_all(self):
+        conn = self.manager.get_connection()
+        self.manager.close_all()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertIsNot(self.manager.get_connection(), conn)
+
+    def test_workload_reuses_one_connection(self):
+        """整段冒险流程只打开一次连接（与每次操作新建连接的耗时对比见 __main__）"""
+        rounds = 5
+        with patch("sqlite3.connect", wraps=sqlite3.connect) as connect:
+            adventure_workload(self.manager.get_connection, rounds)
+
+        self.assertEqual(connect.call_count, 1)
+        metrics = self.manager.metrics()
+        self.assertEqual(metrics["connections_opened"], 1)
+        self.assertEqual(metrics["connection_requests"], rounds * 8)
+        conn = self.manager.get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM wild_pokemon_encounter_log").fetchone()[0], rounds)
+        self.assertEqual(conn.execute("SELECT SUM(exp) FROM user_pokemon").fetchone()[0], rounds * 6 * 10)
+
+
+if __name__ == "__main__":
+    old, new = run_benchmark()
+    print(f"每次操作新建连接: {old:.3f} ms/次冒险, 共享连接管理器(WAL): {new:.3f} ms/次冒险, 加速 {old / new:.1f}x")
@@ -0,0 +1,191 @@
+import sys
+import os
+import importlib.util
+import json
+import sqlite3
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.append(PROJECT_ROOT)
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.csv_importer import (
+    CSV_TABLES, CsvColumn, CsvImporter, CsvTable, INT, REAL, TEXT
+)
+from astrbot_plugin_pokemon.infrastructure.database.seed_database import DEFAULT_CSV_DIR
+from astrbot_plugin_pokemon.tests._db_helpers import create_migrated_db
+
+SAMPLE = CsvTable("sample.csv", "sample", (
+    CsvColumn("id", required=True),
+    CsvColumn("name", TEXT),
+    CsvColumn("rate", REAL, default=1.5),
+    CsvColumn("alias", TEXT, source=("nickname", "name")),
+    CsvColumn("level", default=1),
+))
+
+SORTED = CsvTable("learnset.csv", "learnset", (
+    CsvColumn("species_id", source="pokemon_id"), CsvColumn("move_id"),
+), order_by=("pokemon_id",))
+
+
+# 在子进程中导入全部 CSV，分别统计耗时与峰值 RSS（ru_maxrss 按进程计算，互不干扰）
+_BENCH_CHILD = r"""
+import json, os, resource, sqlite3, sys, time
+from unittest.mock import MagicMock
+for name in ('astrbot', 'astrbot.api', 'astrbot.core'):
+    sys.modules[name] = MagicMock()
+sys.path.append(sys.argv[1])
+mode, db_path = sys.argv[2], sys.argv[3]
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.csv_importer import CSV_TABLES, CsvImporter
+from astrbot_plugin_pokemon.infrastructure.database.seed_database import DEFAULT_CSV_DIR
+
+start = time.perf_counter()
+if mode == "pandas":
+    # 原实现：pandas 整表读入内存后逐行转换、逐表写入
+    import pandas as pd
+    conn = sqlite3.connect(db_path)
+    for spec in CSV_TABLES:
+        df = pd.read_csv(os.path.join(DEFAULT_CSV_DIR, spec.csv_name))
+        rows = []
+        for _, row in df.iterrows():
+            values = []
+            for column in spec.columns:
+                source = next((s for s in column.sources() if s in df.columns), None)
+                value = row[source] if source is not None else None
+                values.append(column.default if value is None or pd.isna(value) else column.kind(str(value)))
+            rows.append(tuple(values))
+        with conn:
+            conn.executemany(spec.insert_sql(), rows)
+    conn.close()
+else:
+    manager = SqliteConnectionManager(db_path)
+    importer = CsvImporter(manager, DEFAULT_CSV_DIR)
+    for spec in CSV_TABLES:
+        importer.import_table(spec)
+    manager.close_all()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _bench_child(mode, db_path):
+    output = subprocess.run([sys.executable, "-c", _BENCH_CHILD, PROJECT_ROOT, mode, db_path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark():
+    """对比 pandas 导入与流式导入全部静态数据的耗时(ms)与进程峰值 RSS(MB)；未安装 pandas 时基线为 None"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("streaming", "pandas"):
+            if mode == "pandas" and importlib.util.find_spec("pandas") is None:
+                results[mode] = None
+                continue
+            db_path = os.path.join(tmp, f"{mode}.db")
+            create_migrated_db(db_path)
+            results[mode] = _bench_child(mode, db_path)
+    return results
+
+
+class TestCsvImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "game.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE sample (id INTEGER PRIMARY KEY, name TEXT, rate REAL, alias TEXT, level INTEGER)")
+            conn.execute("CREATE TABLE learnset (id INTEGER PRIMARY KEY AUTOINCREMENT, species_id INTEGER, move_id INTEGER)")
+        conn.close()
+        self.manager = SqliteConnectionManager(self.db_path)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def write_csv(self, name, content):
+        with open(os.path.join(self.tmp.name, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def query(self, sql):
+        return [tuple(row) for row in self.manager.get_connection().execute(sql).fetchall()]
+
+    def test_coercion_defaults_and_required(self):
+        self.write_csv("sample.csv", "id,name,rate,nickname,level\n"
+                                     "1,bulbasaur,0.5,bulba,5\n"
+                                     "2,ivysaur,,,\n"
+                                     ",missing-id,1,x,1\n"
+                                     "4,venusaur,abc,x,1\n"
+                                     "5,charmander,2,,7.0\n")
+        importer = CsvImporter(self.manager, self.tmp.name)
+        self.assertEqual(importer.import_table(SAMPLE), 3)
+        self.assertEqual(self.query("SELECT * FROM sample ORDER BY id"), [
+            (1, "bulbasaur", 0.5, "bulba", 5),
+            (2, "ivysaur", 1.5, None, 1),
+            (5, "charmander", 2.0, None, 7),
+        ])
+        self.assertEqual(importer.stats["sample.csv"]["read"], 5)
+        self.assertEqual(importer.stats["sample.csv"]["skipped"], 2)
+
+    def test_source_fallback_and_missing_column(self):
+        # 缺少 nickname 时 alias 取 name；缺少 rate / level 列时写入默认值
+        self.write_csv("sample.csv", "id,name\n1,bulbasaur\n")
+        CsvImporter(self.manager, self.tmp.name).import_table(SAMPLE)
+        self.assertEqual(self.query("SELECT * FROM sample"), [(1, "bulbasaur", 1.5, "bulbasaur", 1)])
+
+    def test_chunking(self):
+        self.write_csv("sample.csv", "id,name\n" + "".join(f"{i},p{i}\n" for i in range(1, 6)))
+        importer = CsvImporter(self.manager, self.tmp.name, chunk_size=2)
+        self.assertEqual([len(chunk) for chunk in importer.iter_chunks(SAMPLE)], [2, 2, 1])
+        self.assertEqual(importer.import_table(SAMPLE), 5)
+
+    def test_unsorted_csv_is_sorted_before_insert(self):
+        self.write_csv("learnset.csv", "pokemon_id,move_id\n1,33\n4,52\n2,45\n1,22\n")
+        importer = CsvImporter(self.manager, self.tmp.name)
+        self.assertEqual(importer.import_table(SORTED), 4)
+        # 稳定排序：同一宝可梦保持 CSV 中的先后顺序，自增 ID 与排序结果一致
+        self.assertEqual(self.query("SELECT id, species_id, move_id FROM learnset"),
+                         [(1, 1, 33), (2, 1, 22), (3, 2, 45), (4, 4, 52)])
+
+    def test_missing_csv_returns_zero(self):
+        self.assertEqual(CsvImporter(self.manager, self.tmp.name).import_table(SAMPLE), 0)
+
+    def test_shipped_csvs_import_cleanly(self):
+        """随插件发布的 CSV 均可按声明导入，且已按 order_by 预先排序"""
+        self.manager.close_all()
+        os.remove(self.db_path)
+        create_migrated_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+        importer = CsvImporter(self.manager, DEFAULT_CSV_DIR)
+        for spec in CSV_TABLES:
+            with self.subTest(csv=spec.csv_name):
+                if spec.order_by:
+                    for _ in importer.iter_chunks(spec):
+                        pass
+                written = importer.import_table(spec)
+                self.assertGreater(written, 0)
+                self.assertEqual(self.query(f"SELECT COUNT(*) FROM {spec.table}"), [(written,)])
+
+    def test_int_accepts_float_text(self):
+        self.assertEqual(INT("7.0"), 7)
+        with self.assertRaises(ValueError):
+            INT("abc")
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    streaming, pandas = results["streaming"], results["pandas"]
+    print(f"流式导入全部静态数据: {streaming['ms']:.0f} ms, 峰值 RSS {streaming['rss_mb']:.1f} MB")
+    if pandas:
+        print(f"pandas 导入全部静态数据: {pandas['ms']:.0f} ms, 峰值 RSS {pandas['rss_mb']:.1f} MB")
+    else:
+        print("未安装 pandas，跳过基线对比")
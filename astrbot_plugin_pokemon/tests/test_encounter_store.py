@@ -0,0 +1,299 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_pokemon_repo import SqlitePokemonRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.services.world.encounter_store import EncounterStore
+from astrbot_plugin_pokemon.core.models.pokemon_models import (
+    WildPokemonInfo, PokemonStats, PokemonIVs, PokemonEVs, PokemonMoves
+)
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+
+def create_migrated_db(path):
+    """按顺序执行全部迁移脚本，得到与首次启动相同的空库，并写入测试用的玩家/区域/物种"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn)
+        conn.executemany("INSERT INTO users (user_id, nickname) VALUES (?, ?)", [("u1", "小智"), ("u2", "小霞")])
+        conn.execute("INSERT INTO locations (id, name) VALUES (1, '常青森林')")
+        conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh, capture_rate) VALUES (10, 'caterpie', '绿毛虫', 255)")
+    conn.close()
+
+
+def make_wild(level=5):
+    return WildPokemonInfo(
+        id=0, species_id=10, name="绿毛虫", gender="M", level=level, exp=0,
+        stats=PokemonStats(20, 10, 11, 8, 8, 12), ivs=PokemonIVs(1, 2, 3, 4, 5, 6),
+        evs=PokemonEVs(0, 0, 0, 0, 0, 0), moves=PokemonMoves(33, 81, None, None),
+        nature_id=3, ability_id=19,
+    )
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def count(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def run_benchmark(adventures=300, battle_ratio=0.1):
+    """对比每次冒险都写入野生宝可梦与遭遇记录、只写入发生战斗的遭遇两种方式：返回两者新增的行数与单次冒险写入耗时(ms)"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("eager", "store"):
+            path = os.path.join(tmp, f"{mode}.db")
+            create_migrated_db(path)
+            manager = SqliteConnectionManager(path)
+            pokemon_repo = SqlitePokemonRepository(path, manager)
+            user_pokemon_repo = SqliteUserPokemonRepository(path, manager)
+            store = EncounterStore(pokemon_repo, user_pokemon_repo, write_through=False)
+            battles = int(adventures * battle_ratio)
+
+            start = time.perf_counter()
+            for i in range(adventures):
+                wild = make_wild()
+                if mode == "eager":
+                    wild_id = pokemon_repo.add_wild_pokemon(wild)
+                    log_id = user_pokemon_repo.add_user_encountered_wild_pokemon("u1", wild_id, 1, 10.0, is_captured=0)
+                    if i < battles:
+                        user_pokemon_repo.update_encounter_log(log_id, is_battled=1, battle_result="win")
+                    else:
+                        user_pokemon_repo.update_encounter_log(log_id, isdel=1)
+                else:
+                    store.put("u1", wild, 1, 10.0)
+                    if i < battles:
+                        store.record_battle("u1", "win")
+                    store.resolve("u1")
+            elapsed_ms = (time.perf_counter() - start) / adventures * 1000
+            manager.close_all()
+            results[mode] = (count(path, "wild_pokemon") + count(path, "wild_pokemon_encounter_log"), elapsed_ms)
+    return results
+
+
+class TestEncounterStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        create_migrated_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+        self.pokemon_repo = SqlitePokemonRepository(self.db_path, self.manager)
+        self.user_pokemon_repo = SqliteUserPokemonRepository(self.db_path, self.manager)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def make_store(self, write_through=False, ttl_seconds=60):
+        return EncounterStore(self.pokemon_repo, self.user_pokemon_repo, ttl_seconds=ttl_seconds,
+                              write_through=write_through, clock=self.clock)
+
+    def test_fled_encounter_writes_nothing(self):
+        store = self.make_store()
+        store.put("u1", make_wild(), 1, 10.0)
+        self.assertEqual(store.get("u1").wild_pokemon.name, "绿毛虫")
+        self.assertIsNone(store.resolve("u1"))
+        self.assertIsNone(store.get("u1"))
+        self.assertEqual(count(self.db_path, "wild_pokemon"), 0)
+        self.assertEqual(count(self.db_path, "wild_pokemon_encounter_log"), 0)
+        self.assertEqual(store.stats()["discarded"], 1)
+
+    def test_encounter_expires_after_ttl(self):
+        store = self.make_store(ttl_seconds=60)
+        store.put("u1", make_wild(), 1, 10.0)
+        self.clock.now += 59
+        self.assertIsNotNone(store.get("u1"))
+        self.clock.now += 1
+        self.assertIsNone(store.get("u1"))
+        self.assertEqual(store.stats()["expired"], 1)
+
+    def test_captured_encounter_is_persisted(self):
+        store = self.make_store()
+        store.put("u1", make_wild(level=7), 1, 12.5)
+        wild_id = store.resolve("u1", captured=True)
+        saved = self.pokemon_repo.get_wild_pokemon_by_id(wild_id)
+        self.assertEqual((saved.name, saved.level, saved.nature_id), ("绿毛虫", 7, 3))
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT wild_pokemon_id, is_captured, is_battled, isdel, encounter_rate "
+                               "FROM wild_pokemon_encounter_log").fetchone()
+        self.assertEqual(row, (wild_id, 1, 0, 1, 12.5))
+
+    def test_battled_encounter_can_still_be_captured(self):
+        store = self.make_store()
+        store.put("u1", make_wild(), 1, 10.0)
+        wild_id = store.record_battle("u1", "win")
+        # 战斗后遭遇仍在，可继续捕捉；再次战斗只更新同一条记录
+        self.assertEqual(store.get("u1").wild_pokemon.id, wild_id)
+        self.assertEqual(store.record_battle("u1", "lose"), wild_id)
+        self.assertEqual(store.resolve("u1", captured=True), wild_id)
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT is_captured, is_battled, battle_result, isdel FROM wild_pokemon_encounter_log").fetchall()
+        self.assertEqual(rows, [(1, 1, "lose", 1)])
+        self.assertEqual(count(self.db_path, "wild_pokemon"), 1)
+
+    def test_write_through_survives_restart(self):
+        store = self.make_store(write_through=True)
+        store.put("u1", make_wild(level=9), 1, 10.0)
+        store.put("u2", make_wild(), 1, 10.0)
+        wild_id = store.record_battle("u2", "lose")
+
+        restarted = self.make_store(write_through=True)
+        self.assertEqual(restarted.get("u1").wild_pokemon.level, 9)
+        self.assertEqual(restarted.get("u1").wild_pokemon.moves.move2_id, 81)
+        self.assertEqual(restarted.resolve("u2"), wild_id)
+        self.assertEqual(count(self.db_path, "pending_wild_encounters"), 1)
+
+        self.clock.now += 61
+        self.assertEqual(self.make_store(write_through=True).purge_expired(), 0)
+        self.assertEqual(count(self.db_path, "pending_wild_encounters"), 0)
+
+    def test_rollback_only_reverts_the_failed_battle(self):
+        for write_through in (False, True):
+            with self.subTest(write_through=write_through):
+                store = EncounterStore(self.pokemon_repo, self.user_pokemon_repo, write_through=write_through,
+                                       clock=self.clock, on_rollback=self.manager.on_rollback)
+                store.put("u1", make_wild(), 1, 10.0)
+                store.put("u2", make_wild(level=9), 1, 10.0)
+                with self.assertRaises(RuntimeError):
+                    with self.manager.unit_of_work():
+                        self.assertIsNotNone(store.record_battle("u1", "win"))
+                        raise RuntimeError("boom")
+                # 回滚撤销了战斗记录：u1 的遭遇恢复为未战斗状态，u2 的遭遇不受影响
+                entry = store.get("u1")
+                self.assertIsNone(entry.log_id)
+                self.assertEqual(entry.wild_pokemon.id, 0)
+                self.assertEqual(store.get("u2").wild_pokemon.level, 9)
+                self.assertEqual(count(self.db_path, "wild_pokemon_encounter_log"), 0)
+                if write_through:
+                    restored = EncounterStore(self.pokemon_repo, self.user_pokemon_repo, write_through=True,
+                                              clock=self.clock)
+                    self.assertIsNone(restored.get("u1").log_id)
+                # 之后的战斗照常写入记录
+                self.assertIsNotNone(store.record_battle("u1", "win"))
+                self.assertEqual(count(self.db_path, "wild_pokemon_encounter_log"), 1)
+                store.resolve("u1")
+                store.resolve("u2")
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute("DELETE FROM wild_pokemon_encounter_log")
+                conn.close()
+
+    def test_purge_and_resolve_from_different_threads(self):
+        store = self.make_store(ttl_seconds=60)
+        for i in range(1000):
+            store.put(f"old{i}", make_wild(), 1, 10.0)
+        self.clock.now += 61
+        for i in range(1000):
+            store.put(f"new{i}", make_wild(), 1, 10.0)
+
+        errors = []
+        stop = threading.Event()
+
+        def maintenance():
+            try:
+                while not stop.is_set():
+                    store.purge_expired()
+            except Exception as e:   # 例如 dictionary changed size during iteration
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)   # 频繁切换线程，放大交错的机会
+        worker = threading.Thread(target=maintenance)
+        worker.start()
+        try:
+            for i in range(1000):
+                store.resolve(f"old{i}")
+                store.resolve(f"new{i}")
+                store.put(f"tmp{i}", make_wild(), 1, 10.0)
+        finally:
+            stop.set()
+            worker.join()
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        stats = store.stats()
+        # 每条过期遭遇只被处理一次，未过期的遭遇不受后台清理影响
+        self.assertEqual(stats["expired"], 1000)
+        self.assertEqual(stats["discarded"], 1000)
+        self.assertEqual(len(store), 1000)
+
+    def test_concurrent_first_access_waits_for_restore(self):
+        self.make_store(write_through=True).put("u1", make_wild(level=9), 1, 10.0)
+        real_load = self.user_pokemon_repo.get_pending_encounters
+
+        def slow_load(now):
+            time.sleep(0.05)
+            return real_load(now)
+
+        self.user_pokemon_repo.get_pending_encounters = slow_load
+        restarted = self.make_store(write_through=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(restarted.get("u1"))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([r.wild_pokemon.level for r in results], [9] * 4)
+
+    def test_garbage_collects_legacy_orphans(self):
+        # 旧版本每次冒险都会写入的野生宝可梦：逃跑/未处理的为孤儿，战斗或捕捉过的需要保留
+        legacy = []
+        for flags in [(0, 0, 1), (0, 0, 0), (1, 0, 1), (0, 1, 0)]:
+            wild_id = self.pokemon_repo.add_wild_pokemon(make_wild())
+            self.user_pokemon_repo.add_user_encountered_wild_pokemon(
+                "u1", wild_id, 1, 10.0, encounter_time=f"2025-01-0{len(legacy) + 1} 08:00:00",
+                is_captured=flags[0], is_battled=flags[1], isdel=flags[2])
+            legacy.append(wild_id)
+        self.pokemon_repo.add_wild_pokemon(make_wild())
+
+        store = self.make_store(write_through=True)
+        deleted = 0
+        while True:
+            batch = store.collect_garbage(batch_size=2)
+            if not batch:
+                break
+            deleted += batch
+        self.assertEqual(deleted, 3)
+        with sqlite3.connect(self.db_path) as conn:
+            kept = [row[0] for row in conn.execute("SELECT id FROM wild_pokemon ORDER BY id")]
+            logs = [row[0] for row in conn.execute("SELECT wild_pokemon_id FROM wild_pokemon_encounter_log ORDER BY id")]
+        self.assertEqual(kept, legacy[2:])
+        self.assertEqual(logs, legacy[2:])
+
+        # 清理进度已到最新记录，战斗中写入的新记录不会被误删
+        store.put("u1", make_wild(), 1, 10.0)
+        store.record_battle("u1", "win")
+        self.assertEqual(store.collect_garbage(), 0)
+        self.assertEqual(count(self.db_path, "wild_pokemon"), 3)
+
+    def test_fewer_rows_than_eager_writes(self):
+        results = run_benchmark(adventures=50)
+        self.assertEqual(results["eager"][0], 100)
+        self.assertEqual(results["store"][0], 10)
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    for mode, label in (("eager", "每次冒险写入"), ("store", "遭遇缓存")):
+        rows, elapsed = results[mode]
+        print(f"{label}: 300 次冒险新增 {rows} 行, 平均 {elapsed:.3f} ms/次")
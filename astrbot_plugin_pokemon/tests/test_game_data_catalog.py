@@ -0,0 +1,209 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.game_data_catalog import GameDataCatalog
+from astrbot_plugin_pokemon.infrastructure.repositories.catalog_repos import (
+    CatalogPokemonRepository, CatalogMoveRepository, CatalogItemRepository, CatalogNatureRepository,
+    CatalogAbilityRepository, CatalogPokemonAbilityRepository, CatalogAdventureRepository
+)
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+SEED = """
+INSERT INTO pokemon_types (id, name_en, name_zh) VALUES (1, 'grass', '草'), (2, 'poison', '毒'), (3, 'fire', '火');
+INSERT INTO pokemon_species (id, name_en, name_zh, base_hp, base_attack, base_defense, base_sp_attack,
+    base_sp_defense, base_speed, base_experience, capture_rate, growth_rate_id, effort) VALUES
+    (1, 'bulbasaur', '妙蛙种子', 45, 49, 49, 65, 65, 45, 64, 45, 4, '[0,0,0,1,0,0]'),
+    (2, 'ivysaur', '妙蛙草', 60, 62, 63, 80, 80, 60, 142, 45, 4, '[0,0,0,1,1,0]'),
+    (4, 'charmander', '小火龙', 39, 52, 43, 60, 50, 65, 62, 45, 4, '[0,0,0,0,0,1]');
+INSERT INTO pokemon_species_types (species_id, type_id) VALUES (1, 1), (1, 2), (2, 1), (2, 2), (4, 3);
+INSERT INTO pokemon_evolutions (pre_species_id, evolved_species_id, evolution_trigger_id, minimum_level)
+    VALUES (1, 2, 1, 16);
+INSERT INTO moves (id, name_en, name_zh, type_id, power, pp, accuracy, priority, damage_class_id) VALUES
+    (33, 'tackle', '撞击', 1, 40, 35, 100, 0, 2), (45, 'growl', '叫声', 1, NULL, 40, 100, 0, 1),
+    (52, 'ember', '火花', 3, 40, 25, 100, 0, 3), (99, 'nometa', '无元数据', 1, 10, 10, 100, 0, 2);
+INSERT INTO move_meta (move_id, meta_category_id, meta_ailment_id, ailment_chance) VALUES
+    (33, 0, 0, 0), (45, 2, 0, 0), (52, 4, 4, 10);
+INSERT INTO move_meta_stat_changes (move_id, stat_id, change) VALUES (45, 2, -1);
+INSERT INTO pokemon_moves (pokemon_species_id, move_id, move_method_id, level) VALUES
+    (1, 33, 1, 1), (1, 45, 1, 3), (1, 52, 4, 0), (4, 52, 1, 4), (4, 33, 1, 1);
+INSERT INTO items (id, name_en, name_zh, category_id, cost) VALUES
+    (4, 'poke-ball', '精灵球', 34, 200), (17, 'potion', '伤药', 27, 300);
+INSERT INTO natures (id, name_en, name_zh, decreased_stat_id, increased_stat_id) VALUES
+    (1, 'hardy', '勤奋', 2, 2), (2, 'bold', '大胆', 2, 3);
+INSERT INTO nature_stats (nature_id, pokeathlon_stat_id, max_change) VALUES (2, 1, 1), (2, 2, -1);
+INSERT INTO abilities (id, name_en, name_zh, generation_id) VALUES (34, 'chlorophyll', '叶绿素', 3), (65, 'overgrow', '茂盛', 3);
+INSERT INTO pokemon_abilities (pokemon_id, ability_id, is_hidden, slot) VALUES (1, 65, 0, 1), (1, 34, 1, 3);
+INSERT INTO locations (id, name, min_level, max_level) VALUES (1, '常青森林', 2, 5);
+INSERT INTO location_pokemon (location_id, pokemon_species_id, encounter_rate, min_level, max_level) VALUES
+    (1, 1, 20.0, 2, 4), (1, 4, 35.0, 3, 5);
+"""
+
+
+def create_game_db(path):
+    """按顺序执行全部迁移脚本并写入少量静态数据"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn)
+        conn.executescript(SEED)
+    conn.close()
+
+
+def build_repos(path, manager):
+    return {
+        "pokemon": CatalogPokemonRepository(path, manager),
+        "move": CatalogMoveRepository(path, manager),
+        "item": CatalogItemRepository(path, manager),
+        "nature": CatalogNatureRepository(path, manager),
+        "ability": CatalogAbilityRepository(path, manager),
+        "pokemon_ability": CatalogPokemonAbilityRepository(path, manager),
+        "adventure": CatalogAdventureRepository(path, manager),
+    }
+
+
+# 与 SQL 实现逐一比对的查询
+QUERIES = [
+    ("pokemon", "get_pokemon_by_id", (1,)), ("pokemon", "get_pokemon_by_id", (3,)),
+    ("pokemon", "get_pokemon_by_name", ("妙蛙草",)), ("pokemon", "get_pokemon_name_by_id", (4,)),
+    ("pokemon", "get_all_pokemon", ()), ("pokemon", "get_pokemon_types", (1,)),
+    ("pokemon", "get_base_exp", (2,)), ("pokemon", "get_pokemon_capture_rate", (4,)),
+    ("pokemon", "get_pokemon_evolutions", (1, 16)), ("pokemon", "get_pokemon_evolutions", (1, 15)),
+    ("move", "get_move_by_id", (52,)), ("move", "get_move_by_id", (99,)),
+    ("move", "get_moves_by_ids", ([33, 45, 52, 7],)), ("move", "get_move_by_name", ("火花",)),
+    ("move", "get_move_meta_by_move_id", (52,)), ("move", "get_move_stat_changes_by_move_id", (45,)),
+    ("move", "get_level_up_moves", (1, 3)), ("move", "get_moves_learned_in_level_range", (1, 1, 5)),
+    ("move", "get_pokemon_moves_by_species_id", (1,)),
+    ("item", "get_item_by_id", (17,)), ("item", "get_item_name", (4,)), ("item", "get_all_items", ()),
+    ("item", "get_item_by_name", ("伤药",)), ("item", "get_item_by_name", ("poke",)),
+    ("nature", "get_nature_by_id", (2,)), ("nature", "get_all_natures", ()),
+    ("nature", "get_nature_stats_by_nature_id", (2,)),
+    ("ability", "get_ability_by_id", (65,)), ("ability", "get_all_abilities", ()),
+    ("ability", "get_ability_by_name", ("茂盛",)),
+    ("pokemon_ability", "get_abilities_by_pokemon_id", (1,)),
+    ("pokemon_ability", "get_ability_relation_by_pokemon_and_ability_id", (1, 34)),
+    ("adventure", "get_all_locations", ()), ("adventure", "get_location_by_id", (1,)),
+    ("adventure", "get_location_pokemon_by_location_id", (1,)),
+]
+
+
+def run_queries(repos):
+    return [getattr(repos[repo], method)(*args) for repo, method, args in QUERIES]
+
+
+def hot_path(repos):
+    """遭遇 + 战斗准备阶段的静态数据查询"""
+    repos["adventure"].get_location_pokemon_by_location_id(1)
+    repos["pokemon"].get_pokemon_by_id(1)
+    repos["pokemon"].get_pokemon_types(1)
+    repos["move"].get_level_up_moves(1, 5)
+    repos["move"].get_moves_by_ids([33, 45])
+    repos["move"].get_move_stat_changes_by_move_id(45)
+    repos["pokemon_ability"].get_abilities_by_pokemon_id(1)
+
+
+def run_benchmark(rounds=2000):
+    """对比 SQL 查询与静态数据目录的热路径查询（遭遇 + 战斗准备），返回每轮耗时(us)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_game_db(path)
+        manager = SqliteConnectionManager(path)
+        repos = build_repos(path, manager)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            hot_path(repos)
+        sql_us = (time.perf_counter() - start) / rounds * 1e6
+
+        catalog = GameDataCatalog.load(manager.get_connection())
+        for repo in repos.values():
+            repo.use_catalog(catalog)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            hot_path(repos)
+        catalog_us = (time.perf_counter() - start) / rounds * 1e6
+        manager.close_all()
+    return sql_us, catalog_us
+
+
+class TestGameDataCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "game.db")
+        create_game_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+        self.repos = build_repos(self.db_path, self.manager)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def load_catalog(self):
+        catalog = GameDataCatalog.load(self.manager.get_connection())
+        for repo in self.repos.values():
+            repo.use_catalog(catalog)
+        return catalog
+
+    def test_catalog_matches_sql(self):
+        expected = run_queries(self.repos)
+        self.load_catalog()
+        for (repo, method, args), want, got in zip(QUERIES, expected, run_queries(self.repos)):
+            with self.subTest(method=method, args=args):
+                self.assertEqual(got, want)
+
+    def test_lookups_do_not_touch_database(self):
+        catalog = self.load_catalog()
+        self.assertEqual(catalog.stats()["species"], 3)
+        before = self.manager.statements_executed
+        run_queries(self.repos)
+        # 只有物品名称的模糊匹配（"poke"）仍走 SQL：精确匹配 + 中文模糊 + 英文模糊
+        self.assertEqual(self.manager.statements_executed - before, 3)
+        before = self.manager.statements_executed
+        self.repos["pokemon"].get_pokemon_by_id(1)
+        self.repos["move"].get_level_up_moves(1, 3)
+        self.assertEqual(self.manager.statements_executed, before)
+
+    def test_results_are_copies(self):
+        self.load_catalog()
+        move = self.repos["move"].get_move_by_id(33)
+        move["power"] = 999
+        moves = self.repos["move"].get_pokemon_moves_by_species_id(1)
+        moves.clear()
+        self.assertEqual(self.repos["move"].get_move_by_id(33)["power"], 40)
+        self.assertEqual(len(self.repos["move"].get_pokemon_moves_by_species_id(1)), 3)
+
+    def test_use_catalog_none_restores_sql(self):
+        self.load_catalog()
+        for repo in self.repos.values():
+            repo.use_catalog(None)
+        before = self.manager.statements_executed
+        self.assertEqual(self.repos["pokemon"].get_pokemon_name_by_id(1), "妙蛙种子")
+        self.assertGreater(self.manager.statements_executed, before)
+
+    def test_hot_path_runs_no_sql(self):
+        """热路径加载目录后不再执行 SQL（耗时对比见 __main__）"""
+        before = self.manager.statements_executed
+        hot_path(self.repos)
+        self.assertGreaterEqual(self.manager.statements_executed - before, 7)
+
+        self.load_catalog()
+        before = self.manager.statements_executed
+        for _ in range(3):
+            hot_path(self.repos)
+        self.assertEqual(self.manager.statements_executed, before)
+
+
+if __name__ == "__main__":
+    sql, catalog = run_benchmark()
+    print(f"遭遇+战斗准备热路径: SQL 查询 {sql:.1f} us/次, 静态数据目录 {catalog:.1f} us/次, 加速 {sql / catalog:.1f}x")
@@ -0,0 +1,143 @@
+import sys
+import os
+import random
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.mechanics import growth_rate_table as table
+from astrbot_plugin_pokemon.core.services.mechanics.exp_service import ExpService
+from astrbot_plugin_pokemon.core.models.user_models import User
+
+GROWTH_RATES = (1, 2, 3, 4, 5, 6)
+MAX_EXP = table.exp_formula(100, 5) * 2   # 覆盖各速率组满级经验之外的范围
+
+
+def loop_level_for_exp(exp, growth_rate_id, current_level=1):
+    """原实现：从当前等级开始逐级比较公式计算的门槛"""
+    level = current_level
+    while level < 100 and exp >= table.exp_formula(level + 1, growth_rate_id):
+        level += 1
+    return level
+
+
+def random_cases(rng, n):
+    """随机 (速率组, 总经验) 样本，一半落在某个等级门槛附近"""
+    cases = []
+    for _ in range(n):
+        growth_rate_id = rng.choice(GROWTH_RATES)
+        if rng.random() < 0.5:
+            exp = table.exp_formula(rng.randint(1, 100), growth_rate_id) + rng.randint(-2, 2)
+        else:
+            exp = rng.randint(-10, MAX_EXP)
+        cases.append((growth_rate_id, exp))
+    return cases
+
+
+def run_benchmark(n=20000, seed=3):
+    """对比逐级循环与经验表二分查找：返回每次由总经验求等级的耗时(us)"""
+    cases = random_cases(random.Random(seed), n)
+    start = time.perf_counter()
+    for growth_rate_id, exp in cases:
+        loop_level_for_exp(exp, growth_rate_id)
+    loop_us = (time.perf_counter() - start) / n * 1e6
+
+    start = time.perf_counter()
+    for growth_rate_id, exp in cases:
+        table.level_for_exp(exp, growth_rate_id)
+    bisect_us = (time.perf_counter() - start) / n * 1e6
+    return loop_us, bisect_us
+
+
+class TestGrowthRateTable(unittest.TestCase):
+    def test_table_matches_formulas(self):
+        self.assertEqual(len(table.EXP_TABLES), 6)
+        for growth_rate_id in GROWTH_RATES + (0, 7, None):
+            for level in range(-3, 130):
+                self.assertEqual(table.exp_for_level(level, growth_rate_id), table.exp_formula(level, growth_rate_id),
+                                 (growth_rate_id, level))
+
+    def test_tables_are_monotonic(self):
+        for growth_rate_id, exps in table.EXP_TABLES.items():
+            self.assertEqual(len(exps), 101)
+            self.assertEqual(exps[:2], (0, 0))
+            for level in range(1, 101):
+                self.assertLessEqual(exps[level - 1], exps[level], (growth_rate_id, level))
+
+    def test_level_for_exp_matches_loop_at_every_threshold(self):
+        for growth_rate_id in GROWTH_RATES:
+            for level in range(1, 101):
+                threshold = table.exp_formula(level, growth_rate_id)
+                for exp in (threshold - 1, threshold, threshold + 1):
+                    self.assertEqual(table.level_for_exp(exp, growth_rate_id), loop_level_for_exp(exp, growth_rate_id),
+                                     (growth_rate_id, exp))
+
+    def test_level_for_exp_matches_loop_on_random_exp(self):
+        rng = random.Random(24)
+        for growth_rate_id, exp in random_cases(rng, 5000):
+            current_level = rng.randint(1, 100)
+            self.assertEqual(max(current_level, table.level_for_exp(exp, growth_rate_id)),
+                             loop_level_for_exp(exp, growth_rate_id, current_level), (growth_rate_id, exp, current_level))
+
+    def test_exp_to_next_level(self):
+        for growth_rate_id in GROWTH_RATES:
+            for level in range(0, 101):
+                expected = 1 if level < 1 else \
+                    table.exp_formula(level + 1, growth_rate_id) - table.exp_formula(level, growth_rate_id)
+                self.assertEqual(table.exp_to_next_level(level, growth_rate_id), expected)
+
+    def test_bulk_helpers_match_scalar(self):
+        cases = random_cases(random.Random(5), 500)
+        growth_rate_ids = [g for g, _ in cases]
+        exps = [e for _, e in cases]
+        self.assertEqual(table.levels_for_exp(growth_rate_ids, exps),
+                         [table.level_for_exp(e, g) for g, e in cases])
+        levels = table.levels_for_exp(growth_rate_ids, exps)
+        self.assertEqual(table.exp_for_levels(growth_rate_ids, levels),
+                         [table.exp_formula(l, g) for g, l in zip(growth_rate_ids, levels)])
+        self.assertEqual(table.levels_for_exp([], []), [])
+        with self.assertRaises(ValueError):
+            table.levels_for_exp([1, 2], [10])
+
+    def test_exp_service_uses_tables(self):
+        pokemon_repo = MagicMock()
+        pokemon_repo.get_pokemon_by_id.return_value = MagicMock(growth_rate_id=5)
+        user_repo = MagicMock()
+        service = ExpService(user_repo, pokemon_repo, MagicMock(), MagicMock(), MagicMock(), {}, MagicMock())
+        rng = random.Random(9)
+        for _, exp in random_cases(rng, 500):
+            current_level = rng.randint(1, 100)
+            info = service.check_pokemon_level_up(current_level, exp, 1)
+            expected = loop_level_for_exp(exp, 5, current_level)
+            self.assertEqual(info["new_level"], expected)
+            self.assertEqual(info["levels_gained"], expected - current_level)
+            self.assertEqual(service.get_required_exp_for_level(current_level, 5), table.exp_formula(current_level, 5))
+
+        for level, exp in ((1, 0), (1, 7999), (5, 8000), (99, 10 ** 7), (100, 10 ** 7)):
+            user_repo.get_user_by_id.return_value = User(user_id="u1", nickname="小智", level=level, exp=exp)
+            result = service.update_user_after_battle("u1", 1)
+            self.assertEqual(result["new_level"], loop_level_for_exp(exp + 1, 2, level))
+
+    def test_lookup_does_not_evaluate_formulas(self):
+        """求等级只在预计算的经验表上二分查找，不再逐级计算公式（耗时对比见 __main__）"""
+        cases = random_cases(random.Random(11), 500)
+        expected = [loop_level_for_exp(e, g) for g, e in cases]
+        with patch.object(table, 'exp_formula', wraps=table.exp_formula) as formula:
+            levels = [table.level_for_exp(e, g) for g, e in cases]
+            bulk = table.levels_for_exp([g for g, _ in cases], [e for _, e in cases])
+        formula.assert_not_called()
+        self.assertEqual(levels, expected)
+        self.assertEqual(bulk, expected)
+
+
+if __name__ == "__main__":
+    loop_us, bisect_us = run_benchmark()
+    print(f"由总经验求等级: 逐级循环 {loop_us:.2f} us/次, 经验表二分 {bisect_us:.2f} us/次, 加速 {loop_us / bisect_us:.1f}x")
@@ -0,0 +1,90 @@
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.hook_manager import HookManager, BattleHook
+
+
+class Plugin:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def add_owner(self, value):
+        return value + self.owner
+
+
+class TestHookManager(unittest.TestCase):
+    def test_priority_order_and_unregister(self):
+        hooks = HookManager()
+        calls = []
+        hooks.register("turn_end", BattleHook("b", 10, lambda: calls.append("b")))
+        hooks.register("turn_end", BattleHook("a", 5, lambda: calls.append("a")))
+        hooks.register("turn_end", BattleHook("c", 10, lambda: calls.append("c")))
+        hooks.trigger_event("turn_end")
+        self.assertEqual(calls, ["a", "b", "c"])
+
+        hooks.unregister("turn_end", "b")
+        hooks.unregister("turn_end", "missing")
+        hooks.unregister("no_such_event", "a")
+        self.assertEqual([h.name for h in hooks._hooks["turn_end"]], ["a", "c"])
+        self.assertIsInstance(hooks._hooks["turn_end"], tuple)
+
+    def test_empty_events_short_circuit(self):
+        hooks = HookManager()
+        self.assertFalse(hooks.has_hooks())
+        self.assertEqual(hooks.trigger_value("on_stat_calc", 42), 42)
+        self.assertTrue(hooks.trigger_action("before_move"))
+        self.assertIsNone(hooks.trigger_event("custom_event"))
+
+        hooks.register("custom_event", BattleHook("x", 1, lambda: None))
+        self.assertTrue(hooks.has_hooks("custom_event"))
+        self.assertFalse(hooks.has_hooks("turn_end"))
+
+    def test_one_shot_hooks_and_removal_during_trigger(self):
+        hooks = HookManager()
+        hooks.register("on_stat_calc", BattleHook("double_once", 5, lambda v: v * 2, persistent=False))
+        hooks.register("on_stat_calc", BattleHook("plus_one", 10, lambda v: v + 1))
+        self.assertEqual(hooks.trigger_value("on_stat_calc", 10), 21)
+        self.assertEqual(hooks.trigger_value("on_stat_calc", 10), 11)
+
+        # 触发过程中注销后续钩子，不影响本次遍历
+        calls = []
+
+        def remove_later():
+            calls.append("first")
+            hooks.unregister("before_move", "second")
+
+        hooks.register("before_move", BattleHook("first", 1, remove_later))
+        hooks.register("before_move", BattleHook("second", 2, lambda: calls.append("second")))
+        self.assertTrue(hooks.trigger_action("before_move"))
+        self.assertTrue(hooks.trigger_action("before_move"))
+        self.assertEqual(calls, ["first", "second", "first"])
+
+    def test_template_rebinds_callbacks_and_source_plugin(self):
+        old_plugin = Plugin(owner=1)
+        hooks = HookManager()
+        hook = BattleHook("boost", 10, old_plugin.add_owner)
+        hook.source_plugin = old_plugin
+        hooks.register("on_stat_calc", hook)
+
+        new_plugin = Plugin(owner=100)
+        cloned = HookManager.from_template(hooks.clone_template([old_plugin]), [new_plugin])
+
+        self.assertEqual(cloned.trigger_value("on_stat_calc", 0), 100)
+        self.assertIs(cloned._hooks["on_stat_calc"][0].source_plugin, new_plugin)
+        cloned.unregister("on_stat_calc", "boost")
+        self.assertFalse(cloned.has_hooks())
+        self.assertTrue(hooks.has_hooks("on_stat_calc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
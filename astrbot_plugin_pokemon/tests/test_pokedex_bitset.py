@@ -0,0 +1,259 @@
+import sys
+import os
+import importlib
+import random
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.user_state_cache import UserStateCache
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.models.pokedex_models import SpeciesBitset
+from astrbot_plugin_pokemon.core.models.pokemon_models import (
+    UserPokemonInfo, PokemonStats, PokemonIVs, PokemonEVs, PokemonMoves
+)
+from astrbot_plugin_pokemon.tests._db_helpers import MIGRATIONS_PACKAGE, create_migrated_db
+
+POKEDEX_MIGRATION = "026_create_user_pokedex"
+
+
+def fill_history(path, users=5, encounters_per_user=200, seed=7):
+    """写入旧版本产生的明细数据：宝可梦（含已放生）、捕获历史与遭遇记录"""
+    rng = random.Random(seed)
+    with sqlite3.connect(path) as conn:
+        for u in range(users):
+            user_id = f"u{u}"
+            for species_id in rng.sample(range(1, 500), 12):
+                conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender, isdel) "
+                             "VALUES (?, ?, 'x', 5, 0, 'M', ?)", (user_id, species_id, int(rng.random() < 0.2)))
+            for species_id in rng.sample(range(1, 500), 5):
+                conn.execute("INSERT OR IGNORE INTO user_pokedex_capture_history (user_id, species_id) VALUES (?, ?)",
+                             (user_id, species_id))
+            for i in range(encounters_per_user):
+                wild_id = conn.execute("INSERT INTO wild_pokemon (species_id, name, gender, level) VALUES (?, 'w', 'M', 5)",
+                                       (rng.randrange(1, 500),)).lastrowid
+                conn.execute("INSERT INTO wild_pokemon_encounter_log (user_id, wild_pokemon_id, location_id, encounter_time) "
+                             "VALUES (?, ?, 1, ?)", (user_id, wild_id, f"2025-01-01 {i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}"))
+    conn.close()
+
+
+def run_benchmark(encounters_per_user=2000, lookups=200):
+    """对比从明细表推导图鉴与读取位图（含缓存）：返回每次查询的耗时(us)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_migrated_db(path, skip=(POKEDEX_MIGRATION,))
+        fill_history(path, users=3, encounters_per_user=encounters_per_user)
+        with sqlite3.connect(path) as conn:
+            importlib.import_module(f"{MIGRATIONS_PACKAGE}.{POKEDEX_MIGRATION}").up(conn.cursor())
+        conn.close()
+        manager = SqliteConnectionManager(path)
+        repo = SqliteUserPokemonRepository(path, manager, state_cache=UserStateCache())
+
+        start = time.perf_counter()
+        for _ in range(lookups):
+            repo._derive_pokedex_ids("u0")
+        derive_us = (time.perf_counter() - start) / lookups * 1e6
+
+        repo.get_user_pokedex_ids("u0")
+        start = time.perf_counter()
+        for _ in range(lookups):
+            repo.get_user_pokedex_ids("u0")
+        bitset_us = (time.perf_counter() - start) / lookups * 1e6
+        manager.close_all()
+    return derive_us, bitset_us
+
+
+class TestSpeciesBitset(unittest.TestCase):
+    def test_behaves_like_a_set(self):
+        ids = {1, 7, 8, 151, 1025}
+        bits = SpeciesBitset.from_ids(ids)
+        self.assertEqual(set(bits), ids)
+        self.assertEqual(len(bits), 5)
+        self.assertIn(151, bits)
+        self.assertNotIn(150, bits)
+        self.assertNotIn("151", bits)
+        self.assertEqual(bits, ids)
+        self.assertEqual(set(bits | SpeciesBitset.from_ids({2})), ids | {2})
+        self.assertIsInstance(bits | SpeciesBitset(), SpeciesBitset)
+        self.assertFalse(SpeciesBitset())
+
+    def test_blob_roundtrip(self):
+        bits = SpeciesBitset.from_ids(range(0, 1100, 3))
+        self.assertEqual(SpeciesBitset.from_blob(bits.to_blob()), bits)
+        self.assertEqual(len(SpeciesBitset.from_ids(range(1, 1026)).to_blob()), 129)
+        self.assertEqual(SpeciesBitset.from_blob(b""), set())
+        self.assertEqual(SpeciesBitset.from_blob(None), set())
+
+
+class TestUserPokedex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def make_pokemon(species_id=25):
+        return UserPokemonInfo(
+            id=0, species_id=species_id, name="皮卡丘", gender="M", level=5, exp=0,
+            stats=PokemonStats(20, 12, 10, 11, 11, 18), ivs=PokemonIVs(1, 2, 3, 4, 5, 6),
+            evs=PokemonEVs(0, 0, 0, 0, 0, 0), moves=PokemonMoves(None, None, None, None))
+
+    def open_repo(self, state_cache=None):
+        """与容器一致：仓储共用连接管理器与玩家状态缓存，回滚时清空缓存"""
+        manager = SqliteConnectionManager(self.db_path)
+        self.addCleanup(manager.close_all)
+        state_cache = state_cache if state_cache is not None else UserStateCache()
+        manager.add_rollback_listener(state_cache.clear)
+        return manager, SqliteUserPokemonRepository(self.db_path, manager, state_cache=state_cache)
+
+    def test_migration_backfill_matches_history(self):
+        create_migrated_db(self.db_path, skip=(POKEDEX_MIGRATION,))
+        fill_history(self.db_path)
+        _, legacy_repo = self.open_repo()
+        expected = {f"u{u}": legacy_repo._derive_pokedex_ids(f"u{u}") for u in range(5)}
+
+        with sqlite3.connect(self.db_path) as conn:
+            importlib.import_module(f"{MIGRATIONS_PACKAGE}.{POKEDEX_MIGRATION}").up(conn.cursor())
+        conn.close()
+        manager, repo = self.open_repo()
+        for user_id, legacy in expected.items():
+            before = manager.statements_executed
+            pokedex = repo.get_user_pokedex_ids(user_id)
+            self.assertEqual(manager.statements_executed - before, 1)
+            self.assertEqual(set(pokedex["caught"]), legacy["caught"])
+            self.assertEqual(set(pokedex["seen"]), legacy["seen"])
+
+    def test_marks_are_incremental_and_cached(self):
+        create_migrated_db(self.db_path)
+        manager, repo = self.open_repo()
+        repo.record_pokedex_seen("u1", 16)
+        repo.record_pokedex_capture("u1", 25)
+        self.assertEqual(repo.get_user_pokedex_ids("u1"), {"caught": {25}, "seen": {16, 25}})
+
+        # 缓存命中：查询与重复标记都不访问数据库
+        before = manager.statements_executed
+        for _ in range(10):
+            self.assertIn(25, repo.get_user_pokedex_ids("u1")["caught"])
+            repo.record_pokedex_seen("u1", 16)
+        self.assertEqual(manager.statements_executed, before)
+
+        # 重启后从 user_pokedex 读取
+        _, restarted = self.open_repo()
+        self.assertEqual(restarted.get_user_pokedex_ids("u1"), {"caught": {25}, "seen": {16, 25}})
+
+    def test_missing_row_is_derived_once(self):
+        create_migrated_db(self.db_path)
+        fill_history(self.db_path, users=1, encounters_per_user=20)
+        manager, repo = self.open_repo()
+        expected = repo._derive_pokedex_ids("u0")
+        self.assertEqual(set(repo.get_user_pokedex_ids("u0")["seen"]), expected["seen"])
+        before = manager.statements_executed
+        self.assertEqual(set(repo.get_user_pokedex_ids("u0")["caught"]), expected["caught"])
+        self.assertEqual(manager.statements_executed, before)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_pokedex").fetchone()[0], 1)
+        conn.close()
+
+    def test_created_pokemon_is_marked_caught(self):
+        create_migrated_db(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO users (user_id, nickname) VALUES ('u1', '小智')")
+            conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (25, 'pikachu', '皮卡丘')")
+        conn.close()
+        _, repo = self.open_repo()
+        repo.record_pokedex_seen("u1", 16)
+        self.assertNotIn(25, repo.get_user_pokedex_ids("u1")["caught"])
+        # 只调用 create_user_pokemon（不调用 record_pokedex_capture）也会标记已捕获
+        repo.create_user_pokemon("u1", self.make_pokemon())
+        self.assertEqual(repo.get_user_pokedex_ids("u1"), {"caught": {25}, "seen": {16, 25}})
+        _, restarted = self.open_repo()
+        self.assertEqual(restarted.get_user_pokedex_ids("u1"), {"caught": {25}, "seen": {16, 25}})
+
+    def test_create_stays_atomic_when_pokedex_row_is_derived(self):
+        create_migrated_db(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO users (user_id, nickname) VALUES ('u1', '小智')")
+            conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (25, 'pikachu', '皮卡丘')")
+        conn.close()
+        _, repo = self.open_repo()
+        save = SqliteUserPokemonRepository._save_pokedex
+        saves = []
+
+        def save_then_fail(*args):
+            saves.append(args[1:])
+            if len(saves) > 1:
+                raise RuntimeError("boom")
+            save(*args)
+
+        # 尚无 user_pokedex 行：先推导保存（不得提前提交），再标记已捕获时失败，整个创建回滚
+        with patch.object(repo, "_derive_pokedex_ids", return_value={"caught": set(), "seen": {16}}), \
+                patch.object(SqliteUserPokemonRepository, "_save_pokedex", side_effect=save_then_fail):
+            with self.assertRaises(RuntimeError):
+                repo.create_user_pokemon("u1", self.make_pokemon())
+        self.assertEqual(len(saves), 2)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_pokemon").fetchone()[0], 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_pokedex").fetchone()[0], 0)
+        conn.close()
+
+    def test_concurrent_marks_are_merged(self):
+        create_migrated_db(self.db_path)
+        _, first = self.open_repo()
+        _, second = self.open_repo()
+        first.record_pokedex_seen("u1", 1)
+        self.assertEqual(second.get_user_pokedex_ids("u1")["seen"], {1})
+        # 各自的缓存都已过时：后写入的一方不会覆盖另一方的标记
+        first.record_pokedex_capture("u1", 25)
+        second.record_pokedex_seen("u1", 16)
+        _, restarted = self.open_repo()
+        self.assertEqual(restarted.get_user_pokedex_ids("u1"), {"caught": {25}, "seen": {1, 16, 25}})
+
+    def test_cache_is_bounded_and_cleared_on_rollback(self):
+        create_migrated_db(self.db_path)
+        state_cache = UserStateCache(max_users=2)
+        manager, repo = self.open_repo(state_cache)
+        for u in range(5):
+            repo.record_pokedex_capture(f"u{u}", 25)
+            repo.get_user_pokedex_ids(f"u{u}")
+        self.assertEqual(len(state_cache), 2)
+
+        repo.get_user_pokedex_ids("u0")
+        with manager.unit_of_work() as uow:
+            repo.record_pokedex_seen("u0", 16)
+            self.assertIn(16, repo.get_user_pokedex_ids("u0")["seen"])
+            uow.rollback()
+        # 回滚后不再返回未提交的标记
+        self.assertEqual(repo.get_user_pokedex_ids("u0"), {"caught": {25}, "seen": {25}})
+
+    def test_lookup_reads_only_the_bitmap_row(self):
+        """已有位图时，未命中缓存的查询也只读 user_pokedex 一行，不再扫描明细表（耗时对比见 __main__）"""
+        create_migrated_db(self.db_path)
+        fill_history(self.db_path, users=1, encounters_per_user=50)
+        _, repo = self.open_repo()
+        expected = repo.get_user_pokedex_ids("u0")
+
+        manager, restarted = self.open_repo()
+        statements = []
+        with patch.object(manager, '_count_statement', side_effect=statements.append):
+            self.assertEqual(restarted.get_user_pokedex_ids("u0"), expected)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("user_pokedex", statements[0])
+
+
+if __name__ == "__main__":
+    for n in (200, 2000, 10000):
+        derive_us, bitset_us = run_benchmark(encounters_per_user=n)
+        print(f"每位玩家 {n} 条遭遇记录: 明细推导 {derive_us:.1f} us/次, 图鉴位图 {bitset_us:.2f} us/次, 加速 {derive_us / bitset_us:.0f}x")
@@ -14,6 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 
 from astrbot_plugin_pokemon.core.services.world.adventure_service import AdventureService
 from astrbot_plugin_pokemon.core.models.pokemon_models import UserPokemonInfo, PokemonStats, PokemonIVs, PokemonEVs, PokemonMoves, PokemonSpecies
+from astrbot_plugin_pokemon.core.services.mechanics.stats_kernel import NEUTRAL_NATURE
 
 class TestPvPSystem(unittest.TestCase):
     def setUp(self):
@@ -35,6 +36,7 @@ class TestPvPSystem(unittest.TestCase):
         self.nature_service = MagicMock()
         self.pokemon_service.nature_service = self.nature_service
         self.nature_service.apply_nature_modifiers.side_effect = lambda stats, n_id: stats  # No modifier
+        self.nature_service.nature_multipliers.return_value = NEUTRAL_NATURE
 
         self.service = AdventureService(
             self.adventure_repo, self.pokemon_repo, self.team_repo,
@@ -0,0 +1,261 @@
+import sys
+import os
+import ast
+import importlib
+import re
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.tests._db_helpers import MIGRATIONS_PACKAGE, create_migrated_db
+
+REPOSITORIES_DIR = os.path.join(os.path.dirname(__file__), '..', 'infrastructure', 'repositories')
+INDEX_MIGRATION = "023_add_composite_user_indexes"
+
+# 行数随玩家数量增长的表：对这些表的全表扫描会随用户规模线性变慢
+USER_SCALED_TABLES = {
+    "users", "user_pokemon", "user_items", "user_team", "user_checkins", "user_battle_records", "user_badges",
+    "user_gym_state", "user_pokedex_capture_history", "battle_logs", "wild_pokemon", "wild_pokemon_encounter_log",
+    "trainer_encounters", "win_rate_cache", "pending_wild_encounters", "user_pokedex",
+}
+
+# 只追加、不清理的日志类表：单个玩家的行数也会无限增长，分页查询不能先排序再取页
+APPEND_ONLY_TABLES = {"battle_logs", "wild_pokemon_encounter_log", "user_battle_records", "trainer_encounters"}
+
+# 有意读取全表的语句及原因
+ALLOWED_FULL_SCANS = {
+    "SELECT * FROM users ORDER BY created_at DESC": "管理员列出全部用户，本身就需要读取全表",
+    "SELECT id, created_at FROM battle_logs ORDER BY id LIMIT ?":
+        "后台日志清理按 ID 从最旧的记录读取一批，读到未过期的记录即停止",
+    "SELECT user_id FROM battle_logs GROUP BY user_id HAVING COUNT(*) > ?":
+        "后台日志清理找出超出保留条数的玩家，只扫描覆盖索引",
+    "SELECT COUNT(*) FROM win_rate_cache": "后台维护统计持久化胜率缓存的行数，只扫描覆盖索引",
+    "DELETE FROM win_rate_cache WHERE rowid IN (SELECT rowid FROM win_rate_cache ORDER BY rowid LIMIT ?)":
+        "后台维护按 rowid 从最早写入的记录删除一批，读到 LIMIT 条即停止",
+}
+
+_STATEMENT = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b", re.IGNORECASE)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_KEYWORDS = {"on", "where", "join", "left", "inner", "cross", "order", "group", "limit", "set", "values", "using",
+             "union", "select", "and", "or", "as"}
+# f-string 中动态拼接的部分（IN 占位符、SET 子句等）依次尝试的替代写法
+_FSTRING_FILLERS = ("?", "id = ?", "id = :id")
+
+
+class _NullParams(dict):
+    """命名参数一律绑定 NULL（EXPLAIN 只关心执行计划）"""
+
+    def __missing__(self, key):
+        return None
+
+
+def extract_statements():
+    """静态提取 repositories 下所有 SQL 语句：返回 [(位置, 候选 SQL 列表)]"""
+    statements = []
+    for filename in sorted(os.listdir(REPOSITORIES_DIR)):
+        if not (filename.startswith("sqlite_") and filename.endswith(".py")):
+            continue
+        with open(os.path.join(REPOSITORIES_DIR, filename), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        fragments = {id(v) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for v in node.values}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in fragments:
+                candidates = [node.value]
+            elif isinstance(node, ast.JoinedStr):
+                candidates = ["".join(v.value if isinstance(v, ast.Constant) else filler for v in node.values)
+                              for filler in _FSTRING_FILLERS]
+            else:
+                continue
+            if _STATEMENT.match(candidates[0]):
+                statements.append((f"{filename}:{node.lineno}", candidates))
+    return statements
+
+
+def normalize(sql):
+    return " ".join(sql.split())
+
+
+def explain(conn, candidates):
+    """返回 (SQL, 执行计划明细列表)；所有候选都无法解析时返回 (None, 错误)"""
+    error = None
+    for sql in candidates:
+        body = re.sub(r"'[^']*'", "", sql)
+        params = _NullParams() if re.search(r":\w+", body) else [None] * body.count("?")
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            return sql, [row[3] for row in plan]
+        except sqlite3.Error as e:
+            error = e
+    return None, error
+
+
+def table_aliases(sql):
+    """语句中引用的 表名/别名 -> 表名"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def audit(conn):
+    """对所有语句执行 EXPLAIN QUERY PLAN，返回 (计划列表, 无法解析的语句)"""
+    plans, unexplained = [], []
+    for location, candidates in extract_statements():
+        sql, plan = explain(conn, candidates)
+        if sql is None:
+            # 纯 INSERT ... VALUES（如动态列名的插入）不涉及查询计划
+            if not (candidates[0].lstrip().upper().startswith("INSERT") and "SELECT" not in candidates[0].upper()):
+                unexplained.append((location, plan))
+            continue
+        plans.append((location, normalize(sql), plan, table_aliases(sql)))
+    return plans, unexplained
+
+
+def full_scans(plans):
+    """对 USER_SCALED_TABLES 的全表（或全索引）扫描"""
+    findings = []
+    for location, sql, plan, aliases in plans:
+        for detail in plan:
+            match = re.match(r"SCAN (\w+)", detail)
+            if match and aliases.get(match.group(1)) in USER_SCALED_TABLES and sql not in ALLOWED_FULL_SCANS:
+                findings.append(f"{location}: {detail} <- {sql[:120]}")
+    return findings
+
+
+def populate(conn, users=20, per_user=30):
+    """写入若干玩家及其宝可梦、遭遇记录、对战记录和图鉴历史"""
+    conn.execute("INSERT OR IGNORE INTO pokemon_species (id, name_en, name_zh) VALUES (1, 'bulbasaur', '妙蛙种子')")
+    conn.execute("INSERT OR IGNORE INTO locations (id, name) VALUES (1, '常青森林')")
+    for u in range(users):
+        user_id = f"user{u}"
+        conn.execute("INSERT INTO users (user_id, nickname) VALUES (?, ?)", (user_id, f"玩家{u}"))
+        conn.executemany(
+            "INSERT INTO user_pokemon (user_id, species_id, caught_time, isdel) VALUES (?, ?, ?, ?)",
+            [(user_id, i % 150 + 1, f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}", int(i % 10 == 0))
+             for i in range(per_user)])
+        conn.executemany(
+            "INSERT INTO wild_pokemon (species_id, name, gender, level) VALUES (?, 'wild', 'M', 5)",
+            [(i % 150 + 1,) for i in range(per_user)])
+        first_wild = conn.execute("SELECT MAX(id) FROM wild_pokemon").fetchone()[0] - per_user + 1
+        conn.executemany(
+            "INSERT INTO wild_pokemon_encounter_log (user_id, wild_pokemon_id, location_id, encounter_time) "
+            "VALUES (?, ?, 1, ?)",
+            [(user_id, first_wild + i, f"2025-01-01 01:{i // 60 % 60:02d}:{i % 60:02d}") for i in range(per_user)])
+        conn.executemany(
+            "INSERT INTO battle_logs (user_id, target_name, log_data, result, created_at) VALUES (?, '野生', '[]', 'win', ?)",
+            [(user_id, f"2025-01-01 02:{i // 60 % 60:02d}:{i % 60:02d}") for i in range(per_user)])
+        conn.executemany(
+            "INSERT OR IGNORE INTO user_pokedex_capture_history (user_id, species_id) VALUES (?, ?)",
+            [(user_id, i % 150 + 1) for i in range(per_user)])
+    conn.commit()
+
+
+# 基准使用的按用户查询（均为 repositories 中的原语句）
+BENCH_QUERIES = [
+    ("对战记录分页", "SELECT id, user_id, target_name, log_data, result, created_at FROM battle_logs "
+                "WHERE user_id = ? ORDER BY created_at DESC LIMIT 10 OFFSET 0"),
+    ("最近遭遇", "SELECT * FROM wild_pokemon_encounter_log WHERE user_id = ? AND isdel = 0 "
+             "ORDER BY encounter_time DESC LIMIT 1"),
+    ("图鉴已捕获", "SELECT DISTINCT species_id FROM user_pokemon WHERE user_id = ? AND isdel = 0"),
+    ("盒子分页", "SELECT up.*, ps.name_zh FROM user_pokemon up JOIN pokemon_species ps ON up.species_id = ps.id "
+             "WHERE up.user_id = ? ORDER BY up.caught_time DESC, up.id LIMIT 20 OFFSET 0"),
+]
+
+
+def run_benchmark(users=300, per_user=200, rounds=200):
+    """对比迁移 023 前后按用户查询的耗时(us/次)，返回 {查询名: (迁移前, 迁移后)}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = []
+        for skip in ((INDEX_MIGRATION,), ()):
+            path = os.path.join(tmp, f"bench{len(skip)}.db")
+            create_migrated_db(path, skip=skip)
+            conn = sqlite3.connect(path)
+            populate(conn, users=users, per_user=per_user)
+            timing = {}
+            for name, sql in BENCH_QUERIES:
+                start = time.perf_counter()
+                for i in range(rounds):
+                    conn.execute(sql, (f"user{i % users}",)).fetchall()
+                timing[name] = (time.perf_counter() - start) / rounds * 1e6
+            conn.close()
+            timings.append(timing)
+        for name, _ in BENCH_QUERIES:
+            results[name] = (timings[0][name], timings[1][name])
+    return results
+
+
+class TestQueryPlans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmp.name, "fixture.db")
+        create_migrated_db(cls.db_path)
+        cls.conn = sqlite3.connect(cls.db_path)
+        populate(cls.conn)
+        cls.plans, cls.unexplained = audit(cls.conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        cls.tmp.cleanup()
+
+    def plan_of(self, fragment):
+        matches = [plan for _, sql, plan, _ in self.plans if fragment in sql]
+        self.assertTrue(matches, f"未找到语句: {fragment}")
+        return matches[0]
+
+    def test_every_statement_is_explained(self):
+        self.assertGreater(len(self.plans), 80)
+        self.assertEqual(self.unexplained, [])
+
+    def test_no_full_scans_of_user_scaled_tables(self):
+        self.assertEqual(full_scans(self.plans), [])
+
+    def test_paginated_log_queries_do_not_sort_every_row(self):
+        """日志类表带 LIMIT 的查询不能在取一页之前对该玩家的全部记录排序"""
+        offenders = []
+        for location, sql, plan, aliases in self.plans:
+            if " LIMIT " in f" {sql} " and set(aliases.values()) & APPEND_ONLY_TABLES \
+                    and "USE TEMP B-TREE FOR ORDER BY" in plan:
+                offenders.append(f"{location}: {sql[:120]}")
+        self.assertEqual(offenders, [])
+
+    def test_composite_indexes_are_used(self):
+        self.assertIn("idx_battle_logs_user_created",
+                      " ".join(self.plan_of("FROM battle_logs WHERE user_id = ? ORDER BY created_at DESC")))
+        self.assertIn("idx_wild_encounter_user_time",
+                      " ".join(self.plan_of("WHERE user_id = ? AND isdel = 0 ORDER BY encounter_time DESC LIMIT 1")))
+        self.assertIn("COVERING INDEX idx_user_pokemon_user_isdel_species",
+                      " ".join(self.plan_of("SELECT DISTINCT species_id FROM user_pokemon")))
+        self.assertIn("COVERING INDEX idx_user_pokedex_capture_user_isdel_species",
+                      " ".join(self.plan_of("SELECT DISTINCT species_id FROM user_pokedex_capture_history")))
+
+    def test_audit_detects_missing_index(self):
+        """去掉迁移 023 后，审计应能发现对战记录的全表扫描"""
+        migration = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{INDEX_MIGRATION}")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "old.db")
+            create_migrated_db(path)
+            conn = sqlite3.connect(path)
+            migration.down(conn.cursor())
+            plans, _ = audit(conn)
+            conn.close()
+        self.assertTrue(any("SCAN battle_logs" in finding for finding in full_scans(plans)))
+
+
+if __name__ == "__main__":
+    for query, (before, after) in run_benchmark().items():
+        print(f"{query}: 迁移前 {before:.1f} us/次, 迁移后 {after:.1f} us/次, 加速 {before / after:.1f}x")
@@ -0,0 +1,173 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.seed_database import (
+    DEFAULT_CSV_DIR, DEFAULT_SEED_PATH, SEED_TABLES, apply_seed_database, build_seed_database,
+    checksum_path, file_sha256, source_sha256, verify_seed_database
+)
+from astrbot_plugin_pokemon.tests._db_helpers import latest_version, run_migrations
+
+SEED = """
+INSERT INTO pokemon_types (id, name_en, name_zh) VALUES (1, 'grass', '草'), (3, 'fire', '火');
+INSERT INTO pokemon_species (id, name_en, name_zh, base_hp) VALUES (1, 'bulbasaur', '妙蛙种子', 45), (4, 'charmander', '小火龙', 39);
+INSERT INTO items (id, name_en, name_zh) VALUES (4, 'poke-ball', '精灵球');
+"""
+
+
+def create_migrated_db(path):
+    """按顺序执行全部迁移脚本，得到与首次启动相同的空库"""
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE schema_version (version INTEGER NOT NULL PRIMARY KEY)")
+        conn.execute("INSERT INTO schema_version VALUES (?)", (latest_version(),))
+        run_migrations(conn)
+    conn.close()
+
+
+def write_csvs(csv_dir, names, content="id\n1\n"):
+    os.makedirs(csv_dir, exist_ok=True)
+    for name in names:
+        with open(os.path.join(csv_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def run_benchmark():
+    """对比首次启动时从 CSV 导入与从随插件发布的种子库导入的耗时(ms)"""
+    from astrbot_plugin_pokemon.core.services.system.data_setup_service import DataSetupService
+    from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_ability_repo import SqliteAbilityRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_adventure_repo import SqliteAdventureRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_item_repo import SqliteItemRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_move_repo import SqliteMoveRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_nature_repo import SqliteNatureRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_pokemon_ability_repo import SqlitePokemonAbilityRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_pokemon_repo import SqlitePokemonRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_shop_repo import SqliteShopRepository
+    from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_trainer_repo import SqliteTrainerRepository
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_db, seed_db = os.path.join(tmp, "csv.db"), os.path.join(tmp, "seed.db")
+        create_migrated_db(csv_db)
+        create_migrated_db(seed_db)
+
+        manager = SqliteConnectionManager(csv_db)
+        repos = [cls(csv_db, manager) for cls in (
+            SqlitePokemonRepository, SqliteAdventureRepository, SqliteShopRepository, SqliteMoveRepository,
+            SqliteItemRepository, SqliteNatureRepository, SqliteTrainerRepository, SqliteAbilityRepository,
+            SqlitePokemonAbilityRepository)]
+        start = time.perf_counter()
+        DataSetupService(*repos, manager).setup_initial_data()
+        csv_ms = (time.perf_counter() - start) * 1000
+        manager.close_all()
+
+        start = time.perf_counter()
+        apply_seed_database(seed_db)
+        seed_ms = (time.perf_counter() - start) * 1000
+    return csv_ms, seed_ms
+
+
+class TestSeedDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_dir = os.path.join(self.tmp.name, "csv")
+        self.source_db = os.path.join(self.tmp.name, "source.db")
+        self.seed_path = os.path.join(self.tmp.name, "seed", "pokemon_seed.db")
+        self.game_db = os.path.join(self.tmp.name, "game.db")
+        create_migrated_db(self.source_db)
+        with sqlite3.connect(self.source_db) as conn:
+            conn.executescript(SEED)
+        conn.close()
+        write_csvs(self.csv_dir, ["pokemon_species.csv", "pokemon_types.csv", "items.csv"])
+        create_migrated_db(self.game_db)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def query(self, sql):
+        with sqlite3.connect(self.game_db) as conn:
+            result = conn.execute(sql).fetchall()
+        conn.close()
+        return result
+
+    def test_build_only_includes_tables_with_csv(self):
+        counts = build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+        self.assertEqual(counts, {"pokemon_species": 2, "pokemon_types": 2, "items": 1})
+        self.assertIsNone(verify_seed_database(self.seed_path))
+
+    def test_apply_copies_then_skips_unchanged(self):
+        build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+        with sqlite3.connect(self.game_db) as conn:
+            conn.execute("INSERT INTO users (user_id, nickname) VALUES ('u1', '小智')")
+        conn.close()
+
+        self.assertEqual(apply_seed_database(self.game_db, self.seed_path),
+                         {"pokemon_species": 2, "pokemon_types": 2, "items": 1})
+        self.assertEqual(self.query("SELECT name_zh FROM pokemon_species ORDER BY id"), [("妙蛙种子",), ("小火龙",)])
+        self.assertEqual(len(self.query("SELECT * FROM seed_manifest")), 3)
+        # 已是最新：不再复制
+        self.assertEqual(apply_seed_database(self.game_db, self.seed_path), {})
+        # 用户数据不受影响
+        self.assertEqual(self.query("SELECT nickname FROM users"), [("小智",)])
+
+    def test_only_changed_tables_are_replaced(self):
+        build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+        apply_seed_database(self.game_db, self.seed_path)
+
+        write_csvs(self.csv_dir, ["items.csv"], content="id\n1\n2\n")
+        with sqlite3.connect(self.source_db) as conn:
+            conn.execute("INSERT INTO items (id, name_en, name_zh) VALUES (17, 'potion', '伤药')")
+        conn.close()
+        build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+
+        self.assertEqual(apply_seed_database(self.game_db, self.seed_path), {"items": 2})
+        self.assertEqual(self.query("SELECT id FROM items ORDER BY id"), [(4,), (17,)])
+
+    def test_emptied_table_is_restored(self):
+        build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+        apply_seed_database(self.game_db, self.seed_path)
+        with sqlite3.connect(self.game_db) as conn:
+            conn.execute("DELETE FROM pokemon_types")
+        conn.close()
+        self.assertEqual(apply_seed_database(self.game_db, self.seed_path), {"pokemon_types": 2})
+
+    def test_corrupted_or_missing_seed_is_rejected(self):
+        self.assertIsNotNone(verify_seed_database(self.seed_path))
+        self.assertIsNone(apply_seed_database(self.game_db, self.seed_path))
+
+        build_seed_database(self.source_db, self.csv_dir, self.seed_path)
+        with open(self.seed_path, "r+b") as f:
+            f.seek(200)
+            f.write(b"\x00\x01\x02")
+        self.assertEqual(verify_seed_database(self.seed_path), "校验值不匹配")
+        self.assertIsNone(apply_seed_database(self.game_db, self.seed_path))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM pokemon_species"), [(0,)])
+
+    def test_shipped_seed_matches_csvs(self):
+        """随插件发布的种子库必须通过校验，且与当前 CSV 及导入规则一致（修改后需重新构建种子库）"""
+        self.assertIsNone(verify_seed_database(DEFAULT_SEED_PATH))
+        with open(checksum_path(DEFAULT_SEED_PATH), encoding="utf-8") as f:
+            self.assertEqual(f.read().split()[0], file_sha256(DEFAULT_SEED_PATH))
+        conn = sqlite3.connect(DEFAULT_SEED_PATH)
+        manifest = dict(conn.execute("SELECT csv_name, csv_sha256 FROM seed_manifest").fetchall())
+        conn.close()
+        self.assertEqual(set(manifest), {csv_name for _, csv_name in SEED_TABLES})
+        for csv_name, sha256 in manifest.items():
+            with self.subTest(csv=csv_name):
+                self.assertEqual(source_sha256(DEFAULT_CSV_DIR, csv_name), sha256)
+
+
+if __name__ == "__main__":
+    csv_ms, seed_ms = run_benchmark()
+    print(f"首次启动静态数据导入: CSV {csv_ms:.0f} ms, 种子库 {seed_ms:.0f} ms, 加速 {csv_ms / seed_ms:.1f}x")
@@ -0,0 +1,145 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleLogic
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import (
+    InProcessSimulationExecutor, ProcessPoolSimulationExecutor, PokemonSnapshot, pack_context, unpack_context
+)
+from astrbot_plugin_pokemon.core.services.battle.win_rate_estimator import AdaptiveWinRateEstimator, DEFAULT_BATCH_SIZE
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def create_context(name, hp=120, attack=60, speed=60, types=None):
+    pokemon = PokemonSnapshot(id=1, name=name, species_id=19, level=30,
+                              stats=PokemonStats(hp=hp, attack=attack, defense=60, sp_attack=60, sp_defense=60, speed=speed))
+    moves = [
+        BattleMoveInfo(power=40, accuracy=100, type_name="一般", damage_class_id=2, priority=0,
+                       type_effectiveness=1.0, stab_bonus=1.0, max_pp=35, current_pp=35, move_id=33, move_name="撞击"),
+        BattleMoveInfo(power=0, accuracy=100, type_name="一般", damage_class_id=1, priority=0,
+                       type_effectiveness=1.0, stab_bonus=1.0, max_pp=30, current_pp=30, move_id=14, move_name="剑舞",
+                       stat_changes=[{'stat_id': 2, 'change': 2}], target_id=7, meta_category_id=2),
+    ]
+    return BattleContext(pokemon=pokemon, moves=moves, types=types or ["一般"], current_hp=hp, is_user=True,
+                         stat_levels={2: 1}, non_volatile_status=4, status_turns=0, volatile_statuses={})
+
+
+class TestSimulationExecutor(unittest.TestCase):
+    def test_pack_roundtrip(self):
+        ctx = create_context("Rattata")
+        restored = unpack_context(pack_context(ctx))
+
+        self.assertEqual(restored.pokemon, ctx.pokemon)
+        self.assertEqual(restored.moves, ctx.moves)
+        self.assertEqual(restored.types, ctx.types)
+        self.assertEqual(restored.stat_levels, {2: 1})
+        self.assertEqual(restored.non_volatile_status, 4)
+        # 解包结果与原对象互不影响
+        restored.moves[0].current_pp = 0
+        self.assertEqual(ctx.moves[0].current_pp, 35)
+
+    def test_fallback_when_pool_unavailable(self):
+        fallback = MagicMock()
+        fallback.count_user_wins.return_value = 42
+        executor = ProcessPoolSimulationExecutor(2, fallback=fallback, start_method="no-such-method")
+
+        self.assertFalse(executor.is_pool_active)
+        user_ctx, wild_ctx = create_context("A"), create_context("B")
+        self.assertEqual(executor.count_user_wins(user_ctx, wild_ctx, 100), 42)
+        fallback.count_user_wins.assert_called_once_with(user_ctx, wild_ctx, 100)
+
+    def test_process_pool_matches_in_process_contract(self):
+        executor = ProcessPoolSimulationExecutor(
+            2, fallback=InProcessSimulationExecutor(BattleLogic()), start_method="fork")
+        try:
+            self.assertTrue(executor.is_pool_active)
+            user_ctx = create_context("Strong", hp=200, attack=120, speed=90)
+            wild_ctx = create_context("Weak", hp=40, attack=20, speed=20)
+
+            wins = executor.count_user_wins(user_ctx, wild_ctx, 120)
+            self.assertTrue(0 <= wins <= 120)
+            self.assertTrue(executor.is_pool_active)
+
+            result, logs, wild_hp, user_hp = executor.run_real_battle(user_ctx, wild_ctx)
+            self.assertIn(result, ("win", "fail"))
+            self.assertTrue(logs)
+            # 工作进程的结算结果应同步回调用方的上下文
+            self.assertEqual(user_ctx.current_hp, user_hp)
+            self.assertEqual(wild_ctx.current_hp, wild_hp)
+            self.assertLessEqual(sum(m.current_pp for m in user_ctx.moves), 65)
+        finally:
+            executor.shutdown()
+        self.assertFalse(executor.is_pool_active)
+
+    def test_default_estimator_batches_use_every_worker(self):
+        for workers in (2, 4, 8):
+            executor = ProcessPoolSimulationExecutor(
+                workers, fallback=InProcessSimulationExecutor(BattleLogic()), start_method="fork")
+            try:
+                estimator = AdaptiveWinRateEstimator.from_config({}, batch_size=executor.batch_size_for(DEFAULT_BATCH_SIZE))
+                chunk_counts = set()
+                submit = executor._pool.submit
+                executor._pool.submit = lambda fn, *args: (chunk_counts.add(args[-1]), submit(fn, *args))[1]
+                user_ctx, wild_ctx = create_context("A"), create_context("B")
+                estimate = estimator.estimate(lambda n: executor.count_user_wins(user_ctx, wild_ctx, n))
+
+                self.assertGreaterEqual(estimate.simulations, estimator.min_simulations)
+                # 默认配置下每批都切分为与工作进程数相同的分片
+                self.assertEqual(len(executor._split_simulations(estimator.batch_size)), workers)
+                self.assertTrue(chunk_counts and max(chunk_counts) <= estimator.batch_size // 2)
+            finally:
+                executor.shutdown()
+
+        in_process = InProcessSimulationExecutor(BattleLogic())
+        self.assertEqual(in_process.batch_size_for(DEFAULT_BATCH_SIZE), DEFAULT_BATCH_SIZE)
+
+    def test_async_interface_does_not_block_event_loop(self):
+        executor = ProcessPoolSimulationExecutor(
+            2, fallback=InProcessSimulationExecutor(BattleLogic()), start_method="fork")
+
+        async def scenario():
+            user_ctx = create_context("Strong", hp=200, attack=120, speed=90)
+            wild_ctx = create_context("Weak", hp=40, attack=20, speed=20)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.ensure_future(ticker())
+            wins = await executor.count_user_wins_async(user_ctx, wild_ctx, 200)
+            result, logs, wild_hp, user_hp = await executor.run_real_battle_async(user_ctx, wild_ctx, seed=5)
+            task.cancel()
+            return wins, result, user_ctx.current_hp == user_hp, ticks
+
+        try:
+            wins, result, committed, ticks = asyncio.run(scenario())
+            self.assertTrue(0 <= wins <= 200)
+            self.assertIn(result, ("win", "fail"))
+            self.assertTrue(committed)
+            self.assertGreater(ticks, 0)   # 等待工作进程期间事件循环仍在调度其他任务
+            self.assertTrue(executor.is_pool_active)
+        finally:
+            executor.shutdown()
+
+        estimate = asyncio.run(AdaptiveWinRateEstimator().estimate_async(
+            lambda n: InProcessSimulationExecutor(BattleLogic()).count_user_wins_async(
+                create_context("A"), create_context("B"), n)))
+        self.assertGreaterEqual(estimate.simulations, 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleState, BattleLogic, NoOpBattleLogger
+from astrbot_plugin_pokemon.core.services.battle.hook_manager import BattleHook
+from astrbot_plugin_pokemon.core.services.battle.weather_service import WeatherService
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def create_state(types=None):
+    poke = MagicMock()
+    poke.name = "TestPoke"
+    poke.level = 50
+    poke.ability_id = None
+    poke.held_item_id = None
+    poke.stats = PokemonStats(hp=100, attack=100, defense=100, sp_attack=100, sp_defense=100, speed=100)
+    ctx = BattleContext(pokemon=poke, moves=[], types=types or ["岩石"], current_hp=100, is_user=True,
+                        stat_levels={}, volatile_statuses={})
+    return BattleState.from_context(ctx)
+
+
+class TestModifiedStatsCache(unittest.TestCase):
+    def setUp(self):
+        self.logic = BattleLogic()
+        self.state = create_state()
+
+    def test_repeated_reads_hit_cache(self):
+        first = self.logic._get_modified_stats(self.state)
+        for _ in range(5):
+            self.assertIs(self.logic._get_modified_stats(self.state), first)
+        stats = self.logic.get_stat_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (5, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 83.3)
+
+    def test_invalidated_by_stat_stages_status_and_weather(self):
+        self.assertEqual(self.logic._get_modified_stats(self.state).attack, 100)
+
+        # 原地修改能力等级
+        self.state.stat_levels[2] = 2
+        self.assertEqual(self.logic._get_modified_stats(self.state).attack, 200)
+
+        # 施加灼伤（状态插件注册钩子）
+        self.state.apply_status(4)
+        self.assertEqual(self.logic._get_modified_stats(self.state).attack, 100)
+
+        # 天气改变场域钩子
+        self.assertEqual(self.logic._get_modified_stats(self.state).sp_defense, 100)
+        WeatherService.apply_sandstorm(self.logic, NoOpBattleLogger())
+        self.assertEqual(self.logic._get_modified_stats(self.state).sp_defense, 150)
+        self.logic._clear_weather(NoOpBattleLogger())
+        self.assertEqual(self.logic._get_modified_stats(self.state).sp_defense, 100)
+
+    def test_one_shot_stat_hook_applies_once(self):
+        def double_speed(stats):
+            stats.speed *= 2
+            return stats
+
+        self.state.hooks.register("on_stat_calc", BattleHook("once", 1, double_speed, persistent=False))
+        self.assertEqual(self.logic._get_modified_stats(self.state).speed, 200)
+        self.assertEqual(self.logic._get_modified_stats(self.state).speed, 100)
+
+    def test_clone_does_not_reuse_prototype_cache(self):
+        self.logic._get_modified_stats(self.state)
+        clone = self.state.clone()
+        clone.apply_status(1)  # 麻痹：速度减半
+        self.assertEqual(self.logic._get_modified_stats(clone).speed, 50)
+        self.assertEqual(self.logic._get_modified_stats(self.state).speed, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.services.mechanics import stats_kernel as kernel
+from astrbot_plugin_pokemon.core.services.mechanics.exp_service import ExpService
+from astrbot_plugin_pokemon.core.services.mechanics.evolution_service import EvolutionService
+from astrbot_plugin_pokemon.core.services.mechanics.nature_service import NatureService
+from astrbot_plugin_pokemon.core.models.pokemon_models import (
+    PokemonSpecies, PokemonBaseStats, PokemonStats, PokemonIVs, PokemonEVs)
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+# 与 natures 表一致的 25 种性格：(ID, 提升的 stat_id, 降低的 stat_id)，ID 1/7/13/19/25 为平衡性格
+NATURES = [{"id": 5 * up + down + 1, "increased_stat_id": up + 2, "decreased_stat_id": down + 2}
+           for up in range(5) for down in range(5)]
+STAT_ID_MAP = {2: "attack", 3: "defense", 4: "sp_attack", 5: "sp_defense", 6: "speed"}
+
+
+def make_nature_service():
+    nature_repo = MagicMock()
+    nature_repo.get_all_natures.return_value = NATURES
+    nature_repo.get_nature_by_id.side_effect = lambda nature_id: next((n for n in NATURES if n["id"] == nature_id), None)
+    return NatureService(nature_repo)
+
+
+def legacy_stats(base, ivs, evs, level, nature_id):
+    """统一之前各处的写法：逐项 int(.../100) 计算后按 get_nature_by_id 的结果依次乘 1.1、0.9"""
+    def calc(b, i, e, is_hp=False):
+        res = (b * 2 + i + e // 4) * level / 100
+        return int(res) + level + 10 if is_hp else int(res) + 5
+
+    stats = PokemonStats(*(calc(base[k], ivs[k], evs[k], is_hp=(k == 0)) for k in range(6)))
+    nature = None if nature_id in NatureService.BALANCED_NATURE_IDS else \
+        next((n for n in NATURES if n["id"] == nature_id), None)
+    if nature:
+        name = STAT_ID_MAP[nature["increased_stat_id"]]
+        setattr(stats, name, int(getattr(stats, name) * 1.1))
+        name = STAT_ID_MAP[nature["decreased_stat_id"]]
+        setattr(stats, name, max(1, int(getattr(stats, name) * 0.9)))
+    return kernel.stats_row(stats)
+
+
+def random_pokemon(rng, n):
+    """随机 (种族值, IV, EV, 等级, 性格ID)，性格含未知ID"""
+    return [([rng.randint(1, 255) for _ in range(6)], [rng.randint(0, 31) for _ in range(6)],
+             [rng.randint(0, 252) for _ in range(6)], rng.randint(1, 100), rng.randint(0, 27))
+            for _ in range(n)]
+
+
+def run_benchmark(n=5000, seed=1):
+    """对比逐只标量计算与向量化批量计算 n 只宝可梦的属性：返回两者每只的耗时(us)"""
+    nature_service = make_nature_service()
+    samples = random_pokemon(random.Random(seed), n)
+    natures = [nature_service.nature_multipliers(nature_id) for *_, nature_id in samples]
+
+    start = time.perf_counter()
+    for (base, ivs, evs, level, _), nature in zip(samples, natures):
+        kernel.calculate_stats(base, ivs, evs, level, nature)
+    scalar_us = (time.perf_counter() - start) / n * 1e6
+
+    start = time.perf_counter()
+    kernel.calculate_stats_batch([s[0] for s in samples], [s[1] for s in samples], [s[2] for s in samples],
+                                 [s[3] for s in samples], natures)
+    batch_us = (time.perf_counter() - start) / n * 1e6
+    return scalar_us, batch_us
+
+
+class TestStatsKernel(unittest.TestCase):
+    def setUp(self):
+        self.nature_service = make_nature_service()
+
+    def test_nature_table(self):
+        self.nature_service.nature_multipliers(1)
+        table = self.nature_service._nature_table
+        self.assertEqual(len(table), 25)
+        self.assertTrue(all(len(row) == 6 and row[0] == 1.0 for row in table))
+        for nature_id in NatureService.BALANCED_NATURE_IDS | {0, 26, None}:
+            self.assertEqual(self.nature_service.nature_multipliers(nature_id), kernel.NEUTRAL_NATURE)
+        self.assertEqual(self.nature_service.nature_multipliers(2), (1.0, 1.1, 0.9, 1.0, 1.0, 1.0))
+        self.assertEqual(self.nature_service.nature_repo.get_all_natures.call_count, 1)
+
+    def test_scalar_matches_legacy_formulas(self):
+        for base, ivs, evs, level, nature_id in random_pokemon(random.Random(11), 3000):
+            expected = legacy_stats(base, ivs, evs, level, nature_id)
+            self.assertEqual(kernel.calculate_stats(base, ivs, evs, level, self.nature_service.nature_multipliers(nature_id)),
+                             expected)
+            stats = PokemonStats(*kernel.calculate_stats(base, ivs, evs, level))
+            self.assertEqual(kernel.stats_row(self.nature_service.apply_nature_modifiers(stats, nature_id)), expected)
+
+    def test_batch_matches_scalar(self):
+        samples = random_pokemon(random.Random(12), 2000)
+        args = ([s[0] for s in samples], [s[1] for s in samples], [s[2] for s in samples], [s[3] for s in samples],
+                [self.nature_service.nature_multipliers(s[4]) for s in samples])
+        expected = [legacy_stats(*s) for s in samples]
+        self.assertEqual(kernel.calculate_stats_batch(*args), expected)
+        with patch.object(kernel, "np", None):   # numpy 缺失时逐只回退
+            self.assertEqual(kernel.calculate_stats_batch(*args), expected)
+        self.assertEqual(kernel.calculate_stats_batch(*(column[:3] for column in args)), expected[:3])   # 小批量逐只计算
+        self.assertEqual(kernel.calculate_stats_batch([], [], [], [], []), [])
+
+    def test_service_call_sites_use_kernel(self):
+        base = PokemonBaseStats(80, 82, 83, 100, 100, 80)
+        ivs = PokemonIVs(31, 0, 15, 31, 7, 20)
+        evs = PokemonEVs(252, 0, 4, 252, 0, 2)
+        expected = legacy_stats(kernel.base_stats_row(base), kernel.ivs_row(ivs), kernel.evs_row(evs), 57, 4)
+
+        evolution_service = EvolutionService(MagicMock(), MagicMock(), self.nature_service)
+        self.assertEqual(kernel.stats_row(evolution_service._calculate_new_stats(base, ivs, evs, 57, 4)), expected)
+
+        exp_service = ExpService(MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(), {}, self.nature_service)
+        species = PokemonSpecies(3, "venusaur", "妙蛙花", 1, base, 2.0, 100.0, "")
+        pokemon = MagicMock(ivs=ivs, evs=evs, nature_id=4)
+        self.assertEqual(kernel.stats_row(exp_service._calculate_pokemon_stats(species, pokemon, 57)), expected)
+        self.assertEqual([kernel.stats_row(s) for s in exp_service._calculate_pokemon_stats_many([(species, pokemon, 57)] * 3)],
+                         [expected] * 3)
+
+    def test_recalculate_whole_box(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "box.db")
+            rng = random.Random(13)
+            samples = random_pokemon(rng, 40)
+            with sqlite3.connect(path) as conn:
+                run_migrations(conn)
+                conn.execute("INSERT INTO users (user_id, nickname) VALUES ('u1', '小智')")
+                conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (25, 'pikachu', '皮卡丘')")
+                for _, ivs, evs, level, nature_id in samples:
+                    conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender, nature_id, "
+                                 "hp_iv, attack_iv, defense_iv, sp_attack_iv, sp_defense_iv, speed_iv, "
+                                 "hp_ev, attack_ev, defense_ev, sp_attack_ev, sp_defense_ev, speed_ev, current_hp) "
+                                 "VALUES ('u1', 25, 'x', ?, 0, 'M', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 7)",
+                                 (level, nature_id, *ivs, *evs))
+            conn.close()
+
+            base = PokemonBaseStats(35, 55, 40, 50, 50, 90)
+            pokemon_repo = MagicMock()
+            pokemon_repo.get_pokemon_by_id.return_value = PokemonSpecies(25, "pikachu", "皮卡丘", 1, base, 0.4, 6.0, "")
+            manager = SqliteConnectionManager(path)
+            service = ExpService(MagicMock(), pokemon_repo, MagicMock(), MagicMock(),
+                                 SqliteUserPokemonRepository(path, manager), {}, self.nature_service)
+            self.assertEqual(service.recalculate_user_pokemon_stats("u1"), 40)
+            self.assertEqual(service.recalculate_user_pokemon_stats("nobody"), 0)
+            self.assertEqual(pokemon_repo.get_pokemon_by_id.call_count, 1)   # 同一物种只查询一次
+            manager.close_all()
+
+            with sqlite3.connect(path) as conn:
+                rows = conn.execute("SELECT hp, attack, defense, sp_attack, sp_defense, speed, current_hp "
+                                    "FROM user_pokemon ORDER BY id").fetchall()
+            conn.close()
+            expected = [legacy_stats(kernel.base_stats_row(base), ivs, evs, level, nature_id)
+                        for _, ivs, evs, level, nature_id in samples]
+            self.assertEqual([row[:6] for row in rows], expected)
+            self.assertTrue(all(row[6] == 7 for row in rows))   # 当前HP不变
+
+    @unittest.skipIf(kernel.np is None, "numpy 不可用")
+    def test_large_batch_is_vectorized(self):
+        """达到 BATCH_MIN_ROWS 的批量一次向量化计算，小批量才逐只回退（耗时对比见 __main__）"""
+        samples = random_pokemon(random.Random(14), kernel.BATCH_MIN_ROWS)
+        args = ([s[0] for s in samples], [s[1] for s in samples], [s[2] for s in samples], [s[3] for s in samples],
+                [self.nature_service.nature_multipliers(s[4]) for s in samples])
+        with patch.object(kernel, "calculate_stats", wraps=kernel.calculate_stats) as scalar:
+            kernel.calculate_stats_batch(*args)
+            scalar.assert_not_called()
+            kernel.calculate_stats_batch(*(column[:-1] for column in args))
+            self.assertEqual(scalar.call_count, kernel.BATCH_MIN_ROWS - 1)
+
+
+if __name__ == "__main__":
+    for n in (6, 16, 100, 5000):
+        scalar_us, batch_us = run_benchmark(n=n)
+        print(f"{n} 只宝可梦: 逐只计算 {scalar_us:.2f} us/只, 向量化批量 {batch_us:.2f} us/只")
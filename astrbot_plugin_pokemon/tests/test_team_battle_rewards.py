@@ -0,0 +1,204 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.services.mechanics.exp_service import ExpService
+from astrbot_plugin_pokemon.core.services.mechanics.nature_service import NatureService
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonSpecies, PokemonBaseStats
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+SPECIES = {
+    25: PokemonSpecies(25, "pikachu", "皮卡丘", 1, PokemonBaseStats(35, 55, 40, 50, 50, 90), 0.4, 6.0, "", growth_rate_id=2),
+    1: PokemonSpecies(1, "bulbasaur", "妙蛙种子", 1, PokemonBaseStats(45, 49, 49, 65, 65, 45), 0.7, 6.9, "", growth_rate_id=4),
+    129: PokemonSpecies(129, "magikarp", "鲤鱼王", 1, PokemonBaseStats(20, 10, 55, 15, 20, 80), 0.9, 10.0, "", growth_rate_id=1),
+}
+# (物种, 等级, 经验, 六项EV, 性格)：接近升级、一次升多级、EV 接近上限、满级
+TEAM = [
+    (25, 10, 1300, (0, 0, 0, 0, 0, 0), 2),
+    (1, 5, 130, (10, 20, 0, 0, 0, 0), 1),
+    (129, 20, 9999, (252, 252, 0, 0, 0, 4), 3),
+    (25, 99, 970000, (0, 0, 0, 0, 0, 0), 4),
+    (1, 30, 21000, (100, 0, 100, 0, 100, 0), 5),
+    (25, 100, 1000000, (6, 0, 0, 0, 0, 0), 2),
+]
+STAT_COLUMNS = ("level", "exp", "hp_ev", "attack_ev", "defense_ev", "sp_attack_ev", "sp_defense_ev", "speed_ev",
+                "hp", "attack", "defense", "sp_attack", "sp_defense", "speed")
+
+
+def create_migrated_db(path):
+    """按顺序执行全部迁移脚本，写入物种与玩家 u1 的 6 只宝可梦，返回宝可梦ID列表"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn)
+        conn.execute("INSERT INTO users (user_id, nickname) VALUES ('u1', '小智')")
+        for species in SPECIES.values():
+            conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (?, ?, ?)",
+                         (species.id, species.name_en, species.name_zh))
+        ids = [conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender, nature_id, "
+                            "hp_iv, attack_iv, defense_iv, sp_attack_iv, sp_defense_iv, speed_iv, "
+                            "hp_ev, attack_ev, defense_ev, sp_attack_ev, sp_defense_ev, speed_ev) "
+                            "VALUES ('u1', ?, NULL, ?, ?, 'M', ?, 31, 20, 15, 10, 5, 0, ?, ?, ?, ?, ?, ?)",
+                            (species_id, level, exp, nature_id, *evs)).lastrowid
+               for species_id, level, exp, evs, nature_id in TEAM]
+    conn.close()
+    return ids
+
+
+def make_service(path, manager):
+    pokemon_repo = MagicMock()
+    pokemon_repo.get_pokemon_by_id.side_effect = SPECIES.get
+    pokemon_repo.get_pokemon_evolutions.return_value = []
+    move_repo = MagicMock()
+    move_repo.get_level_up_moves.return_value = []
+    move_repo.get_moves_learned_in_level_range.return_value = []
+    nature_repo = MagicMock()
+    nature_repo.get_all_natures.return_value = [
+        {"id": nature_id, "increased_stat_id": 2 + nature_id % 5, "decreased_stat_id": 2 + (nature_id + 2) % 5}
+        for nature_id in range(1, 26)]
+    return ExpService(MagicMock(), pokemon_repo, MagicMock(), move_repo,
+                      SqliteUserPokemonRepository(path, manager), {}, NatureService(nature_repo))
+
+
+def legacy_update(service, user_id, pokemon_id, exp_gained, ev_gained):
+    """批量化之前 update_pokemon_after_battle 的逐只处理顺序：EV、属性、逐级循环升级、再按新等级计算属性"""
+    pokemon_data = service.user_pokemon_repo.get_user_pokemon_by_id(user_id, pokemon_id)
+    service._update_pokemon_ev(user_id, pokemon_id, ev_gained)
+    service._calculate_and_update_pokemon_stats(pokemon_id, pokemon_data.species_id, pokemon_data.level, user_id)
+    growth_rate_id = SPECIES[pokemon_data.species_id].growth_rate_id
+    total_exp = pokemon_data.exp + exp_gained
+    new_level = pokemon_data.level
+    while new_level < 100 and total_exp >= service.get_required_exp_for_level(new_level + 1, growth_rate_id):
+        new_level += 1
+    service.user_pokemon_repo._update_user_pokemon_fields(user_id, pokemon_id, level=new_level, exp=total_exp)
+    if new_level > pokemon_data.level:
+        service._calculate_and_update_pokemon_stats(pokemon_id, pokemon_data.species_id, new_level, user_id)
+    return new_level
+
+
+def read_rows(path, ids):
+    with sqlite3.connect(path) as conn:
+        rows = [conn.execute(f"SELECT {', '.join(STAT_COLUMNS)} FROM user_pokemon WHERE id = ?", (pid,)).fetchone()
+                for pid in ids]
+    conn.close()
+    return rows
+
+
+def run_benchmark(rounds=100, exp_gained=500):
+    """对比逐只更新与批量更新 6 只队伍：返回 {模式: (每场耗时ms, 每场执行的SQL语句数)}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("legacy", "batch"):
+            path = os.path.join(tmp, f"{mode}.db")
+            ids = create_migrated_db(path)
+            manager = SqliteConnectionManager(path)
+            service = make_service(path, manager)
+            before = manager.statements_executed
+            start = time.perf_counter()
+            for _ in range(rounds):
+                ev_gained = {"hp_ev": 0, "attack_ev": 1, "defense_ev": 0, "sp_attack_ev": 0, "sp_defense_ev": 0, "speed_ev": 1}
+                if mode == "legacy":
+                    for pid in ids:
+                        legacy_update(service, "u1", pid, exp_gained, ev_gained)
+                else:
+                    service.apply_team_battle_rewards("u1", [(pid, exp_gained) for pid in ids], ev_gained)
+            elapsed_ms = (time.perf_counter() - start) / rounds * 1000
+            results[mode] = (elapsed_ms, (manager.statements_executed - before) / rounds)
+            manager.close_all()
+    return results
+
+
+class TestTeamBattleRewards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open(self, name):
+        path = os.path.join(self.tmp.name, name)
+        ids = create_migrated_db(path)
+        manager = SqliteConnectionManager(path)
+        self.addCleanup(manager.close_all)
+        return path, ids, manager, make_service(path, manager)
+
+    def test_bisect_matches_level_loop(self):
+        _, _, _, service = self.open("levels.db")
+        for growth_rate_id in range(1, 7):
+            for current_level in (1, 5, 37, 99, 100):
+                for total_exp in range(0, 1_700_000, 997):
+                    expected = current_level
+                    while expected < 100 and total_exp >= service.get_required_exp_for_level(expected + 1, growth_rate_id):
+                        expected += 1
+                    info = service._resolve_level_up(current_level, total_exp, growth_rate_id)
+                    self.assertEqual(info["new_level"], expected, (growth_rate_id, current_level, total_exp))
+                    self.assertEqual(info["required_exp_for_next"],
+                                     service.get_required_exp_for_level(expected + 1, growth_rate_id) if expected < 100 else 0)
+
+    def test_batch_matches_per_pokemon_updates(self):
+        ev_gained = {"hp_ev": 2, "attack_ev": 0, "defense_ev": 0, "sp_attack_ev": 1, "sp_defense_ev": 0, "speed_ev": 3}
+        gains = [60000, 30, 500, 0, 900000, 10]
+        legacy_path, legacy_ids, _, legacy_service = self.open("legacy.db")
+        expected_levels = [legacy_update(legacy_service, "u1", pid, exp, dict(ev_gained))
+                           for pid, exp in zip(legacy_ids, gains)]
+
+        batch_path, batch_ids, _, service = self.open("batch.db")
+        results = service.apply_team_battle_rewards("u1", list(zip(batch_ids, gains)), dict(ev_gained))
+        self.assertEqual(read_rows(batch_path, batch_ids), read_rows(legacy_path, legacy_ids))
+        self.assertEqual([r["level_up_info"]["new_level"] for r in results], expected_levels)
+
+        # 返回结构与逐只更新相同
+        first = results[0]
+        self.assertEqual(set(first), {"success", "exp_gained", "ev_gained", "level_up_info", "pokemon_id", "pokemon_name"})
+        self.assertEqual((first["pokemon_id"], first["pokemon_name"], first["exp_gained"]), (batch_ids[0], "皮卡丘", 60000))
+        self.assertTrue(first["level_up_info"]["should_level_up"])
+        self.assertIn("move_learning_result", first["level_up_info"])
+        self.assertIn("evolution_info", first["level_up_info"])
+        self.assertNotIn("move_learning_result", results[5]["level_up_info"])
+
+    def test_single_write_statement(self):
+        path, ids, manager, service = self.open("writes.db")
+        statements = []
+        manager._count_statement = statements.append   # 在打开连接前替换，记录执行的 SQL
+        service.user_pokemon_repo.get_user_pokemon_by_ids("u1", [])
+        results = service.apply_team_battle_rewards("u1", [(pid, 1) for pid in ids] + [(99999, 1)],
+                                                    {"hp_ev": 1, "attack_ev": 0, "defense_ev": 0,
+                                                     "sp_attack_ev": 0, "sp_defense_ev": 0, "speed_ev": 0})
+        self.assertEqual(results[-1], {"success": False, "message": "宝可梦不存在"})
+        selects = [sql for sql in statements if sql.lstrip().startswith("SELECT")]
+        updates = [sql for sql in statements if sql.lstrip().startswith("UPDATE")]
+        self.assertEqual(len(selects), 1)                       # 一次批量查询
+        self.assertEqual(len(updates), len(ids))                # executemany 每只一行
+        self.assertEqual(sum(sql.startswith("BEGIN") for sql in statements), 1)   # 一个事务
+
+    def test_update_pokemon_after_battle_uses_batch(self):
+        path, ids, _, service = self.open("single.db")
+        result = service.update_pokemon_after_battle("u1", ids[1], 30)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["ev_gained"]["hp_ev"], 0)
+        self.assertEqual(read_rows(path, [ids[1]])[0][:2], (result["level_up_info"]["new_level"], 160))
+        self.assertEqual(service.update_pokemon_after_battle("u1", 99999, 30), {"success": False, "message": "宝可梦不存在"})
+
+    def test_batch_runs_fewer_statements(self):
+        """只比较每场执行的 SQL 语句数（耗时对比见 __main__）"""
+        results = run_benchmark(rounds=2)
+        self.assertLess(results["batch"][1], results["legacy"][1])
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    for mode, label in (("legacy", "逐只更新"), ("batch", "批量更新")):
+        elapsed, statements = results[mode]
+        print(f"{label}: 6 只队伍每场 {elapsed:.2f} ms, 执行 {statements:.0f} 条 SQL")
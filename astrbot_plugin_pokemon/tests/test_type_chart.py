@@ -0,0 +1,75 @@
+import sys
+import os
+import itertools
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.type_chart import (
+    type_chart, TYPE_NAMES, TYPE_NAME_MAPPING, UNKNOWN_TYPE_ID
+)
+from astrbot_plugin_pokemon.core.services.battle.battle_config import battle_config
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleLogic, BattleState
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+
+
+def reference_effectiveness(atk_types, def_types):
+    """旧版基于字符串与嵌套字典的实现"""
+    chart = battle_config.get_type_chart()
+    eff = 1.0
+    for at in atk_types:
+        at_en = TYPE_NAME_MAPPING.get(at, at.lower())
+        if at_en not in chart:
+            continue
+        for dt in def_types:
+            dt_en = TYPE_NAME_MAPPING.get(dt, dt.lower())
+            eff *= chart[at_en].get(dt_en, 1.0)
+    return eff
+
+
+class TestTypeChart(unittest.TestCase):
+    def test_matrix_matches_reference_for_all_combinations(self):
+        names = list(TYPE_NAME_MAPPING)
+        for atk in names:
+            atk_id = type_chart.type_id(atk)
+            for d1, d2 in itertools.product(names, repeat=2):
+                expected = reference_effectiveness([atk], [d1, d2])
+                self.assertEqual(type_chart.effectiveness(atk_id, type_chart.type_ids([d1, d2])), expected)
+            for d in names:
+                self.assertEqual(type_chart.effectiveness(atk_id, (type_chart.type_id(d),)),
+                                 reference_effectiveness([atk], [d]))
+
+    def test_known_matchups_and_unknown_types(self):
+        self.assertEqual(len(TYPE_NAMES), 18)
+        self.assertEqual(type_chart.effectiveness_by_names(['火'], ['草', '虫']), 4.0)
+        self.assertEqual(type_chart.effectiveness_by_names(['电'], ['地面']), 0.0)
+        self.assertEqual(type_chart.effectiveness_by_names(['Water'], ['fire']), 2.0)
+        self.assertEqual(type_chart.type_id('???'), UNKNOWN_TYPE_ID)
+        self.assertEqual(type_chart.effectiveness_by_names(['???'], ['草']), 1.0)
+        self.assertEqual(type_chart.effectiveness_by_names(['火'], ['???']), 1.0)
+        self.assertEqual(type_chart.effectiveness_by_names(['火'], []), 1.0)
+        # 字符串兼容接口
+        self.assertEqual(BattleLogic().calculate_type_effectiveness(['格斗'], ['一般', '岩石']), 4.0)
+
+    def test_context_normalized_once(self):
+        move = BattleMoveInfo(power=40, accuracy=100, type_name="水", damage_class_id=3, priority=0,
+                              type_effectiveness=1.0, stab_bonus=1.0, max_pp=25, current_pp=25)
+        ctx = BattleContext(pokemon=MagicMock(), moves=[move], types=["火", "飞行"], current_hp=50, is_user=True)
+        BattleState.from_context(ctx)
+
+        self.assertEqual(ctx.type_ids, (TYPE_NAMES.index('fire'), TYPE_NAMES.index('flying')))
+        self.assertEqual(move.type_id, TYPE_NAMES.index('water'))
+
+        defender = BattleState.from_context(ctx)
+        self.assertEqual(BattleLogic()._move_effectiveness(move, defender), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
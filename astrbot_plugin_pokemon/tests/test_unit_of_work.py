@@ -0,0 +1,225 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_item_repo import SqliteUserItemRepository
+from astrbot_plugin_pokemon.core.services.world.adventure_service import AdventureService
+from astrbot_plugin_pokemon.tests._db_helpers import create_migrated_db
+
+SCHEMA = """
+CREATE TABLE battle_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, target_name TEXT,
+    log_data TEXT, result TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, format_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE user_items (user_id TEXT, item_id INTEGER, quantity INTEGER, PRIMARY KEY (user_id, item_id));
+CREATE TABLE user_pokemon (id INTEGER PRIMARY KEY, user_id TEXT, exp INTEGER, current_hp INTEGER);
+"""
+
+
+def create_db(path):
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO user_pokemon VALUES (?, 'u1', 0, 100)", [(i,) for i in range(6)])
+    conn.close()
+
+
+def post_battle_writes(manager, battle_repo, item_repo):
+    """一场战斗后的写入：队伍HP/PP与经验、战斗日志、掉落物品"""
+    for pid in range(6):
+        with manager.get_connection() as conn:
+            conn.execute("UPDATE user_pokemon SET current_hp = ? WHERE id = ?", (90, pid))
+            conn.commit()
+        with manager.get_connection() as conn:
+            conn.execute("UPDATE user_pokemon SET exp = exp + ? WHERE id = ?", (10, pid))
+            conn.commit()
+    battle_repo.save_battle_log("u1", "小拉达", [{"details": []}], "success")
+    item_repo.add_user_item("u1", 17, 1)
+
+
+def run_benchmark(battles=100, synchronous="FULL"):
+    """对比每次写入单独提交与一场战斗一个工作单元，返回每场战斗的写入耗时(ms)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_db(path)
+        manager = SqliteConnectionManager(path, synchronous=synchronous)
+        battle_repo = SqliteBattleRepository(path, manager)
+        item_repo = SqliteUserItemRepository(path, manager)
+
+        start = time.perf_counter()
+        for _ in range(battles):
+            post_battle_writes(manager, battle_repo, item_repo)
+        separate_ms = (time.perf_counter() - start) / battles * 1000
+
+        start = time.perf_counter()
+        for _ in range(battles):
+            with manager.unit_of_work():
+                post_battle_writes(manager, battle_repo, item_repo)
+        unit_ms = (time.perf_counter() - start) / battles * 1000
+        manager.close_all()
+    return separate_ms, unit_ms
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        create_db(self.db_path)
+        self.manager = SqliteConnectionManager(self.db_path)
+        self.battle_repo = SqliteBattleRepository(self.db_path, self.manager)
+        self.item_repo = SqliteUserItemRepository(self.db_path, self.manager)
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmp.cleanup()
+
+    def count(self, table):
+        with sqlite3.connect(self.db_path) as other:
+            return other.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_writes_commit_once_at_end(self):
+        with self.manager.unit_of_work() as uow:
+            # 不同连接配置的仓储在工作单元中共用同一个事务连接
+            self.assertIs(self.battle_repo._get_connection(), self.item_repo._get_connection())
+            self.assertIs(self.battle_repo._get_connection(), uow)
+            log_id = self.battle_repo.save_battle_log("u1", "小拉达", [], "success")
+            self.item_repo.add_user_item("u1", 17, 1)
+            self.item_repo.add_user_item("u1", 17, 2)
+            # 事务内可读到自己的写入，其他连接尚不可见
+            self.assertEqual(uow.execute("SELECT quantity FROM user_items").fetchone()[0], 3)
+            self.assertEqual(self.count("battle_logs"), 0)
+        self.assertGreater(log_id, 0)
+        self.assertEqual(self.count("battle_logs"), 1)
+        self.assertEqual(self.count("user_items"), 1)
+        self.assertEqual(self.manager.metrics()["units_committed"], 1)
+        # 工作单元结束后恢复按配置区分的连接
+        self.assertIsNot(self.battle_repo._get_connection(), self.item_repo._get_connection())
+
+    def test_failed_write_rolls_back_everything(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.unit_of_work():
+                self.battle_repo.save_battle_log("u1", "小拉达", [], "success")
+                raise RuntimeError("boom")
+        self.assertEqual(self.count("battle_logs"), 0)
+
+        # 仓储内出错但被服务吞掉的异常同样使整个工作单元回滚
+        with self.manager.unit_of_work():
+            self.battle_repo.save_battle_log("u1", "小拉达", [], "success")
+            try:
+                with self.manager.get_connection() as conn:
+                    conn.execute("INSERT INTO missing_table VALUES (1)")
+            except sqlite3.OperationalError:
+                pass
+        self.assertEqual(self.count("battle_logs"), 0)
+        self.assertEqual(self.manager.metrics()["units_rolled_back"], 2)
+
+    def test_nested_unit_joins_outer(self):
+        with self.manager.unit_of_work() as outer:
+            with self.manager.unit_of_work() as inner:
+                self.assertIs(inner, outer)
+                self.item_repo.add_user_item("u1", 1, 1)
+            self.assertEqual(self.count("user_items"), 0)
+        self.assertEqual(self.count("user_items"), 1)
+
+    def test_default_connection_repo_unchanged_inside_unit(self):
+        """战斗仓储按默认配置取连接：在工作单元（类型解析 + 外键约束）内外的读写结果一致"""
+        path = os.path.join(self.tmp.name, "migrated.db")
+        create_migrated_db(path)
+        manager = SqliteConnectionManager(path)
+        battle_repo = SqliteBattleRepository(path, manager)
+        conn = manager.get_connection()
+        for table in ("battle_logs", "win_rate_cache"):
+            self.assertEqual(conn.execute(f"PRAGMA foreign_key_list({table})").fetchall(), [], table)
+
+        def battle_writes(fingerprint):
+            log = battle_repo.get_battle_log_by_id(
+                battle_repo.save_battle_log("ghost", "小拉达", [{"details": ["撞击"]}], "success"))
+            battle_repo.save_cached_win_rate(fingerprint, {"win_rate": 62.5, "lower": 50.0, "upper": 75.0,
+                                                           "simulations": 40, "stop_reason": "precision"})
+            return {k: (v, type(v)) for k, v in log.items() if k != "id"}, battle_repo.get_cached_win_rate(fingerprint)
+
+        outside = battle_writes("a")
+        with manager.unit_of_work():
+            inside = battle_writes("b")
+        self.assertEqual(inside, outside)
+        self.assertEqual(manager.metrics()["units_committed"], 1)
+        manager.close_all()
+
+    def test_rollback_runs_every_listener(self):
+        calls = []
+
+        def failing():
+            calls.append("failing")
+            raise RuntimeError("listener")
+
+        self.manager.add_rollback_listener(failing)
+        self.manager.add_rollback_listener(lambda: calls.append("next"))
+        with self.manager.unit_of_work() as uow:
+            uow.rollback()
+        self.assertEqual(calls, ["failing", "next"])
+        with self.manager.unit_of_work():
+            pass
+        self.assertEqual(len(calls), 2)   # 提交时不调用
+
+    def test_rollback_actions_belong_to_their_unit(self):
+        calls = []
+        self.manager.on_rollback(lambda: calls.append("outside"))   # 不在工作单元中：忽略
+        with self.manager.unit_of_work():
+            self.manager.on_rollback(lambda: calls.append("committed"))
+        with self.manager.unit_of_work() as uow:
+            self.manager.on_rollback(lambda: calls.append("failed"))
+            uow.rollback()
+        with self.manager.unit_of_work() as uow:
+            uow.rollback()
+        self.assertEqual(calls, ["failed"])
+
+    def test_adventure_service_wraps_battles(self):
+        entered = []
+        unit = MagicMock()
+        unit.return_value.__enter__.side_effect = lambda: entered.append(True)
+        service = AdventureService(
+            adventure_repo=MagicMock(), pokemon_repo=MagicMock(), team_repo=MagicMock(),
+            pokemon_service=MagicMock(), user_repo=MagicMock(), user_pokemon_repo=MagicMock(),
+            battle_repo=MagicMock(), user_item_repo=MagicMock(), item_repo=MagicMock(), move_repo=MagicMock(),
+            pokemon_ability_repo=MagicMock(), exp_service=MagicMock(), config={},
+            simulation_executor=MagicMock(batch_size_for=lambda n: n), unit_of_work=unit
+        )
+        service._start_battle = MagicMock(return_value="wild")
+        service._start_trainer_battle = MagicMock(return_value="trainer")
+        self.assertEqual(service.start_battle("u1", MagicMock(), [1]), "wild")
+        self.assertEqual(service.start_trainer_battle("u1", MagicMock(), [1]), "trainer")
+        self.assertEqual(len(entered), 2)
+
+    def test_one_commit_per_battle(self):
+        """工作单元内一场战斗的全部写入只提交一次（与逐次提交的耗时对比见 __main__）"""
+        statements = []
+        with patch.object(self.manager, '_count_statement', side_effect=statements.append):
+            post_battle_writes(self.manager, self.battle_repo, self.item_repo)
+            separate_commits = statements.count("COMMIT")
+            statements.clear()
+            with self.manager.unit_of_work():
+                post_battle_writes(self.manager, self.battle_repo, self.item_repo)
+            unit_commits = statements.count("COMMIT")
+
+        self.assertEqual(separate_commits, 6 * 2 + 2)
+        self.assertEqual(unit_commits, 1)
+        self.assertEqual(self.count("battle_logs"), 2)
+
+
+if __name__ == "__main__":
+    for sync in ("FULL", "NORMAL"):
+        separate, unit = run_benchmark(synchronous=sync)
+        print(f"synchronous={sync}: 每次写入单独提交 {separate:.3f} ms/场, 工作单元 {unit:.3f} ms/场, 加速 {separate / unit:.1f}x")
@@ -0,0 +1,208 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.infrastructure.database.connection_manager import SqliteConnectionManager
+from astrbot_plugin_pokemon.infrastructure.database.user_state_cache import UserStateCache, USER, TEAM
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_repo import SqliteUserRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_team_repo import SqliteTeamRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_adventure_repo import SqliteAdventureRepository
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_user_pokemon_repo import SqliteUserPokemonRepository
+from astrbot_plugin_pokemon.core.models.user_models import UserTeam
+from astrbot_plugin_pokemon.core.models.adventure_models import UserGymState
+from astrbot_plugin_pokemon.tests._db_helpers import run_migrations
+
+
+def create_migrated_db(path, users=1):
+    """按顺序执行全部迁移脚本，并写入测试用的玩家、物种与每位玩家 3 只宝可梦的队伍"""
+    with sqlite3.connect(path) as conn:
+        run_migrations(conn)
+        conn.execute("INSERT INTO pokemon_species (id, name_en, name_zh) VALUES (25, 'pikachu', '皮卡丘')")
+        for u in range(users):
+            user_id = f"u{u}"
+            conn.execute("INSERT INTO users (user_id, nickname, coins) VALUES (?, ?, 100)", (user_id, f"训练家{u}"))
+            ids = [conn.execute("INSERT INTO user_pokemon (user_id, species_id, nickname, level, exp, gender, current_hp) "
+                                "VALUES (?, 25, '皮卡丘', 10, 0, 'M', 30)", (user_id,)).lastrowid for _ in range(3)]
+            conn.execute("INSERT INTO user_team (user_id, team) VALUES (?, ?)", (user_id, str(ids)))
+    conn.close()
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Repos:
+    """与容器一致：各仓储共享同一个连接管理器与状态缓存"""
+
+    def __init__(self, path, state_cache):
+        self.manager = SqliteConnectionManager(path)
+        self.manager.add_rollback_listener(state_cache.clear)
+        self.cache = state_cache
+        self.user = SqliteUserRepository(path, self.manager, state_cache=state_cache)
+        self.team = SqliteTeamRepository(path, self.manager, state_cache=state_cache)
+        self.adventure = SqliteAdventureRepository(path, self.manager, state_cache=state_cache)
+        self.user_pokemon = SqliteUserPokemonRepository(path, self.manager, state_cache=state_cache)
+
+    def adventure_reads(self, user_id):
+        """模拟一次 /冒险 中各服务对同一玩家状态的读取"""
+        self.user.get_user_by_id(user_id)
+        team = self.team.get_user_team(user_id)
+        self.user_pokemon.get_user_current_trainer_encounter(user_id)
+        self.adventure.get_gym_state(user_id)
+        for _ in range(2):
+            for pokemon_id in team.team_pokemon_ids:
+                self.user_pokemon.get_user_pokemon_by_id(user_id, pokemon_id)
+        self.user.get_user_by_id(user_id)
+
+
+def run_benchmark(users=20, rounds=50):
+    """对比有无状态缓存时一次冒险读取玩家状态的耗时(us)与执行的 SQL 语句数"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_migrated_db(path, users=users)
+        for label, max_users in (("uncached", 0), ("cached", users)):
+            repos = Repos(path, UserStateCache(max_users=max_users))
+            for u in range(users):
+                repos.adventure_reads(f"u{u}")
+            before = repos.manager.statements_executed
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for u in range(users):
+                    repos.adventure_reads(f"u{u}")
+            elapsed_us = (time.perf_counter() - start) / (rounds * users) * 1e6
+            statements = (repos.manager.statements_executed - before) / (rounds * users)
+            repos.manager.close_all()
+            results[label] = (elapsed_us, statements)
+    return results
+
+
+class TestUserStateCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = UserStateCache(max_users=2)
+        for user_id in ("a", "b"):
+            cache.get_or_load(user_id, USER, lambda: user_id)
+        cache.get_or_load("a", USER, lambda: "reloaded")   # a 变为最近使用
+        cache.get_or_load("c", USER, lambda: "c")            # 淘汰 b
+        self.assertEqual(cache.get_or_load("a", USER, lambda: "reloaded"), "a")
+        self.assertEqual(cache.get_or_load("b", USER, lambda: "reloaded"), "reloaded")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_ttl_expiry_and_invalidate(self):
+        clock = FakeClock()
+        cache = UserStateCache(max_users=8, ttl_seconds=60, clock=clock)
+        cache.get_or_load("a", USER, lambda: 1)
+        cache.get_or_load("a", TEAM, lambda: None)
+        clock.now += 59
+        self.assertEqual(cache.get_or_load("a", USER, lambda: 2), 1)
+        self.assertIsNone(cache.get_or_load("a", TEAM, lambda: 2))   # None 也会被缓存
+        clock.now += 1
+        self.assertEqual(cache.get_or_load("a", USER, lambda: 3), 3)
+        cache.invalidate("a", USER)
+        self.assertEqual(cache.get_or_load("a", USER, lambda: 4), 4)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_load_racing_with_write_is_not_cached(self):
+        cache = UserStateCache(max_users=8)
+
+        def loader():
+            cache.invalidate("a", USER)   # 加载期间其他线程写入
+            return "stale"
+
+        self.assertEqual(cache.get_or_load("a", USER, loader), "stale")
+        self.assertEqual(cache.get_or_load("a", USER, lambda: "fresh"), "fresh")
+
+    def test_disabled_cache_always_loads(self):
+        cache = UserStateCache(max_users=0)
+        for i in range(3):
+            self.assertEqual(cache.get_or_load("a", USER, lambda: i), i)
+        self.assertEqual(len(cache), 0)
+
+
+class TestCachedRepositories(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        create_migrated_db(self.db_path)
+        self.repos = Repos(self.db_path, UserStateCache(max_users=16))
+
+    def tearDown(self):
+        self.repos.manager.close_all()
+        self.tmp.cleanup()
+
+    def test_repeated_reads_skip_database(self):
+        self.repos.adventure_reads("u0")
+        before = self.repos.manager.statements_executed
+        self.repos.adventure_reads("u0")
+        self.assertEqual(self.repos.manager.statements_executed, before)
+        self.assertGreater(self.repos.cache.stats()["hit_rate"], 50)
+
+    def test_writes_invalidate(self):
+        repos = self.repos
+        repos.adventure_reads("u0")
+        pokemon_id = repos.team.get_user_team("u0").team_pokemon_ids[0]
+
+        repos.user.add_user_coins("u0", 50)
+        repos.user_pokemon.set_user_current_trainer_encounter("u0", 7)
+        repos.team.update_user_team("u0", UserTeam(user_id="u0", team_pokemon_ids=[pokemon_id]))
+        repos.adventure.save_gym_state(UserGymState("u0", 3, 2, True, 0))
+        repos.user_pokemon.update_user_pokemon_current_hp("u0", pokemon_id, 5)
+
+        self.assertEqual(repos.user.get_user_by_id("u0").coins, 150)
+        self.assertEqual(repos.user_pokemon.get_user_current_trainer_encounter("u0"), 7)
+        self.assertEqual(repos.team.get_user_team("u0").team_pokemon_ids, [pokemon_id])
+        self.assertEqual(repos.adventure.get_gym_state("u0").current_stage, 2)
+        self.assertEqual(repos.user_pokemon.get_user_pokemon_by_id("u0", pokemon_id).current_hp, 5)
+
+        repos.adventure.delete_gym_state("u0")
+        repos.user_pokemon.clear_user_current_trainer_encounter("u0")
+        self.assertIsNone(repos.adventure.get_gym_state("u0"))
+        self.assertIsNone(repos.user_pokemon.get_user_current_trainer_encounter("u0"))
+
+    def test_returned_objects_do_not_share_state(self):
+        user = self.repos.user.get_user_by_id("u0")
+        user.coins = 999
+        team = self.repos.team.get_user_team("u0")
+        team.team_pokemon_ids.append(12345)
+        self.assertEqual(self.repos.user.get_user_by_id("u0").coins, 100)
+        self.assertNotIn(12345, self.repos.team.get_user_team("u0").team_pokemon_ids)
+
+    def test_rollback_clears_cache(self):
+        repos = self.repos
+        with self.assertRaises(RuntimeError):
+            with repos.manager.unit_of_work():
+                repos.user.add_user_coins("u0", 50)
+                self.assertEqual(repos.user.get_user_by_id("u0").coins, 150)   # 读到未提交的数据并缓存
+                raise RuntimeError("写入失败")
+        self.assertEqual(len(repos.cache), 0)
+        self.assertEqual(repos.user.get_user_by_id("u0").coins, 100)
+
+    def test_cache_reduces_statements(self):
+        results = run_benchmark(users=3, rounds=5)
+        self.assertEqual(results["cached"][1], 0)
+        self.assertGreaterEqual(results["uncached"][1], 10)
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    for label, name in (("uncached", "无缓存"), ("cached", "状态缓存")):
+        elapsed, statements = results[label]
+        print(f"{name}: 单次冒险读取玩家状态 {elapsed:.1f} us, 执行 {statements:.1f} 条 SQL")
@@ -0,0 +1,148 @@
+import sys
+import os
+import math
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.battle_engine import BattleState, BattleLogic, NoOpBattleLogger
+from astrbot_plugin_pokemon.core.services.battle.vectorized_engine import VectorizedBattleSimulator
+from astrbot_plugin_pokemon.core.services.battle.ability_plugins import AbilityRegistry
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def create_mock_pokemon(name="TestPoke", level=50, hp=120, attack=60, defense=60, sp_attack=60, sp_defense=60, speed=60,
+                        ability_id=None):
+    poke = MagicMock()
+    poke.name = name
+    poke.level = level
+    poke.ability_id = ability_id
+    poke.held_item_id = None
+    poke.stats = PokemonStats(hp=hp, attack=attack, defense=defense, sp_attack=sp_attack, sp_defense=sp_defense, speed=speed)
+    return poke
+
+
+def create_mock_context(pokemon, moves, types):
+    return BattleContext(
+        pokemon=pokemon,
+        moves=moves,
+        types=types,
+        current_hp=pokemon.stats.hp,
+        is_user=True,
+        stat_levels={},
+        non_volatile_status=None,
+        status_turns=0,
+        volatile_statuses={},
+        charging_move_id=None,
+        protection_status=None
+    )
+
+
+def make_move(move_id, name, type_name, power, category=0, damage_class_id=2, accuracy=100, pp=10, **kwargs):
+    return BattleMoveInfo(
+        move_id=move_id, move_name=name, type_name=type_name, power=power, accuracy=accuracy,
+        damage_class_id=damage_class_id, priority=kwargs.pop('priority', 0), type_effectiveness=1.0, stab_bonus=1.0,
+        max_pp=pp, current_pp=pp, meta_category_id=category, **kwargs
+    )
+
+
+def scalar_win_rate(logic, user_ctx, wild_ctx, simulations, seed):
+    """使用真实随机数（不受其他测试模块对 random 的全局 Mock 影响）运行标量引擎"""
+    rng = random.Random(seed)
+    with patch.object(random, 'random', rng.random), patch.object(random, 'uniform', rng.uniform), \
+            patch.object(random, 'randint', rng.randint), patch.object(random, 'choice', rng.choice):
+        wins = 0
+        for _ in range(simulations):
+            user_state = BattleState.from_context(user_ctx)
+            wild_state = BattleState.from_context(wild_ctx)
+            turn = 0
+            while user_state.current_hp > 0 and wild_state.current_hp > 0 and turn < 50:
+                turn += 1
+                if logic.process_turn(user_state, wild_state, NoOpBattleLogger()):
+                    break
+            if user_state.current_hp > 0:
+                wins += 1
+    return wins / simulations
+
+
+class TestVectorizedEngine(unittest.TestCase):
+    SCALAR_SIMS = 1500
+    VECTOR_SIMS = 20000
+
+    def setUp(self):
+        self.logic = BattleLogic()
+        self.simulator = VectorizedBattleSimulator(self.logic)
+
+    def assert_agrees(self, user_ctx, wild_ctx):
+        self.assertTrue(self.simulator.supports(user_ctx, wild_ctx))
+        p_scalar = scalar_win_rate(self.logic, user_ctx, wild_ctx, self.SCALAR_SIMS, seed=42)
+        p_vector = self.simulator.simulate(user_ctx, wild_ctx, self.VECTOR_SIMS, seed=42) / self.VECTOR_SIMS
+        # 两个独立二项估计之差的 4.5 倍标准差作为统计容差
+        p = (p_scalar + p_vector) / 2
+        sigma = math.sqrt(max(p * (1 - p), 0.01) * (1 / self.SCALAR_SIMS + 1 / self.VECTOR_SIMS))
+        self.assertLessEqual(abs(p_scalar - p_vector), 4.5 * sigma,
+                             f"scalar={p_scalar:.3f} vectorized={p_vector:.3f}")
+
+    def test_plain_damage_matchup(self):
+        user = create_mock_pokemon("User", attack=100, speed=55)
+        wild = create_mock_pokemon("Wild", hp=130, sp_attack=50, speed=65)
+        user_ctx = create_mock_context(user, [
+            make_move(1, "撞击", "一般", 40),
+            make_move(2, "火花", "火", 40, pp=3),
+        ], ["火"])
+        wild_ctx = create_mock_context(wild, [
+            make_move(3, "水枪", "水", 40, damage_class_id=3),
+            make_move(4, "电光一闪", "一般", 40, priority=1, accuracy=90),
+        ], ["一般"])
+        self.assert_agrees(user_ctx, wild_ctx)
+
+    def test_status_and_stat_moves(self):
+        user = create_mock_pokemon("User", hp=110, attack=65, speed=70)
+        wild = create_mock_pokemon("Wild", hp=250, attack=100, speed=58)
+        user_ctx = create_mock_context(user, [
+            make_move(10, "电磁波", "电", 0, category=1, damage_class_id=1, meta_ailment_id=1, target_id=10),
+            make_move(11, "剑舞", "一般", 0, category=2, damage_class_id=1, target_id=7,
+                      stat_changes=[{'stat_id': 2, 'change': 2}]),
+            make_move(12, "火焰拳", "火", 75, category=4, meta_ailment_id=4, ailment_chance=30, target_id=10),
+            make_move(13, "吸取拳", "格斗", 75, category=8, drain=50, target_id=10),
+        ], ["电"])
+        wild_ctx = create_mock_context(wild, [
+            make_move(20, "咬碎", "恶", 80, category=6, stat_chance=0.2, target_id=10,
+                      stat_changes=[{'stat_id': 3, 'change': -1}]),
+            make_move(21, "自我再生", "一般", 0, category=3, damage_class_id=1, healing=50, target_id=7),
+            make_move(22, "催眠粉", "草", 0, category=1, damage_class_id=1, accuracy=75, meta_ailment_id=2, target_id=10),
+        ], ["一般"])
+        self.assert_agrees(user_ctx, wild_ctx)
+
+    def test_unsupported_matchups_fall_back(self):
+        user = create_mock_pokemon("User")
+        wild = create_mock_pokemon("Wild")
+        tackle = make_move(1, "撞击", "一般", 40)
+        user_ctx = create_mock_context(user, [tackle], ["一般"])
+        wild_ctx = create_mock_context(wild, [tackle], ["一般"])
+        self.assertTrue(self.simulator.supports(user_ctx, wild_ctx))
+
+        # 已注册的特性插件
+        ability_id = next(iter(AbilityRegistry._registry))
+        ability_ctx = create_mock_context(create_mock_pokemon("Ability", ability_id=ability_id), [tackle], ["一般"])
+        self.assertFalse(self.simulator.supports(ability_ctx, wild_ctx))
+
+        # 连续攻击与挥发性状态
+        multi_hit = make_move(5, "连续拳", "一般", 18, min_hits=2, max_hits=5)
+        self.assertFalse(self.simulator.supports(create_mock_context(user, [multi_hit], ["一般"]), wild_ctx))
+        confused_ctx = create_mock_context(user, [tackle], ["一般"])
+        confused_ctx.volatile_statuses = {6: 3}
+        self.assertFalse(self.simulator.supports(confused_ctx, wild_ctx))
+
+
+if __name__ == "__main__":
+    unittest.main()
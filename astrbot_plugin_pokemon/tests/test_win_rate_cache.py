@@ -0,0 +1,161 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import importlib
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle import win_rate_cache
+from astrbot_plugin_pokemon.core.services.battle.win_rate_cache import WinRateCache, matchup_fingerprint
+from astrbot_plugin_pokemon.core.services.battle.win_rate_estimator import WinRateEstimate
+from astrbot_plugin_pokemon.core.services.battle.simulation_executor import PokemonSnapshot
+from astrbot_plugin_pokemon.core.services.world.adventure_service import AdventureService
+from astrbot_plugin_pokemon.infrastructure.repositories.sqlite_battle_repo import SqliteBattleRepository
+from astrbot_plugin_pokemon.core.models.adventure_models import BattleContext, BattleMoveInfo
+from astrbot_plugin_pokemon.core.models.pokemon_models import PokemonStats
+
+
+def create_context(pokemon_id=1, name="Rattata", hp=100, pp=35):
+    pokemon = PokemonSnapshot(id=pokemon_id, name=name, species_id=19, level=30,
+                              stats=PokemonStats(hp=100, attack=60, defense=60, sp_attack=60, sp_defense=60, speed=70))
+    moves = [BattleMoveInfo(power=40, accuracy=100, type_name="一般", damage_class_id=2, priority=0,
+                            type_effectiveness=1.0, stab_bonus=1.0, max_pp=35, current_pp=pp, move_id=33, move_name="撞击")]
+    return BattleContext(pokemon=pokemon, moves=moves, types=["一般"], current_hp=hp, is_user=True,
+                         stat_levels={}, volatile_statuses={})
+
+
+def make_estimate(win_rate=62.5, simulations=80):
+    return WinRateEstimate(win_rate=win_rate, lower=51.0, upper=72.0, simulations=simulations,
+                           elapsed_ms=12.0, stop_reason="precision")
+
+
+class TestMatchupFingerprint(unittest.TestCase):
+    def test_fingerprint_ignores_identity_but_tracks_state(self):
+        base = matchup_fingerprint(create_context(), create_context())
+        # 实例ID与名称不影响对局
+        self.assertEqual(base, matchup_fingerprint(create_context(pokemon_id=7, name="小拉达"), create_context()))
+        # HP、PP、状态变化都会得到新的指纹
+        self.assertNotEqual(base, matchup_fingerprint(create_context(hp=50), create_context()))
+        self.assertNotEqual(base, matchup_fingerprint(create_context(), create_context(pp=3)))
+        burned = create_context()
+        burned.non_volatile_status = 4
+        self.assertNotEqual(base, matchup_fingerprint(create_context(), burned))
+        # 双方互换也是不同的对局
+        strong = create_context(hp=80)
+        self.assertNotEqual(matchup_fingerprint(strong, create_context()), matchup_fingerprint(create_context(), strong))
+
+    def test_engine_version_changes_fingerprint(self):
+        base = matchup_fingerprint(create_context(), create_context())
+        with patch.object(win_rate_cache, "BATTLE_ENGINE_VERSION", win_rate_cache.BATTLE_ENGINE_VERSION + 1):
+            self.assertNotEqual(base, matchup_fingerprint(create_context(), create_context()))
+
+
+class TestWinRateCache(unittest.TestCase):
+    def test_lru_eviction_and_counters(self):
+        cache = WinRateCache(max_entries=2)
+        cache.put("a", make_estimate())
+        cache.put("b", make_estimate())
+        self.assertIsNotNone(cache.get("a"))  # a 变为最近使用
+        cache.put("c", make_estimate())  # 淘汰 b
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(len(cache), 2)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def create_store_db(self, tmp):
+        db_path = os.path.join(tmp, "cache.db")
+        migration = importlib.import_module(
+            "astrbot_plugin_pokemon.infrastructure.database.migrations.021_create_win_rate_cache")
+        with sqlite3.connect(db_path) as conn:
+            migration.up(conn.cursor())
+        conn.close()
+        return db_path
+
+    def test_size_zero_disables_store(self):
+        store = MagicMock()
+        cache = WinRateCache(max_entries=0, store=store)
+        cache.put("fp", make_estimate())
+        self.assertIsNone(cache.get("fp"))
+        store.save_cached_win_rate.assert_not_called()
+        store.get_cached_win_rate.assert_not_called()
+        self.assertEqual(len(cache), 0)
+
+    def test_persisted_rows_are_pruned_oldest_first(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = SqliteBattleRepository(self.create_store_db(tmp))
+            cache = WinRateCache(store=repo)
+            for i in range(10):
+                cache.put(f"fp{i}", make_estimate())
+            cache.put("fp0", make_estimate(win_rate=10.0))   # 重新写入的记录视为最新
+            self.assertEqual(repo.prune_win_rate_cache(0), 0)
+            self.assertEqual(repo.prune_win_rate_cache(4, batch_size=3), 3)
+            self.assertEqual(repo.prune_win_rate_cache(4, batch_size=3), 3)
+            self.assertEqual(repo.prune_win_rate_cache(4, batch_size=3), 0)
+            remaining = WinRateCache(store=repo)
+            self.assertEqual([fp for fp in (f"fp{i}" for i in range(10)) if remaining.get(fp)],
+                             ["fp0", "fp7", "fp8", "fp9"])
+
+    def test_sqlite_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = self.create_store_db(tmp)
+
+            WinRateCache(store=SqliteBattleRepository(db_path)).put("fp", make_estimate(win_rate=40.0))
+
+            # 新的缓存实例（模拟重启）从数据库命中
+            cache = WinRateCache(store=SqliteBattleRepository(db_path))
+            estimate = cache.get("fp")
+            self.assertEqual(estimate.win_rate, 40.0)
+            self.assertEqual((estimate.lower, estimate.upper, estimate.simulations), (51.0, 72.0, 80))
+            self.assertEqual(cache.stats()["store_hits"], 1)
+            self.assertIsNone(cache.get("missing"))
+
+
+class TestAdventureServiceWinRateCache(unittest.TestCase):
+    def setUp(self):
+        self.executor = MagicMock()
+        self.executor.count_user_wins.side_effect = lambda u, w, n: n // 2
+        self.executor.batch_size_for.side_effect = lambda n: n
+        self.service = AdventureService(
+            adventure_repo=MagicMock(), pokemon_repo=MagicMock(), team_repo=MagicMock(),
+            pokemon_service=MagicMock(), user_repo=MagicMock(), user_pokemon_repo=MagicMock(),
+            battle_repo=MagicMock(), user_item_repo=MagicMock(), item_repo=MagicMock(), move_repo=MagicMock(),
+            pokemon_ability_repo=MagicMock(), exp_service=MagicMock(), config={},
+            simulation_executor=self.executor
+        )
+
+    def test_repeat_matchup_skips_simulation(self):
+        user_ctx, wild_ctx = create_context(), create_context()
+        self.assertEqual(self.service.calculate_battle_win_rate(user_ctx, wild_ctx), (50.0, 50.0))
+        calls = self.executor.count_user_wins.call_count
+
+        rates = self.service.calculate_battle_win_rate(create_context(), create_context())
+        self.assertEqual(rates, (50.0, 50.0))
+        self.assertEqual(self.executor.count_user_wins.call_count, calls)
+        self.assertEqual(self.service.win_rate_cache.stats()["hits"], 1)
+
+        # 要求更多模拟次数时不复用较粗的缓存结果
+        self.service.calculate_battle_win_rate(user_ctx, wild_ctx, simulations=200)
+        self.assertEqual(self.executor.count_user_wins.call_count, calls + 1)
+
+    def test_estimate_uses_cache(self):
+        first = self.service.estimate_battle_win_rate(create_context(), create_context())
+        calls = self.executor.count_user_wins.call_count
+        second = self.service.estimate_battle_win_rate(create_context(), create_context())
+
+        self.assertIs(first, second)
+        self.assertEqual(self.executor.count_user_wins.call_count, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+import json
+import random
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock astrbot module before imports
+sys.modules['astrbot'] = MagicMock()
+sys.modules['astrbot.api'] = MagicMock()
+sys.modules['astrbot.core'] = MagicMock()
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from astrbot_plugin_pokemon.core.services.battle.win_rate_estimator import (
+    AdaptiveWinRateEstimator, wilson_interval, STOP_PRECISION, STOP_TIME_BUDGET, STOP_MAX_SIMULATIONS
+)
+
+CONF_SCHEMA = os.path.join(os.path.dirname(__file__), '..', '..', '_conf_schema.json')
+LEGACY_SIMULATIONS = 100  # 改造前每次胜率计算固定模拟的场数
+
+
+def bernoulli_batches(p, seed=7):
+    rng = random.Random(seed)
+    return lambda n: sum(1 for _ in range(n) if rng.random() < p)
+
+
+class TestAdaptiveWinRateEstimator(unittest.TestCase):
+    def test_lopsided_matchup_stops_early(self):
+        estimator = AdaptiveWinRateEstimator(batch_size=20, min_simulations=40, max_simulations=400, ci_width=10.0)
+        estimate = estimator.estimate(lambda n: n)  # 每场都赢
+
+        self.assertEqual(estimate.stop_reason, STOP_PRECISION)
+        self.assertEqual(estimate.simulations, 40)
+        self.assertEqual(estimate.win_rate, 100.0)
+        self.assertEqual(estimate.upper, 100.0)
+        self.assertLess(estimate.upper - estimate.lower, 10.0)
+        self.assertEqual(estimate.as_rates(), (100.0, 0.0))
+
+    def test_close_matchup_runs_until_precise(self):
+        estimator = AdaptiveWinRateEstimator(batch_size=20, min_simulations=40, max_simulations=2000,
+                                             ci_width=10.0, time_budget_ms=60_000)
+        estimate = estimator.estimate(bernoulli_batches(0.5))
+
+        self.assertEqual(estimate.stop_reason, STOP_PRECISION)
+        self.assertGreaterEqual(estimate.simulations, 360)
+        self.assertLessEqual(estimate.upper - estimate.lower, 10.0)
+        self.assertTrue(estimate.lower <= 50.0 <= estimate.upper)
+
+    def test_time_budget_and_max_simulations(self):
+        def slow_batch(n):
+            time.sleep(0.01)
+            return n // 2
+
+        estimate = AdaptiveWinRateEstimator(batch_size=10, min_simulations=10, max_simulations=10_000,
+                                            ci_width=1.0, time_budget_ms=30).estimate(slow_batch)
+        self.assertEqual(estimate.stop_reason, STOP_TIME_BUDGET)
+        self.assertLess(estimate.simulations, 10_000)
+
+        estimate = AdaptiveWinRateEstimator(batch_size=30, min_simulations=10, max_simulations=100,
+                                            ci_width=1.0, time_budget_ms=60_000).estimate(bernoulli_batches(0.4))
+        self.assertEqual(estimate.stop_reason, STOP_MAX_SIMULATIONS)
+        self.assertEqual(estimate.simulations, 100)
+
+    def test_default_worst_case_within_legacy_budget(self):
+        with open(CONF_SCHEMA, encoding="utf-8") as f:
+            items = json.load(f)["adventure"]["items"]
+        schema_config = {key: items[key]["default"] for key in ("win_rate_max_simulations", "win_rate_ci_width")}
+
+        for config in ({}, schema_config):
+            for batch_size in (20, 40, 80):   # 进程池按工作进程数放大每批场数
+                estimator = AdaptiveWinRateEstimator.from_config(config, batch_size=batch_size)
+                for seed in range(20):
+                    estimate = estimator.estimate(bernoulli_batches(0.5, seed))
+                    self.assertLessEqual(estimate.simulations, LEGACY_SIMULATIONS)
+                # 悬殊对局仍然提前停止
+                self.assertLess(estimator.estimate(lambda n: n).simulations, LEGACY_SIMULATIONS)
+
+    def test_wilson_interval_bounds(self):
+        lower, upper = wilson_interval(0, 50)
+        self.assertEqual(lower, 0.0)
+        self.assertGreater(upper, 0.0)
+        lower, upper = wilson_interval(30, 60)
+        self.assertAlmostEqual((lower + upper) / 2, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from astrbot.api import logger, AstrBotConfig
 from .astrbot_plugin_pokemon.core.container import GameContainer
 
 from .astrbot_plugin_pokemon.infrastructure.database.migration import run_migrations
+from .astrbot_plugin_pokemon.infrastructure.database.seed_database import apply_seed_database
 from .astrbot_plugin_pokemon.core.services import DataSetupService
 
 from .astrbot_plugin_pokemon.interface.commands.common_handlers import CommonHandlers
@@ -36,12 +37,50 @@ class PokemonPlugin(Star):
         # 2. 读取配置
         user_config = config.get("user", {})
         adventure_config = config.get("adventure", {})
+        battle_log_config = config.get("battle_log", {})
+        database_config = config.get("database", {})
+        state_cache_config = config.get("state_cache", {})
         self.game_config = {
             "user": {"initial_coins": user_config.get("initial_coins", 200)},
-            "adventure": {"cooldown": adventure_config.get("cooldown_seconds", 10)}
+            "adventure": {
+                "cooldown": adventure_config.get("cooldown_seconds", 10),
+                "simulation_workers": adventure_config.get("simulation_workers", 0),
+                "win_rate_ci_width": adventure_config.get("win_rate_ci_width", 20.0),
+                "win_rate_time_budget_ms": adventure_config.get("win_rate_time_budget_ms", 300),
+                "win_rate_max_simulations": adventure_config.get("win_rate_max_simulations", 100),
+                "win_rate_cache_size": adventure_config.get("win_rate_cache_size", 1024),
+                "win_rate_cache_persist": adventure_config.get("win_rate_cache_persist", False),
+                "win_rate_cache_persist_rows": adventure_config.get("win_rate_cache_persist_rows", 10000),
+                "battle_log_replay": adventure_config.get("battle_log_replay", False),
+                "encounter_ttl_seconds": adventure_config.get("encounter_ttl_seconds", 1800),
+                "encounter_write_through": adventure_config.get("encounter_write_through", True),
+                "wild_gc_interval_minutes": adventure_config.get("wild_gc_interval_minutes", 60)
+            },
+            "battle_log": {
+                "compress": battle_log_config.get("compress", True),
+                "keep_per_user": battle_log_config.get("keep_per_user", 200),
+                "keep_days": battle_log_config.get("keep_days", 0),
+                "archive": battle_log_config.get("archive", True),
+                "maintenance_interval_minutes": battle_log_config.get("maintenance_interval_minutes", 60)
+            },
+            "database": {
+                "journal_mode": database_config.get("journal_mode", "WAL"),
+                "synchronous": database_config.get("synchronous", "NORMAL"),
+                "cache_size_kb": database_config.get("cache_size_kb", 8192),
+                "mmap_size_mb": database_config.get("mmap_size_mb", 64),
+                "temp_store": database_config.get("temp_store", "MEMORY"),
+                "busy_timeout_ms": database_config.get("busy_timeout_ms", 5000),
+                "statement_cache_size": database_config.get("statement_cache_size", 256),
+                "executor_workers": database_config.get("executor_workers", 1)
+            },
+            "state_cache": {
+                "max_users": state_cache_config.get("max_users", 512),
+                "ttl_seconds": state_cache_config.get("ttl_seconds", 300)
+            }
         }
 
         self.web_admin_task = None
+        self.maintenance_tasks = []
         webui_config = config.get("webui", {})
         self.secret_key = webui_config.get("secret_key", "default-secret-key")
         self.port = webui_config.get("port", 7777)
@@ -118,6 +157,14 @@ class PokemonPlugin(Star):
             return
 
         # 3. 初始化核心游戏数据
+        # 从预编译的种子库导入静态数据（只替换来源 CSV 有变化的表），不可用时由下方的 CSV 导入兜底
+        try:
+            copied = apply_seed_database(self.db_path)
+            if copied:
+                logger.info(f"[{self.plugin_id}] 已从种子库导入静态数据: {copied}")
+        except Exception as e:
+            logger.error(f"[{self.plugin_id}] 种子库导入失败，改为从 CSV 导入: {e}")
+
         try:
             data_setup_service = DataSetupService(
                 self.pokemon_repo,
@@ -128,13 +175,33 @@ class PokemonPlugin(Star):
                 self.nature_repo,
                 self.trainer_repo,  # 添加训练家仓库
                 self.container.ability_repo,  # 添加特性定义仓库
-                self.container.pokemon_ability_repo  # 添加宝可梦特性关联仓库
+                self.container.pokemon_ability_repo,  # 添加宝可梦特性关联仓库
+                self.container.db_manager
             )
             data_setup_service.setup_initial_data()
             logger.info(f"[{self.plugin_id}] 初始数据检查/写入完成。")
         except Exception as e:
             logger.error(f"[{self.plugin_id}] 初始数据设置失败: {e}")
 
+        # 加载静态数据目录：物种/招式/物品等查询此后直接读取内存
+        try:
+            catalog = self.container.load_catalog()
+            logger.info(f"[{self.plugin_id}] 静态数据目录已加载: {catalog.stats()}")
+        except Exception as e:
+            logger.error(f"[{self.plugin_id}] 静态数据目录加载失败，继续使用数据库查询: {e}")
+
+        # 后台维护任务：压缩/归档战斗日志，清理过期遭遇与无引用的野生宝可梦
+        maintenance_jobs = [
+            ("战斗日志维护", self.container.maintain_battle_logs,
+             self.game_config["battle_log"]["maintenance_interval_minutes"]),
+            ("野生宝可梦清理", self.container.collect_wild_pokemon_garbage,
+             self.game_config["adventure"]["wild_gc_interval_minutes"]),
+        ]
+        for name, job, interval_minutes in maintenance_jobs:
+            if interval_minutes > 0:
+                self.maintenance_tasks.append(
+                    asyncio.create_task(self._maintenance_loop(name, job, interval_minutes)))
+
 
     # ====================== 指令注册区 ======================
 
@@ -392,6 +459,32 @@ class PokemonPlugin(Star):
         except:
             return False
 
+    async def _maintenance_loop(self, name: str, job, interval_minutes: int):
+        """定期执行维护任务 job（返回本批各项处理条数）；每批在数据库线程中执行，批次之间让出数据库线程给指令处理"""
+        interval = interval_minutes * 60
+        while True:
+            try:
+                totals = {}
+                while True:
+                    batch = await self.container.db_executor.run(job)
+                    if not any(batch.values()):
+                        break
+                    for key, count in batch.items():
+                        totals[key] = totals.get(key, 0) + count
+                if any(totals.values()):
+                    logger.info(f"[{self.plugin_id}] {name}完成: {totals}")
+            except Exception as e:
+                logger.error(f"[{self.plugin_id}] {name}失败: {e}")
+            await asyncio.sleep(interval)
+
     async def terminate(self):
         """可选择实现异步的插件销毁方法"""
-        pass
\ No newline at end of file
+        # 停止后台维护任务
+        for task in self.maintenance_tasks:
+            task.cancel()
+        logger.info(f"[{self.plugin_id}] 缓存指标: {self.container.cache_metrics()}")
+        # 关闭战斗模拟进程池
+        self.container.adventure_service.simulation_executor.shutdown()
+        # 关闭数据库线程与共享的数据库连接
+        self.container.db_executor.shutdown()
+        self.container.db_manager.close_all()
\ No newline at end of file
@@ -81,6 +81,7 @@ class TestGymSystem(unittest.TestCase):
         # Setup Team
         self.service.team_repo.get_user_team.return_value = MagicMock(team_pokemon_ids=[1, 2, 3])
         self.service.user_pokemon_repo.get_user_pokemon_by_id.return_value = MagicMock(current_hp=100) # Alive
+        self.service.user_pokemon_repo.get_user_pokemon_by_ids.return_value = [MagicMock(current_hp=100)] * 3 # Alive
 
         # Mock Trainers
         self.mock_trainer_service.get_trainer_with_pokemon.return_value = MagicMock()
@@ -62,6 +62,7 @@ class TestGymStateful(unittest.TestCase):
         # Mock Team
         self.mock_team_repo.get_user_team.return_value = MagicMock(team_pokemon_ids=[1])
         self.mock_user_pokemon_repo.get_user_pokemon_by_id.return_value = MagicMock(current_hp=100)
+        self.mock_user_pokemon_repo.get_user_pokemon_by_ids.return_value = [MagicMock(current_hp=100)]
 
         # Mock Gym
         self.gym = GymInfo(